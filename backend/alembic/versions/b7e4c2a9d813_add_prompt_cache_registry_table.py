@@ -0,0 +1,45 @@
+"""add_prompt_cache_registry_table
+
+Revision ID: b7e4c2a9d813
+Revises: f2192a3c0b71
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e4c2a9d813"
+down_revision: Union[str, Sequence[str], None] = "f2192a3c0b71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create prompt_cache_registry table."""
+    op.create_table(
+        "prompt_cache_registry",
+        sa.Column("cache_key", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("cached_content_name", sa.String(), nullable=True),
+        sa.Column("expires_at", sa.Float(), nullable=True),
+        sa.Column("lock_owner", sa.String(), nullable=True),
+        sa.Column("lock_expires_at", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("cache_key", "model"),
+    )
+    op.create_index(
+        "ix_prompt_cache_registry_cached_content_name",
+        "prompt_cache_registry",
+        ["cached_content_name"],
+    )
+
+
+def downgrade() -> None:
+    """Drop prompt_cache_registry table."""
+    op.drop_index("ix_prompt_cache_registry_cached_content_name", "prompt_cache_registry")
+    op.drop_table("prompt_cache_registry")
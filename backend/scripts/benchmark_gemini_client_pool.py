@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold vs warm GeminiClient construction and request latency.
+
+"Cold" builds a fresh genai client (new credentials, new TLS connections) for every
+request, as GeminiClient did before clients were pooled. "Warm" goes through the
+process-wide pool, so requests reuse one client and its keep-alive connections.
+
+Run:
+  python3 scripts/benchmark_gemini_client_pool.py                 # construction only, no network
+  python3 scripts/benchmark_gemini_client_pool.py --live --requests 10
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from videoagent import gemini as gemini_module  # noqa: E402
+from videoagent.gcp import build_vertex_client_kwargs  # noqa: E402
+from videoagent.gemini import GeminiClient  # noqa: E402
+from videoagent.gemini_cache_db import GeminiCacheDB  # noqa: E402
+
+
+def _summarize(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+    print(
+        f"{label:<28} n={len(samples):<4} "
+        f"mean={statistics.mean(samples) * 1000:8.2f}ms  "
+        f"p50={statistics.median(samples) * 1000:8.2f}ms  "
+        f"p90={p90 * 1000:8.2f}ms"
+    )
+
+
+def _time(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def _cold_construction() -> None:
+    gemini_module._DOTENV_LOADED = False
+    client = GeminiClient()
+    from google import genai
+
+    client._load_dotenv()
+    GeminiCacheDB(client._cache_db_path)
+    genai.Client(**build_vertex_client_kwargs(client.config))
+
+
+def _warm_construction() -> None:
+    GeminiClient()._get_content_client()
+
+
+def _request(genai_client, model: str) -> None:
+    genai_client.models.generate_content(model=model, contents="Reply with the single word: ok")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="also time real generate_content requests")
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--model", default="gemini-3-flash-preview")
+    args = parser.parse_args()
+
+    cold = [_time(_cold_construction) for _ in range(args.iterations)]
+    _warm_construction()
+    warm = [_time(_warm_construction) for _ in range(args.iterations)]
+    _summarize("construction (cold)", cold)
+    _summarize("construction (pooled)", warm)
+
+    if not args.live:
+        return
+
+    from google import genai
+
+    cold_requests = []
+    for _ in range(args.requests):
+        cold_requests.append(
+            _time(lambda: _request(genai.Client(**build_vertex_client_kwargs(GeminiClient().config)), args.model))
+        )
+    pooled = GeminiClient()._get_content_client()
+    _request(pooled, args.model)
+    warm_requests = [
+        _time(lambda: _request(GeminiClient()._get_content_client(), args.model))
+        for _ in range(args.requests)
+    ]
+    _summarize("request (fresh client)", cold_requests)
+    _summarize("request (pooled client)", warm_requests)
+    del pooled
+
+
+if __name__ == "__main__":
+    main()
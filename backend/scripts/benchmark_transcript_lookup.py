@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: transcript lookups on Pydantic segment lists vs CompactTranscript.
+
+Run:
+  python3 scripts/benchmark_transcript_lookup.py
+  python3 scripts/benchmark_transcript_lookup.py --segments 50000 --queries 2000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from videoagent.models import TranscriptSegment  # noqa: E402
+from videoagent.transcript_store import CompactTranscript  # noqa: E402
+
+
+def _make_rows(count: int) -> list[tuple[float, float, str]]:
+    rng = random.Random(0)
+    rows = []
+    cursor = 0.0
+    for index in range(count):
+        length = rng.uniform(1.0, 6.0)
+        rows.append((cursor, cursor + length, f"transcript line {index} with a few words of speech"))
+        cursor += length
+    return rows
+
+
+def _measure_memory(build) -> tuple[object, int]:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    value = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, after - before
+
+
+def _time_per_query(fn, queries: list[float]) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segments", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    args = parser.parse_args()
+
+    rows = _make_rows(args.segments)
+    total = rows[-1][1]
+    rng = random.Random(1)
+    queries = [rng.uniform(0.0, total) for _ in range(args.queries)]
+
+    segments, segment_bytes = _measure_memory(
+        lambda: [TranscriptSegment(text=text, start_time=start, end_time=end) for start, end, text in rows]
+    )
+    compact, compact_bytes = _measure_memory(lambda: CompactTranscript.from_rows(rows))
+
+    def linear_at(query: float):
+        for seg in segments:
+            if seg.start_time <= query <= seg.end_time:
+                return seg
+        return None
+
+    def linear_range(query: float):
+        return [seg for seg in segments if seg.end_time >= query and seg.start_time <= query + 30.0]
+
+    scale = 10_000 / args.segments
+    print(f"segments={args.segments} queries={args.queries}")
+    print(f"memory per 10k segments: pydantic={segment_bytes * scale / 1024:.1f} KiB "
+          f"compact={compact_bytes * scale / 1024:.1f} KiB")
+    print(f"point lookup: linear={_time_per_query(linear_at, queries):.2f} us "
+          f"bisect={_time_per_query(compact.index_at, queries):.2f} us")
+    print(f"30s range lookup: linear={_time_per_query(linear_range, queries):.2f} us "
+          f"bisect={_time_per_query(lambda q: compact.indices_in_range(q, q + 30.0), queries):.2f} us")
+
+
+if __name__ == "__main__":
+    main()
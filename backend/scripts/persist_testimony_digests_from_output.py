@@ -13,7 +13,10 @@ from videoagent.storage import get_storage_client
 from videoagent.testimony_digest_index import (
     TESTIMONY_DIGEST_SCHEMA_VERSION,
     build_testimony_digest_index,
+    compile_testimony_digest_bundle,
+    testimony_digest_bundle_key,
     testimony_digest_video_key,
+    write_testimony_digest_bundle,
     write_testimony_digest_index,
     write_testimony_digest_run_summary,
     write_video_testimony_digest,
@@ -144,6 +147,7 @@ def main() -> None:
 
     index_written = False
     index_key = ""
+    bundle_key = ""
     if not args.no_index:
         index_payload = build_testimony_digest_index(
             company_id=company_id,
@@ -155,6 +159,10 @@ def main() -> None:
         write_testimony_digest_index(storage, company_id, index_payload)
         index_written = True
         index_key = f"companies/{company_id}/testimony_digest/index_td_v1.json"
+        bundle_payload = compile_testimony_digest_bundle(storage, company_id)
+        if bundle_payload is not None:
+            write_testimony_digest_bundle(storage, company_id, bundle_payload)
+            bundle_key = testimony_digest_bundle_key(company_id)
 
     run_summary_written = False
     run_summary_key = ""
@@ -171,6 +179,7 @@ def main() -> None:
         "video_errors": errors,
         "index_written": index_written,
         "index_key": index_key or None,
+        "bundle_key": bundle_key or None,
         "run_summary_written": run_summary_written,
         "run_summary_key": run_summary_key or None,
     }
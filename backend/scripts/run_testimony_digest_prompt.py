@@ -15,7 +15,10 @@ from typing import Any, Optional
 from videoagent.testimony_digest_index import (
     TESTIMONY_DIGEST_SCHEMA_VERSION,
     build_testimony_digest_index,
+    compile_testimony_digest_bundle,
+    testimony_digest_bundle_key,
     testimony_digest_video_key,
+    write_testimony_digest_bundle,
     write_testimony_digest_index,
     write_testimony_digest_run_summary,
     write_video_testimony_digest,
@@ -997,6 +1000,7 @@ async def main() -> None:
         "video_errors": [],
         "index_persisted": False,
         "index_key": None,
+        "bundle_key": None,
         "run_summary_persisted": False,
         "run_summary_key": None,
     }
@@ -1055,6 +1059,16 @@ async def main() -> None:
                     except Exception as exc:
                         gcs_persistence["index_error"] = str(exc)
 
+                # The agent reads only the bundle, so rebuild it whenever a digest or the index changed.
+                if videos_persisted or gcs_persistence["index_persisted"]:
+                    try:
+                        bundle_payload = compile_testimony_digest_bundle(storage_client, resolved_company_id)
+                        if bundle_payload is not None:
+                            write_testimony_digest_bundle(storage_client, resolved_company_id, bundle_payload)
+                            gcs_persistence["bundle_key"] = testimony_digest_bundle_key(resolved_company_id)
+                    except Exception as exc:
+                        gcs_persistence["bundle_error"] = str(exc)
+
                 summary["gcs_persistence"] = gcs_persistence
                 if index_local_path:
                     summary["index_local_path"] = index_local_path
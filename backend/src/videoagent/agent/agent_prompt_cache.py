@@ -0,0 +1,237 @@
+"""Explicit Gemini context cache for the agent's static instruction prefix.
+
+Every agent model call starts with the same few thousand tokens: the system prompt,
+the company brief and the testimony digest. Only the video brief and storyboard that
+follow them change between calls. `AgentPrefixCacheModel` puts that static prefix,
+together with the tool declarations, into a Gemini explicit cache keyed by (company,
+prompt version, digest generation). Each request then sends only the session state,
+as a leading user message. Gemini rejects `system_instruction` and `tools` next to
+`cachedContent`, so both live in the cache.
+
+Caches are created through `GeminiClient`, which talks to Vertex AI. Explicit caching
+therefore applies to `vertex_ai/` agent models only; `gemini/` models keep the full
+instructions, where the stable leading prefix still benefits from implicit caching.
+A cache that cannot be created, or that Gemini rejects (expired, not found), falls back
+to the uncached request. Rate limits and transient errors propagate to the retry layer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from agents import ModelSettings
+from agents.extensions.models.litellm_model import LitellmModel
+from agents.models.chatcmpl_converter import Converter
+
+from videoagent.gemini import GeminiClient
+from videoagent.resilience import ErrorClass, classify_error
+
+_DEFAULT_TTL_SECONDS = 1800
+# After a cache cannot be created (e.g. prefix below the model's minimum), retry this much later.
+_UNAVAILABLE_BACKOFF_SECONDS = 600.0
+
+
+_CACHE_REJECTION_MARKERS = ("cachedcontent", "cached_content", "cached content")
+
+
+def prompt_version(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def is_cached_content_rejection(error: BaseException) -> bool:
+    """Whether Gemini refused the request because of the cache it references (e.g. not found or expired)."""
+    message = str(error).lower()
+    return classify_error(error) is ErrorClass.FATAL and any(marker in message for marker in _CACHE_REJECTION_MARKERS)
+
+
+def agent_prefix_cache_ttl_seconds() -> int:
+    raw = str(os.environ.get("AGENT_PREFIX_CACHE_TTL_SECONDS") or "").strip()
+    if not raw:
+        return _DEFAULT_TTL_SECONDS
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return _DEFAULT_TTL_SECONDS
+
+
+@dataclass(frozen=True)
+class AgentStaticPrefix:
+    company_id: str
+    prompt_version: str
+    digest_generation: Optional[str]
+    text: str
+
+
+def gemini_tool_declarations(openai_tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Chat-completions tool schemas as one Gemini tool with raw JSON-schema parameters."""
+    declarations = []
+    for tool in openai_tools:
+        function = tool.get("function") if isinstance(tool, dict) else None
+        if not isinstance(function, dict) or not function.get("name"):
+            continue
+        declaration: dict[str, Any] = {"name": function["name"]}
+        if function.get("description"):
+            declaration["description"] = function["description"]
+        if function.get("parameters"):
+            declaration["parameters_json_schema"] = function["parameters"]
+        declarations.append(declaration)
+    return [{"function_declarations": declarations}] if declarations else []
+
+
+def agent_prefix_cache_key(prefix: AgentStaticPrefix, model: str, tool_declarations: list[dict[str, Any]]) -> str:
+    content_hash = hashlib.sha256(
+        f"{prefix.text}\n{json.dumps(tool_declarations, sort_keys=True)}".encode("utf-8")
+    ).hexdigest()
+    return hashlib.sha256(
+        "\n".join(
+            [prefix.company_id, prefix.prompt_version, str(prefix.digest_generation), model, content_hash]
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def _vertex_location_of(cached_content_name: str) -> Optional[str]:
+    """Region of a `projects/<p>/locations/<l>/cachedContents/<id>` name."""
+    parts = cached_content_name.split("/")
+    if len(parts) >= 4 and parts[0] == "projects" and parts[2] == "locations":
+        return parts[3]
+    return None
+
+
+def _with_session_state(input: Any, session_state: str) -> list[Any]:
+    items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+    if not session_state:
+        return items
+    return [{"role": "user", "content": session_state}, *items]
+
+
+class AgentPrefixCacheModel(LitellmModel):
+    """LiteLLM model that serves the agent's static instruction prefix from an explicit cache."""
+
+    def __init__(
+        self,
+        model: str,
+        *,
+        provider_model: str,
+        ttl_seconds: int,
+        client_factory: Callable[[], GeminiClient] = GeminiClient,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(model=model)
+        self.provider_model = provider_model
+        self.ttl_seconds = ttl_seconds
+        # Set by the agent's dynamic instructions before each model call.
+        self.static_prefix: Optional[AgentStaticPrefix] = None
+        self._client_factory = client_factory
+        self._clock = clock
+        self._unavailable_until: dict[str, float] = {}
+
+    def _cached_content_name(self, prefix: AgentStaticPrefix, tools: list[Any]) -> Optional[str]:
+        tool_declarations = gemini_tool_declarations([Converter.tool_to_openai(tool) for tool in tools])
+        cache_key = agent_prefix_cache_key(prefix, self.provider_model, tool_declarations)
+        if self._unavailable_until.get(cache_key, 0.0) > self._clock():
+            return None
+        try:
+            return self._client_factory().get_or_create_cached_content(
+                model=self.provider_model,
+                cache_key=cache_key,
+                contents=None,
+                system_instruction=prefix.text,
+                tools=tool_declarations or None,
+                ttl_seconds=self.ttl_seconds,
+                display_name=f"agent_prefix_{prefix.company_id[:24]}_{prefix.prompt_version}",
+            )
+        except Exception as exc:
+            print(f"[AgentPrefixCacheModel][prompt_cache] cache unavailable for {prefix.company_id}: {exc}")
+            self._unavailable_until[cache_key] = self._clock() + _UNAVAILABLE_BACKOFF_SECONDS
+            return None
+
+    async def _fetch_response(
+        self,
+        system_instructions: Optional[str],
+        input: Any,
+        model_settings: ModelSettings,
+        tools: list[Any],
+        output_schema: Any,
+        handoffs: list[Any],
+        span: Any,
+        tracing: Any,
+        stream: bool = False,
+        prompt: Any = None,
+    ) -> Any:
+        prefix = self.static_prefix
+        cached_content_name = None
+        if (
+            self.ttl_seconds > 0
+            and prefix is not None
+            and system_instructions
+            and system_instructions.startswith(prefix.text)
+            and not handoffs
+        ):
+            cached_content_name = await asyncio.to_thread(self._cached_content_name, prefix, tools)
+        if not cached_content_name:
+            return await super()._fetch_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, span, tracing,
+                stream=stream, prompt=prompt,
+            )
+
+        extra_args = dict(model_settings.extra_args or {})
+        extra_args["cached_content"] = cached_content_name
+        location = _vertex_location_of(cached_content_name)
+        if location:
+            # The request must hit the region that holds the cache.
+            extra_args["vertex_location"] = location
+        cached_settings = model_settings.resolve(ModelSettings(extra_args=extra_args))
+        session_state = system_instructions[len(prefix.text):].strip()
+        try:
+            return await super()._fetch_response(
+                None, _with_session_state(input, session_state), cached_settings, [], output_schema, handoffs,
+                span, tracing, stream=stream, prompt=prompt,
+            )
+        except Exception as exc:
+            if not is_cached_content_rejection(exc):
+                raise
+            print(
+                "[AgentPrefixCacheModel][prompt_cache] cached content rejected; "
+                f"retrying without cache. error={exc}"
+            )
+            self._client_factory().forget_cached_content(cached_content_name)
+            return await super()._fetch_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, span, tracing,
+                stream=stream, prompt=prompt,
+            )
+
+
+_TURN_USAGE: dict[str, dict[str, int]] = {}
+_TURN_USAGE_LOCK = threading.Lock()
+
+
+def record_agent_turn_usage(company_id: Optional[str], usage: Any) -> dict[str, int]:
+    """Fold one turn's token usage into the per-company totals; returns the turn's report."""
+    input_tokens = int(getattr(usage, "input_tokens", 0) or 0)
+    details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = int(getattr(details, "cached_tokens", 0) or 0)
+    report = {
+        "requests": int(getattr(usage, "requests", 0) or 0),
+        "input_tokens": input_tokens,
+        "cached_input_tokens": cached_tokens,
+        "billed_input_tokens": max(0, input_tokens - cached_tokens),
+        "output_tokens": int(getattr(usage, "output_tokens", 0) or 0),
+    }
+    with _TURN_USAGE_LOCK:
+        totals = _TURN_USAGE.setdefault(str(company_id or "global"), {"turns": 0, **{key: 0 for key in report}})
+        totals["turns"] += 1
+        for key, value in report.items():
+            totals[key] += value
+    return report
+
+
+def agent_prompt_cache_metrics() -> dict[str, dict[str, int]]:
+    with _TURN_USAGE_LOCK:
+        return {company_id: dict(totals) for company_id, totals in _TURN_USAGE.items()}
@@ -161,6 +161,11 @@ After matching results:
 
 The UI will show these as alternatives
 
+Large tool results come back as a compact view headed by a `tool_result` handle:
+- Descriptions and rationales are shortened; warnings and shortlist clips are only counted.
+- When you need the omitted detail, call `get_tool_result` with that handle and, optionally, a `path`
+  such as `results.0.candidates`.
+
 ### 2.7 Scene candidates review
 1. After setting the scene candidates, you will immediately be able to view the actual clips selected for each scene in your content.
 2. Review all the clips and make sure they are a perfect match that respect all the rules above.
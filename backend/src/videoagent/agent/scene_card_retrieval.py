@@ -0,0 +1,167 @@
+"""Local BM25 retrieval over VO scene cards ahead of the shortlist LLM call."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from videoagent.transcript_search import TranscriptSearchIndex
+
+# Eligible cards closer than this are treated as one contiguous span, since a
+# shortlist clip may cover several adjacent scenes.
+_ADJACENT_GAP_SECONDS = 0.5
+_CHARS_PER_TOKEN = 4
+# Reciprocal-rank-fusion constant used to blend lexical and semantic rankings.
+_RRF_K = 60
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count used for reporting prompt savings."""
+    return (len(text or "") + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def scene_card_text(card: dict[str, Any]) -> str:
+    semantic = card.get("semantic_meaning")
+    semantic_map = semantic if isinstance(semantic, dict) else {}
+    keywords = card.get("searchable_keywords")
+    parts = [
+        str(card.get("visual_summary") or ""),
+        " ".join(str(value or "") for value in semantic_map.values() if isinstance(value, str)),
+        " ".join(str(item or "") for item in keywords) if isinstance(keywords, list) else "",
+    ]
+    return " ".join(part for part in parts if part)
+
+
+def _card_float(card: dict[str, Any], key: str) -> float:
+    try:
+        return float(card.get(key, 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass(frozen=True)
+class RetrievalStats:
+    cards_total: int
+    cards_sent: int
+    cards_feasible: int
+    videos_sent: int
+
+
+class SceneCardRetriever:
+    """BM25 + duration-feasibility filter over a prepared shortlist index payload."""
+
+    def __init__(self, index_payload: dict[str, Any]) -> None:
+        self._index_payload = index_payload
+        self._videos: list[dict[str, Any]] = [
+            video for video in index_payload.get("videos", []) if isinstance(video, dict)
+        ]
+        self._search = TranscriptSearchIndex()
+        # Per video: contiguous-run id and run span for each eligible card.
+        self._run_ids: dict[str, list[int]] = {}
+        self._run_spans: dict[str, list[float]] = {}
+        self._card_positions: dict[tuple[str, str], int] = {}
+        self.cards_total = 0
+
+        for video in self._videos:
+            video_id = str(video.get("video_id") or "")
+            cards = self._eligible_cards(video)
+            self.cards_total += len(cards)
+            self._search.add_video(video_id, [scene_card_text(card) for card in cards])
+            for card_index, card in enumerate(cards):
+                self._card_positions.setdefault((video_id, str(card.get("scene_id") or "")), card_index)
+
+            run_ids: list[int] = []
+            run_starts: list[float] = []
+            run_ends: list[float] = []
+            for card in cards:
+                start = _card_float(card, "start_time")
+                end = _card_float(card, "end_time")
+                if run_ends and start - run_ends[-1] <= _ADJACENT_GAP_SECONDS:
+                    run_ends[-1] = max(run_ends[-1], end)
+                else:
+                    run_starts.append(start)
+                    run_ends.append(end)
+                run_ids.append(len(run_starts) - 1)
+            self._run_ids[video_id] = run_ids
+            self._run_spans[video_id] = [run_ends[run] - run_starts[run] for run in run_ids]
+
+    @staticmethod
+    def _eligible_cards(video: dict[str, Any]) -> list[dict[str, Any]]:
+        cards = video.get("eligible_scenes")
+        return [card for card in cards if isinstance(card, dict)] if isinstance(cards, list) else []
+
+    def _is_feasible(self, video_id: str, card_index: int, target_duration: float) -> bool:
+        return self._run_spans[video_id][card_index] > target_duration
+
+    def retrieve(
+        self,
+        query: str,
+        *,
+        target_duration: float,
+        top_k: int,
+        neighbor_radius: int = 1,
+        semantic_hits: Optional[list[tuple[str, str, float]]] = None,
+    ) -> tuple[dict[str, Any], RetrievalStats]:
+        """Narrow the payload to the top-k feasible cards plus their adjacent neighbours.
+
+        `semantic_hits` ((video_id, scene_id, score), best first) are fused with the
+        BM25 ranking by reciprocal rank.
+        """
+        feasible = [
+            (video_id, card_index)
+            for video_id, spans in self._run_spans.items()
+            for card_index in range(len(spans))
+            if self._is_feasible(video_id, card_index, target_duration)
+        ]
+        fused: dict[tuple[str, int], float] = {}
+        lexical = self._search.search(query, limit=self.cards_total)
+        for rank, (video_id, card_index, _score) in enumerate(lexical):
+            fused[(video_id, card_index)] = 1.0 / (_RRF_K + rank)
+        for rank, (video_id, scene_id, _score) in enumerate(semantic_hits or []):
+            card_index = self._card_positions.get((video_id, scene_id))
+            if card_index is not None:
+                key = (video_id, card_index)
+                fused[key] = fused.get(key, 0.0) + 1.0 / (_RRF_K + rank)
+
+        selected: list[tuple[str, int]] = []
+        seen: set[tuple[str, int]] = set()
+        for video_id, card_index in sorted(fused, key=lambda key: -fused[key]):
+            if len(selected) >= top_k:
+                break
+            if self._is_feasible(video_id, card_index, target_duration):
+                selected.append((video_id, card_index))
+                seen.add((video_id, card_index))
+        # Queries with little lexical overlap still get a bounded, feasible candidate set.
+        for hit in feasible:
+            if len(selected) >= top_k:
+                break
+            if hit not in seen:
+                selected.append(hit)
+                seen.add(hit)
+
+        keep: dict[str, set[int]] = {}
+        for video_id, card_index in selected:
+            run_ids = self._run_ids[video_id]
+            for neighbor in range(card_index - neighbor_radius, card_index + neighbor_radius + 1):
+                if 0 <= neighbor < len(run_ids) and run_ids[neighbor] == run_ids[card_index]:
+                    keep.setdefault(video_id, set()).add(neighbor)
+
+        videos_out: list[dict[str, Any]] = []
+        cards_sent = 0
+        for video in self._videos:
+            video_id = str(video.get("video_id") or "")
+            indices = keep.get(video_id)
+            if not indices:
+                continue
+            cards = self._eligible_cards(video)
+            narrowed = [cards[index] for index in sorted(indices)]
+            cards_sent += len(narrowed)
+            videos_out.append({**video, "eligible_scenes": narrowed})
+
+        payload = {**self._index_payload, "videos": videos_out}
+        stats = RetrievalStats(
+            cards_total=self.cards_total,
+            cards_sent=cards_sent,
+            cards_feasible=len(feasible),
+            videos_sent=len(videos_out),
+        )
+        return payload, stats
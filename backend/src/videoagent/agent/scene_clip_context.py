@@ -0,0 +1,157 @@
+"""Incremental scene-clip context for agent turns.
+
+Each turn the agent gets one user message that shows it the storyboard's matched
+footage. Attaching every clip on every turn makes the model re-ingest the whole
+storyboard's video per user message. Instead, `SceneClipLedger` remembers, per
+session, the clip each scene had when the model last saw it (keyed by a fingerprint
+of source video, offsets and audio routing). Only new or changed scenes are
+attached as video; unchanged scenes become short text descriptors.
+
+Attached clips share a per-turn frame budget. When the changed clips would exceed
+it at the default fps, the fps is lowered (down to a floor) before any clip is
+deferred to a later turn. Deferred scenes are not recorded as seen, so they are
+attached first once the budget allows.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from videoagent.story import _StoryboardScene
+
+# Text parts of the clip context message start with this marker so that earlier
+# turns' clip messages can be recognised (and dropped) in the session history.
+SCENE_CLIP_CONTEXT_MARKER = "[SCENE_CLIP_CONTEXT]"
+
+_DEFAULT_FPS = 5.0
+_MIN_FPS = 1.0
+# ~2 minutes of footage at 5 fps.
+_DEFAULT_MAX_FRAMES = 600
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = str(os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def scene_clip_fps() -> float:
+    return max(_MIN_FPS, _env_float("SCENE_CLIP_CONTEXT_FPS", _DEFAULT_FPS))
+
+
+def scene_clip_frame_budget() -> int:
+    """Max video frames attached per turn; 0 disables the budget."""
+    return max(0, int(_env_float("SCENE_CLIP_CONTEXT_MAX_FRAMES", _DEFAULT_MAX_FRAMES)))
+
+
+def scene_clip_fingerprint(scene: _StoryboardScene) -> Optional[str]:
+    matched = scene.matched_scene
+    if not matched or not matched.source_video_id:
+        return None
+    audio = "voice_over" if scene.use_voice_over else "original_audio"
+    return f"{matched.source_video_id}|{float(matched.start_time):.3f}|{float(matched.end_time):.3f}|{audio}"
+
+
+def scene_clip_descriptor(scene: _StoryboardScene, status: str) -> str:
+    matched = scene.matched_scene
+    if not matched:
+        return f"{SCENE_CLIP_CONTEXT_MARKER} {scene.scene_id}: no matched clip."
+    audio = "voice over" if scene.use_voice_over else "original audio"
+    description = " ".join(str(matched.description or "").split())
+    return (
+        f"{SCENE_CLIP_CONTEXT_MARKER} {scene.scene_id}: {status}. "
+        f"Clip {matched.source_video_id} {float(matched.start_time):.3f}s-{float(matched.end_time):.3f}s "
+        f"({audio}). {description}"
+    ).strip()
+
+
+def is_scene_clip_context_text(part: Any) -> bool:
+    return (
+        isinstance(part, dict)
+        and part.get("type") == "input_text"
+        and str(part.get("text") or "").startswith(SCENE_CLIP_CONTEXT_MARKER)
+    )
+
+
+@dataclass(frozen=True)
+class SceneClipPlan:
+    fps: float
+    attach: list[str] = field(default_factory=list)
+    deferred: list[str] = field(default_factory=list)
+
+
+def plan_scene_clip_budget(
+    durations: list[tuple[str, float]],
+    *,
+    max_frames: int,
+    fps: float = _DEFAULT_FPS,
+    min_fps: float = _MIN_FPS,
+) -> SceneClipPlan:
+    """Pick the fps and the clips (in order) that fit the frame budget.
+
+    The fps is lowered first; clips are deferred only when even `min_fps` does not
+    fit. The first clip is always attached so that a long clip cannot stall forever.
+    """
+    total_seconds = sum(max(0.0, seconds) for _, seconds in durations)
+    if max_frames <= 0 or total_seconds * fps <= max_frames:
+        return SceneClipPlan(fps=fps, attach=[scene_id for scene_id, _ in durations])
+
+    scaled_fps = max(min_fps, math.floor(max_frames / total_seconds * 100) / 100)
+    plan = SceneClipPlan(fps=scaled_fps)
+    frames = 0.0
+    for scene_id, seconds in durations:
+        clip_frames = max(0.0, seconds) * scaled_fps
+        if plan.attach and (plan.deferred or frames + clip_frames > max_frames):
+            plan.deferred.append(scene_id)
+            continue
+        plan.attach.append(scene_id)
+        frames += clip_frames
+    return plan
+
+
+class SceneClipLedger:
+    """Per-session record of the clip fingerprint each scene had when last attached.
+
+    `stage` holds a turn's attachments until `commit`, so a failed turn does not mark
+    clips as seen. The ledger is per process; after a restart every clip is attached
+    once more.
+    """
+
+    def __init__(self) -> None:
+        self._seen: dict[str, dict[str, str]] = {}
+        self._staged: dict[str, tuple[dict[str, str], set[str]]] = {}
+        self._lock = threading.Lock()
+
+    def seen(self, session_id: str) -> dict[str, str]:
+        with self._lock:
+            return dict(self._seen.get(session_id, {}))
+
+    def stage(self, session_id: str, attached: dict[str, str], current_scene_ids: set[str]) -> None:
+        with self._lock:
+            self._staged[session_id] = (dict(attached), set(current_scene_ids))
+
+    def commit(self, session_id: str) -> None:
+        with self._lock:
+            staged = self._staged.pop(session_id, None)
+            if staged is None:
+                return
+            attached, current_scene_ids = staged
+            seen = {
+                scene_id: fingerprint
+                for scene_id, fingerprint in self._seen.get(session_id, {}).items()
+                if scene_id in current_scene_ids
+            }
+            seen.update(attached)
+            self._seen[session_id] = seen
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._staged.pop(session_id, None)
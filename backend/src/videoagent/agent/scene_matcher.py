@@ -3,18 +3,22 @@ from __future__ import annotations
 
 import asyncio
 import json
+import threading
 import time
+from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from google.genai import types
 from pydantic import ValidationError
 
+from videoagent.concurrency import Priority, priority_scope
 from videoagent.config import Config
 from videoagent.gemini import GeminiClient
 from videoagent.library import VideoLibrary
-from videoagent.story import _StoryboardScene
+from videoagent.response_cache import ResponseCachePolicy, json_response_validator
+from videoagent.story import SceneCandidate, _StoryboardScene
 
 from .schemas import (
     SceneMatchBatchRequest,
@@ -50,6 +54,103 @@ class SceneMatchJob:
 
 # Keep this aligned with tools._check_scene_warnings (>10% is considered mismatch).
 _VOICE_OVER_DURATION_MISMATCH_RATIO_THRESHOLD = 0.10
+# Candidates kept in the shortlist when a scene's results are streamed into the storyboard.
+_STREAMED_CANDIDATE_LIMIT = 5
+# Streamed scenes are persisted from worker threads; each load/modify/save of the storyboard must not interleave.
+_STREAM_PERSIST_LOCK = threading.Lock()
+
+
+def _persist_streamed_candidates(
+    storyboard_store: StoryboardStore,
+    session_id: str,
+    user_id: Optional[str],
+    scene_id: str,
+    ranked: list[dict],
+    keep_original_audio: bool,
+) -> None:
+    from videoagent.candidates import set_candidates
+
+    scenes = storyboard_store.load(session_id, user_id=user_id) or []
+    scene = next((item for item in scenes if item.scene_id == scene_id), None)
+    if scene is None:
+        return
+    new_candidates = [
+        SceneCandidate(
+            source_video_id=candidate["video_id"],
+            start_time=candidate["start_seconds"],
+            end_time=candidate["end_seconds"],
+            description=candidate.get("description") or "",
+            rationale=candidate.get("rationale") or "",
+            keep_original_audio=keep_original_audio,
+            last_rank=rank,
+            shortlisted=True,
+        )
+        for rank, candidate in enumerate(ranked)
+    ]
+    selected = next(
+        (
+            candidate
+            for candidate in scene.matched_scene_candidates
+            if candidate.candidate_id == scene.selected_candidate_id
+        ),
+        None,
+    )
+    if selected is not None:
+        selected.last_rank = len(new_candidates)
+        new_candidates.append(selected)
+    set_candidates(scene, new_candidates, auto_select_best=False)
+    storyboard_store.save(session_id, scenes, user_id=user_id)
+
+
+def _stream_scene_match_result(
+    *,
+    storyboard_store: StoryboardStore,
+    event_store: EventStore,
+    session_id: str,
+    user_id: Optional[str],
+    scene_id: str,
+    candidates: list[dict],
+    keep_original_audio: bool,
+    warnings: Optional[list[str]] = None,
+    errors: Optional[list[dict]] = None,
+) -> None:
+    """Persist one finished scene's candidates and emit `scene_match_result` before the batch ends.
+
+    New candidates replace the scene's previous ones, except the currently selected
+    candidate, which is kept so a streamed result never changes the user's pick. Nothing
+    is auto-selected either; that stays with the agent. Blocking (storage I/O): callers
+    on the event loop run it through `asyncio.to_thread`.
+    """
+    # Matcher order is kept; the agent re-ranks with set_scene_candidates afterwards.
+    ranked = candidates[:_STREAMED_CANDIDATE_LIMIT]
+    try:
+        if ranked:
+            with _STREAM_PERSIST_LOCK:
+                _persist_streamed_candidates(
+                    storyboard_store, session_id, user_id, scene_id, ranked, keep_original_audio
+                )
+
+        event: dict[str, Any] = {
+            "type": "scene_match_result",
+            "scene_id": scene_id,
+            "candidate_count": len(candidates),
+            "candidates": [
+                {
+                    "video_id": candidate["video_id"],
+                    "start_seconds": candidate["start_seconds"],
+                    "end_seconds": candidate["end_seconds"],
+                    "description": candidate.get("description") or "",
+                }
+                for candidate in ranked
+            ],
+        }
+        if warnings:
+            event["warnings"] = warnings
+        if errors:
+            event["errors"] = [error.get("error") for error in errors]
+        event_store.append(session_id, event, user_id=user_id)
+    except Exception as exc:
+        print(f"[SceneMatcher][scene_match_stream] Failed to stream result for scene_id={scene_id}: {exc}")
 
 
 class SceneMatcher:
@@ -120,8 +221,33 @@ class SceneMatcher:
                 response_payload["errors"] = errors
             return json.dumps(response_payload)
 
-        # 3. Execution (Analysis)
-        analysis_results = await _execute_analysis_jobs(client, jobs, uploaded_files)
+        # 3. Execution (Analysis); each scene is persisted and announced as soon as it finishes.
+        jobs_by_scene_id: dict[str, list[SceneMatchJob]] = {}
+        for job in jobs:
+            jobs_by_scene_id.setdefault(job.scene_id, []).append(job)
+
+        def _on_scene_complete(scene_id: str, scene_results: list[dict]) -> None:
+            scene_jobs = jobs_by_scene_id[scene_id]
+            scene_errors: list[dict] = []
+            scene_output, _notes = _process_analysis_results(scene_jobs, scene_results, scene_errors)
+            _stream_scene_match_result(
+                storyboard_store=self.storyboard_store,
+                event_store=self.event_store,
+                session_id=self.session_id,
+                user_id=self.user_id,
+                scene_id=scene_id,
+                candidates=scene_output[scene_id]["candidates"],
+                keep_original_audio=scene_jobs[0].mode == SceneMatchMode.ORIGINAL_AUDIO,
+                warnings=warnings_by_scene_id.get(scene_id),
+                errors=scene_errors,
+            )
+
+        analysis_results = await _execute_analysis_jobs(
+            client,
+            jobs,
+            uploaded_files,
+            on_scene_complete=_on_scene_complete,
+        )
 
         # 4. Processing Results
         results_by_scene_id, _notes_by_scene_id = _process_analysis_results(
@@ -702,6 +828,11 @@ async def _analyze_job_with_prompt(
                 "response_json_schema": _response_schema_for_mode(job),
                 "thinking_config": types.ThinkingConfig(thinking_budget=1024),
             },
+            # Same (video, window, script) prompt -> same analysis; only replay parseable answers.
+            response_cache=ResponseCachePolicy(
+                site="deep_analysis",
+                accept=json_response_validator(lambda text: _parse_response_for_mode(job, text)),
+            ),
         )
     except Exception as exc:
         _print_prompt_log(job, time.perf_counter() - llm_start, None)
@@ -845,13 +976,28 @@ async def _execute_analysis_jobs(
     client: GeminiClient,
     jobs: list[SceneMatchJob],
     uploaded_files: dict[str, object],
+    on_scene_complete: Optional[Callable[[str, list[dict]], None]] = None,
 ) -> list[dict]:
-    """Execute analysis in parallel."""
-    tasks = [
-        _analyze_single_job(client, job, uploaded_files.get(job.video_id))
-        for job in jobs
-    ]
-    return await asyncio.gather(*tasks)
+    """Execute analysis in parallel; the shared governor bounds in-flight model calls.
+
+    `on_scene_complete(scene_id, results)` is called, in a worker thread, as soon as every
+    job of a scene has finished, while other scenes are still running.
+    """
+    remaining_by_scene_id = Counter(job.scene_id for job in jobs)
+    results_by_scene_id: dict[str, list[dict]] = {}
+
+    async def _run(job: SceneMatchJob) -> dict:
+        result = await _analyze_single_job(client, job, uploaded_files.get(job.video_id))
+        if on_scene_complete is not None:
+            results_by_scene_id.setdefault(job.scene_id, []).append(result)
+            remaining_by_scene_id[job.scene_id] -= 1
+            if remaining_by_scene_id[job.scene_id] == 0:
+                # Off the event loop: publishing loads and saves the storyboard.
+                await asyncio.to_thread(on_scene_complete, job.scene_id, results_by_scene_id[job.scene_id])
+        return result
+
+    with priority_scope(Priority.BATCH):
+        return await asyncio.gather(*[_run(job) for job in jobs])
 
 
 def _normalize_candidates(
@@ -2,33 +2,63 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Optional
 
 from google.genai import types
 from pydantic import BaseModel, Field, ValidationError
 
+from videoagent.concurrency import Priority, priority_scope
 from videoagent.config import Config
+from videoagent.gcp import get_vertex_project
 from videoagent.gemini import GeminiClient
+from videoagent.hedging import HedgeDeadlineExceeded, get_hedge_group
 from videoagent.library import VideoLibrary
+from videoagent.prompt_cache_manager import get_prompt_cache_manager
+from videoagent.resilience import ErrorClass, classify_error
+from videoagent.response_cache import ResponseCachePolicy, json_response_validator
 from videoagent.storage import get_storage_client
 from videoagent.story import _StoryboardScene
 
-from .scene_analysis_index import read_scene_index, to_voiceless_path
+from .scene_analysis_index import read_scene_index, scene_analysis_index_key, to_voiceless_path
+from .scene_card_retrieval import SceneCardRetriever, estimate_tokens
 from .scene_matcher import (
     SceneMatchJob,
     SceneMatchMode,
     _analyze_voice_over_job,
     _duration_section,
+    _stream_scene_match_result,
 )
+from .scene_vector_index import GeminiEmbedder, SceneEmbedder, SceneVectorIndex
 from .schemas import SceneMatchV2BatchRequest
+from .shortlist_index_cache import (
+    ShortlistIndexSnapshot,
+    get_shortlist_index_cache,
+    library_version,
+    shortlist_prompt_cache_key,
+)
 from .storage import EventStore, StoryboardStore
 
 _SHORTLIST_DURATION_EPSILON_SECONDS = 0.01
 _SHORTLIST_END_SOFT_CAP_SECONDS = 0.5
+_SHORTLIST_RETRIEVAL_DEFAULT_TOP_K = 40
+_SEMANTIC_PRERANK_TOP_K = 100
+_SHORTLIST_BATCH_DEFAULT_MAX_SCENES = 8
+# Estimated prompt tokens (library context + target blocks) allowed in one batched shortlist call.
+_SHORTLIST_BATCH_MAX_PROMPT_TOKENS = 120_000
+# Age after which a cached shortlist index snapshot is re-validated in the background.
+_SHORTLIST_INDEX_DEFAULT_REFRESH_SECONDS = 60
+# Wall-clock budget for one scene's deep analysis (uploads plus model calls); 0 disables it.
+_DEEP_ANALYSIS_DEFAULT_SCENE_BUDGET_SECONDS = 180
+
+# Per-company scene vector indexes, kept across requests and synced incrementally.
+_SCENE_VECTOR_INDEXES: dict[tuple[str, str], SceneVectorIndex] = {}
+_SCENE_VECTOR_INDEXES_LOCK = threading.Lock()
 
 
 class ShortlistClip(BaseModel):
@@ -43,9 +73,32 @@ class ShortlistResponse(BaseModel):
     notes: Optional[str] = None
 
 
+class ShortlistSceneResult(BaseModel):
+    scene_id: str
+    review_clips: list[ShortlistClip] = Field(default_factory=list)
+    notes: Optional[str] = None
+
+
+class BatchShortlistResponse(BaseModel):
+    scenes: list[ShortlistSceneResult] = Field(default_factory=list)
+
+
+@dataclass
+class _ShortlistBatchItem:
+    index: int
+    scene: _StoryboardScene
+    notes: str
+    target_duration: float
+    semantic_hits: list[tuple[str, str, float]]
+    index_payload: dict[str, Any]
+
+
 class SceneMatcherV2:
     """Isolated v2 matcher for voice-over scenes only."""
 
+    # Prepared shortlist context for the current call; lets prefix rendering and hashing be skipped.
+    _shortlist_snapshot: Optional[ShortlistIndexSnapshot] = None
+
     def __init__(
         self,
         config: Config,
@@ -68,6 +121,40 @@ class SceneMatcherV2:
             os.environ.get("SHORTLIST_PROMPT_CACHE_TTL_SECONDS"),
             default=600,
         )
+        self._shortlist_retrieval_top_k = self._parse_optional_positive_int(
+            os.environ.get("SHORTLIST_RETRIEVAL_TOP_K"),
+            default=_SHORTLIST_RETRIEVAL_DEFAULT_TOP_K,
+        )
+        self._shortlist_batch_max_scenes = self._parse_optional_positive_int(
+            os.environ.get("SHORTLIST_BATCH_MAX_SCENES"),
+            default=_SHORTLIST_BATCH_DEFAULT_MAX_SCENES,
+        )
+        self._shortlist_index_refresh_seconds = self._parse_optional_positive_int(
+            os.environ.get("SHORTLIST_INDEX_REFRESH_SECONDS"),
+            default=_SHORTLIST_INDEX_DEFAULT_REFRESH_SECONDS,
+        )
+        self._deep_analysis_scene_budget_seconds = self._parse_optional_positive_int(
+            os.environ.get("DEEP_ANALYSIS_SCENE_BUDGET_SECONDS"),
+            default=_DEEP_ANALYSIS_DEFAULT_SCENE_BUDGET_SECONDS,
+        )
+        # Semantic pre-ranking needs real embeddings; without a Vertex project it stays off.
+        self._scene_vector_embedder = (
+            str(os.environ.get("SCENE_VECTOR_EMBEDDER") or "").strip().lower()
+            or ("gemini" if get_vertex_project(config) else "off")
+        )
+
+    @staticmethod
+    def _parse_optional_positive_int(value: Optional[str], *, default: int) -> int:
+        raw = str(value or "").strip().lower()
+        if raw in {"", "default"}:
+            return default
+        if raw in {"none", "off", "false", "disabled", "disable", "0"}:
+            return 0
+        try:
+            parsed = int(raw)
+        except ValueError:
+            return default
+        return parsed if parsed > 0 else default
 
     @staticmethod
     def _parse_thinking_budget(value: str) -> Optional[int]:
@@ -217,8 +304,8 @@ class SceneMatcherV2:
             return "company_id is required for scene_matcher_v2."
 
         storage = get_storage_client(self.config)
-        index_payload = read_scene_index(storage, self.company_id)
-        if not index_payload:
+        snapshot = self._get_shortlist_snapshot()
+        if snapshot is None:
             self._print_issue(
                 "missing_index",
                 (
@@ -231,15 +318,18 @@ class SceneMatcherV2:
                 "Run run_scene_analysis_prompt.py with --all-videos --persist-gcs --build-index first."
             )
 
-        library = VideoLibrary(self.config, company_id=self.company_id)
-        library.scan_library()
-        video_map = {video.id: video for video in library.list_videos()}
-        shortlist_index_payload, index_warnings = self._prepare_shortlist_index_payload(
-            index_payload=index_payload,
-            video_map=video_map,
-        )
+        video_map = snapshot.video_map
+        shortlist_index_payload = snapshot.index_payload
+        index_warnings = list(snapshot.index_warnings)
         for warning in index_warnings:
             self._print_issue("index_warning", warning)
+        shortlist_retriever = (
+            snapshot.scene_card_retriever or SceneCardRetriever(shortlist_index_payload)
+            if self._shortlist_retrieval_top_k > 0
+            else None
+        )
+        # Syncing embeds new or changed cards with blocking Gemini calls.
+        scene_vector_index = await asyncio.to_thread(self._get_scene_vector_index, shortlist_index_payload)
 
         response_results_by_index: dict[int, dict[str, Any]] = {}
         response_warnings: dict[str, list[str]] = {}
@@ -301,6 +391,17 @@ class SceneMatcherV2:
 
             pending_jobs.append((index, scene_id, scene, request.notes.strip(), float(target_duration)))
 
+        batched_shortlists: dict[int, tuple[dict[str, Any], list[tuple[str, str, float]]]] = {}
+        if len(pending_jobs) > 1 and self._shortlist_batch_max_scenes > 1:
+            with priority_scope(Priority.BATCH):
+                batched_shortlists = await self._batch_shortlist_pending_jobs(
+                    pending_jobs=pending_jobs,
+                    shortlist_index_payload=shortlist_index_payload,
+                    video_map=video_map,
+                    shortlist_retriever=shortlist_retriever,
+                    scene_vector_index=scene_vector_index,
+                )
+
         async def _run_pending_job(
             index: int,
             scene_id: str,
@@ -308,6 +409,7 @@ class SceneMatcherV2:
             notes: str,
             target_duration: float,
         ) -> tuple[int, str, dict[str, Any]]:
+            shortlist_result, semantic_hits = batched_shortlists.get(index, (None, None))
             scene_result = await self._match_single_scene_to_video_v2(
                 scene=scene,
                 notes=notes,
@@ -316,17 +418,35 @@ class SceneMatcherV2:
                 shortlist_index_payload=shortlist_index_payload,
                 video_map=video_map,
                 index_warnings=index_warnings,
+                shortlist_retriever=shortlist_retriever,
+                scene_vector_index=scene_vector_index,
+                shortlist_result=shortlist_result,
+                semantic_hits=semantic_hits,
+            )
+            # Publish this scene now instead of waiting for the slowest scene in the batch.
+            await asyncio.to_thread(
+                _stream_scene_match_result,
+                storyboard_store=self.storyboard_store,
+                event_store=self.event_store,
+                session_id=self.session_id,
+                user_id=self.user_id,
+                scene_id=scene_id,
+                candidates=scene_result["candidates"],
+                keep_original_audio=False,
+                warnings=scene_result["warnings"],
+                errors=scene_result["errors"],
             )
             return index, scene_id, scene_result
 
         if pending_jobs:
-            concurrent_results = await asyncio.gather(
-                *[
-                    _run_pending_job(index, scene_id, scene, notes, target_duration)
-                    for index, scene_id, scene, notes, target_duration in pending_jobs
-                ],
-                return_exceptions=True,
-            )
+            with priority_scope(Priority.BATCH):
+                concurrent_results = await asyncio.gather(
+                    *[
+                        _run_pending_job(index, scene_id, scene, notes, target_duration)
+                        for index, scene_id, scene, notes, target_duration in pending_jobs
+                    ],
+                    return_exceptions=True,
+                )
 
             for (index, scene_id, _scene, _notes, _duration), result in zip(pending_jobs, concurrent_results):
                 if isinstance(result, Exception):
@@ -381,18 +501,38 @@ class SceneMatcherV2:
         shortlist_index_payload: dict[str, Any],
         video_map: dict[str, Any],
         index_warnings: list[str],
+        shortlist_retriever: Optional[SceneCardRetriever] = None,
+        scene_vector_index: Optional[SceneVectorIndex] = None,
+        shortlist_result: Optional[dict[str, Any]] = None,
+        semantic_hits: Optional[list[tuple[str, str, float]]] = None,
     ) -> dict[str, Any]:
         scene_id = scene.scene_id
         errors: list[dict[str, Any]] = []
         warnings: list[str] = list(index_warnings)
         notes_out: list[str] = []
 
-        shortlist_result = await self._shortlist_review_clips(
-            scene=scene,
-            notes=notes,
-            target_duration=target_duration,
-            index_payload=shortlist_index_payload,
-        )
+        if shortlist_result is None:
+            semantic_hits, scene_index_payload = self._prepare_scene_shortlist_context(
+                scene=scene,
+                notes=notes,
+                target_duration=target_duration,
+                shortlist_index_payload=shortlist_index_payload,
+                shortlist_retriever=shortlist_retriever,
+                scene_vector_index=scene_vector_index,
+            )
+            context_payload, send_hints = self._shortlist_context_payload(
+                shortlist_index_payload,
+                [scene_index_payload],
+            )
+            shortlist_result = await self._shortlist_review_clips(
+                scene=scene,
+                notes=notes,
+                target_duration=target_duration,
+                index_payload=context_payload,
+                retrieval_hint=scene_index_payload if send_hints else None,
+                # A per-scene library context is not shared, so explicit caching would not pay off.
+                use_prompt_cache=context_payload is shortlist_index_payload,
+            )
         if shortlist_result.get("error"):
             self._print_issue(
                 "shortlist_error",
@@ -446,6 +586,13 @@ class SceneMatcherV2:
                 "shortlist_review_clips": [clip.model_dump(mode="json") for clip in shortlist_clips],
             }
 
+        if semantic_hits:
+            shortlist_clips = self._prerank_shortlist_clips(
+                shortlist_clips,
+                semantic_hits=semantic_hits,
+                index_payload=shortlist_index_payload,
+            )
+
         deep_results = await self._run_deep_analysis(
             scene=scene,
             notes=notes,
@@ -566,6 +713,400 @@ class SceneMatcherV2:
         }
         return payload_out, warnings
 
+    def _prepare_scene_shortlist_context(
+        self,
+        *,
+        scene: _StoryboardScene,
+        notes: str,
+        target_duration: float,
+        shortlist_index_payload: dict[str, Any],
+        shortlist_retriever: Optional[SceneCardRetriever],
+        scene_vector_index: Optional[SceneVectorIndex],
+    ) -> tuple[list[tuple[str, str, float]], dict[str, Any]]:
+        """Semantic hits and the (possibly narrowed) library payload for one scene's shortlist."""
+        semantic_hits = self._semantic_scene_hits(
+            scene=scene,
+            notes=notes,
+            vector_index=scene_vector_index,
+        )
+        if shortlist_retriever is None:
+            return semantic_hits, shortlist_index_payload
+        scene_index_payload = self._retrieve_shortlist_index_payload(
+            scene=scene,
+            notes=notes,
+            target_duration=target_duration,
+            index_payload=shortlist_index_payload,
+            retriever=shortlist_retriever,
+            semantic_hits=semantic_hits,
+        )
+        return semantic_hits, scene_index_payload
+
+    @staticmethod
+    def _union_index_payloads(base_payload: dict[str, Any], payloads: list[dict[str, Any]]) -> dict[str, Any]:
+        """Merge narrowed payloads back into one context, keeping the base card order."""
+        if all(payload is base_payload for payload in payloads):
+            return base_payload
+        keep: dict[str, set[str]] = {}
+        for payload in payloads:
+            for video in payload.get("videos", []):
+                if not isinstance(video, dict):
+                    continue
+                scene_ids = keep.setdefault(str(video.get("video_id") or ""), set())
+                for card in video.get("eligible_scenes") or []:
+                    if isinstance(card, dict):
+                        scene_ids.add(str(card.get("scene_id") or ""))
+
+        videos_out: list[dict[str, Any]] = []
+        for video in base_payload.get("videos", []):
+            if not isinstance(video, dict):
+                continue
+            scene_ids = keep.get(str(video.get("video_id") or ""))
+            if not scene_ids:
+                continue
+            cards = [
+                card
+                for card in video.get("eligible_scenes") or []
+                if isinstance(card, dict) and str(card.get("scene_id") or "") in scene_ids
+            ]
+            videos_out.append({**video, "eligible_scenes": cards})
+        return {**base_payload, "videos": videos_out}
+
+    def _shortlist_context_payload(
+        self,
+        shortlist_index_payload: dict[str, Any],
+        scene_payloads: list[dict[str, Any]],
+    ) -> tuple[dict[str, Any], bool]:
+        """Library context to send, and whether the retrieved cards go along as per-scene hints.
+
+        With explicit prompt caching the full library stays the cached prefix, so every
+        request reuses it; retrieval then only points the model at the best cards.
+        Without caching the context itself is narrowed to the retrieved cards.
+        """
+        narrowed_payload = self._union_index_payloads(shortlist_index_payload, scene_payloads)
+        if narrowed_payload is shortlist_index_payload:
+            return shortlist_index_payload, False
+        if self._shortlist_prompt_cache_ttl_seconds > 0:
+            return shortlist_index_payload, True
+        return narrowed_payload, False
+
+    def _estimate_batch_prompt_tokens(
+        self,
+        items: list[_ShortlistBatchItem],
+        shortlist_index_payload: dict[str, Any],
+    ) -> int:
+        context_payload, send_hints = self._shortlist_context_payload(
+            shortlist_index_payload,
+            [item.index_payload for item in items],
+        )
+        return estimate_tokens(self._shortlist_prompt_prefix(context_payload)) + estimate_tokens(
+            self._render_batch_target_scenes_block(
+                [(item.scene, item.notes, item.target_duration) for item in items],
+                retrieval_hints={item.scene.scene_id: item.index_payload for item in items} if send_hints else None,
+            )
+        )
+
+    def _plan_shortlist_batches(
+        self,
+        items: list[_ShortlistBatchItem],
+        shortlist_index_payload: dict[str, Any],
+    ) -> list[list[_ShortlistBatchItem]]:
+        """Greedily pack scenes into batches bounded by scene count and estimated prompt tokens."""
+        batches: list[list[_ShortlistBatchItem]] = []
+        current: list[_ShortlistBatchItem] = []
+        for item in items:
+            candidate = current + [item]
+            overflow = current and (
+                len(candidate) > self._shortlist_batch_max_scenes
+                or any(existing.scene.scene_id == item.scene.scene_id for existing in current)
+                or self._estimate_batch_prompt_tokens(candidate, shortlist_index_payload)
+                > _SHORTLIST_BATCH_MAX_PROMPT_TOKENS
+            )
+            if overflow:
+                batches.append(current)
+                current = [item]
+            else:
+                current = candidate
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _batch_shortlist_pending_jobs(
+        self,
+        *,
+        pending_jobs: list[tuple[int, str, _StoryboardScene, str, float]],
+        shortlist_index_payload: dict[str, Any],
+        video_map: dict[str, Any],
+        shortlist_retriever: Optional[SceneCardRetriever],
+        scene_vector_index: Optional[SceneVectorIndex],
+    ) -> dict[int, tuple[dict[str, Any], list[tuple[str, str, float]]]]:
+        """Shortlist several scenes per LLM call.
+
+        Returns (shortlist_result, semantic_hits) by pending-job index. Scenes missing
+        from the result fall back to a per-scene shortlist call.
+        """
+        items: list[_ShortlistBatchItem] = []
+        for index, _scene_id, scene, notes, target_duration in pending_jobs:
+            semantic_hits, scene_index_payload = self._prepare_scene_shortlist_context(
+                scene=scene,
+                notes=notes,
+                target_duration=target_duration,
+                shortlist_index_payload=shortlist_index_payload,
+                shortlist_retriever=shortlist_retriever,
+                scene_vector_index=scene_vector_index,
+            )
+            items.append(
+                _ShortlistBatchItem(
+                    index=index,
+                    scene=scene,
+                    notes=notes,
+                    target_duration=target_duration,
+                    semantic_hits=semantic_hits,
+                    index_payload=scene_index_payload,
+                )
+            )
+
+        batches = [batch for batch in self._plan_shortlist_batches(items, shortlist_index_payload) if len(batch) > 1]
+        if not batches:
+            return {}
+        self._print_issue(
+            "shortlist_batch",
+            (
+                f"Shortlisting {sum(len(batch) for batch in batches)}/{len(items)} scene(s) "
+                f"in {len(batches)} batched call(s)."
+            ),
+        )
+        batch_results = await asyncio.gather(
+            *[
+                self._shortlist_review_clips_batch(
+                    items=batch,
+                    shortlist_index_payload=shortlist_index_payload,
+                    video_map=video_map,
+                )
+                for batch in batches
+            ],
+            return_exceptions=True,
+        )
+
+        prepared: dict[int, tuple[dict[str, Any], list[tuple[str, str, float]]]] = {}
+        for batch, result in zip(batches, batch_results):
+            if isinstance(result, Exception):
+                self._print_issue("shortlist_batch", f"Unexpected batched shortlist exception: {result}")
+                continue
+            for item in batch:
+                scene_result = result.get(item.scene.scene_id)
+                if scene_result is not None:
+                    prepared[item.index] = (scene_result, item.semantic_hits)
+        return prepared
+
+    async def _shortlist_review_clips_batch(
+        self,
+        *,
+        items: list[_ShortlistBatchItem],
+        shortlist_index_payload: dict[str, Any],
+        video_map: dict[str, Any],
+    ) -> dict[str, dict[str, Any]]:
+        """Shortlist a batch of scenes in one call; returns results keyed by scene_id."""
+        client = GeminiClient(self.config)
+        client.use_vertexai = True
+
+        scene_ids = [item.scene.scene_id for item in items]
+        scope = f"scene_ids={','.join(scene_ids)}"
+        context_payload, send_hints = self._shortlist_context_payload(
+            shortlist_index_payload,
+            [item.index_payload for item in items],
+        )
+        shared_prompt_prefix = self._shortlist_prompt_prefix(context_payload)
+        batch_block = self._render_batch_target_scenes_block(
+            [(item.scene, item.notes, item.target_duration) for item in items],
+            retrieval_hints={item.scene.scene_id: item.index_payload for item in items} if send_hints else None,
+        )
+        thinking_budget = self._thinking_budget
+        if thinking_budget is not None and thinking_budget > 0:
+            thinking_budget *= len(items)
+
+        response, error = await self._generate_shortlist_response(
+            client=client,
+            shared_prompt_prefix=shared_prompt_prefix,
+            request_block=batch_block,
+            response_schema=BatchShortlistResponse.model_json_schema(),
+            response_cache=ResponseCachePolicy(
+                site="shortlist_batch",
+                accept=json_response_validator(BatchShortlistResponse.model_validate_json),
+            ),
+            scope=scope,
+            use_prompt_cache=context_payload is shortlist_index_payload,
+            thinking_budget=thinking_budget,
+        )
+        if error or response is None or not response.text:
+            self._print_issue(
+                "shortlist_batch",
+                (
+                    f"{scope}: batched shortlist unavailable, falling back to per-scene calls. "
+                    f"error={error or 'empty response'}"
+                ),
+            )
+            return {}
+
+        try:
+            parsed = BatchShortlistResponse.model_validate_json(response.text)
+        except ValidationError as exc:
+            self._print_issue(
+                "shortlist_batch",
+                (
+                    f"{scope}: batched shortlist validation failed, falling back to per-scene calls: {exc}. "
+                    f"response_preview={self._preview_text(response.text, max_chars=320)}"
+                ),
+            )
+            return {}
+
+        results: dict[str, dict[str, Any]] = {}
+        for scene_result in parsed.scenes:
+            if scene_result.scene_id not in scene_ids or scene_result.scene_id in results:
+                continue
+            validation_error = self._validate_shortlist(scene_result.review_clips, video_map)
+            if validation_error:
+                self._print_issue(
+                    "shortlist_batch",
+                    f"scene_id={scene_result.scene_id}: {validation_error} Falling back to per-scene call.",
+                )
+                continue
+            results[scene_result.scene_id] = {
+                "review_clips": scene_result.review_clips,
+                "notes": scene_result.notes,
+            }
+        missing = [scene_id for scene_id in scene_ids if scene_id not in results]
+        if missing:
+            self._print_issue(
+                "shortlist_batch",
+                f"{scope}: no usable batched result for {','.join(missing)}; falling back to per-scene calls.",
+            )
+        return results
+
+    @classmethod
+    def _shortlist_retrieval_query(cls, *, scene: _StoryboardScene, notes: str) -> str:
+        return " ".join(
+            cls._clean_prompt_text(value, max_chars=800)
+            for value in (scene.title, scene.purpose, scene.script, notes)
+        )
+
+    def _retrieve_shortlist_index_payload(
+        self,
+        *,
+        scene: _StoryboardScene,
+        notes: str,
+        target_duration: float,
+        index_payload: dict[str, Any],
+        retriever: SceneCardRetriever,
+        semantic_hits: Optional[list[tuple[str, str, float]]] = None,
+    ) -> dict[str, Any]:
+        """Narrow the library context to BM25 top-k cards that can fit the VO duration."""
+        if retriever.cards_total <= self._shortlist_retrieval_top_k:
+            return index_payload
+        narrowed_payload, stats = retriever.retrieve(
+            self._shortlist_retrieval_query(scene=scene, notes=notes),
+            target_duration=target_duration,
+            top_k=self._shortlist_retrieval_top_k,
+            semantic_hits=semantic_hits,
+        )
+        full_tokens = estimate_tokens(self._render_video_context_block(index_payload))
+        narrowed_tokens = estimate_tokens(self._render_video_context_block(narrowed_payload))
+        self._print_issue(
+            "shortlist_retrieval",
+            (
+                f"scene_id={scene.scene_id}: cards {stats.cards_sent}/{stats.cards_total} "
+                f"(feasible={stats.cards_feasible}, videos={stats.videos_sent}); "
+                f"est_context_tokens {full_tokens}->{narrowed_tokens}, "
+                f"saved~{full_tokens - narrowed_tokens}"
+            ),
+        )
+        return narrowed_payload
+
+    def _build_scene_embedder(self) -> Optional[SceneEmbedder]:
+        if self._scene_vector_embedder != "gemini":
+            return None
+        client = GeminiClient(self.config)
+        client.use_vertexai = True
+        return GeminiEmbedder(client)
+
+    def _get_scene_vector_index(self, index_payload: dict[str, Any]) -> Optional[SceneVectorIndex]:
+        """Per-company vector index, re-embedding only videos whose cards changed."""
+        if not self.company_id:
+            return None
+        key = (self.company_id, self._scene_vector_embedder)
+        try:
+            with _SCENE_VECTOR_INDEXES_LOCK:
+                vector_index = _SCENE_VECTOR_INDEXES.get(key)
+                if vector_index is None:
+                    embedder = self._build_scene_embedder()
+                    if embedder is None:
+                        return None
+                    vector_index = _SCENE_VECTOR_INDEXES[key] = SceneVectorIndex(embedder)
+            # Embedding calls Gemini; keep it off the process-wide lock so other companies are not blocked.
+            started = time.perf_counter()
+            updated = vector_index.sync_from_scene_index(index_payload)
+        except Exception as exc:
+            self._print_issue("scene_vector_index", f"Semantic pre-ranking unavailable: {exc}")
+            return None
+        if updated:
+            self._print_issue(
+                "scene_vector_index",
+                (
+                    f"company_id={self.company_id}: embedded {updated} video(s), "
+                    f"{len(vector_index)} card(s) indexed in {time.perf_counter() - started:.3f}s"
+                ),
+            )
+        return vector_index
+
+    def _semantic_scene_hits(
+        self,
+        *,
+        scene: _StoryboardScene,
+        notes: str,
+        vector_index: Optional[SceneVectorIndex],
+    ) -> list[tuple[str, str, float]]:
+        if vector_index is None:
+            return []
+        try:
+            return vector_index.search(
+                self._shortlist_retrieval_query(scene=scene, notes=notes),
+                top_k=_SEMANTIC_PRERANK_TOP_K,
+            )
+        except Exception as exc:
+            self._print_issue("scene_vector_index", f"scene_id={scene.scene_id}: semantic search failed: {exc}")
+            return []
+
+    @staticmethod
+    def _prerank_shortlist_clips(
+        review_clips: list[ShortlistClip],
+        *,
+        semantic_hits: list[tuple[str, str, float]],
+        index_payload: dict[str, Any],
+    ) -> list[ShortlistClip]:
+        """Order clips for deep analysis by the best semantic score of the cards they cover."""
+        hit_scores = {(video_id, scene_id): score for video_id, scene_id, score in semantic_hits}
+        card_spans: dict[str, list[tuple[str, float, float]]] = {}
+        for video in index_payload.get("videos", []):
+            if not isinstance(video, dict):
+                continue
+            spans = card_spans.setdefault(str(video.get("video_id") or ""), [])
+            for card in video.get("eligible_scenes") or []:
+                if not isinstance(card, dict):
+                    continue
+                try:
+                    spans.append((str(card.get("scene_id") or ""), float(card["start_time"]), float(card["end_time"])))
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+        def clip_score(clip: ShortlistClip) -> float:
+            scores = [
+                hit_scores.get((clip.video_id, scene_id), 0.0)
+                for scene_id, start, end in card_spans.get(clip.video_id, [])
+                if end > clip.start_time and start < clip.end_time
+            ]
+            return max(scores, default=0.0)
+
+        return sorted(review_clips, key=clip_score, reverse=True)
+
     def _validate_shortlist(self, review_clips: list[ShortlistClip], video_map: dict[str, Any]) -> Optional[str]:
         if len(review_clips) > 5:
             return "Shortlist rejected: model returned more than 5 clips."
@@ -597,18 +1138,20 @@ class SceneMatcherV2:
         *,
         client: GeminiClient,
         shared_prompt_prefix: str,
-        scene_id: Optional[str] = None,
+        scope: Optional[str] = None,
     ) -> Optional[str]:
         if self._shortlist_prompt_cache_ttl_seconds <= 0:
             return None
 
-        cache_key = hashlib.sha256(
-            f"{self.shortlist_model}\n{shared_prompt_prefix}".encode("utf-8")
-        ).hexdigest()
+        snapshot = self._shortlist_snapshot
+        if snapshot is not None and shared_prompt_prefix is snapshot.shared_prompt_prefix:
+            cache_key = snapshot.prompt_cache_key
+        else:
+            cache_key = shortlist_prompt_cache_key(self.shortlist_model, shared_prompt_prefix)
         cache_display_name = f"scene_matcher_v2_shortlist_{cache_key[:12]}"
 
         try:
-            return client.get_or_create_text_cached_content(
+            cached_content_name = client.get_or_create_text_cached_content(
                 model=self.shortlist_model,
                 cache_key=cache_key,
                 text=shared_prompt_prefix,
@@ -616,12 +1159,79 @@ class SceneMatcherV2:
                 display_name=cache_display_name,
             )
         except Exception as exc:
-            scope = f"scene_id={scene_id}: " if scene_id else ""
+            prefix = f"{scope}: " if scope else ""
             self._print_issue(
                 "shortlist_prompt_cache",
-                f"{scope}explicit cache unavailable, falling back to full prompt. error={exc}",
+                f"{prefix}explicit cache unavailable, falling back to full prompt. error={exc}",
             )
             return None
+        if cached_content_name and self.company_id:
+            get_prompt_cache_manager().track(
+                str(self.company_id),
+                self.shortlist_model,
+                cache_key,
+                cached_content_name,
+                expires_at=client.cached_prompt_expiry(cache_key, self.shortlist_model),
+                ttl_seconds=self._shortlist_prompt_cache_ttl_seconds,
+            )
+        return cached_content_name
+
+    def _get_shortlist_snapshot(self) -> Optional[ShortlistIndexSnapshot]:
+        """Prepared shortlist context for this company, served from the in-memory cache."""
+        cache = get_shortlist_index_cache(self._shortlist_index_refresh_seconds)
+        snapshot = cache.get((self.company_id, self.shortlist_model), self._load_shortlist_snapshot)
+        self._shortlist_snapshot = snapshot
+        return snapshot
+
+    def _load_shortlist_snapshot(
+        self,
+        previous: Optional[ShortlistIndexSnapshot],
+    ) -> Optional[ShortlistIndexSnapshot]:
+        """Rebuild the snapshot unless the index generation and library version are unchanged."""
+        storage = get_storage_client(self.config)
+        try:
+            index_generation = storage.get_metadata(scene_analysis_index_key(self.company_id)).get("generation")
+        except FileNotFoundError:
+            return None
+        library = VideoLibrary(self.config, company_id=self.company_id)
+        library.scan_library()
+        video_map = {video.id: video for video in library.list_videos()}
+        version = library_version(video_map)
+        if (
+            previous is not None
+            and index_generation is not None
+            and previous.index_generation == index_generation
+            and previous.library_version == version
+        ):
+            return previous
+
+        index_payload = read_scene_index(storage, self.company_id)
+        if not index_payload:
+            return None
+        shortlist_index_payload, index_warnings = self._prepare_shortlist_index_payload(
+            index_payload=index_payload,
+            video_map=video_map,
+        )
+        shared_prompt_prefix = self._build_shortlist_prompt_shared_prefix(index_payload=shortlist_index_payload)
+        return ShortlistIndexSnapshot(
+            company_id=str(self.company_id),
+            index_generation=index_generation,
+            library_version=version,
+            video_map=video_map,
+            index_payload=shortlist_index_payload,
+            index_warnings=index_warnings,
+            shared_prompt_prefix=shared_prompt_prefix,
+            prompt_cache_key=shortlist_prompt_cache_key(self.shortlist_model, shared_prompt_prefix),
+            scene_card_retriever=(
+                SceneCardRetriever(shortlist_index_payload) if self._shortlist_retrieval_top_k > 0 else None
+            ),
+        )
+
+    def _shortlist_prompt_prefix(self, index_payload: dict[str, Any]) -> str:
+        snapshot = self._shortlist_snapshot
+        if snapshot is not None and index_payload is snapshot.index_payload:
+            return snapshot.shared_prompt_prefix
+        return self._build_shortlist_prompt_shared_prefix(index_payload=index_payload)
 
     def warm_shortlist_prompt_cache(self) -> bool:
         if self._shortlist_prompt_cache_ttl_seconds <= 0:
@@ -633,32 +1243,21 @@ class SceneMatcherV2:
             )
             return False
 
-        storage = get_storage_client(self.config)
-        index_payload = read_scene_index(storage, self.company_id)
-        if not index_payload:
+        try:
+            snapshot = self._get_shortlist_snapshot()
+        except Exception as exc:
             self._print_issue(
                 "shortlist_cache_warmup",
-                f"Skipped shortlist prompt cache warmup: missing scene index for company_id={self.company_id}.",
+                f"Skipped shortlist prompt cache warmup: failed to load shortlist index: {exc}",
             )
             return False
-
-        library = VideoLibrary(self.config, company_id=self.company_id)
-        try:
-            library.scan_library()
-        except Exception as exc:
+        if snapshot is None:
             self._print_issue(
                 "shortlist_cache_warmup",
-                f"Skipped shortlist prompt cache warmup: failed library scan: {exc}",
+                f"Skipped shortlist prompt cache warmup: missing scene index for company_id={self.company_id}.",
             )
             return False
-        video_map = {video.id: video for video in library.list_videos()}
-        shortlist_index_payload, _ = self._prepare_shortlist_index_payload(
-            index_payload=index_payload,
-            video_map=video_map,
-        )
-        shared_prompt_prefix = self._build_shortlist_prompt_shared_prefix(
-            index_payload=shortlist_index_payload,
-        )
+        shared_prompt_prefix = snapshot.shared_prompt_prefix
 
         client = GeminiClient(self.config)
         client.use_vertexai = True
@@ -681,6 +1280,8 @@ class SceneMatcherV2:
         notes: str,
         target_duration: float,
         index_payload: dict[str, Any],
+        retrieval_hint: Optional[dict[str, Any]] = None,
+        use_prompt_cache: bool = True,
     ) -> dict[str, Any]:
         client = GeminiClient(self.config)
         client.use_vertexai = True
@@ -689,29 +1290,91 @@ class SceneMatcherV2:
             scene=scene,
             notes=notes,
             target_duration=target_duration,
+            retrieval_hint=retrieval_hint,
         )
-        shared_prompt_prefix = self._build_shortlist_prompt_shared_prefix(
-            index_payload=index_payload,
+        shared_prompt_prefix = self._shortlist_prompt_prefix(index_payload)
+        response, error = await self._generate_shortlist_response(
+            client=client,
+            shared_prompt_prefix=shared_prompt_prefix,
+            request_block=target_block,
+            response_schema=ShortlistResponse.model_json_schema(),
+            response_cache=ResponseCachePolicy(
+                site="shortlist",
+                accept=json_response_validator(ShortlistResponse.model_validate_json),
+            ),
+            scope=f"scene_id={scene.scene_id}",
+            use_prompt_cache=use_prompt_cache,
+            thinking_budget=self._thinking_budget,
         )
-        prompt = f"{shared_prompt_prefix}\n\n{target_block}\n"
+        if error or response is None:
+            return {"error": error}
 
-        config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_json_schema=ShortlistResponse.model_json_schema(),
-        )
-        if self._thinking_budget is not None:
-            config.thinking_config = types.ThinkingConfig(thinking_budget=self._thinking_budget)
+        if not response.text:
+            self._print_issue(
+                "shortlist_empty_response",
+                f"Shortlist model returned empty response for scene_id={scene.scene_id}.",
+            )
+            return {"error": "Shortlist LLM returned empty response."}
 
+        try:
+            parsed = ShortlistResponse.model_validate_json(response.text)
+        except ValidationError as exc:
+            response_preview = self._preview_text(response.text, max_chars=320)
+            self._print_issue(
+                "shortlist_validation",
+                (
+                    f"Failed to validate shortlist JSON for scene_id={scene.scene_id}: {exc}. "
+                    f"response_preview={response_preview}"
+                ),
+            )
+            return {"error": f"Shortlist response validation failed: {exc}"}
+
+        return {
+            "review_clips": parsed.review_clips,
+            "notes": parsed.notes,
+        }
+
+    async def _generate_shortlist_response(
+        self,
+        *,
+        client: GeminiClient,
+        shared_prompt_prefix: str,
+        request_block: str,
+        response_schema: dict[str, Any],
+        scope: str,
+        use_prompt_cache: bool,
+        thinking_budget: Optional[int],
+        response_cache: Optional[ResponseCachePolicy] = None,
+    ) -> tuple[Any, Optional[str]]:
+        """Run a shortlist request, preferring the explicit prefix cache; returns (response, error)."""
+        prompt = f"{shared_prompt_prefix}\n\n{request_block}\n"
+
+        def _build_config() -> types.GenerateContentConfig:
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_json_schema=response_schema,
+            )
+            if thinking_budget is not None:
+                config.thinking_config = types.ThinkingConfig(thinking_budget=thinking_budget)
+            return config
+
+        config = _build_config()
         request_text = prompt
         used_prompt_cache = False
-        cached_content_name = self._get_shortlist_prompt_cached_content_name(
-            client=client,
-            shared_prompt_prefix=shared_prompt_prefix,
-            scene_id=scene.scene_id,
+        # The lookup may create the cache or wait for another node to publish it; both block.
+        cached_content_name = (
+            await asyncio.to_thread(
+                self._get_shortlist_prompt_cached_content_name,
+                client=client,
+                shared_prompt_prefix=shared_prompt_prefix,
+                scope=scope,
+            )
+            if use_prompt_cache
+            else None
         )
         if cached_content_name:
             config.cached_content = cached_content_name
-            request_text = target_block
+            request_text = request_block
             used_prompt_cache = True
 
         response = None
@@ -723,24 +1386,17 @@ class SceneMatcherV2:
                     parts=[types.Part(text=request_text)],
                 ),
                 config=config,
+                response_cache=response_cache,
             )
         except Exception as exc:
             if used_prompt_cache:
                 self._print_issue(
                     "shortlist_prompt_cache",
-                    (
-                        f"scene_id={scene.scene_id}: cached-content request failed; "
-                        f"retrying without cache. error={exc}"
-                    ),
-                )
-                fallback_config = types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_json_schema=ShortlistResponse.model_json_schema(),
+                    f"{scope}: cached-content request failed; retrying without cache. error={exc}",
                 )
-                if self._thinking_budget is not None:
-                    fallback_config.thinking_config = types.ThinkingConfig(
-                        thinking_budget=self._thinking_budget
-                    )
+                if classify_error(exc) is ErrorClass.FATAL:
+                    # Skipped remote validation may have trusted a cache deleted early; stop reusing it.
+                    client.forget_cached_content(cached_content_name)
                 try:
                     response = await client.generate_content_async(
                         model=self.shortlist_model,
@@ -748,7 +1404,8 @@ class SceneMatcherV2:
                             role="user",
                             parts=[types.Part(text=prompt)],
                         ),
-                        config=fallback_config,
+                        config=_build_config(),
+                        response_cache=response_cache,
                     )
                     used_prompt_cache = False
                 except Exception as fallback_exc:
@@ -756,15 +1413,18 @@ class SceneMatcherV2:
             if response is None:
                 self._print_issue(
                     "shortlist_llm_call",
-                    (
-                        f"Shortlist LLM call failed for scene_id={scene.scene_id}, "
-                        f"model={self.shortlist_model}: {exc}"
-                    ),
+                    f"Shortlist LLM call failed for {scope}, model={self.shortlist_model}: {exc}",
                 )
-                return {"error": f"Shortlist LLM call failed: {exc}"}
+                return None, f"Shortlist LLM call failed: {exc}"
 
         if used_prompt_cache:
             cached_tokens = self._extract_cached_token_count(response)
+            get_prompt_cache_manager().record_use(
+                self.company_id,
+                self.shortlist_model,
+                cached_content_name,
+                cached_tokens,
+            )
             cached_token_text = (
                 str(cached_tokens)
                 if cached_tokens is not None
@@ -772,36 +1432,9 @@ class SceneMatcherV2:
             )
             self._print_issue(
                 "shortlist_prompt_cache",
-                (
-                    f"scene_id={scene.scene_id}: explicit cache used; "
-                    f"cached_content_token_count={cached_token_text}"
-                ),
-            )
-
-        if not response.text:
-            self._print_issue(
-                "shortlist_empty_response",
-                f"Shortlist model returned empty response for scene_id={scene.scene_id}.",
+                f"{scope}: explicit cache used; cached_content_token_count={cached_token_text}",
             )
-            return {"error": "Shortlist LLM returned empty response."}
-
-        try:
-            parsed = ShortlistResponse.model_validate_json(response.text)
-        except ValidationError as exc:
-            response_preview = self._preview_text(response.text, max_chars=320)
-            self._print_issue(
-                "shortlist_validation",
-                (
-                    f"Failed to validate shortlist JSON for scene_id={scene.scene_id}: {exc}. "
-                    f"response_preview={response_preview}"
-                ),
-            )
-            return {"error": f"Shortlist response validation failed: {exc}"}
-
-        return {
-            "review_clips": parsed.review_clips,
-            "notes": parsed.notes,
-        }
+        return response, None
 
     async def _run_deep_analysis(
         self,
@@ -813,6 +1446,7 @@ class SceneMatcherV2:
         storage: Any,
         target_duration: float,
     ) -> list[dict[str, Any]]:
+        started = time.monotonic()
         client = GeminiClient(self.config)
         client.use_vertexai = True
         upload_cache: dict[str, object] = {}
@@ -873,14 +1507,29 @@ class SceneMatcherV2:
             )
             runnable_jobs.append((clip, job, uploaded))
 
+        budget = self._deep_analysis_scene_budget_seconds
+        deadline = max(0.0, budget - (time.monotonic() - started)) if budget > 0 else None
+        hedge_group = get_hedge_group("deep_analysis")
         tasks = [
-            _analyze_voice_over_job(client, job, uploaded)
+            hedge_group.run(
+                lambda job=job, uploaded=uploaded: _analyze_voice_over_job(client, job, uploaded),
+                deadline_seconds=deadline,
+                accept=lambda result: not result.get("error"),
+            )
             for _, job, uploaded in runnable_jobs
         ]
         analyzed = await asyncio.gather(*tasks, return_exceptions=True) if tasks else []
 
         merged_results: list[dict[str, Any]] = list(skipped_results)
         for (clip, _, _), result in zip(runnable_jobs, analyzed):
+            if isinstance(result, HedgeDeadlineExceeded):
+                warning = (
+                    f"Deep analysis for clip {clip.video_id} [{clip.start_time:.2f}, {clip.end_time:.2f}] "
+                    f"missed the {budget}s scene budget; returning candidates that arrived in time"
+                )
+                self._print_issue("deep_analysis_deadline", f"scene_id={scene.scene_id}: {warning}")
+                merged_results.append({"clip": clip, "candidates": [], "notes": None, "warning": warning})
+                continue
             if isinstance(result, Exception):
                 self._print_issue(
                     "deep_analysis_exception",
@@ -945,6 +1594,7 @@ class SceneMatcherV2:
         scene: _StoryboardScene,
         notes: str,
         target_duration: float,
+        retrieval_hint: Optional[dict[str, Any]] = None,
     ) -> str:
         title = cls._clean_prompt_text(scene.title, max_chars=140) or "(untitled)"
         purpose = cls._clean_prompt_text(scene.purpose, max_chars=220) or "(none)"
@@ -958,6 +1608,58 @@ class SceneMatcherV2:
             f"- target_duration_seconds: {target_duration:.3f}\n"
             f"- script: {script}\n"
             f"- notes: {notes_text}\n"
+            + (cls._render_retrieval_hint(retrieval_hint) if retrieval_hint is not None else "")
+        )
+
+    @staticmethod
+    def _render_retrieval_hint(index_payload: dict[str, Any]) -> str:
+        cards = "; ".join(
+            f"{video.get('video_id')}: "
+            + ", ".join(
+                str(card.get("scene_id")) for card in video.get("eligible_scenes") or [] if isinstance(card, dict)
+            )
+            for video in index_payload.get("videos", [])
+            if isinstance(video, dict)
+        )
+        return (
+            "- retrieval_hint: scene cards that best match this scene by keywords and meaning. "
+            "Review them first; any eligible card in the library context may still be shortlisted: "
+            f"{cards or '(none)'}\n"
+        )
+
+    @classmethod
+    def _render_batch_target_scenes_block(
+        cls,
+        scenes: list[tuple[_StoryboardScene, str, float]],
+        retrieval_hints: Optional[dict[str, dict[str, Any]]] = None,
+    ) -> str:
+        target_blocks = "\n".join(
+            cls._render_target_scene_block(
+                scene=scene,
+                notes=notes,
+                target_duration=target_duration,
+                retrieval_hint=(retrieval_hints or {}).get(scene.scene_id),
+            )
+            for scene, notes, target_duration in scenes
+        )
+        return (
+            "### BATCHED TARGET SCENES\n"
+            f"This request contains {len(scenes)} TARGET SCENE blocks. Shortlist each scene independently: "
+            "apply every rule, limit and hard constraint above to each scene on its own, "
+            "and only use that scene's target_duration_seconds for its clips.\n\n"
+            f"{target_blocks}\n"
+            "### BATCHED OUTPUT SCHEMA\n"
+            "Return exactly one entry per target scene, keyed by its `scene_id`. "
+            "This replaces the single-scene output schema above.\n"
+            "{\n"
+            '  "scenes":[\n'
+            "    {\n"
+            '      "scene_id":"...",\n'
+            '      "review_clips":[{"video_id":"...","start_time":12.3,"end_time":68.0,"reason":"..."}],\n'
+            '      "notes":"optional"\n'
+            "    }\n"
+            "  ]\n"
+            "}\n"
         )
 
     @classmethod
@@ -0,0 +1,272 @@
+"""Embedding index over VO scene cards for fast semantic pre-ranking."""
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional, Protocol
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover
+    raise RuntimeError("numpy is required. Install with: pip install numpy") from exc
+
+from videoagent.transcript_search import tokenize
+
+from .scene_card_retrieval import scene_card_text
+
+_IVF_MIN_VECTORS = 4_096
+_IVF_KMEANS_ITERATIONS = 8
+_IVF_DEFAULT_PROBES = 8
+_IVF_RETRAIN_GROWTH = 2.0
+_EMBED_BATCH_SIZE = 100
+
+# (video_id, scene_id, score)
+SceneVectorHit = tuple[str, str, float]
+
+
+class SceneEmbedder(Protocol):
+    dimension: int
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Return an (n, dimension) float32 matrix of L2-normalized rows."""
+        ...
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class HashingEmbedder:
+    """Deterministic feature-hashing embedder (word unigrams + character trigrams).
+
+    Needs no model or network, which makes it suitable for tests. It only captures
+    lexical overlap, so production pre-ranking uses `GeminiEmbedder` instead.
+    """
+
+    def __init__(self, dimension: int = 512) -> None:
+        self.dimension = dimension
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimension, 1.0 if (value >> 63) & 1 else -1.0
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                bucket, sign = self._bucket(f"w:{token}")
+                matrix[row, bucket] += sign
+                padded = f"#{token}#"
+                for offset in range(max(1, len(padded) - 2)):
+                    bucket, sign = self._bucket(f"c:{padded[offset:offset + 3]}")
+                    matrix[row, bucket] += 0.5 * sign
+        return _normalize_rows(matrix)
+
+
+class GeminiEmbedder:
+    """Embedder backed by a Gemini embedding model."""
+
+    def __init__(self, client: Any, model: str = "gemini-embedding-001", dimension: int = 3072) -> None:
+        self.client = client
+        self.model = model
+        self.dimension = dimension
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        rows: list[list[float]] = []
+        for start in range(0, len(texts), _EMBED_BATCH_SIZE):
+            rows.extend(self.client.embed_texts(self.model, texts[start:start + _EMBED_BATCH_SIZE]))
+        if not rows:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return _normalize_rows(np.asarray(rows, dtype=np.float32))
+
+
+def _card_fingerprint(texts: list[str]) -> str:
+    return hashlib.sha1("\x1f".join(texts).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class _BuiltIndex:
+    """One immutable build of the search structures; swapped in whole so readers never see a partial rebuild."""
+
+    row_video_ids: list[str]
+    row_scene_ids: list[str]
+    matrix: np.ndarray
+    centroids: Optional[np.ndarray] = None
+    list_rows: list[np.ndarray] = field(default_factory=list)
+    codes: Optional[np.ndarray] = None
+    code_scales: Optional[np.ndarray] = None
+    trained_size: int = 0
+
+
+class SceneVectorIndex:
+    """Cosine-similarity index over scene cards, updated one video at a time.
+
+    Small libraries use exact brute-force search. From `ivf_min_vectors` cards the
+    index switches to an IVF layout with int8-quantized vectors: k-means coarse
+    centroids pick `probes` lists to scan, which keeps queries cheap as libraries grow.
+
+    Safe to share between threads: updates take `_lock` only to swap in their result
+    (embedding happens outside it), and searches run against an immutable build.
+    """
+
+    def __init__(
+        self,
+        embedder: SceneEmbedder,
+        *,
+        ivf_min_vectors: int = _IVF_MIN_VECTORS,
+        probes: int = _IVF_DEFAULT_PROBES,
+    ) -> None:
+        self.embedder = embedder
+        self.ivf_min_vectors = ivf_min_vectors
+        self.probes = probes
+        self._videos: dict[str, tuple[list[str], np.ndarray, str]] = {}
+        self._lock = threading.Lock()
+        # Serialises syncs so concurrent callers do not embed the same videos twice.
+        self._sync_lock = threading.Lock()
+        self._built: Optional[_BuiltIndex] = None
+        self._trained: Optional[_BuiltIndex] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(scene_ids) for scene_ids, _vectors, _fingerprint in self._videos.values())
+
+    @property
+    def video_ids(self) -> set[str]:
+        with self._lock:
+            return set(self._videos)
+
+    @property
+    def uses_ivf(self) -> bool:
+        return self._ensure_built().centroids is not None
+
+    def upsert_video(self, video_id: str, cards: list[dict[str, Any]]) -> bool:
+        """(Re)embed a video's cards; returns False when its cards are unchanged."""
+        cards = [card for card in cards if isinstance(card, dict)]
+        texts = [scene_card_text(card) for card in cards]
+        fingerprint = _card_fingerprint(texts)
+        with self._lock:
+            existing = self._videos.get(video_id)
+        if existing is not None and existing[2] == fingerprint:
+            return False
+        vectors = self.embedder.embed(texts) if texts else np.zeros((0, self.embedder.dimension), dtype=np.float32)
+        scene_ids = [str(card.get("scene_id") or "") for card in cards]
+        with self._lock:
+            self._videos[video_id] = (scene_ids, vectors, fingerprint)
+            self._built = None
+        return True
+
+    def remove_video(self, video_id: str) -> None:
+        with self._lock:
+            if self._videos.pop(video_id, None) is not None:
+                self._built = None
+
+    def sync_from_scene_index(self, index_payload: dict[str, Any]) -> int:
+        """Mirror a VO scene index payload; returns how many videos were (re)embedded."""
+        with self._sync_lock:
+            seen: set[str] = set()
+            updated = 0
+            for video in index_payload.get("videos", []):
+                if not isinstance(video, dict):
+                    continue
+                video_id = str(video.get("video_id") or "").strip()
+                if not video_id:
+                    continue
+                seen.add(video_id)
+                cards = video.get("eligible_scenes")
+                if self.upsert_video(video_id, cards if isinstance(cards, list) else []):
+                    updated += 1
+            for video_id in self.video_ids - seen:
+                self.remove_video(video_id)
+            return updated
+
+    def _ensure_built(self) -> _BuiltIndex:
+        with self._lock:
+            if self._built is None:
+                self._built = self._build()
+            return self._built
+
+    def _build(self) -> _BuiltIndex:
+        row_video_ids: list[str] = []
+        row_scene_ids: list[str] = []
+        blocks = []
+        for video_id, (scene_ids, vectors, _fingerprint) in self._videos.items():
+            row_video_ids.extend([video_id] * len(scene_ids))
+            row_scene_ids.extend(scene_ids)
+            blocks.append(vectors)
+        matrix = (
+            np.vstack(blocks).astype(np.float32, copy=False)
+            if blocks
+            else np.zeros((0, self.embedder.dimension), dtype=np.float32)
+        )
+        size = len(row_scene_ids)
+        if size < self.ivf_min_vectors:
+            return _BuiltIndex(row_video_ids, row_scene_ids, matrix)
+        trained = self._trained
+        if trained is None or size >= trained.trained_size * _IVF_RETRAIN_GROWTH:
+            centroids, trained_size = self._train_centroids(matrix), size
+        else:
+            centroids, trained_size = trained.centroids, trained.trained_size
+        assert centroids is not None
+        assignment = np.argmax(matrix @ centroids.T, axis=1)
+        scales = np.abs(matrix).max(axis=1)
+        scales[scales == 0] = 1.0
+        code_scales = (scales / 127.0).astype(np.float32)
+        built = _BuiltIndex(
+            row_video_ids,
+            row_scene_ids,
+            # Quantized codes replace the float matrix for IVF search.
+            np.zeros((0, self.embedder.dimension), dtype=np.float32),
+            centroids=centroids,
+            list_rows=[np.flatnonzero(assignment == index) for index in range(len(centroids))],
+            codes=np.round(matrix / code_scales[:, None]).astype(np.int8),
+            code_scales=code_scales,
+            trained_size=trained_size,
+        )
+        self._trained = built
+        return built
+
+    @staticmethod
+    def _train_centroids(matrix: np.ndarray) -> np.ndarray:
+        size = len(matrix)
+        list_count = max(1, int(np.sqrt(size)))
+        rng = np.random.default_rng(0)
+        centroids = matrix[rng.choice(size, size=list_count, replace=False)].copy()
+        for _ in range(_IVF_KMEANS_ITERATIONS):
+            assignment = np.argmax(matrix @ centroids.T, axis=1)
+            for list_index in range(list_count):
+                members = matrix[assignment == list_index]
+                if len(members):
+                    centroids[list_index] = members.mean(axis=0)
+            centroids = _normalize_rows(centroids)
+        return centroids
+
+    def search(self, query: str, top_k: int = 20) -> list[SceneVectorHit]:
+        built = self._ensure_built()
+        if top_k <= 0 or not built.row_scene_ids:
+            return []
+        query_vector = self.embedder.embed([query])[0]
+
+        if built.centroids is None:
+            scores = built.matrix @ query_vector
+            rows = np.arange(len(scores))
+        else:
+            probes = min(self.probes, len(built.centroids))
+            nearest_lists = np.argsort(-(built.centroids @ query_vector))[:probes]
+            rows = np.concatenate([built.list_rows[index] for index in nearest_lists])
+            assert built.codes is not None and built.code_scales is not None
+            scores = (built.codes[rows].astype(np.float32) @ query_vector) * built.code_scales[rows]
+
+        if not len(rows):
+            return []
+        count = min(top_k, len(rows))
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            (built.row_video_ids[rows[index]], built.row_scene_ids[rows[index]], float(scores[index]))
+            for index in best
+        ]
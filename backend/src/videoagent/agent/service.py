@@ -6,6 +6,7 @@ from __future__ import annotations
 import json
 import os
 from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from threading import Lock
 from typing import Any, Iterable, Optional
@@ -17,13 +18,11 @@ from agents import (
     ModelSettings,
     RunConfig,
     Runner,
-    SQLiteSession,
     set_tracing_export_api_key,
 )
 from agents.extensions.models.litellm_model import LitellmModel
 from agents.tracing.processors import BackendSpanExporter
 from pydantic import BaseModel, Field
-from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
 
 from videoagent.config import Config, default_config
 from videoagent.company_brief_context import (
@@ -33,16 +32,33 @@ from videoagent.db import connection, crud, models
 from videoagent.gemini import GeminiClient
 from videoagent.library import VideoLibrary
 from videoagent.models import RenderResult, VideoBrief
+from videoagent.prompt_cache_manager import get_prompt_cache_manager, prompt_cache_manager_enabled
+from videoagent.resilience import ErrorClass, RetryPolicy, call_with_resilience, retry_budget_scope
+from videoagent.response_cache import ResponseCachePolicy
 from videoagent.storage import get_storage_client
-from videoagent.testimony_digest_index import (
-    read_testimony_digest_index,
-    read_video_testimony_digest,
-)
 from videoagent.story import PersonalizedStoryGenerator, _StoryboardScene
-
+from videoagent.testimony_digest_index import TestimonyDigestBundle, load_testimony_digest_bundle
+
+from .agent_prompt_cache import (
+    AgentPrefixCacheModel,
+    AgentStaticPrefix,
+    agent_prefix_cache_ttl_seconds,
+    prompt_version,
+    record_agent_turn_usage,
+)
 from .prompts import AGENT_SYSTEM_PROMPT_V2
 from .scene_analysis_index import to_voiceless_path
+from .scene_clip_context import (
+    SceneClipLedger,
+    is_scene_clip_context_text,
+    plan_scene_clip_budget,
+    scene_clip_descriptor,
+    scene_clip_fingerprint,
+    scene_clip_fps,
+    scene_clip_frame_budget,
+)
 from .scene_matcher_v2 import SceneMatcherV2
+from .session_memory import CompactingSQLiteSession, MemoryPolicy, bound_history, session_memory_enabled
 from .storage import (
     BriefStore,
     ChatStore,
@@ -100,14 +116,23 @@ def _select_model_name(config: Config) -> str:
     return f"gemini/{model_name}"
 
 
-def _is_retryable_rate_limit_error(exc: BaseException) -> bool:
-    if getattr(exc, "status_code", None) == 429:
-        return True
-    detail = getattr(exc, "detail", None)
-    if isinstance(detail, str) and '"code": 429' in detail:
-        return True
-    message = str(exc).lower()
-    return "ratelimiterror" in message and "429" in message
+_AGENT_TURN_RETRY_POLICY = RetryPolicy(
+    max_attempts=4,  # Initial attempt + up to 3 retries
+    base_delay_seconds=1.0,
+    max_delay_seconds=8.0,
+    retry_on=frozenset({ErrorClass.RATE_LIMITED}),
+)
+# Retries shared by a whole agent turn, including the model calls its tools make.
+_AGENT_TURN_RETRY_BUDGET = 8
+_AGENT_TURN_RETRY_BUDGET_SECONDS = 60.0
+# Startup warmup covers companies with chat activity this recently, most recent first.
+_PROMPT_CACHE_WARMUP_ACTIVE_DAYS = 7
+_PROMPT_CACHE_WARMUP_MAX_COMPANIES = 50
+
+
+def _agent_provider(model_name: str) -> str:
+    """Resilience provider key for the agent model, shared with GeminiClient calls."""
+    return "vertex" if model_name.startswith("vertex_ai/") else "gemini"
 
 
 class SessionTitleOutput(BaseModel):
@@ -237,15 +262,20 @@ class VideoAgentService:
         self._agent_lock = Lock()
         self._run_locks_guard = Lock()
         self._run_locks: dict[str, Lock] = {}
+        self._scene_clip_ledger = SceneClipLedger()
         self._render_lock = Lock()
         self._render_executor = ThreadPoolExecutor(max_workers=1)
         self._render_futures: dict[str, object] = {}
         self._title_executor = ThreadPoolExecutor(max_workers=2)
+        # Warmups build shortlist snapshots and create Gemini caches; keep them off the title workers.
+        self._cache_warmup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-warmup")
         self._title_lock = Lock()
         self._title_inflight: set[str] = set()
         self._shortlist_cache_warmup_lock = Lock()
+        # Company IDs with a warmup queued or running; the prompt cache manager tracks the rest.
         self._shortlist_cache_warmup_inflight: set[str] = set()
-        self._shortlist_cache_warmup_ready: set[str] = set()
+        self._prompt_cache_manager = get_prompt_cache_manager()
+        self._prompt_cache_manager.set_warmer(self._warm_shortlist_cache)
         _load_env()
         _patch_agents_input_file_passthrough()
         self._configure_tracing()
@@ -274,29 +304,33 @@ class VideoAgentService:
             set_tracing_export_api_key(tracing_key)
 
     def _build_instructions(self, context_payload: dict) -> str:
-        company_brief_content = self._normalize_text(context_payload.get("company_brief_context"))
-        testimony_context = context_payload.get("testimony_digest_context")
-        video_brief = context_payload.get("video_brief")
-        storyboard_scenes = context_payload.get("storyboard_scenes")
-        company_brief_block = company_brief_content
-        testimony_block = json.dumps(testimony_context, separators=(",", ":"))
-        video_brief_block = json.dumps(video_brief, separators=(",", ":"))
-        storyboard_block = json.dumps(storyboard_scenes, separators=(",", ":"))
-        session_state_section = ""
-        if video_brief is not None or storyboard_scenes is not None:
-            session_state_section = (
-                "\n\nCURRENT VIDEO BRIEF (SESSION CONTEXT):\n"
-                f"{video_brief_block}\n\n"
-                "CURRENT STORYBOARD SCENES (SESSION CONTEXT):\n"
-                f"{storyboard_block}"
-            )
+        return self._build_static_instructions(context_payload) + self._build_session_state_section(context_payload)
+
+    def _build_static_instructions(self, context_payload: dict) -> str:
+        """Instruction prefix shared by every session of a company: prompt, company brief, testimony digest."""
+        company_brief_block = self._normalize_text(context_payload.get("company_brief_context"))
+        testimony_block = json.dumps(context_payload.get("testimony_digest_context"), separators=(",", ":"))
         return (
             f"{self._base_instructions}\n\n"
             "COMPANY BRIEF INSERT (GLOBAL COMPANY CONTEXT):\n"
             f"{company_brief_block}\n\n"
             "TESTIMONY DIGEST INSERT (PRIMARY EVIDENCE CONTEXT - USE THIS INSTEAD OF FULL TRANSCRIPTS):\n"
             f"{testimony_block}"
-            f"{session_state_section}"
+        )
+
+    @staticmethod
+    def _build_session_state_section(context_payload: dict) -> str:
+        video_brief = context_payload.get("video_brief")
+        storyboard_scenes = context_payload.get("storyboard_scenes")
+        if video_brief is None and storyboard_scenes is None:
+            return ""
+        video_brief_block = json.dumps(video_brief, separators=(",", ":"))
+        storyboard_block = json.dumps(storyboard_scenes, separators=(",", ":"))
+        return (
+            "\n\nCURRENT VIDEO BRIEF (SESSION CONTEXT):\n"
+            f"{video_brief_block}\n\n"
+            "CURRENT STORYBOARD SCENES (SESSION CONTEXT):\n"
+            f"{storyboard_block}"
         )
 
     def _build_context_payload(
@@ -304,8 +338,9 @@ class VideoAgentService:
         session_id: str,
         testimony_digest_videos: Optional[list[dict]] = None,
         company_brief_context: Optional[str] = None,
+        owner: Optional[tuple[Optional[str], Optional[str]]] = None,
     ) -> dict:
-        user_id, company_id = self._resolve_session_owner(session_id)
+        user_id, company_id = owner or self._resolve_session_owner(session_id)
         if testimony_digest_videos is None:
             testimony_digest_videos = self._build_testimony_digest_videos(company_id)
         if company_brief_context is None:
@@ -343,19 +378,46 @@ class VideoAgentService:
             print(session_id, session_user_id, session_company_id)
 
             testimony_digest_videos: Optional[list[dict]] = None
+            testimony_digest_generation: Optional[str] = None
             company_brief_context: Optional[str] = None
+            static_instructions: Optional[str] = None
+            # Instructions rendered for a (storyboard version, brief version) pair. A fresh
+            # closure is built every turn, so state saved by other processes is picked up.
+            rendered: Optional[tuple[tuple[int, int], str]] = None
 
             def _dynamic_instructions(run_context, agent) -> str:
-                nonlocal testimony_digest_videos, company_brief_context
+                nonlocal testimony_digest_videos, testimony_digest_generation, company_brief_context
+                nonlocal static_instructions, rendered
+                # Read versions before loading so a concurrent save forces a re-render next step.
+                state_version = (
+                    self.storyboard_store.version(session_id),
+                    self.brief_store.version(session_id),
+                )
+                if rendered is not None and rendered[0] == state_version:
+                    return rendered[1]
+                if testimony_digest_videos is None:
+                    testimony_digest_generation = self._testimony_digest_generation(session_company_id)
                 payload = self._build_context_payload(
                     session_id,
                     testimony_digest_videos,
                     company_brief_context,
+                    owner=(session_user_id, session_company_id),
                 )
                 testimony_context = payload.get("testimony_digest_context") or {}
                 testimony_digest_videos = testimony_context.get("videos") or []
                 company_brief_context = payload.get("company_brief_context")
-                return self._build_instructions(payload)
+                if static_instructions is None:
+                    static_instructions = self._build_static_instructions(payload)
+                    if isinstance(agent.model, AgentPrefixCacheModel) and session_company_id:
+                        agent.model.static_prefix = AgentStaticPrefix(
+                            company_id=session_company_id,
+                            prompt_version=prompt_version(self._base_instructions),
+                            digest_generation=testimony_digest_generation,
+                            text=static_instructions,
+                        )
+                instructions = static_instructions + self._build_session_state_section(payload)
+                rendered = (state_version, instructions)
+                return instructions
 
             self.model_name = _select_model_name(self.config)
             provider_model = self.model_name
@@ -383,7 +445,16 @@ class VideoAgentService:
                 agent.instructions = _dynamic_instructions
                 return agent
 
-            model = LitellmModel(model=self.model_name,)
+            prefix_cache_ttl_seconds = agent_prefix_cache_ttl_seconds()
+            if provider_name == "vertex_ai" and prefix_cache_ttl_seconds > 0:
+                model = AgentPrefixCacheModel(
+                    self.model_name,
+                    provider_model=provider_model,
+                    ttl_seconds=prefix_cache_ttl_seconds,
+                    client_factory=lambda: GeminiClient(self.config),
+                )
+            else:
+                model = LitellmModel(model=self.model_name,)
             
             # Tools need resolved IDs
             tools = _build_tools(
@@ -495,42 +566,58 @@ class VideoAgentService:
         self._title_executor.submit(self._generate_session_title_job, session_id)
 
     def _schedule_shortlist_cache_warmup(self, session_id: str) -> None:
+        _, company_id = self._resolve_session_owner(session_id)
+        if company_id:
+            self._schedule_company_cache_warmup(company_id)
+
+    def _schedule_company_cache_warmup(self, company_id: str) -> None:
+        if self._prompt_cache_manager.has_live_cache(company_id):
+            return
         with self._shortlist_cache_warmup_lock:
-            if (
-                session_id in self._shortlist_cache_warmup_inflight
-                or session_id in self._shortlist_cache_warmup_ready
-            ):
+            if company_id in self._shortlist_cache_warmup_inflight:
                 return
-            self._shortlist_cache_warmup_inflight.add(session_id)
-        self._title_executor.submit(self._warm_shortlist_cache_job, session_id)
+            self._shortlist_cache_warmup_inflight.add(company_id)
+        self._cache_warmup_executor.submit(self._warm_shortlist_cache_job, company_id)
 
-    def _warm_shortlist_cache_job(self, session_id: str) -> None:
-        ready = False
+    def _warm_shortlist_cache_job(self, company_id: str) -> None:
         try:
-            ready = self._warm_shortlist_cache(session_id)
+            self._warm_shortlist_cache(company_id)
         except Exception as exc:
-            print(f"[_warm_shortlist_cache_job] Failed for session {session_id}: {exc}")
+            print(f"[_warm_shortlist_cache_job] Failed for company {company_id}: {exc}")
         finally:
             with self._shortlist_cache_warmup_lock:
-                self._shortlist_cache_warmup_inflight.discard(session_id)
-                if ready:
-                    self._shortlist_cache_warmup_ready.add(session_id)
-
-    def _warm_shortlist_cache(self, session_id: str) -> bool:
-        user_id, company_id = self._resolve_session_owner(session_id)
-        if not company_id:
-            return False
+                self._shortlist_cache_warmup_inflight.discard(company_id)
 
+    def _warm_shortlist_cache(self, company_id: str) -> bool:
         matcher = SceneMatcherV2(
             self.config,
             self.storyboard_store,
             self.event_store,
-            session_id,
+            session_id=f"warmup:{company_id}",
             company_id=company_id,
-            user_id=user_id,
+            user_id=None,
         )
         return matcher.warm_shortlist_prompt_cache()
 
+    def start_prompt_cache_manager(self) -> None:
+        """Warm recently active companies' shortlist prompt caches and keep in-use caches alive."""
+        if not prompt_cache_manager_enabled():
+            return
+        since = datetime.utcnow() - timedelta(days=_PROMPT_CACHE_WARMUP_ACTIVE_DAYS)
+        try:
+            with connection.get_db_context() as db:
+                company_ids = crud.list_recently_active_company_ids(
+                    db,
+                    since,
+                    limit=_PROMPT_CACHE_WARMUP_MAX_COMPANIES,
+                )
+        except Exception as exc:
+            print(f"[start_prompt_cache_manager] Failed to list companies: {exc}")
+            company_ids = []
+        for company_id in company_ids:
+            self._schedule_company_cache_warmup(company_id)
+        self._prompt_cache_manager.start()
+
     def _generate_session_title_job(self, session_id: str) -> None:
         try:
             self._generate_session_title(session_id)
@@ -578,6 +665,10 @@ class VideoAgentService:
                     response_schema=SessionTitleOutput,
                     thinking_config=types.ThinkingConfig(thinking_budget=512),
                 ),
+                response_cache=ResponseCachePolicy(
+                    site="session_title",
+                    accept=lambda response: bool(getattr(getattr(response, "parsed", None), "title", None)),
+                ),
             )
             parsed = getattr(response, "parsed", None)
             if parsed and getattr(parsed, "title", None):
@@ -645,86 +736,6 @@ class VideoAgentService:
     def _normalize_text(value: object) -> str:
         return str(value or "").strip()
 
-    @classmethod
-    def _is_valid_testimony_card(cls, card: object) -> bool:
-        if not isinstance(card, dict):
-            return False
-        speaker = card.get("speaker")
-        speaker_has_data = False
-        if isinstance(speaker, dict):
-            speaker_has_data = any(
-                cls._normalize_text(speaker.get(field))
-                for field in ("name", "role", "company")
-            )
-
-        proof_claim = cls._normalize_text(card.get("proof_claim"))
-        intro_seed = cls._normalize_text(card.get("intro_seed"))
-        evidence_snippet = cls._normalize_text(card.get("evidence_snippet"))
-
-        metrics_raw = card.get("metrics")
-        metrics_has_data = False
-        if isinstance(metrics_raw, list):
-            for metric in metrics_raw:
-                if not isinstance(metric, dict):
-                    continue
-                metric_name = cls._normalize_text(metric.get("metric"))
-                metric_value = cls._normalize_text(metric.get("value"))
-                if metric_name or metric_value:
-                    metrics_has_data = True
-                    break
-
-        red_flags_raw = card.get("red_flags")
-        red_flags_has_data = False
-        if isinstance(red_flags_raw, list):
-            red_flags_has_data = any(cls._normalize_text(flag) for flag in red_flags_raw)
-
-        return bool(
-            proof_claim
-            or intro_seed
-            or evidence_snippet
-            or speaker_has_data
-            or metrics_has_data
-            or red_flags_has_data
-        )
-
-    @classmethod
-    def _sanitize_testimony_card(cls, card: dict) -> dict:
-        speaker = card.get("speaker")
-        speaker_dict = speaker if isinstance(speaker, dict) else {}
-        metrics_raw = card.get("metrics")
-        metrics_list = metrics_raw if isinstance(metrics_raw, list) else []
-        red_flags_raw = card.get("red_flags")
-        red_flags_list = red_flags_raw if isinstance(red_flags_raw, list) else []
-
-        sanitized_metrics: list[dict[str, str]] = []
-        for metric in metrics_list:
-            if not isinstance(metric, dict):
-                continue
-            metric_name = cls._normalize_text(metric.get("metric"))
-            metric_value = cls._normalize_text(metric.get("value"))
-            if not metric_name and not metric_value:
-                continue
-            sanitized_metrics.append({"metric": metric_name, "value": metric_value})
-
-        sanitized_red_flags = [
-            cls._normalize_text(flag)
-            for flag in red_flags_list
-            if cls._normalize_text(flag)
-        ]
-
-        return {
-            "speaker": {
-                "name": cls._normalize_text(speaker_dict.get("name")) or None,
-                "role": cls._normalize_text(speaker_dict.get("role")) or None,
-                "company": cls._normalize_text(speaker_dict.get("company")) or None,
-            },
-            "proof_claim": cls._normalize_text(card.get("proof_claim")),
-            "metrics": sanitized_metrics,
-            "intro_seed": cls._normalize_text(card.get("intro_seed")),
-            "evidence_snippet": cls._normalize_text(card.get("evidence_snippet")),
-            "red_flags": sanitized_red_flags,
-        }
-
     def _build_company_brief_context(self, company_id: Optional[str]) -> str:
         if not company_id:
             return ""
@@ -738,59 +749,23 @@ class VideoAgentService:
             return ""
         return self._normalize_text(context.get("content"))
 
-    def _build_testimony_digest_videos(self, company_id: Optional[str]) -> list[dict]:
+    def _testimony_digest_bundle(self, company_id: Optional[str]) -> Optional[TestimonyDigestBundle]:
         if not company_id:
-            return []
+            return None
         try:
             storage = get_storage_client(self.config)
         except Exception as exc:
-            print(f"[_build_testimony_digest_videos] Unable to initialize storage: {exc}")
-            return []
-
-        index_payload = read_testimony_digest_index(storage, company_id)
-        if not isinstance(index_payload, dict):
-            return []
-        videos = index_payload.get("videos")
-        if not isinstance(videos, list):
-            return []
-
-        testimony_videos: list[dict] = []
-        for entry in videos:
-            if not isinstance(entry, dict):
-                continue
-            has_cards = bool(entry.get("has_testimony_cards"))
-            cards_count = int(entry.get("testimony_cards_count") or 0)
-            if not has_cards or cards_count <= 0:
-                continue
-
-            video_id = self._normalize_text(entry.get("video_id"))
-            if not video_id:
-                continue
+            print(f"[_testimony_digest_bundle] Unable to initialize storage: {exc}")
+            return None
+        return load_testimony_digest_bundle(storage, company_id)
 
-            digest_payload = read_video_testimony_digest(storage, company_id, video_id)
-            if not isinstance(digest_payload, dict):
-                continue
-            cards_raw = digest_payload.get("testimony_cards")
-            if not isinstance(cards_raw, list):
-                continue
+    def _testimony_digest_generation(self, company_id: Optional[str]) -> Optional[str]:
+        bundle = self._testimony_digest_bundle(company_id)
+        return bundle.generation if bundle is not None else None
 
-            valid_cards: list[dict] = []
-            for raw_card in cards_raw:
-                if not self._is_valid_testimony_card(raw_card):
-                    continue
-                if not isinstance(raw_card, dict):
-                    continue
-                valid_cards.append(self._sanitize_testimony_card(raw_card))
-
-            if not valid_cards:
-                continue
-            testimony_videos.append(
-                {
-                    "video_id": video_id,
-                    "testimony_cards": valid_cards,
-                }
-            )
-        return testimony_videos
+    def _build_testimony_digest_videos(self, company_id: Optional[str]) -> list[dict]:
+        bundle = self._testimony_digest_bundle(company_id)
+        return bundle.videos if bundle is not None else []
 
     def _get_run_lock(self, session_id: str) -> Lock:
         with self._run_locks_guard:
@@ -865,6 +840,8 @@ class VideoAgentService:
             return False
 
         for part in content:
+            if is_scene_clip_context_text(part):
+                continue
             if not isinstance(part, dict):
                 return False
             if part.get("type") != "input_file":
@@ -897,18 +874,40 @@ class VideoAgentService:
             matched_scenes.append(scene)
 
         if not matched_scenes:
+            self._scene_clip_ledger.stage(session_id, {}, set())
             return None
 
-        library = VideoLibrary(self.config, company_id=company_id)
-        try:
-            library.scan_library()
-        except Exception as exc:
-            print(f"[_build_scene_clip_context_message] Failed to scan video library: {exc}")
-            return None
+        # Only scenes whose clip changed since the model last saw it are attached as video.
+        seen = self._scene_clip_ledger.seen(session_id)
+        fingerprints = {scene.scene_id: scene_clip_fingerprint(scene) for scene in matched_scenes}
+        changed = [scene for scene in matched_scenes if seen.get(scene.scene_id) != fingerprints[scene.scene_id]]
+        plan = plan_scene_clip_budget(
+            [
+                (scene.scene_id, float(scene.matched_scene.end_time) - float(scene.matched_scene.start_time))
+                for scene in changed
+            ],
+            max_frames=scene_clip_frame_budget(),
+            fps=scene_clip_fps(),
+        )
+        attach_ids = set(plan.attach)
+        deferred_ids = set(plan.deferred)
+
+        library: Optional[VideoLibrary] = None
+        if any(
+            not str(scene.matched_scene.source_video_id).strip().startswith("generated:")
+            for scene in changed
+            if scene.scene_id in attach_ids
+        ):
+            library = VideoLibrary(self.config, company_id=company_id)
+            try:
+                library.scan_library()
+            except Exception as exc:
+                print(f"[_build_scene_clip_context_message] Failed to scan video library: {exc}")
+                library = None
 
         content: list[dict[str, Any]] = []
+        attached: dict[str, str] = {}
 
-        attached_count = 0
         for scene in matched_scenes:
             matched = scene.matched_scene
             if not matched:
@@ -917,6 +916,23 @@ class VideoAgentService:
             if not source_video_id:
                 continue
 
+            if scene.scene_id in deferred_ids:
+                content.append(
+                    {
+                        "type": "input_text",
+                        "text": scene_clip_descriptor(scene, "changed; clip deferred to a later turn (media budget)"),
+                    }
+                )
+                continue
+            if scene.scene_id not in attach_ids:
+                content.append(
+                    {
+                        "type": "input_text",
+                        "text": scene_clip_descriptor(scene, "unchanged since its clip was attached earlier"),
+                    }
+                )
+                continue
+
             is_voice_over_scene = bool(scene.use_voice_over)
             start_seconds = float(matched.start_time)
             end_seconds = float(matched.end_time)
@@ -927,7 +943,7 @@ class VideoAgentService:
             if source_video_id.startswith("generated:"):
                 file_uri = self._resolve_generated_video_uri(source_video_id, company_id)
             else:
-                metadata = library.get_video(source_video_id)
+                metadata = library.get_video(source_video_id) if library is not None else None
                 if metadata is None:
                     continue
                 source_filename = str(metadata.filename or source_filename)
@@ -956,26 +972,50 @@ class VideoAgentService:
                     "filename": f"{scene.scene_id}{extension}",
                     "format": self._infer_video_mime_type(file_uri),
                     "video_metadata": {
-                        "fps": 5,
+                        "fps": plan.fps,
                         "start_offset": self._format_offset_seconds(start_seconds),
                         "end_offset": self._format_offset_seconds(end_seconds),
                     },
                 }
             )
-            attached_count += 1
+            attached[scene.scene_id] = fingerprints[scene.scene_id]
 
-        if attached_count == 0:
+        # Recorded as seen only once the turn succeeds (see run_turn).
+        self._scene_clip_ledger.stage(session_id, attached, set(fingerprints))
+        if not content:
             return None
+        if attached or deferred_ids:
+            print(
+                f"[VideoAgentService][scene_clips] session={session_id} attached={len(attached)} "
+                f"unchanged={len(matched_scenes) - len(changed)} deferred={len(deferred_ids)} fps={plan.fps:g}"
+            )
 
         return {"type": "message", "role": "user", "content": content}
 
+    @staticmethod
+    def _compact_session_memory(session: CompactingSQLiteSession, policy: MemoryPolicy, prepare) -> None:
+        try:
+            stats = session.compact(policy, prepare)
+        except Exception as exc:
+            print(f"[VideoAgentService][memory] compaction failed for session={session.session_id}: {exc}")
+            return
+        if stats is not None:
+            print(
+                f"[VideoAgentService][memory] compacted session={session.session_id} "
+                f"items={stats['items_before']}->{stats['items_after']} "
+                f"tokens~{stats['tokens_before']}->{stats['tokens_after']}"
+            )
+
     def run_turn(self, session_id: str, user_message: str) -> dict:
         agent = self._get_agent(session_id)
 
-        session = SQLiteSession(session_id, str(self.session_db_path))
+        session = CompactingSQLiteSession(session_id, str(self.session_db_path))
+        memory_enabled = session_memory_enabled()
+        memory_policy = MemoryPolicy.from_env()
         ui_update_tools = {
             "update_storyboard",
             "update_video_brief",
+            "set_scene_candidates",
         }
         redacted_args = json.dumps(
             {"note": "REDACTED TO REDUCE TOKEN USAGE; SEE LATEST STATE IN SYSTEM PROMPT"}
@@ -1026,12 +1066,17 @@ class VideoAgentService:
                 return scrubbed
             return item
 
-        def _merge_session_input(history, new_input):
-            scrubbed_history = [
+        def _prepare_history(history):
+            return [
                 _scrub_input_item(item)
                 for item in history
                 if not self._is_scene_clip_context_message(item)
             ]
+
+        def _merge_session_input(history, new_input):
+            scrubbed_history = _prepare_history(history)
+            if memory_enabled:
+                scrubbed_history = bound_history(scrubbed_history, memory_policy)
             merged: list[dict[str, Any]] = []
             scene_clip_context_message = self._build_scene_clip_context_message(session_id)
             if scene_clip_context_message is not None:
@@ -1047,7 +1092,8 @@ class VideoAgentService:
         )
         
         # Resolve owner for event logging
-        user_id, _ = self._resolve_session_owner(session_id)
+        user_id, company_id = self._resolve_session_owner(session_id)
+        turn_usage: Optional[dict[str, int]] = None
         
         self.event_store.append(
             session_id,
@@ -1061,22 +1107,37 @@ class VideoAgentService:
         self._schedule_shortlist_cache_warmup(session_id)
         
         try:
-            with self._get_run_lock(session_id):
-                result = None
-                for attempt in Retrying(
-                    retry=retry_if_exception(_is_retryable_rate_limit_error),
-                    stop=stop_after_attempt(4),  # Initial attempt + up to 3 retries
-                    wait=wait_exponential(multiplier=1, min=1, max=8),
+            # One budget covers the turn and every nested model call its tools make.
+            with self._get_run_lock(session_id), retry_budget_scope(
+                _AGENT_TURN_RETRY_BUDGET,
+                max_wasted_seconds=_AGENT_TURN_RETRY_BUDGET_SECONDS,
+            ):
+                result = call_with_resilience(
+                    lambda: Runner.run_sync(
+                        agent,
+                        input=user_message,
+                        session=session,
+                        max_turns=100,
+                        run_config=run_config,
+                    ),
+                    provider=_agent_provider(getattr(self, "model_name", "") or ""),
+                    operation_name="agent_turn",
+                    policy=_AGENT_TURN_RETRY_POLICY,
                     reraise=True,
-                ):
-                    with attempt:
-                        result = Runner.run_sync(
-                            agent,
-                            input=user_message,
-                            session=session,
-                            max_turns=100,
-                            run_config=run_config,
-                        )
+                    log_prefix="[VideoAgentService]",
+                )
+                # Compact before releasing the run lock so a next turn cannot write mid-rewrite.
+                if memory_enabled:
+                    self._compact_session_memory(session, memory_policy, _prepare_history)
+            self._scene_clip_ledger.commit(session_id)
+            usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+            if usage is not None:
+                turn_usage = record_agent_turn_usage(company_id, usage)
+                print(
+                    f"[VideoAgentService][token_usage] session={session_id} "
+                    f"input={turn_usage['input_tokens']} cached={turn_usage['cached_input_tokens']} "
+                    f"billed={turn_usage['billed_input_tokens']} output={turn_usage['output_tokens']}"
+                )
             output = result.final_output
             if not isinstance(output, str):
                 output = str(output)
@@ -1111,8 +1172,13 @@ class VideoAgentService:
                 "suggested_actions": suggested_actions,
             }
         finally:
+            # Clips staged by a failed turn are attached again next turn.
+            self._scene_clip_ledger.discard(session_id)
             uid, _ = self._resolve_session_owner(session_id)
-            self.event_store.append(session_id, {"type": "run_end"}, user_id=uid)
+            run_end: dict[str, Any] = {"type": "run_end"}
+            if turn_usage is not None:
+                run_end["usage"] = turn_usage
+            self.event_store.append(session_id, run_end, user_id=uid)
 
     def get_events(self, session_id: str, cursor: Optional[int]) -> tuple[list[dict], int]:
         user_id, _ = self._resolve_session_owner(session_id)
@@ -0,0 +1,303 @@
+"""Bounded conversation memory for agent sessions.
+
+The agent's `SQLiteSession` would otherwise keep every message, tool call and tool
+output of a session forever, and every turn would re-send all of it. `bound_history`
+shapes the history sent with a turn:
+
+- the last `recent_turns` turns are kept verbatim;
+- older turns are folded into one rule-based summary message, which also carries
+  over any summary from an earlier compaction;
+- large outputs of tools whose results land in the storyboard or brief (both already
+  in the system prompt) are dropped from every turn but the latest;
+- while the result exceeds `max_history_tokens`, the oldest kept turn is moved into
+  the summary as well.
+
+`CompactingSQLiteSession.compact` writes that bounded history back to the store once
+a session grows past `compact_after_turns`, so the table stays bounded too.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from agents import SQLiteSession
+
+SUMMARY_MARKER = "[CONVERSATION_SUMMARY]"
+_SUMMARY_PREAMBLE = (
+    "Earlier turns of this conversation, summarized. The current storyboard and brief are in the system prompt."
+)
+
+# Tools whose results are persisted into the storyboard / brief state that the
+# system prompt already shows, or that the agent follows up with a tool that does.
+STATE_REFLECTED_TOOLS = frozenset(
+    {
+        "update_storyboard",
+        "update_storyboard_scene",
+        "update_matched_scenes",
+        "set_scene_candidates",
+        "update_video_brief",
+        "match_scene_to_video",
+        "match_scene_to_video_v2",
+        "generate_voiceover_v3",
+        "generate_scene",
+        "set_scene_animation",
+    }
+)
+
+_SNIPPET_CHARS = 280
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = str(os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return default
+
+
+def session_memory_enabled() -> bool:
+    raw = str(os.environ.get("AGENT_MEMORY_ENABLED") or "true").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+@dataclass(frozen=True)
+class MemoryPolicy:
+    recent_turns: int = 6
+    max_history_tokens: int = 32_000
+    max_tool_output_chars: int = 2_000
+    max_summary_chars: int = 6_000
+    compact_after_turns: int = 12
+
+    @classmethod
+    def from_env(cls) -> "MemoryPolicy":
+        recent_turns = max(1, _env_int("AGENT_MEMORY_RECENT_TURNS", cls.recent_turns))
+        return cls(
+            recent_turns=recent_turns,
+            max_history_tokens=_env_int("AGENT_MEMORY_MAX_HISTORY_TOKENS", cls.max_history_tokens),
+            max_tool_output_chars=_env_int("AGENT_MEMORY_MAX_TOOL_OUTPUT_CHARS", cls.max_tool_output_chars),
+            max_summary_chars=_env_int("AGENT_MEMORY_MAX_SUMMARY_CHARS", cls.max_summary_chars),
+            compact_after_turns=max(
+                recent_turns + 1,
+                _env_int("AGENT_MEMORY_COMPACT_AFTER_TURNS", max(cls.compact_after_turns, recent_turns * 2)),
+            ),
+        )
+
+
+def estimate_tokens(items: list[Any]) -> int:
+    """Rough token count (~4 characters per token) of serialized input items."""
+    return sum(len(json.dumps(item, default=str)) for item in items) // 4
+
+
+def _snippet(text: str, limit: int = _SNIPPET_CHARS) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def _summary_text(item: Any) -> Optional[str]:
+    if isinstance(item, dict) and item.get("role") == "user" and isinstance(item.get("content"), str):
+        content = item["content"]
+        if content.startswith(SUMMARY_MARKER):
+            text = content[len(SUMMARY_MARKER):].strip()
+            return text[len(_SUMMARY_PREAMBLE):].strip() if text.startswith(_SUMMARY_PREAMBLE) else text
+    return None
+
+
+def _is_user_turn_start(item: Any) -> bool:
+    return (
+        isinstance(item, dict)
+        and item.get("role") == "user"
+        and item.get("type", "message") == "message"
+        and _summary_text(item) is None
+    )
+
+
+def split_turns(items: list[Any]) -> tuple[Optional[str], list[list[Any]]]:
+    """Split history into (earlier summary, turns); a turn starts at each user message."""
+    summary: Optional[str] = None
+    turns: list[list[Any]] = []
+    for item in items:
+        text = _summary_text(item)
+        if text is not None:
+            summary = "\n".join(part for part in (summary, text) if part)
+            continue
+        if _is_user_turn_start(item) or not turns:
+            turns.append([])
+        turns[-1].append(item)
+    return summary, turns
+
+
+def _message_text(item: dict[str, Any]) -> str:
+    content = item.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            str(part.get("text") or "")
+            for part in content
+            if isinstance(part, dict) and part.get("type") in {"input_text", "output_text", "text"}
+        )
+    return ""
+
+
+def _assistant_reply(text: str) -> str:
+    # The agent answers with {"response": ..., "suggested_actions": [...]}.
+    try:
+        parsed = json.loads(text)
+    except (json.JSONDecodeError, ValueError):
+        return text
+    if isinstance(parsed, dict) and isinstance(parsed.get("response"), str):
+        return parsed["response"]
+    return text
+
+
+def summarize_turn(turn: list[Any]) -> str:
+    user_text = ""
+    reply = ""
+    tool_counts: dict[str, int] = {}
+    for item in turn:
+        if not isinstance(item, dict):
+            continue
+        if _is_user_turn_start(item) and not user_text:
+            user_text = _message_text(item)
+        elif item.get("role") == "assistant":
+            text = _message_text(item).strip()
+            if text:
+                reply = text
+        elif item.get("type") == "function_call" and item.get("name"):
+            tool_counts[item["name"]] = tool_counts.get(item["name"], 0) + 1
+    lines = [f"- User: {_snippet(user_text)}" if user_text else "- (no user message)"]
+    if tool_counts:
+        tools = ", ".join(f"{name} x{count}" if count > 1 else name for name, count in tool_counts.items())
+        lines.append(f"  Tools: {tools}")
+    if reply:
+        lines.append(f"  Assistant: {_snippet(_assistant_reply(reply))}")
+    return "\n".join(lines)
+
+
+def summarize_turns(previous_summary: Optional[str], turns: list[list[Any]], max_chars: int) -> str:
+    text = "\n".join(part for part in [previous_summary, *(summarize_turn(turn) for turn in turns)] if part)
+    if max_chars and len(text) > max_chars:
+        # Keep the most recent part of the summary.
+        text = "…" + text[-(max_chars - 1):]
+    return text
+
+
+def summary_message(summary: str) -> dict[str, Any]:
+    return {
+        "role": "user",
+        "content": f"{SUMMARY_MARKER}\n{_SUMMARY_PREAMBLE}\n{summary}",
+    }
+
+
+def drop_reflected_tool_outputs(turn: list[Any], max_chars: int) -> list[Any]:
+    """Replace large outputs of state-reflected tools with a short note."""
+    tool_names = {
+        item.get("call_id"): item.get("name")
+        for item in turn
+        if isinstance(item, dict) and item.get("type") == "function_call"
+    }
+    trimmed: list[Any] = []
+    for item in turn:
+        if isinstance(item, dict) and item.get("type") == "function_call_output":
+            output = item.get("output")
+            size = len(output) if isinstance(output, str) else len(json.dumps(output, default=str))
+            if size > max_chars and tool_names.get(item.get("call_id")) in STATE_REFLECTED_TOOLS:
+                item = dict(item)
+                item["output"] = (
+                    f"[TOOL_OUTPUT_DROPPED: {size} chars; the result is reflected in the current "
+                    "storyboard / brief state in the system prompt]"
+                )
+        trimmed.append(item)
+    return trimmed
+
+
+def bound_history(items: list[Any], policy: MemoryPolicy) -> list[Any]:
+    previous_summary, turns = split_turns(items)
+    older = turns[: -policy.recent_turns] if len(turns) > policy.recent_turns else []
+    recent = turns[len(older):]
+    # The latest turn keeps its tool outputs; the agent often follows up on them.
+    recent = [drop_reflected_tool_outputs(turn, policy.max_tool_output_chars) for turn in recent[:-1]] + recent[-1:]
+
+    def _assemble() -> list[Any]:
+        bounded: list[Any] = []
+        if previous_summary or older:
+            summary = summarize_turns(previous_summary, older, policy.max_summary_chars)
+            bounded.append(summary_message(summary))
+        for turn in recent:
+            bounded.extend(turn)
+        return bounded
+
+    bounded = _assemble()
+    while policy.max_history_tokens and len(recent) > 1 and estimate_tokens(bounded) > policy.max_history_tokens:
+        older.append(recent.pop(0))
+        bounded = _assemble()
+    return bounded
+
+
+class CompactingSQLiteSession(SQLiteSession):
+    """`SQLiteSession` whose stored history can be replaced by its bounded form."""
+
+    def _get_items_sync(self) -> list[Any]:
+        conn = self._get_connection()
+        rows = conn.execute(
+            f"SELECT message_data FROM {self.messages_table} WHERE session_id = ? ORDER BY id ASC",
+            (self.session_id,),
+        ).fetchall()
+        items = []
+        for (message_data,) in rows:
+            try:
+                items.append(json.loads(message_data))
+            except json.JSONDecodeError:
+                continue
+        return items
+
+    def _replace_items_sync(self, conn: sqlite3.Connection, items: list[Any]) -> None:
+        conn.execute(f"DELETE FROM {self.messages_table} WHERE session_id = ?", (self.session_id,))
+        conn.executemany(
+            f"INSERT INTO {self.messages_table} (session_id, message_data) VALUES (?, ?)",
+            [(self.session_id, json.dumps(item)) for item in items],
+        )
+
+    def compact(
+        self,
+        policy: MemoryPolicy,
+        prepare: Callable[[list[Any]], list[Any]] = list,
+    ) -> Optional[dict[str, int]]:
+        """Rewrite the stored history to its bounded form once it exceeds the policy.
+
+        `prepare` filters/scrubs stored items first (the same way the turn input is
+        built). Returns before/after stats when the store was rewritten, else None.
+        The read and the rewrite share one write transaction, so items added by
+        another connection meanwhile wait for it instead of being deleted.
+        """
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                items = self._get_items_sync()
+                prepared = prepare(items)
+                _, turns = split_turns(prepared)
+                tokens_before = estimate_tokens(items)
+                if len(turns) <= policy.compact_after_turns and (
+                    not policy.max_history_tokens or tokens_before <= 2 * policy.max_history_tokens
+                ):
+                    conn.rollback()
+                    return None
+                compacted = bound_history(prepared, policy)
+                self._replace_items_sync(conn, compacted)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return {
+            "items_before": len(items),
+            "items_after": len(compacted),
+            "tokens_before": tokens_before,
+            "tokens_after": estimate_tokens(compacted),
+        }
@@ -0,0 +1,143 @@
+"""In-memory per-company cache of the prepared shortlist context.
+
+The v2 matcher needs the same derived data on every call: the parsed scene-analysis
+index, the library video map, the prepared shortlist payload, the rendered shared
+prompt prefix and its hash, and the BM25 scene-card retriever over that payload. A
+`ShortlistIndexSnapshot` holds all of them for one (index generation, library
+version) pair. `ShortlistIndexCache.get` serves the snapshot from memory and, once it
+is older than the refresh interval, re-validates it in the background; the loader
+rebuilds only when the index object generation or the library version changed. Only
+the very first call for a company does I/O inline. A refresh interval of 0 turns
+re-validation off: the first snapshot is kept until invalidated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from videoagent.single_flight import get_single_flight
+
+from .scene_card_retrieval import SceneCardRetriever
+
+# Loader contract: given the current snapshot (or None), return it unchanged when still
+# valid, a rebuilt snapshot, or None when the company has no usable index.
+SnapshotLoader = Callable[[Optional["ShortlistIndexSnapshot"]], Optional["ShortlistIndexSnapshot"]]
+
+
+@dataclass(frozen=True)
+class ShortlistIndexSnapshot:
+    company_id: str
+    index_generation: Optional[str]
+    library_version: str
+    video_map: dict[str, Any]
+    index_payload: dict[str, Any]
+    index_warnings: list[str]
+    shared_prompt_prefix: str
+    # sha256 of "<model>\n<prefix>", the explicit prompt-cache key for this prefix.
+    prompt_cache_key: str
+    scene_card_retriever: Optional[SceneCardRetriever] = None
+
+
+def library_version(video_ids: Any) -> str:
+    """Version of a library listing; video IDs already encode object generation and size."""
+    return hashlib.sha256("\n".join(sorted(str(video_id) for video_id in video_ids)).encode("utf-8")).hexdigest()
+
+
+def shortlist_prompt_cache_key(model: str, shared_prompt_prefix: str) -> str:
+    return hashlib.sha256(f"{model}\n{shared_prompt_prefix}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _CacheEntry:
+    snapshot: ShortlistIndexSnapshot
+    checked_at: float
+    refreshing: bool = False
+
+
+def _start_daemon_thread(target: Callable[[], None]) -> None:
+    threading.Thread(target=target, name="shortlist-index-refresh", daemon=True).start()
+
+
+class ShortlistIndexCache:
+    """Serves prepared shortlist snapshots from memory with background re-validation."""
+
+    def __init__(
+        self,
+        *,
+        refresh_after_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        run_in_background: Callable[[Callable[[], None]], None] = _start_daemon_thread,
+    ) -> None:
+        self.refresh_after_seconds = refresh_after_seconds
+        self._clock = clock
+        self._run_in_background = run_in_background
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, _CacheEntry] = {}
+
+    def get(self, key: Hashable, loader: SnapshotLoader) -> Optional[ShortlistIndexSnapshot]:
+        with self._lock:
+            entry = self._entries.get(key)
+            stale = (
+                entry is not None
+                and self.refresh_after_seconds > 0
+                and not entry.refreshing
+                and self._clock() - entry.checked_at >= self.refresh_after_seconds
+            )
+            if stale:
+                entry.refreshing = True
+        if entry is None:
+            # Concurrent cold callers share one load.
+            return get_single_flight("shortlist_index").do(key, lambda: self._load(key, loader))
+        if stale:
+            self._run_in_background(lambda: self._refresh(key, loader, entry))
+        return entry.snapshot
+
+    def _load(self, key: Hashable, loader: SnapshotLoader) -> Optional[ShortlistIndexSnapshot]:
+        snapshot = loader(None)
+        if snapshot is not None:
+            with self._lock:
+                self._entries[key] = _CacheEntry(snapshot=snapshot, checked_at=self._clock())
+        return snapshot
+
+    def _refresh(self, key: Hashable, loader: SnapshotLoader, entry: _CacheEntry) -> None:
+        try:
+            snapshot = loader(entry.snapshot)
+        except Exception as exc:
+            print(f"[ShortlistIndexCache][refresh] Keeping cached snapshot for {key}: {exc}")
+            with self._lock:
+                entry.refreshing = False
+                entry.checked_at = self._clock()
+            return
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return
+            if snapshot is None:
+                del self._entries[key]
+                return
+            if snapshot is not entry.snapshot:
+                print(
+                    f"[ShortlistIndexCache][refresh] Rebuilt {key}: "
+                    f"index_generation={snapshot.index_generation}, library_version={snapshot.library_version[:12]}"
+                )
+            self._entries[key] = _CacheEntry(snapshot=snapshot, checked_at=self._clock())
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+_SHORTLIST_INDEX_CACHE: Optional[ShortlistIndexCache] = None
+_SHORTLIST_INDEX_CACHE_LOCK = threading.Lock()
+
+
+def get_shortlist_index_cache(refresh_after_seconds: float) -> ShortlistIndexCache:
+    """Process-wide snapshot cache; the refresh interval is fixed on first use."""
+    global _SHORTLIST_INDEX_CACHE
+    with _SHORTLIST_INDEX_CACHE_LOCK:
+        if _SHORTLIST_INDEX_CACHE is None:
+            _SHORTLIST_INDEX_CACHE = ShortlistIndexCache(refresh_after_seconds=refresh_after_seconds)
+        return _SHORTLIST_INDEX_CACHE
@@ -142,11 +142,17 @@ class StoryboardStore:
     base_dir: Path
     user_id: Optional[str] = None
     _lock: Lock = field(default_factory=Lock)
+    # Per-session save counter, bumped once a change is committed; readers memoize derived state until it changes.
+    _versions: dict[str, int] = field(default_factory=dict)
 
     def _session_dir(self, session_id: str, user_id: Optional[str]) -> Path:
         user_scope = user_id or "unknown"
         return self.base_dir / user_scope / session_id
 
+    def version(self, session_id: str) -> int:
+        with self._lock:
+            return self._versions.get(session_id, 0)
+
     def _storyboard_path(self, session_id: str, user_id: Optional[str]) -> Path:
         # Kept for compatibility with tools that derive session asset directories.
         return self._session_dir(session_id, user_id) / "storyboard.json"
@@ -161,28 +167,32 @@ class StoryboardStore:
 
     def save(self, session_id: str, scenes: list[_StoryboardScene], user_id: Optional[str] = None) -> None:
         payload = [scene.model_dump(mode="json") for scene in scenes]
-        with self._lock, get_db_context() as db:
-            row = db.query(SessionStoryboard).filter(SessionStoryboard.session_id == session_id).first()
-            if row:
-                row.scenes = payload
-                if user_id is not None:
-                    row.user_id = user_id
-                row.updated_at = datetime.utcnow()
-            else:
-                db.add(
-                    SessionStoryboard(
-                        session_id=session_id,
-                        user_id=user_id,
-                        scenes=payload,
-                        updated_at=datetime.utcnow(),
+        with self._lock:
+            with get_db_context() as db:
+                row = db.query(SessionStoryboard).filter(SessionStoryboard.session_id == session_id).first()
+                if row:
+                    row.scenes = payload
+                    if user_id is not None:
+                        row.user_id = user_id
+                    row.updated_at = datetime.utcnow()
+                else:
+                    db.add(
+                        SessionStoryboard(
+                            session_id=session_id,
+                            user_id=user_id,
+                            scenes=payload,
+                            updated_at=datetime.utcnow(),
+                        )
                     )
-                )
+            self._versions[session_id] = self._versions.get(session_id, 0) + 1
 
     def clear(self, session_id: str, user_id: Optional[str] = None) -> None:
-        with self._lock, get_db_context() as db:
-            db.query(SessionStoryboard).filter(SessionStoryboard.session_id == session_id).delete(
-                synchronize_session=False
-            )
+        with self._lock:
+            with get_db_context() as db:
+                db.query(SessionStoryboard).filter(SessionStoryboard.session_id == session_id).delete(
+                    synchronize_session=False
+                )
+            self._versions[session_id] = self._versions.get(session_id, 0) + 1
 
 
 @dataclass
@@ -190,11 +200,17 @@ class BriefStore:
     base_dir: Path
     user_id: Optional[str] = None
     _lock: Lock = field(default_factory=Lock)
+    # Per-session save counter, bumped once a change is committed; readers memoize derived state until it changes.
+    _versions: dict[str, int] = field(default_factory=dict)
 
     def _session_dir(self, session_id: str, user_id: Optional[str]) -> Path:
         user_scope = user_id or "unknown"
         return self.base_dir / user_scope / session_id
 
+    def version(self, session_id: str) -> int:
+        with self._lock:
+            return self._versions.get(session_id, 0)
+
     def _brief_path(self, session_id: str, user_id: Optional[str]) -> Path:
         # Kept for compatibility with tooling that expects a deterministic session directory.
         return self._session_dir(session_id, user_id) / "brief.json"
@@ -209,28 +225,32 @@ class BriefStore:
 
     def save(self, session_id: str, brief: VideoBrief, user_id: Optional[str] = None) -> None:
         payload = brief.model_dump(mode="json")
-        with self._lock, get_db_context() as db:
-            row = db.query(SessionBrief).filter(SessionBrief.session_id == session_id).first()
-            if row:
-                row.brief = payload
-                if user_id is not None:
-                    row.user_id = user_id
-                row.updated_at = datetime.utcnow()
-            else:
-                db.add(
-                    SessionBrief(
-                        session_id=session_id,
-                        user_id=user_id,
-                        brief=payload,
-                        updated_at=datetime.utcnow(),
+        with self._lock:
+            with get_db_context() as db:
+                row = db.query(SessionBrief).filter(SessionBrief.session_id == session_id).first()
+                if row:
+                    row.brief = payload
+                    if user_id is not None:
+                        row.user_id = user_id
+                    row.updated_at = datetime.utcnow()
+                else:
+                    db.add(
+                        SessionBrief(
+                            session_id=session_id,
+                            user_id=user_id,
+                            brief=payload,
+                            updated_at=datetime.utcnow(),
+                        )
                     )
-                )
+            self._versions[session_id] = self._versions.get(session_id, 0) + 1
 
     def clear(self, session_id: str, user_id: Optional[str] = None) -> None:
-        with self._lock, get_db_context() as db:
-            db.query(SessionBrief).filter(SessionBrief.session_id == session_id).delete(
-                synchronize_session=False
-            )
+        with self._lock:
+            with get_db_context() as db:
+                db.query(SessionBrief).filter(SessionBrief.session_id == session_id).delete(
+                    synchronize_session=False
+                )
+            self._versions[session_id] = self._versions.get(session_id, 0) + 1
 
 
 @dataclass
@@ -0,0 +1,277 @@
+"""Compact encoding of agent tool results.
+
+Tool outputs land in the agent context and are replayed on every later model call
+of the turn (and in the history of later turns). Scene matching returns kilobytes of
+JSON: candidates with rationales, per-scene warnings and the whole shortlist. An
+output above `AGENT_TOOL_RESULT_MAX_INLINE_CHARS` is therefore stored server-side
+under a short handle. The model gets a compact view of it instead, and can drill
+into the full result with the `get_tool_result` tool.
+
+Every tool result is counted per tool: the raw size, what was returned to the model
+and the estimated tokens saved (~4 characters per token).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+_DEFAULT_MAX_INLINE_CHARS = 1_500
+_DEFAULT_MAX_STORED_RESULTS = 512
+_PAGE_CHARS = 6_000
+_TEXT_CHARS = 160
+_HEAD_CHARS = 600
+_MAX_LISTED_WARNINGS = 2
+
+
+def tool_result_max_inline_chars() -> int:
+    """Outputs longer than this are stored behind a handle; 0 disables compaction."""
+    raw = str(os.environ.get("AGENT_TOOL_RESULT_MAX_INLINE_CHARS") or "").strip()
+    if not raw:
+        return _DEFAULT_MAX_INLINE_CHARS
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return _DEFAULT_MAX_INLINE_CHARS
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def _truncate(value: Any, limit: int = _TEXT_CHARS) -> str:
+    text = " ".join(str(value or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+@dataclass(frozen=True)
+class StoredToolResult:
+    handle: str
+    session_id: str
+    tool_name: str
+    output: str
+    created_at: float
+
+
+class ToolResultStore:
+    """Bounded, per-process store of full tool outputs, oldest evicted first."""
+
+    def __init__(self, max_entries: int = _DEFAULT_MAX_STORED_RESULTS) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, StoredToolResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, session_id: str, tool_name: str, output: str) -> str:
+        handle = f"tr_{uuid4().hex[:10]}"
+        with self._lock:
+            self._entries[handle] = StoredToolResult(handle, session_id, tool_name, output, time.time())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def get(self, session_id: str, handle: str) -> Optional[StoredToolResult]:
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None or entry.session_id != session_id:
+                return None
+            self._entries.move_to_end(handle)
+            return entry
+
+
+_STORE = ToolResultStore()
+
+
+def get_tool_result_store() -> ToolResultStore:
+    return _STORE
+
+
+def _split_json_prefix(output: str) -> tuple[Optional[Any], str]:
+    """(parsed leading JSON value, trailing text) of outputs shaped like `<json>\\n<message>`."""
+    text = output.lstrip()
+    try:
+        payload, end = json.JSONDecoder().raw_decode(text)
+    except (json.JSONDecodeError, ValueError):
+        return None, output
+    return payload, text[end:].strip()
+
+
+_CANDIDATE_KEYS = (
+    "video_id",
+    "source_video_id",
+    "start_seconds",
+    "end_seconds",
+    "start_time",
+    "end_time",
+    "keep_original_audio",
+)
+
+
+def _compact_candidate(candidate: Any) -> Any:
+    if not isinstance(candidate, dict):
+        return candidate
+    compact = {key: candidate[key] for key in _CANDIDATE_KEYS if key in candidate}
+    for key in ("description", "rationale"):
+        if candidate.get(key):
+            compact[key] = _truncate(candidate[key])
+    return compact
+
+
+def summarize_scene_match_result(output: str) -> Optional[str]:
+    """Compact view of a scene-matching result: candidates kept, diagnostics counted."""
+    payload, message = _split_json_prefix(output)
+    if not isinstance(payload, dict) or not isinstance(payload.get("results"), list):
+        return None
+    compact: dict[str, Any] = {
+        "results": [
+            {
+                "scene_id": result.get("scene_id"),
+                "candidates": [_compact_candidate(candidate) for candidate in result.get("candidates") or []],
+            }
+            for result in payload["results"]
+            if isinstance(result, dict)
+        ]
+    }
+    warnings = payload.get("warnings")
+    if isinstance(warnings, dict) and warnings:
+        compact["warnings"] = {
+            scene_id: {
+                "count": len(items),
+                "first": [_truncate(item) for item in list(items)[:_MAX_LISTED_WARNINGS]],
+            }
+            for scene_id, items in warnings.items()
+            if isinstance(items, list)
+        }
+    errors = payload.get("errors")
+    if isinstance(errors, list) and errors:
+        compact["errors"] = [
+            {**error, "error": _truncate(error.get("error"), 240)} if isinstance(error, dict) else error
+            for error in errors
+        ]
+    shortlist = payload.get("shortlist_review_clips")
+    if isinstance(shortlist, dict) and shortlist:
+        compact["shortlist_review_clips"] = {
+            scene_id: f"{len(clips)} clip(s)" for scene_id, clips in shortlist.items() if isinstance(clips, list)
+        }
+    return "\n".join(part for part in (json.dumps(compact, separators=(",", ":")), message) if part)
+
+
+def _summarize_text(output: str) -> str:
+    head = output[:_HEAD_CHARS].rstrip()
+    return f"{head}\n…" if len(output) > _HEAD_CHARS else head
+
+
+_SUMMARIZERS: dict[str, Callable[[str], Optional[str]]] = {
+    "match_scene_to_video": summarize_scene_match_result,
+    "match_scene_to_video_v2": summarize_scene_match_result,
+}
+
+
+_TOOL_TOKENS: dict[str, dict[str, int]] = {}
+_TOOL_TOKENS_LOCK = threading.Lock()
+
+
+def _record(tool_name: str, raw: str, returned: str, *, compacted: bool) -> None:
+    raw_tokens = _estimate_tokens(raw)
+    returned_tokens = _estimate_tokens(returned)
+    with _TOOL_TOKENS_LOCK:
+        totals = _TOOL_TOKENS.setdefault(
+            tool_name,
+            {"calls": 0, "compacted": 0, "raw_tokens": 0, "returned_tokens": 0, "saved_tokens": 0},
+        )
+        totals["calls"] += 1
+        totals["compacted"] += int(compacted)
+        totals["raw_tokens"] += raw_tokens
+        totals["returned_tokens"] += returned_tokens
+        totals["saved_tokens"] += max(0, raw_tokens - returned_tokens)
+
+
+def encode_tool_result(
+    session_id: str,
+    tool_name: str,
+    output: str,
+    *,
+    store: Optional[ToolResultStore] = None,
+) -> str:
+    """Return `output` as-is when short, else a handle plus a compact view of it."""
+    max_inline_chars = tool_result_max_inline_chars()
+    if not max_inline_chars or len(output) <= max_inline_chars:
+        _record(tool_name, output, output, compacted=False)
+        return output
+
+    try:
+        summary = (_SUMMARIZERS.get(tool_name) or _summarize_text)(output) or _summarize_text(output)
+    except Exception as exc:
+        print(f"[ToolResults][compact] summarizer failed for {tool_name}: {exc}")
+        summary = _summarize_text(output)
+    handle = (store or _STORE).put(session_id, tool_name, output)
+    encoded = (
+        f"[tool_result {handle}: {tool_name}, {len(output)} chars stored; compact view below. "
+        f'Call get_tool_result(handle="{handle}") for the full result.]\n{summary}'
+    )
+    if len(encoded) >= len(output):
+        _record(tool_name, output, output, compacted=False)
+        return output
+    _record(tool_name, output, encoded, compacted=True)
+    return encoded
+
+
+def _select_path(value: Any, path: str) -> Any:
+    for key in [part for part in path.split(".") if part]:
+        if isinstance(value, list):
+            try:
+                value = value[int(key)]
+            except (ValueError, IndexError):
+                raise KeyError(key)
+        elif isinstance(value, dict):
+            if key not in value:
+                raise KeyError(key)
+            value = value[key]
+        else:
+            raise KeyError(key)
+    return value
+
+
+def read_tool_result(
+    session_id: str,
+    handle: str,
+    *,
+    path: Optional[str] = None,
+    offset: int = 0,
+    store: Optional[ToolResultStore] = None,
+) -> str:
+    """Full stored output (or one JSON field of it), paged by `offset`."""
+    entry = (store or _STORE).get(session_id, handle.strip())
+    if entry is None:
+        return (
+            f"Unknown or expired tool result handle: {handle}. "
+            "Re-run the original tool call to get the result again."
+        )
+    text = entry.output
+    if path:
+        payload, _ = _split_json_prefix(entry.output)
+        if payload is None:
+            return f"Tool result {handle} is not JSON; call get_tool_result without a path."
+        try:
+            selected = _select_path(payload, path)
+        except KeyError as exc:
+            return f"Path '{path}' not found in tool result {handle} (missing key {exc})."
+        text = selected if isinstance(selected, str) else json.dumps(selected)
+    offset = max(0, int(offset or 0))
+    end = min(len(text), offset + _PAGE_CHARS)
+    header = f"[tool_result {handle}{f' {path}' if path else ''}: chars {offset}-{end} of {len(text)}]"
+    footer = f"\n[More: call get_tool_result with offset={end}]" if end < len(text) else ""
+    page = f"{header}\n{text[offset:end]}{footer}"
+    # Drill-downs are counted too, so the savings above are net of them.
+    _record("get_tool_result", page, page, compacted=False)
+    return page
+
+
+def tool_result_metrics() -> dict[str, dict[str, int]]:
+    with _TOOL_TOKENS_LOCK:
+        return {tool_name: dict(totals) for tool_name, totals in _TOOL_TOKENS.items()}
@@ -14,8 +14,9 @@ from uuid import uuid4
 
 from agents import function_tool
 
+from videoagent.concurrency import Priority, priority_scope
 from videoagent.config import Config
-from videoagent.gcp import build_vertex_client_kwargs
+from videoagent.gemini import GeminiClient
 from videoagent.library import VideoLibrary
 from videoagent.models import RenderResult, VoiceOver
 from videoagent.storage import get_storage_client
@@ -44,6 +45,7 @@ from .storage import (
     StoryboardStore,
     BriefStore,
 )
+from .tool_results import encode_tool_result, read_tool_result
 
 
 def _sanitize_output_filename(filename: str) -> str:
@@ -445,9 +447,15 @@ def _build_tools(
         def error_fn(ctx, error: Exception):
             error_type = type(error).__name__
             error_message = str(error).strip() or "No additional details."
-            return f"{name} failed: {error_type}: {error_message}"
+            return encode_tool_result(session_id, name, f"{name} failed: {error_type}: {error_message}")
         return error_fn
 
+    def _encode_result(name: str, result):
+        # Large outputs go behind a handle; get_tool_result is how the model reads them back.
+        if not isinstance(result, str) or name == "get_tool_result":
+            return result
+        return encode_tool_result(session_id, name, result)
+
     def log_tool(name: str):
         def decorator(fn):
             if asyncio.iscoroutinefunction(fn):
@@ -457,7 +465,7 @@ def _build_tools(
                     try:
                         result = await fn(*args, **kwargs)
                         event_store.append(session_id, {"type": "tool_end", "name": name, "status": "ok"}, user_id=user_id)
-                        return result
+                        return _encode_result(name, result)
                     except Exception as exc:
                         event_store.append(
                             session_id,
@@ -472,7 +480,7 @@ def _build_tools(
                 try:
                     result = fn(*args, **kwargs)
                     event_store.append(session_id, {"type": "tool_end", "name": name, "status": "ok"}, user_id=user_id)
-                    return result
+                    return _encode_result(name, result)
                 except Exception as exc:
                     event_store.append(
                         session_id,
@@ -890,18 +898,16 @@ def _build_tools(
             voice_dir = session_dir / "voice_overs"
             voice_dir.mkdir(parents=True, exist_ok=True)
 
-            semaphore = asyncio.Semaphore(5)
             async def _run(scene_id: str) -> VoiceOver:
                 job_start = time.perf_counter()
                 scene = scene_map[scene_id]
                 audio_id = uuid4().hex[:8]
                 output_path = voice_dir / f"vo_{audio_id}.wav"
-                async with semaphore:
-                    voice_over = await generator.generate_voice_over_async(
-                        scene.script,
-                        voice=voice,
-                        output_path=output_path,
-                    )
+                voice_over = await generator.generate_voice_over_async(
+                    scene.script,
+                    voice=voice,
+                    output_path=output_path,
+                )
                 print(
                     "[generate_voice_overs] "
                     f"{scene_id} generated in {time.perf_counter() - job_start:.2f}s"
@@ -919,7 +925,9 @@ def _build_tools(
                 voice_over.audio_url = None
                 return voice_over
 
-            results = await asyncio.gather(*[_run(scene_id) for scene_id in segment_ids])
+            # TTS concurrency is bounded by the process-wide governor.
+            with priority_scope(Priority.DEFAULT):
+                results = await asyncio.gather(*[_run(scene_id) for scene_id in segment_ids])
             for scene_id, voice_over in zip(segment_ids, results):
                 scene = scene_map[scene_id]
                 scene.voice_over = voice_over
@@ -1019,8 +1027,6 @@ def _build_tools(
             voice_dir = session_dir / "voice_overs"
             voice_dir.mkdir(parents=True, exist_ok=True)
 
-            semaphore = asyncio.Semaphore(16)
-
             async def _run(scene_id: str) -> VoiceOver:
                 job_start = time.perf_counter()
                 scene = scene_map[scene_id]
@@ -1028,12 +1034,11 @@ def _build_tools(
                 output_path = voice_dir / f"vo_{audio_id}.wav"
                 rendered_text = rendered_voiceovers_map[scene_id]
 
-                async with semaphore:
-                    voice_over = await generator.generate_voice_over_async(
-                        rendered_text=rendered_text,
-                        output_path=output_path,
-                        voice_id=user_voice_preference,
-                    )
+                voice_over = await generator.generate_voice_over_async(
+                    rendered_text=rendered_text,
+                    output_path=output_path,
+                    voice_id=user_voice_preference,
+                )
                 print(
                     "[generate_voiceover] "
                     f"{scene_id} generated in {time.perf_counter() - job_start:.2f}s"
@@ -1052,7 +1057,9 @@ def _build_tools(
                 voice_over.audio_url = None
                 return voice_over
 
-            results = await asyncio.gather(*[_run(scene_id) for scene_id in segment_ids])
+            # ElevenLabs concurrency is bounded by the process-wide governor.
+            with priority_scope(Priority.DEFAULT):
+                results = await asyncio.gather(*[_run(scene_id) for scene_id in segment_ids])
             for scene_id, voice_over in zip(segment_ids, results):
                 scene_map[scene_id].voice_over = voice_over
 
@@ -1235,8 +1242,6 @@ def _build_tools(
         Returns:
             Success message. The scene is automatically updated with the generated video.
         """
-        from google import genai
-        
         # Use store path resolution for correct directory
         session_dir = storyboard_store._storyboard_path(session_id, user_id=user_id).parent
         generated_dir = session_dir / "generated_videos"
@@ -1329,8 +1334,8 @@ def _build_tools(
         storage_client = get_storage_client(config)
         
         try:
-            # Initialize the Genai client
-            client = genai.Client(**build_vertex_client_kwargs(config))
+            # Reuse the pooled genai client and its connections
+            client = GeminiClient(config).client
             
             # Use the GCS URI directly for output
             gcs_key = _generated_scene_blob_key(company_id, session_id, output_filename)
@@ -1497,6 +1502,19 @@ def _build_tools(
         event_store.append(session_id, {"type": "storyboard_update"}, user_id=user_id)
         return f"Animation overlay set for scene '{target.title}' ({payload.scene_id})."
 
+    @function_tool(failure_error_function=tool_error("get_tool_result"), strict_mode=False)
+    @log_tool("get_tool_result")
+    def get_tool_result(handle: str, path: Optional[str] = None, offset: int = 0) -> str:
+        """Read the full result stored behind a tool_result handle.
+
+        Args:
+            handle: The handle from a compacted tool result, e.g. "tr_1a2b3c4d5e".
+            path: Optional dot-separated JSON path into the result, e.g.
+                "shortlist_review_clips.scene_1" or "results.0.candidates".
+            offset: Character offset for paging through long results.
+        """
+        return read_tool_result(session_id, handle, path=path, offset=offset)
+
     return [
         update_storyboard,
         update_storyboard_scene,
@@ -1508,4 +1526,5 @@ def _build_tools(
         generate_voiceover_v3,
         generate_scene,
         set_scene_animation,
+        get_tool_result,
     ]
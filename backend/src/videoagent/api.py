@@ -16,6 +16,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from videoagent.agent import VideoAgentService
+from videoagent.agent.agent_prompt_cache import agent_prompt_cache_metrics
+from videoagent.agent.tool_results import tool_result_metrics
+from videoagent.concurrency import governor_metrics
+from videoagent.hedging import hedging_metrics
+from videoagent.prompt_cache_manager import prompt_cache_metrics
+from videoagent.resilience import resilience_metrics
+from videoagent.response_cache import response_cache_metrics
+from videoagent.single_flight import single_flight_metrics
 from videoagent.config import Config
 from videoagent.models import RenderResult, VideoBrief
 from videoagent.story import _StoryboardScene
@@ -193,6 +201,8 @@ async def lifespan(app: FastAPI):
     get_storage_client(agent_config)
     # Create new multi-tenancy tables if they don't exist
     Base.metadata.create_all(bind=engine)
+    # Warm shortlist prompt caches for every company before the first request needs them.
+    agent_service.start_prompt_cache_manager()
     
     yield
     # Shutdown: Clean up if needed
@@ -263,6 +273,54 @@ def health() -> HealthResponse:
     return HealthResponse(status="ok")
 
 
+@app.get("/metrics/concurrency")
+def concurrency_metrics() -> dict:
+    """Per provider/model governor state: limit, in-flight, queue depth and wait times."""
+    return {"governors": governor_metrics()}
+
+
+@app.get("/metrics/resilience")
+def resilience_metrics_endpoint() -> dict:
+    """Per provider retry counts, wasted backoff time, budget exhaustion and circuit state."""
+    return {"providers": resilience_metrics()}
+
+
+@app.get("/metrics/response-cache")
+def response_cache_metrics_endpoint() -> dict:
+    """Gemini response cache size, evictions and per call-site hit/miss counts."""
+    return response_cache_metrics()
+
+
+@app.get("/metrics/single-flight")
+def single_flight_metrics_endpoint() -> dict:
+    """Per request namespace counts of executed and coalesced in-flight calls."""
+    return {"groups": single_flight_metrics()}
+
+
+@app.get("/metrics/hedging")
+def hedging_metrics_endpoint() -> dict:
+    """Running latency quantiles, hedges fired and deadline misses per request kind."""
+    return {"groups": hedging_metrics()}
+
+
+@app.get("/metrics/prompt-cache")
+def prompt_cache_metrics_endpoint() -> dict:
+    """Live explicit prompt caches per company and model, with hits and cached-token totals."""
+    return prompt_cache_metrics()
+
+
+@app.get("/metrics/agent-prompt-cache")
+def agent_prompt_cache_metrics_endpoint() -> dict:
+    """Agent turns per company with input, cached, billed and output token totals."""
+    return {"companies": agent_prompt_cache_metrics()}
+
+
+@app.get("/metrics/tool-results")
+def tool_result_metrics_endpoint() -> dict:
+    """Per-tool call counts with raw, returned and saved token estimates for tool results."""
+    return {"tools": tool_result_metrics()}
+
+
 
 @app.get("/customers")
 def list_customers(
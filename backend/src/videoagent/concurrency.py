@@ -0,0 +1,337 @@
+"""Process-wide concurrency governor for external model APIs.
+
+Every call to Gemini/Vertex or ElevenLabs goes through one `ProviderGovernor` per
+(provider, model), shared by all sessions, threads and event loops in the process.
+A governor combines a token-bucket request rate with an AIMD concurrency limit that
+halves on HTTP 429 and grows back by one slot per window of successes. Waiters are
+served by priority class, so interactive work is not starved by batch analysis.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+R = TypeVar("R")
+
+_AIMD_DECREASE_FACTOR = 0.5
+# Concurrent 429s from one overload event should only halve the limit once.
+_AIMD_DECREASE_COOLDOWN_SECONDS = 1.0
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BATCH = 2
+
+
+_current_priority: ContextVar[Priority] = ContextVar("governor_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    """Run governed calls made in this context (and tasks/threads it spawns) at `priority`."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+@dataclass(frozen=True)
+class GovernorLimits:
+    initial_concurrency: int
+    max_concurrency: int
+    min_concurrency: int = 1
+    # Sustained requests per second and burst size; rate <= 0 disables rate limiting.
+    rate_per_second: float = 0.0
+    burst: int = 1
+
+
+_DEFAULT_LIMITS: dict[str, GovernorLimits] = {
+    "vertex": GovernorLimits(initial_concurrency=16, max_concurrency=32, rate_per_second=20.0, burst=40),
+    "gemini": GovernorLimits(initial_concurrency=8, max_concurrency=16, rate_per_second=10.0, burst=20),
+    "elevenlabs": GovernorLimits(initial_concurrency=8, max_concurrency=16, rate_per_second=10.0, burst=16),
+}
+_FALLBACK_LIMITS = GovernorLimits(initial_concurrency=8, max_concurrency=16)
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued_at", "wake", "granted", "cancelled")
+
+    def __init__(self, priority: Priority, enqueued_at: float, wake: Callable[[], None]) -> None:
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+
+class ProviderGovernor:
+    """Token bucket + AIMD concurrency limit + priority queue for one (provider, model)."""
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        limits: GovernorLimits,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.provider = provider
+        self.model = model
+        self.limits = limits
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._limit = float(max(limits.min_concurrency, limits.initial_concurrency))
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._queue_depth = 0
+        self._tokens = float(limits.burst)
+        self._tokens_updated_at = clock()
+        self._last_decrease_at: Optional[float] = None
+        # Metrics.
+        self._max_queue_depth = 0
+        self._acquired = 0
+        self._successes = 0
+        self._rate_limited = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @property
+    def concurrency_limit(self) -> int:
+        with self._lock:
+            return self._effective_limit_locked()
+
+    def _effective_limit_locked(self) -> int:
+        return max(self.limits.min_concurrency, int(self._limit))
+
+    def _enqueue_locked(self, waiter: _Waiter) -> None:
+        heapq.heappush(self._waiters, (int(waiter.priority), next(self._sequence), waiter))
+        self._queue_depth += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+
+    def _dispatch_locked(self) -> None:
+        while self._waiters and self._in_flight < self._effective_limit_locked():
+            _priority, _sequence, waiter = heapq.heappop(self._waiters)
+            if waiter.cancelled:
+                continue
+            self._queue_depth -= 1
+            try:
+                waiter.wake()
+            except RuntimeError:
+                # The waiting event loop has already shut down.
+                continue
+            self._in_flight += 1
+            waiter.granted = True
+
+    def _try_acquire_locked(self) -> bool:
+        if not self._waiters and self._in_flight < self._effective_limit_locked():
+            self._in_flight += 1
+            return True
+        return False
+
+    def _reserve_token(self) -> float:
+        """Take one request token; returns how long the caller must wait for it."""
+        rate = self.limits.rate_per_second
+        if rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            elapsed = max(0.0, now - self._tokens_updated_at)
+            self._tokens = min(float(self.limits.burst), self._tokens + elapsed * rate)
+            self._tokens_updated_at = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / rate
+
+    def _record_acquired(self, waited_seconds: float) -> None:
+        with self._lock:
+            self._acquired += 1
+            self._wait_seconds_total += waited_seconds
+            self._wait_seconds_max = max(self._wait_seconds_max, waited_seconds)
+
+    def acquire(self, priority: Optional[Priority] = None) -> None:
+        """Block the calling thread until a slot and a rate token are available."""
+        started = self._clock()
+        if priority is None:
+            priority = current_priority()
+        event = threading.Event()
+        with self._lock:
+            if self._try_acquire_locked():
+                event.set()
+            else:
+                self._enqueue_locked(_Waiter(priority, started, event.set))
+        event.wait()
+        delay = self._reserve_token()
+        if delay > 0:
+            time.sleep(delay)
+        self._record_acquired(self._clock() - started)
+
+    async def acquire_async(self, priority: Optional[Priority] = None) -> None:
+        """Wait (without blocking the loop) until a slot and a rate token are available."""
+        started = self._clock()
+        if priority is None:
+            priority = current_priority()
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+
+        def _resolve() -> None:
+            if not future.done():
+                future.set_result(None)
+
+        waiter: Optional[_Waiter] = None
+        with self._lock:
+            if not self._try_acquire_locked():
+                waiter = _Waiter(priority, started, lambda: loop.call_soon_threadsafe(_resolve))
+                self._enqueue_locked(waiter)
+        if waiter is not None:
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter.granted:
+                        self._in_flight -= 1
+                        self._dispatch_locked()
+                    else:
+                        waiter.cancelled = True
+                        self._queue_depth -= 1
+                raise
+        delay = self._reserve_token()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+        self._record_acquired(self._clock() - started)
+
+    def release(self, *, success: bool = False, rate_limited: bool = False) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if rate_limited:
+                self._rate_limited += 1
+                now = self._clock()
+                if (
+                    self._last_decrease_at is None
+                    or now - self._last_decrease_at >= _AIMD_DECREASE_COOLDOWN_SECONDS
+                ):
+                    self._limit = max(float(self.limits.min_concurrency), self._limit * _AIMD_DECREASE_FACTOR)
+                    self._last_decrease_at = now
+                    self._tokens = min(self._tokens, 0.0)
+            elif success:
+                self._successes += 1
+                self._limit = min(float(self.limits.max_concurrency), self._limit + 1.0 / self._limit)
+            self._dispatch_locked()
+
+    def run(
+        self,
+        operation: Callable[[], R],
+        *,
+        is_rate_limited: Callable[[BaseException], bool],
+        priority: Optional[Priority] = None,
+    ) -> R:
+        """Run a blocking call under the governor, feeding its outcome back into AIMD."""
+        self.acquire(priority)
+        try:
+            result = operation()
+        except BaseException as exc:
+            self.release(rate_limited=is_rate_limited(exc))
+            raise
+        self.release(success=True)
+        return result
+
+    async def run_async(
+        self,
+        operation: Callable[[], Awaitable[R]],
+        *,
+        is_rate_limited: Callable[[BaseException], bool],
+        priority: Optional[Priority] = None,
+    ) -> R:
+        """Async counterpart of `run`."""
+        await self.acquire_async(priority)
+        try:
+            result = await operation()
+        except BaseException as exc:
+            self.release(rate_limited=is_rate_limited(exc))
+            raise
+        self.release(success=True)
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "concurrency_limit": self._effective_limit_locked(),
+                "in_flight": self._in_flight,
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "acquired": self._acquired,
+                "successes": self._successes,
+                "rate_limited": self._rate_limited,
+                "wait_seconds_total": round(self._wait_seconds_total, 6),
+                "wait_seconds_max": round(self._wait_seconds_max, 6),
+                "wait_seconds_avg": round(self._wait_seconds_total / self._acquired, 6) if self._acquired else 0.0,
+            }
+
+
+_GOVERNORS: dict[tuple[str, str], ProviderGovernor] = {}
+_GOVERNORS_LOCK = threading.Lock()
+
+
+def _parse_env_number(name: str, default: float) -> float:
+    raw = str(os.environ.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        parsed = float(raw)
+    except ValueError:
+        return default
+    return parsed if parsed >= 0 else default
+
+
+def _limits_for_provider(provider: str) -> GovernorLimits:
+    """Default limits for a provider, overridable with GOVERNOR_<PROVIDER>_* env vars."""
+    defaults = _DEFAULT_LIMITS.get(provider, _FALLBACK_LIMITS)
+    prefix = f"GOVERNOR_{provider.upper()}"
+    max_concurrency = max(1, int(_parse_env_number(f"{prefix}_MAX_CONCURRENCY", defaults.max_concurrency)))
+    initial = int(_parse_env_number(f"{prefix}_INITIAL_CONCURRENCY", defaults.initial_concurrency))
+    return GovernorLimits(
+        initial_concurrency=max(1, min(initial, max_concurrency)),
+        max_concurrency=max_concurrency,
+        min_concurrency=defaults.min_concurrency,
+        rate_per_second=_parse_env_number(f"{prefix}_RPS", defaults.rate_per_second),
+        burst=max(1, int(_parse_env_number(f"{prefix}_BURST", defaults.burst))),
+    )
+
+
+def get_governor(provider: str, model: str) -> ProviderGovernor:
+    """Shared governor for (provider, model), created on first use."""
+    key = (provider, model)
+    with _GOVERNORS_LOCK:
+        governor = _GOVERNORS.get(key)
+        if governor is None:
+            governor = _GOVERNORS[key] = ProviderGovernor(provider, model, _limits_for_provider(provider))
+        return governor
+
+
+def governor_metrics() -> list[dict[str, Any]]:
+    with _GOVERNORS_LOCK:
+        governors = list(_GOVERNORS.values())
+    return [governor.snapshot() for governor in governors]
@@ -5,6 +5,7 @@ from .models import (
     Company,
     CustomerProfile,
     Feedback,
+    PromptCacheRegistryEntry,
     Session,
     SessionAnnotatorStatus,
     SessionBrief,
@@ -31,6 +32,7 @@ __all__ = [
     "CustomerProfile",
     "Annotation",
     "Feedback",
+    "PromptCacheRegistryEntry",
     "SessionAnnotatorStatus",
     # Connection
     "engine",
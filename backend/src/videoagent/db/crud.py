@@ -8,6 +8,8 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session as DBSession
 
 from .models import (
@@ -15,6 +17,7 @@ from .models import (
     Company,
     CustomerProfile,
     Feedback,
+    PromptCacheRegistryEntry,
     Pronunciation,
     ClonedVoice,
     Session,
@@ -71,6 +74,30 @@ def list_companies(
     return query.offset(skip).limit(limit).all()
 
 
+def list_recently_active_company_ids(
+    db: DBSession,
+    since: datetime,
+    include_test: bool = False,
+    limit: int = 100,
+) -> list[str]:
+    """IDs of companies with chat activity in any session since `since`, most recent first."""
+    query = (
+        db.query(Session.company_id)
+        .join(SessionChatMessage, SessionChatMessage.session_id == Session.id)
+        .join(Company, Company.id == Session.company_id)
+        .filter(SessionChatMessage.timestamp >= since)
+    )
+    if not include_test:
+        query = query.filter(Company.is_test == False)
+    rows = (
+        query.group_by(Session.company_id)
+        .order_by(func.max(SessionChatMessage.timestamp).desc())
+        .limit(limit)
+        .all()
+    )
+    return [company_id for (company_id,) in rows]
+
+
 def update_company(
     db: DBSession,
     company_id: str,
@@ -692,3 +719,107 @@ def delete_feedback(db: DBSession, feedback_id: str, user_id: str) -> bool:
     db.delete(feedback)
     db.commit()
     return True
+
+
+# ============================================================================
+# Prompt Cache Registry CRUD
+# ============================================================================
+
+def get_prompt_cache_entry(db: DBSession, cache_key: str, model: str) -> Optional[PromptCacheRegistryEntry]:
+    """Get the registry row for a (cache_key, model) pair."""
+    return db.query(PromptCacheRegistryEntry).filter(
+        PromptCacheRegistryEntry.cache_key == cache_key,
+        PromptCacheRegistryEntry.model == model,
+    ).first()
+
+
+def try_lock_prompt_cache_entry(
+    db: DBSession,
+    cache_key: str,
+    model: str,
+    owner: str,
+    now: float,
+    lock_ttl_seconds: float,
+) -> bool:
+    """Claim the create-lock for a cache key; False when another node holds a live lock."""
+    lock_expires_at = now + lock_ttl_seconds
+    db.add(
+        PromptCacheRegistryEntry(
+            cache_key=cache_key,
+            model=model,
+            lock_owner=owner,
+            lock_expires_at=lock_expires_at,
+        )
+    )
+    try:
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+
+    rows_updated = (
+        db.query(PromptCacheRegistryEntry)
+        .filter(
+            PromptCacheRegistryEntry.cache_key == cache_key,
+            PromptCacheRegistryEntry.model == model,
+            or_(
+                PromptCacheRegistryEntry.lock_owner.is_(None),
+                PromptCacheRegistryEntry.lock_owner == owner,
+                PromptCacheRegistryEntry.lock_expires_at <= now,
+            ),
+        )
+        .update(
+            {
+                PromptCacheRegistryEntry.lock_owner: owner,
+                PromptCacheRegistryEntry.lock_expires_at: lock_expires_at,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return bool(rows_updated)
+
+
+def publish_prompt_cache_entry(
+    db: DBSession,
+    cache_key: str,
+    model: str,
+    cached_content_name: str,
+    expires_at: Optional[float],
+) -> None:
+    """Record a created cache and release the create-lock."""
+    entry = get_prompt_cache_entry(db, cache_key, model)
+    if not entry:
+        entry = PromptCacheRegistryEntry(cache_key=cache_key, model=model)
+        db.add(entry)
+    entry.cached_content_name = cached_content_name
+    entry.expires_at = expires_at
+    entry.lock_owner = None
+    entry.lock_expires_at = None
+    entry.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def release_prompt_cache_lock(db: DBSession, cache_key: str, model: str, owner: str) -> None:
+    """Release a create-lock held by `owner` without publishing a cache."""
+    db.query(PromptCacheRegistryEntry).filter(
+        PromptCacheRegistryEntry.cache_key == cache_key,
+        PromptCacheRegistryEntry.model == model,
+        PromptCacheRegistryEntry.lock_owner == owner,
+    ).update(
+        {
+            PromptCacheRegistryEntry.lock_owner: None,
+            PromptCacheRegistryEntry.lock_expires_at: None,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def delete_prompt_cache_entries_by_name(db: DBSession, cached_content_name: str) -> int:
+    """Forget a cached content that the API no longer serves."""
+    rows_deleted = db.query(PromptCacheRegistryEntry).filter(
+        PromptCacheRegistryEntry.cached_content_name == cached_content_name,
+    ).delete(synchronize_session=False)
+    db.commit()
+    return rows_deleted
@@ -284,3 +284,21 @@ class Feedback(Base):
     session = relationship("Session", overlaps="session")
     company = relationship("Company")
     user = relationship("User")
+
+
+class PromptCacheRegistryEntry(Base):
+    """Cluster-wide record of an explicit Gemini context cache, shared by all API nodes."""
+    __tablename__ = "prompt_cache_registry"
+
+    cache_key = Column(String, primary_key=True)
+    model = Column(String, primary_key=True)
+    # NULL while the lock holder is still creating the cache.
+    cached_content_name = Column(String, nullable=True, index=True)
+    expires_at = Column(Float, nullable=True)  # Unix seconds
+
+    # Create-lock: the node creating the cache and when its claim lapses.
+    lock_owner = Column(String, nullable=True)
+    lock_expires_at = Column(Float, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
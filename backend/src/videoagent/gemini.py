@@ -6,18 +6,84 @@ Provides a centralized client for both video analysis and TTS.
 import asyncio
 import datetime
 import hashlib
-import sqlite3
+import os
 import tempfile
+import threading
 import time
+from dataclasses import replace
 from pathlib import Path
 from typing import Any, Awaitable, Callable, Optional, TypeVar, Union
 
+from pydantic import BaseModel
+
+from videoagent.concurrency import ProviderGovernor, get_governor
 from videoagent.config import Config, default_config
-from videoagent.gcp import build_vertex_client_kwargs
+from videoagent.gcp import build_vertex_client_kwargs, get_vertex_location, get_vertex_project
+from videoagent.gemini_cache_db import get_gemini_cache_db
+from videoagent.prompt_cache_registry import get_prompt_cache_registry
+from videoagent.resilience import (
+    RetryPolicy,
+    call_with_resilience,
+    call_with_resilience_async,
+    is_rate_limit_error,
+)
+from videoagent.response_cache import (
+    ResponseCachePolicy,
+    UncacheableRequestError,
+    canonical_request_key,
+    get_response_cache,
+    response_cache_enabled,
+)
+from videoagent.single_flight import get_single_flight
 
 R = TypeVar("R")
 _RETRY_MAX_ATTEMPTS = 3
 _RETRY_BASE_DELAY_SECONDS = 1.0
+_RETRY_MAX_DELAY_SECONDS = 8.0
+_RETRY_POLICY = RetryPolicy(
+    max_attempts=_RETRY_MAX_ATTEMPTS,
+    base_delay_seconds=_RETRY_BASE_DELAY_SECONDS,
+    max_delay_seconds=_RETRY_MAX_DELAY_SECONDS,
+)
+# How long a looked-up GCS object generation is trusted when building response cache keys.
+_OBJECT_GENERATION_TTL_SECONDS = 60.0
+_OBJECT_GENERATIONS: dict[str, tuple[float, Optional[str]]] = {}
+# A locally known prompt cache expiring further out than this is used without asking the API.
+_PROMPT_CACHE_TRUST_MARGIN_SECONDS = 120.0
+
+# Process-wide genai clients keyed by (vertexai, project, location, credentials file), so
+# every GeminiClient reuses the same HTTP transports and their keep-alive connections.
+# Clients used inside an event loop are also keyed by that loop: the SDK's async httpx
+# transport cannot be shared across loops. Entries for closed loops are dropped.
+_GENAI_CLIENTS: dict[tuple, Any] = {}
+_GENAI_CLIENTS_LOCK = threading.Lock()
+_DOTENV_LOADED = False
+
+
+def _genai_client_pool_key(config: Config) -> tuple:
+    credentials_path = (os.environ.get("GOOGLE_APPLICATION_CREDENTIALS") or "").strip()
+    key: tuple = (True, get_vertex_project(config), get_vertex_location(config), credentials_path)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return key
+    return key + (loop,)
+
+
+def _pooled_genai_client(config: Config, factory: Callable[[], Any]) -> Any:
+    key = _genai_client_pool_key(config)
+    with _GENAI_CLIENTS_LOCK:
+        client = _GENAI_CLIENTS.get(key)
+        if client is None:
+            for stale_key in [k for k in _GENAI_CLIENTS if len(k) > 4 and k[4].is_closed()]:
+                del _GENAI_CLIENTS[stale_key]
+            client = _GENAI_CLIENTS[key] = factory()
+        return client
+
+
+def genai_client_pool_size() -> int:
+    with _GENAI_CLIENTS_LOCK:
+        return len(_GENAI_CLIENTS)
 
 
 class GeminiClient:
@@ -30,12 +96,14 @@ class GeminiClient:
     def __init__(self, config: Optional[Config] = None):
         self.config = config or default_config
         self.use_vertexai = True
-        self._content_client = None
-        self._tts_client = None
         self._cache_db_path = self._default_cache_db_path()
-        self._init_cache_db()
+        self._cache_db = get_gemini_cache_db(self._cache_db_path)
 
     def _load_dotenv(self) -> None:
+        global _DOTENV_LOADED
+        if _DOTENV_LOADED:
+            return
+        _DOTENV_LOADED = True
         try:
             from dotenv import load_dotenv
         except ImportError:
@@ -49,12 +117,15 @@ class GeminiClient:
             load_dotenv(dotenv_path=Path(".env"))
 
     def _create_client(self):
-        """Create a Gemini client configured for Vertex AI."""
+        """Return the pooled Gemini client configured for Vertex AI, creating it on first use."""
         try:
             from google import genai
             self._load_dotenv()
             self.use_vertexai = True
-            return genai.Client(**build_vertex_client_kwargs(self.config))
+            return _pooled_genai_client(
+                self.config,
+                lambda: genai.Client(**build_vertex_client_kwargs(self.config)),
+            )
 
         except ImportError:
             raise RuntimeError(
@@ -68,44 +139,6 @@ class GeminiClient:
         cache_dir.mkdir(parents=True, exist_ok=True)
         return cache_dir / "gemini_files.db"
 
-    def _init_cache_db(self) -> None:
-        with sqlite3.connect(self._cache_db_path) as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS gemini_file_cache (
-                    file_path TEXT NOT NULL,
-                    file_hash TEXT NOT NULL,
-                    file_size INTEGER NOT NULL,
-                    mtime REAL NOT NULL,
-                    gemini_file_name TEXT NOT NULL,
-                    created_at REAL NOT NULL,
-                    last_used_at REAL NOT NULL,
-                    PRIMARY KEY (file_path, file_hash)
-                )
-                """
-            )
-            conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_gemini_file_cache_path "
-                "ON gemini_file_cache (file_path)"
-            )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS gemini_prompt_cache (
-                    cache_key TEXT NOT NULL,
-                    model TEXT NOT NULL,
-                    cached_content_name TEXT NOT NULL,
-                    expires_at REAL,
-                    created_at REAL NOT NULL,
-                    last_used_at REAL NOT NULL,
-                    PRIMARY KEY (cache_key, model)
-                )
-                """
-            )
-            conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_gemini_prompt_cache_expires_at "
-                "ON gemini_prompt_cache (expires_at)"
-            )
-
     def _compute_file_hash(self, file_path: Path) -> str:
         hasher = hashlib.sha256()
         with file_path.open("rb") as handle:
@@ -116,15 +149,14 @@ class GeminiClient:
     def _load_cached_file(self, file_path: Path, file_hash: str) -> Optional[object]:
         resolved = str(file_path.resolve())
         stats = file_path.stat()
-        with sqlite3.connect(self._cache_db_path) as conn:
-            row = conn.execute(
-                """
-                SELECT gemini_file_name, file_size, mtime
-                FROM gemini_file_cache
-                WHERE file_path = ? AND file_hash = ?
-                """,
-                (resolved, file_hash),
-            ).fetchone()
+        row = self._cache_db.fetchone(
+            """
+            SELECT gemini_file_name, file_size, mtime
+            FROM gemini_file_cache
+            WHERE file_path = ? AND file_hash = ?
+            """,
+            (resolved, file_hash),
+        )
         if not row:
             return None
         gemini_file_name, cached_size, cached_mtime = row
@@ -148,59 +180,58 @@ class GeminiClient:
         resolved = str(file_path.resolve())
         stats = file_path.stat()
         now = time.time()
-        with sqlite3.connect(self._cache_db_path) as conn:
-            conn.execute(
-                """
-                INSERT INTO gemini_file_cache (
-                    file_path, file_hash, file_size, mtime,
-                    gemini_file_name, created_at, last_used_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(file_path, file_hash) DO UPDATE SET
-                    file_size=excluded.file_size,
-                    mtime=excluded.mtime,
-                    gemini_file_name=excluded.gemini_file_name,
-                    last_used_at=excluded.last_used_at
-                """,
-                (
-                    resolved,
-                    file_hash,
-                    stats.st_size,
-                    stats.st_mtime,
-                    gemini_file_name,
-                    now,
-                    now,
-                ),
-            )
+        self._cache_db.execute(
+            """
+            INSERT INTO gemini_file_cache (
+                file_path, file_hash, file_size, mtime,
+                gemini_file_name, created_at, last_used_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(file_path, file_hash) DO UPDATE SET
+                file_size=excluded.file_size,
+                mtime=excluded.mtime,
+                gemini_file_name=excluded.gemini_file_name,
+                last_used_at=excluded.last_used_at
+            """,
+            (
+                resolved,
+                file_hash,
+                stats.st_size,
+                stats.st_mtime,
+                gemini_file_name,
+                now,
+                now,
+            ),
+        )
 
     def _touch_cached_file(self, file_path: Path, file_hash: str) -> None:
-        resolved = str(file_path.resolve())
-        with sqlite3.connect(self._cache_db_path) as conn:
-            conn.execute(
-                """
-                UPDATE gemini_file_cache
-                SET last_used_at = ?
-                WHERE file_path = ? AND file_hash = ?
-                """,
-                (time.time(), resolved, file_hash),
-            )
+        self._cache_db.touch_file(str(file_path.resolve()), file_hash)
 
     def _load_cached_prompt_name(self, cache_key: str, model: str) -> Optional[str]:
         now = time.time()
-        with sqlite3.connect(self._cache_db_path) as conn:
-            row = conn.execute(
-                """
-                SELECT cached_content_name, expires_at
-                FROM gemini_prompt_cache
-                WHERE cache_key = ? AND model = ?
-                """,
-                (cache_key, model),
-            ).fetchone()
+        remembered = self._cache_db.remembered_prompt_name(cache_key, model)
+        if remembered is not None and self._prompt_cache_expiry_is_safe(remembered[1], now):
+            self._cache_db.touch_prompt(cache_key, model)
+            return remembered[0]
+
+        row = self._cache_db.fetchone(
+            """
+            SELECT cached_content_name, expires_at
+            FROM gemini_prompt_cache
+            WHERE cache_key = ? AND model = ?
+            """,
+            (cache_key, model),
+        )
         if not row:
             return None
         cached_content_name, cached_expires_at = row
         if cached_expires_at is not None and float(cached_expires_at) <= now:
             self._delete_cached_prompt_entry(cache_key, model)
             return None
+        if self._prompt_cache_expiry_is_safe(cached_expires_at, now):
+            # Recorded expiry is far enough away that the remote cache can be trusted as-is.
+            self._cache_db.remember_prompt_name(cache_key, model, cached_content_name, cached_expires_at)
+            self._cache_db.touch_prompt(cache_key, model)
+            return cached_content_name
 
         try:
             remote = self._run_with_retry(
@@ -217,11 +248,16 @@ class GeminiClient:
             self._delete_cached_prompt_entry(cache_key, model)
             return None
 
-        self._touch_cached_prompt_entry(cache_key, model)
+        self._cache_db.touch_prompt(cache_key, model)
         if remote_expires_at is not None and remote_expires_at != cached_expires_at:
             self._update_cached_prompt_expiry(cache_key, model, remote_expires_at)
+        self._cache_db.remember_prompt_name(cache_key, model, cached_content_name, effective_expires_at)
         return cached_content_name
 
+    @staticmethod
+    def _prompt_cache_expiry_is_safe(expires_at: Optional[float], now: float) -> bool:
+        return expires_at is not None and float(expires_at) - now > _PROMPT_CACHE_TRUST_MARGIN_SECONDS
+
     def _store_cached_prompt_entry(
         self,
         cache_key: str,
@@ -230,37 +266,29 @@ class GeminiClient:
         expires_at: Optional[float],
     ) -> None:
         now = time.time()
-        with sqlite3.connect(self._cache_db_path) as conn:
-            conn.execute(
-                """
-                INSERT INTO gemini_prompt_cache (
-                    cache_key, model, cached_content_name, expires_at, created_at, last_used_at
-                ) VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(cache_key, model) DO UPDATE SET
-                    cached_content_name=excluded.cached_content_name,
-                    expires_at=excluded.expires_at,
-                    last_used_at=excluded.last_used_at
-                """,
-                (
-                    cache_key,
-                    model,
-                    cached_content_name,
-                    expires_at,
-                    now,
-                    now,
-                ),
-            )
+        self._cache_db.execute(
+            """
+            INSERT INTO gemini_prompt_cache (
+                cache_key, model, cached_content_name, expires_at, created_at, last_used_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(cache_key, model) DO UPDATE SET
+                cached_content_name=excluded.cached_content_name,
+                expires_at=excluded.expires_at,
+                last_used_at=excluded.last_used_at
+            """,
+            (
+                cache_key,
+                model,
+                cached_content_name,
+                expires_at,
+                now,
+                now,
+            ),
+        )
+        self._cache_db.remember_prompt_name(cache_key, model, cached_content_name, expires_at)
 
     def _touch_cached_prompt_entry(self, cache_key: str, model: str) -> None:
-        with sqlite3.connect(self._cache_db_path) as conn:
-            conn.execute(
-                """
-                UPDATE gemini_prompt_cache
-                SET last_used_at = ?
-                WHERE cache_key = ? AND model = ?
-                """,
-                (time.time(), cache_key, model),
-            )
+        self._cache_db.touch_prompt(cache_key, model)
 
     def _update_cached_prompt_expiry(
         self,
@@ -268,25 +296,74 @@ class GeminiClient:
         model: str,
         expires_at: Optional[float],
     ) -> None:
-        with sqlite3.connect(self._cache_db_path) as conn:
-            conn.execute(
-                """
-                UPDATE gemini_prompt_cache
-                SET expires_at = ?
-                WHERE cache_key = ? AND model = ?
-                """,
-                (expires_at, cache_key, model),
-            )
+        self._cache_db.execute(
+            """
+            UPDATE gemini_prompt_cache
+            SET expires_at = ?
+            WHERE cache_key = ? AND model = ?
+            """,
+            (expires_at, cache_key, model),
+        )
 
     def _delete_cached_prompt_entry(self, cache_key: str, model: str) -> None:
-        with sqlite3.connect(self._cache_db_path) as conn:
-            conn.execute(
-                """
-                DELETE FROM gemini_prompt_cache
-                WHERE cache_key = ? AND model = ?
-                """,
-                (cache_key, model),
+        self._cache_db.forget_prompt_name(cache_key, model)
+        self._cache_db.execute(
+            """
+            DELETE FROM gemini_prompt_cache
+            WHERE cache_key = ? AND model = ?
+            """,
+            (cache_key, model),
+        )
+
+    def forget_cached_content(self, cached_content_name: str) -> None:
+        """Stop reusing a cached content the API rejected, so the next lookup recreates it."""
+        self._cache_db.forget_prompt_cached_content(cached_content_name)
+        try:
+            registry = get_prompt_cache_registry()
+            if registry is not None:
+                registry.forget(cached_content_name)
+        except Exception as exc:
+            print(f"[GeminiClient][prompt_cache_registry] failed to forget {cached_content_name}: {exc}")
+
+    def cached_prompt_expiry(self, cache_key: str, model: str) -> Optional[float]:
+        """Expiry of the prompt cache this process last resolved for (cache_key, model)."""
+        remembered = self._cache_db.remembered_prompt_name(cache_key, model)
+        return remembered[1] if remembered is not None else None
+
+    def extend_cached_content_ttl(
+        self,
+        *,
+        model: str,
+        cache_key: str,
+        cached_content_name: str,
+        ttl_seconds: int,
+    ) -> Optional[float]:
+        """Renew a prompt cache for another `ttl_seconds`; returns the new expiry, or None if it is gone."""
+        from google.genai import types
+
+        try:
+            updated = self._run_with_retry(
+                lambda: self._get_content_client().caches.update(
+                    name=cached_content_name,
+                    config=types.UpdateCachedContentConfig(ttl=f"{int(ttl_seconds)}s"),
+                ),
+                operation_name="update_cached_content",
             )
+        except Exception as exc:
+            print(f"[GeminiClient][prompt_cache] failed to extend {cached_content_name}: {exc}")
+            self.forget_cached_content(cached_content_name)
+            return None
+        expires_at = self._coerce_unix_timestamp(getattr(updated, "expire_time", None))
+        if expires_at is None:
+            expires_at = time.time() + int(ttl_seconds)
+        self._store_cached_prompt_entry(cache_key, model, cached_content_name, expires_at)
+        try:
+            registry = get_prompt_cache_registry()
+            if registry is not None:
+                registry.publish(cache_key, model, cached_content_name, expires_at)
+        except Exception as exc:
+            print(f"[GeminiClient][prompt_cache_registry] failed to publish renewed {cached_content_name}: {exc}")
+        return expires_at
 
     @staticmethod
     def _coerce_unix_timestamp(value: object) -> Optional[float]:
@@ -320,6 +397,7 @@ class GeminiClient:
         ttl_seconds: int,
         display_name: Optional[str] = None,
         system_instruction: Any = None,
+        tools: Any = None,
     ) -> Optional[str]:
         if ttl_seconds <= 0:
             return None
@@ -328,24 +406,55 @@ class GeminiClient:
         if cached_name:
             return cached_name
 
+        registry = None
+        published = None
+        lock_held = False
+        try:
+            registry = get_prompt_cache_registry()
+            if registry is not None:
+                published = registry.lookup(cache_key, model)
+                if published is not None and not self._prompt_cache_expiry_is_safe(published[1], time.time()):
+                    published = None
+                if published is None:
+                    lock_held = registry.try_acquire(cache_key, model)
+                    if not lock_held:
+                        # Another node is creating this cache; reuse it once published.
+                        published = registry.wait_for_published(cache_key, model)
+                        if published is None:
+                            lock_held = registry.try_acquire(cache_key, model)
+        except Exception as exc:
+            print(f"[GeminiClient][prompt_cache_registry] unavailable, creating cache locally: {exc}")
+            registry = None
+            published = None
+        if published is not None:
+            published_name, published_expires_at = published
+            self._store_cached_prompt_entry(cache_key, model, published_name, published_expires_at)
+            return published_name
+
         from google.genai import types
 
         create_started_at = time.monotonic()
-        created = self._run_with_retry(
-            lambda: self._get_content_client().caches.create(
-                model=model,
-                config=types.CreateCachedContentConfig(
-                    display_name=display_name,
-                    ttl=f"{int(ttl_seconds)}s",
-                    contents=contents,
-                    system_instruction=system_instruction,
+        try:
+            created = self._run_with_retry(
+                lambda: self._get_content_client().caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        display_name=display_name,
+                        ttl=f"{int(ttl_seconds)}s",
+                        contents=contents,
+                        system_instruction=system_instruction,
+                        tools=tools,
+                    ),
                 ),
-            ),
-            operation_name="create_cached_content",
-        )
-        created_name = getattr(created, "name", None)
-        if not created_name:
-            raise RuntimeError("Cached content creation returned no cache name.")
+                operation_name="create_cached_content",
+            )
+            created_name = getattr(created, "name", None)
+            if not created_name:
+                raise RuntimeError("Cached content creation returned no cache name.")
+        except BaseException:
+            if lock_held:
+                self._release_registry_lock(registry, cache_key, model)
+            raise
         create_elapsed_seconds = time.monotonic() - create_started_at
         print(
             "[GeminiClient][prompt_cache] created "
@@ -356,8 +465,20 @@ class GeminiClient:
         if expires_at is None:
             expires_at = time.time() + int(ttl_seconds)
         self._store_cached_prompt_entry(cache_key, model, created_name, expires_at)
+        if registry is not None:
+            try:
+                registry.publish(cache_key, model, created_name, expires_at)
+            except Exception as exc:
+                print(f"[GeminiClient][prompt_cache_registry] failed to publish {created_name}: {exc}")
         return created_name
 
+    @staticmethod
+    def _release_registry_lock(registry: Any, cache_key: str, model: str) -> None:
+        try:
+            registry.release(cache_key, model)
+        except Exception as exc:
+            print(f"[GeminiClient][prompt_cache_registry] failed to release create-lock: {exc}")
+
     def get_or_create_text_cached_content(
         self,
         *,
@@ -379,24 +500,38 @@ class GeminiClient:
         )
 
     def _get_content_client(self):
-        if self._content_client is None:
-            self._content_client = self._create_client()
-        return self._content_client
+        # Resolved per call rather than held: one GeminiClient may be used from several event loops.
+        return self._create_client()
 
     def _get_tts_client(self):
-        if self._tts_client is None:
-            self._tts_client = self._create_client()
-        return self._tts_client
+        return self._create_client()
 
     @staticmethod
     def _is_retryable_rate_limit_error(error: BaseException) -> bool:
-        if getattr(error, "status_code", None) == 429:
-            return True
-        detail = getattr(error, "detail", None)
-        if isinstance(detail, str) and '"code": 429' in detail:
-            return True
-        message = str(error).lower()
-        return "ratelimiterror" in message and "429" in message
+        return is_rate_limit_error(error)
+
+    def _governor(self, model: str) -> ProviderGovernor:
+        """Process-wide concurrency governor for model calls made by this client."""
+        return get_governor("vertex" if self.use_vertexai else "gemini", model)
+
+    def _provider(self) -> str:
+        return "vertex" if self.use_vertexai else "gemini"
+
+    def _governed(self, operation: Callable[[], R], model: Optional[str]) -> Callable[[], R]:
+        if not model:
+            return operation
+        governor = self._governor(model)
+        return lambda: governor.run(operation, is_rate_limited=self._is_retryable_rate_limit_error)
+
+    def _governed_async(
+        self,
+        operation: Callable[[], Awaitable[R]],
+        model: Optional[str],
+    ) -> Callable[[], Awaitable[R]]:
+        if not model:
+            return operation
+        governor = self._governor(model)
+        return lambda: governor.run_async(operation, is_rate_limited=self._is_retryable_rate_limit_error)
 
     def _run_with_retry(
         self,
@@ -404,29 +539,15 @@ class GeminiClient:
         *,
         operation_name: str,
         max_attempts: int = _RETRY_MAX_ATTEMPTS,
+        model: Optional[str] = None,
     ) -> R:
-        last_error: Optional[Exception] = None
-        for attempt in range(1, max_attempts + 1):
-            try:
-                return operation()
-            except Exception as exc:
-                last_error = exc
-                if not self._is_retryable_rate_limit_error(exc):
-                    raise
-                if attempt == max_attempts:
-                    break
-                delay_seconds = _RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1))
-                print(
-                    f"[GeminiClient] {operation_name} failed "
-                    f"(attempt {attempt}/{max_attempts}): {exc}. "
-                    f"Retrying in {delay_seconds:.1f}s."
-                )
-                time.sleep(delay_seconds)
-        if last_error is None:
-            raise RuntimeError(f"{operation_name} failed without an exception.")
-        raise RuntimeError(
-            f"{operation_name} failed after {max_attempts} attempts."
-        ) from last_error
+        return call_with_resilience(
+            self._governed(operation, model),
+            provider=self._provider(),
+            operation_name=operation_name,
+            policy=replace(_RETRY_POLICY, max_attempts=max_attempts),
+            log_prefix="[GeminiClient]",
+        )
 
     async def _run_with_retry_async(
         self,
@@ -434,27 +555,15 @@ class GeminiClient:
         *,
         operation_name: str,
         max_attempts: int = _RETRY_MAX_ATTEMPTS,
+        model: Optional[str] = None,
     ) -> R:
-        last_error: Optional[Exception] = None
-        for attempt in range(1, max_attempts + 1):
-            try:
-                return await operation()
-            except Exception as exc:
-                last_error = exc
-                if attempt == max_attempts:
-                    break
-                delay_seconds = _RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1))
-                print(
-                    f"[GeminiClient] {operation_name} failed "
-                    f"(attempt {attempt}/{max_attempts}): {exc}. "
-                    f"Retrying in {delay_seconds:.1f}s."
-                )
-                await asyncio.sleep(delay_seconds)
-        if last_error is None:
-            raise RuntimeError(f"{operation_name} failed without an exception.")
-        raise RuntimeError(
-            f"{operation_name} failed after {max_attempts} attempts."
-        ) from last_error
+        return await call_with_resilience_async(
+            self._governed_async(operation, model),
+            provider=self._provider(),
+            operation_name=operation_name,
+            policy=replace(_RETRY_POLICY, max_attempts=max_attempts),
+            log_prefix="[GeminiClient]",
+        )
 
     @property
     def client(self):
@@ -566,11 +675,96 @@ class GeminiClient:
 
         return types.Part(file_data=types.FileData(file_uri=normalized, mime_type=f"video/{normalized.split('.')[-1]}"))
 
+    def _object_generation(self, gs_uri: str) -> Optional[str]:
+        """GCS generation of a file part, so overwritten objects miss the response cache."""
+        now = time.monotonic()
+        cached = _OBJECT_GENERATIONS.get(gs_uri)
+        if cached and now - cached[0] < _OBJECT_GENERATION_TTL_SECONDS:
+            return cached[1]
+        try:
+            from videoagent.storage import get_storage_client
+
+            generation = get_storage_client(self.config).get_metadata(gs_uri).get("generation")
+        except Exception as exc:
+            print(f"[GeminiClient] Could not resolve object generation for {gs_uri}: {exc}")
+            generation = None
+        _OBJECT_GENERATIONS[gs_uri] = (now, generation)
+        return generation
+
+    def _response_cache_key(
+        self,
+        model: str,
+        contents: Any,
+        config: Any,
+        policy: Optional[ResponseCachePolicy],
+    ) -> Optional[str]:
+        if policy is None or not response_cache_enabled():
+            return None
+        try:
+            return canonical_request_key(model, contents, config, file_generation=self._object_generation)
+        except UncacheableRequestError as exc:
+            get_response_cache().record(policy.site, "uncacheable")
+            print(f"[GeminiClient] Response cache skipped for {policy.site}: {exc}")
+            return None
+
+    @staticmethod
+    def _load_cached_response(cache_key: str, policy: ResponseCachePolicy, config: Any) -> Optional[Any]:
+        from google.genai import types
+
+        cache = get_response_cache()
+        payload = cache.get(cache_key)
+        response = None
+        if payload is not None:
+            try:
+                response = types.GenerateContentResponse.model_validate_json(payload)
+            except ValueError:
+                response = None
+        if response is not None:
+            # `parsed` is not stored; rebuild it for callers passing a pydantic response_schema.
+            schema = getattr(config, "response_schema", None) if not isinstance(config, dict) else None
+            if isinstance(schema, type) and issubclass(schema, BaseModel) and response.text:
+                try:
+                    response.parsed = schema.model_validate_json(response.text)
+                except ValueError:
+                    response = None
+        if response is None or not policy.accepts(response):
+            if payload is not None:
+                cache.delete(cache_key)
+            cache.record(policy.site, "misses")
+            return None
+        cache.record(policy.site, "hits")
+        return response
+
+    @staticmethod
+    def _store_cached_response(cache_key: str, policy: ResponseCachePolicy, model: str, response: Any) -> None:
+        cache = get_response_cache()
+        if not policy.accepts(response):
+            cache.record(policy.site, "rejected")
+            return
+        try:
+            payload = response.model_dump_json(exclude_none=True, exclude={"parsed", "sdk_http_response"})
+            cache.put(cache_key, site=policy.site, model=model, payload=payload, ttl_seconds=policy.ttl_seconds)
+        except Exception as exc:
+            print(f"[GeminiClient] Failed to store cached response for {policy.site}: {exc}")
+            return
+        cache.record(policy.site, "stores")
+
+    @staticmethod
+    def _in_flight_key(model: str, contents: Any, config: Any, cache_key: Optional[str]) -> Optional[str]:
+        """Key under which identical concurrent requests are coalesced; None disables coalescing."""
+        if cache_key is not None:
+            return cache_key
+        try:
+            return canonical_request_key(model, contents, config, file_generation=None)
+        except UncacheableRequestError:
+            return None
+
     def generate_content(
         self,
         model: str,
         contents: list,
         config: Optional[dict] = None,
+        response_cache: Optional[ResponseCachePolicy] = None,
     ):
         """
         Generate content using Gemini.
@@ -579,54 +773,94 @@ class GeminiClient:
             model: Model name
             contents: Content to send (can include files and text)
             config: Generation config
+            response_cache: Opt-in persistent response cache policy for this call site
 
         Returns:
             Response object
         """
-        return self._run_with_retry(
-            lambda: self._get_content_client().models.generate_content(
+        cache_key = self._response_cache_key(model, contents, config, response_cache)
+        if cache_key is not None:
+            cached = self._load_cached_response(cache_key, response_cache, config)
+            if cached is not None:
+                return cached
+
+        def _generate() -> Any:
+            response = self._run_with_retry(
+                lambda: self._get_content_client().models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=config,
+                ),
+                operation_name="generate_content",
+                model=model,
+            )
+            if cache_key is not None:
+                self._store_cached_response(cache_key, response_cache, model, response)
+            return response
+
+        flight_key = self._in_flight_key(model, contents, config, cache_key)
+        if flight_key is None:
+            return _generate()
+        return get_single_flight("gemini.generate_content").do(flight_key, _generate)
+
+    def embed_texts(self, model: str, texts: list[str]) -> list[list[float]]:
+        """Embed texts with a Gemini embedding model."""
+        response = self._run_with_retry(
+            lambda: self._get_content_client().models.embed_content(
                 model=model,
-                contents=contents,
-                config=config,
+                contents=texts,
             ),
-            operation_name="generate_content",
+            operation_name="embed_content",
+            model=model,
         )
+        return [list(embedding.values or []) for embedding in response.embeddings or []]
 
     async def generate_content_async(
         self,
         model: str,
         contents: list,
         config: Optional[dict] = None,
+        response_cache: Optional[ResponseCachePolicy] = None,
     ) -> Any:
-        """Generate content using Gemini async API with retries."""
-        return await self._run_with_retry_async(
-            lambda: self._get_content_client().aio.models.generate_content(
+        """Generate content using Gemini async API with retries and an optional response cache."""
+        cache_key = None
+        if response_cache is not None:
+            cache_key = await asyncio.to_thread(self._response_cache_key, model, contents, config, response_cache)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self._load_cached_response, cache_key, response_cache, config)
+            if cached is not None:
+                return cached
+
+        async def _generate() -> Any:
+            response = await self._run_with_retry_async(
+                lambda: self._get_content_client().aio.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=config,
+                ),
+                operation_name="generate_content_async",
                 model=model,
-                contents=contents,
-                config=config,
-            ),
-            operation_name="generate_content_async",
-        )
+            )
+            if cache_key is not None:
+                await asyncio.to_thread(self._store_cached_response, cache_key, response_cache, model, response)
+            return response
+
+        flight_key = self._in_flight_key(model, contents, config, cache_key)
+        if flight_key is None:
+            return await _generate()
+        return await get_single_flight("gemini.generate_content").do_async(flight_key, _generate)
 
     async def generate_contents_parallel(
         self,
         model: str,
         contents_list: list,
         config: Optional[dict] = None,
-        max_concurrency: int = 8,
     ) -> list:
-        """Generate multiple contents concurrently using the async client."""
-        semaphore = asyncio.Semaphore(max_concurrency)
-
-        async def _run(contents):
-            async with semaphore:
-                return await self.generate_content_async(
-                    model=model,
-                    contents=contents,
-                    config=config,
-                )
-
-        return await asyncio.gather(*[_run(contents) for contents in contents_list])
+        """Generate multiple contents concurrently; the shared governor bounds concurrency."""
+        return await asyncio.gather(*[
+            self.generate_content_async(model=model, contents=contents, config=config)
+            for contents in contents_list
+        ])
 
 
     async def generate_speech_async(
@@ -637,22 +871,26 @@ class GeminiClient:
         """Generate speech audio using Gemini TTS (async)."""
         from google.genai import types
 
-        response = await self._run_with_retry_async(
-            lambda: self._get_tts_client().aio.models.generate_content(
-                model=self.config.gemini_tts_model,
-                contents=text,
-                config=types.GenerateContentConfig(
-                    response_modalities=["AUDIO"],
-                    speech_config=types.SpeechConfig(
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                voice_name=voice,
+        response = await get_single_flight("gemini.speech").do_async(
+            (self.config.gemini_tts_model, voice, text),
+            lambda: self._run_with_retry_async(
+                lambda: self._get_tts_client().aio.models.generate_content(
+                    model=self.config.gemini_tts_model,
+                    contents=text,
+                    config=types.GenerateContentConfig(
+                        response_modalities=["AUDIO"],
+                        speech_config=types.SpeechConfig(
+                            voice_config=types.VoiceConfig(
+                                prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                                    voice_name=voice,
+                                )
                             )
-                        )
+                        ),
                     ),
                 ),
+                operation_name="generate_speech_async",
+                model=self.config.gemini_tts_model,
             ),
-            operation_name="generate_speech_async",
         )
 
         if not response.candidates:
@@ -669,17 +907,10 @@ class GeminiClient:
     async def generate_speeches_parallel(
         self,
         text_voice_pairs: list[tuple[str, str]],
-        max_concurrency: int = 8,
     ) -> list[bytes]:
-        """Generate multiple TTS outputs concurrently using the async client."""
-        semaphore = asyncio.Semaphore(max_concurrency)
-
-        async def _run(text: str, voice: str) -> bytes:
-            async with semaphore:
-                return await self.generate_speech_async(text, voice)
-
+        """Generate multiple TTS outputs concurrently; the shared governor bounds concurrency."""
         return await asyncio.gather(*[
-            _run(text, voice) for text, voice in text_voice_pairs
+            self.generate_speech_async(text, voice) for text, voice in text_voice_pairs
         ])
 
     def generate_speech(
@@ -699,22 +930,26 @@ class GeminiClient:
         """
         from google.genai import types
 
-        response = self._run_with_retry(
-            lambda: self._get_tts_client().models.generate_content(
-                model=self.config.gemini_tts_model,
-                contents=text,
-                config=types.GenerateContentConfig(
-                    response_modalities=["AUDIO"],
-                    speech_config=types.SpeechConfig(
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                voice_name=voice,
+        response = get_single_flight("gemini.speech").do(
+            (self.config.gemini_tts_model, voice, text),
+            lambda: self._run_with_retry(
+                lambda: self._get_tts_client().models.generate_content(
+                    model=self.config.gemini_tts_model,
+                    contents=text,
+                    config=types.GenerateContentConfig(
+                        response_modalities=["AUDIO"],
+                        speech_config=types.SpeechConfig(
+                            voice_config=types.VoiceConfig(
+                                prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                                    voice_name=voice,
+                                )
                             )
-                        )
+                        ),
                     ),
                 ),
+                operation_name="generate_speech",
+                model=self.config.gemini_tts_model,
             ),
-            operation_name="generate_speech",
         )
 
         if not response.candidates:
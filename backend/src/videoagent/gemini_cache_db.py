@@ -0,0 +1,209 @@
+"""Persistent connection to the local Gemini file/prompt cache database.
+
+All `GeminiClient` instances share one `GeminiCacheDB` per database path. It holds a
+single WAL-mode connection guarded by a lock instead of opening a connection per
+query. `last_used_at` touches are buffered in memory and written in one batch by a
+background flusher. Valid prompt-cache names are also kept in an in-memory front
+cache with their expiry, so repeat lookups need neither SQLite nor the remote API.
+"""
+
+from __future__ import annotations
+
+import atexit
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+_TOUCH_FLUSH_INTERVAL_SECONDS = 5.0
+# Flush early once this many touches are buffered.
+_TOUCH_FLUSH_MAX_PENDING = 256
+
+
+class GeminiCacheDB:
+    """Thread-safe WAL-mode store for `gemini_file_cache` and `gemini_prompt_cache`."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        flush_interval_seconds: float = _TOUCH_FLUSH_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.db_path = db_path
+        self.flush_interval_seconds = flush_interval_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+        self._pending_file_touches: dict[tuple[str, str], float] = {}
+        self._pending_prompt_touches: dict[tuple[str, str], float] = {}
+        self._prompt_names: dict[tuple[str, str], tuple[str, Optional[float]]] = {}
+        self._flush_requested = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _init_schema(self) -> None:
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS gemini_file_cache (
+                file_path TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                gemini_file_name TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                PRIMARY KEY (file_path, file_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_gemini_file_cache_path "
+            "ON gemini_file_cache (file_path)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS gemini_prompt_cache (
+                cache_key TEXT NOT NULL,
+                model TEXT NOT NULL,
+                cached_content_name TEXT NOT NULL,
+                expires_at REAL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                PRIMARY KEY (cache_key, model)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_gemini_prompt_cache_expires_at "
+            "ON gemini_prompt_cache (expires_at)"
+        )
+
+    def fetchone(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def execute(self, sql: str, params: tuple = ()) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    # Prompt-cache front cache -------------------------------------------------
+
+    def remembered_prompt_name(self, cache_key: str, model: str) -> Optional[tuple[str, Optional[float]]]:
+        """(cached_content_name, expires_at) last confirmed valid in this process, if any."""
+        with self._lock:
+            return self._prompt_names.get((cache_key, model))
+
+    def remember_prompt_name(
+        self,
+        cache_key: str,
+        model: str,
+        cached_content_name: str,
+        expires_at: Optional[float],
+    ) -> None:
+        with self._lock:
+            self._prompt_names[(cache_key, model)] = (cached_content_name, expires_at)
+
+    def forget_prompt_name(self, cache_key: str, model: str) -> None:
+        with self._lock:
+            self._prompt_names.pop((cache_key, model), None)
+            self._pending_prompt_touches.pop((cache_key, model), None)
+
+    def forget_prompt_cached_content(self, cached_content_name: str) -> None:
+        """Drop every local record of a cached content that the API no longer serves."""
+        with self._lock:
+            for key in [key for key, (name, _) in self._prompt_names.items() if name == cached_content_name]:
+                del self._prompt_names[key]
+                self._pending_prompt_touches.pop(key, None)
+            self._conn.execute(
+                "DELETE FROM gemini_prompt_cache WHERE cached_content_name = ?",
+                (cached_content_name,),
+            )
+
+    # Batched last_used_at touches ---------------------------------------------
+
+    def touch_file(self, file_path: str, file_hash: str) -> None:
+        self._queue_touch(self._pending_file_touches, (file_path, file_hash))
+
+    def touch_prompt(self, cache_key: str, model: str) -> None:
+        self._queue_touch(self._pending_prompt_touches, (cache_key, model))
+
+    def _queue_touch(self, pending: dict[tuple[str, str], float], key: tuple[str, str]) -> None:
+        with self._lock:
+            pending[key] = self._clock()
+            pending_count = len(self._pending_file_touches) + len(self._pending_prompt_touches)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="gemini-cache-db-flush", daemon=True)
+                self._flusher.start()
+        if pending_count >= _TOUCH_FLUSH_MAX_PENDING:
+            self._flush_requested.set()
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._flush_requested.wait(self.flush_interval_seconds)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"[GeminiCacheDB][flush] Failed to write last_used_at touches: {exc}")
+
+    def flush(self) -> None:
+        """Write buffered `last_used_at` touches in one transaction."""
+        with self._lock:
+            file_touches, self._pending_file_touches = self._pending_file_touches, {}
+            prompt_touches, self._pending_prompt_touches = self._pending_prompt_touches, {}
+            if not file_touches and not prompt_touches:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE gemini_file_cache SET last_used_at = ? WHERE file_path = ? AND file_hash = ?",
+                    [(used_at, path, file_hash) for (path, file_hash), used_at in file_touches.items()],
+                )
+                self._conn.executemany(
+                    "UPDATE gemini_prompt_cache SET last_used_at = ? WHERE cache_key = ? AND model = ?",
+                    [(used_at, cache_key, model) for (cache_key, model), used_at in prompt_touches.items()],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def pending_touches(self) -> int:
+        with self._lock:
+            return len(self._pending_file_touches) + len(self._pending_prompt_touches)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "db_path": str(self.db_path),
+                "remembered_prompt_names": len(self._prompt_names),
+                "pending_touches": len(self._pending_file_touches) + len(self._pending_prompt_touches),
+            }
+
+
+_CACHE_DBS: dict[Path, GeminiCacheDB] = {}
+_CACHE_DBS_LOCK = threading.Lock()
+
+
+def get_gemini_cache_db(db_path: Path) -> GeminiCacheDB:
+    """Shared cache database for a path, opened on first use."""
+    with _CACHE_DBS_LOCK:
+        db = _CACHE_DBS.get(db_path)
+        if db is None:
+            db = _CACHE_DBS[db_path] = GeminiCacheDB(db_path)
+        return db
+
+
+@atexit.register
+def _flush_all() -> None:
+    with _CACHE_DBS_LOCK:
+        dbs = list(_CACHE_DBS.values())
+    for db in dbs:
+        try:
+            db.flush()
+        except Exception:
+            pass
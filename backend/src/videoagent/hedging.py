@@ -0,0 +1,171 @@
+"""Hedged, deadline-bounded async calls for latency-sensitive provider requests.
+
+A `HedgeGroup` keeps a sliding window of recent successful call latencies for one
+kind of request. `run` starts the request, fires one duplicate (the hedge) when the
+original is still running past the window's p90, returns whichever finishes first
+and cancels the other. A per-call deadline bounds the total wait; when it passes
+`HedgeDeadlineExceeded` is raised and every attempt is cancelled. Hedges run
+inside `single_flight_bypass()` so they are not coalesced into the slow original.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from videoagent.single_flight import single_flight_bypass
+
+R = TypeVar("R")
+
+_DEFAULT_WINDOW = 200
+# Fewer samples than this make the p90 too noisy to hedge on.
+_DEFAULT_MIN_SAMPLES = 20
+# Never hedge sooner than this, however fast recent calls were.
+_DEFAULT_MIN_HEDGE_DELAY_SECONDS = 2.0
+
+
+class HedgeDeadlineExceeded(asyncio.TimeoutError):
+    """No attempt of a hedged call finished before its deadline."""
+
+
+class HedgeGroup:
+    """Latency window and hedging counters for one kind of request."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        quantile: float = 0.9,
+        window: int = _DEFAULT_WINDOW,
+        min_samples: int = _DEFAULT_MIN_SAMPLES,
+        min_hedge_delay_seconds: float = _DEFAULT_MIN_HEDGE_DELAY_SECONDS,
+    ) -> None:
+        self.name = name
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_hedge_delay_seconds = min_hedge_delay_seconds
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._deadline_exceeded = 0
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(max(0.0, float(seconds)))
+
+    def latency_quantile(self) -> Optional[float]:
+        """Running latency quantile, or None while the window is too small."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(self.quantile * len(samples)) - 1))
+        return samples[index]
+
+    def hedge_delay(self) -> Optional[float]:
+        quantile = self.latency_quantile()
+        if quantile is None:
+            return None
+        return max(self.min_hedge_delay_seconds, quantile)
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    async def run(
+        self,
+        operation: Callable[[], Awaitable[R]],
+        *,
+        deadline_seconds: Optional[float] = None,
+        accept: Optional[Callable[[R], bool]] = None,
+    ) -> R:
+        """Run `operation`, hedging once past the running quantile and giving up at the deadline.
+
+        A result that `accept` rejects (or an exception) only ends the call when no
+        other attempt is still running; otherwise the remaining attempt is awaited.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        hedge_delay = self.hedge_delay()
+        if hedge_delay is not None and deadline_seconds is not None and hedge_delay >= deadline_seconds:
+            hedge_delay = None
+        self._count("_calls")
+
+        primary = asyncio.ensure_future(operation())
+        attempts: set[asyncio.Future] = {primary}
+        hedge: Optional[asyncio.Future] = None
+        fallback: Optional[asyncio.Future] = None
+        try:
+            while attempts:
+                elapsed = loop.time() - started
+                timeouts = []
+                if deadline_seconds is not None:
+                    timeouts.append(deadline_seconds - elapsed)
+                if hedge is None and hedge_delay is not None:
+                    timeouts.append(hedge_delay - elapsed)
+                timeout = max(0.0, min(timeouts)) if timeouts else None
+                done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    attempts.discard(attempt)
+                    if attempt.exception() is None and (accept is None or accept(attempt.result())):
+                        self.record_latency(loop.time() - started)
+                        if attempt is hedge:
+                            self._count("_hedge_wins")
+                        return attempt.result()
+                    fallback = attempt
+                if not attempts:
+                    break
+                elapsed = loop.time() - started
+                if deadline_seconds is not None and elapsed >= deadline_seconds:
+                    self._count("_deadline_exceeded")
+                    raise HedgeDeadlineExceeded(
+                        f"{self.name} call did not finish within {deadline_seconds:.1f}s"
+                    )
+                if hedge is None and hedge_delay is not None and elapsed >= hedge_delay:
+                    self._count("_hedges")
+                    with single_flight_bypass():
+                        hedge = asyncio.ensure_future(operation())
+                    attempts.add(hedge)
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+        assert fallback is not None
+        return fallback.result()
+
+    def snapshot(self) -> dict[str, Any]:
+        quantile = self.latency_quantile()
+        with self._lock:
+            return {
+                "name": self.name,
+                "samples": len(self._latencies),
+                "latency_quantile": self.quantile,
+                "latency_quantile_seconds": round(quantile, 3) if quantile is not None else None,
+                "calls": self._calls,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "deadline_exceeded": self._deadline_exceeded,
+            }
+
+
+_GROUPS: dict[str, HedgeGroup] = {}
+_GROUPS_LOCK = threading.Lock()
+
+
+def get_hedge_group(name: str) -> HedgeGroup:
+    """Shared hedge group for a request kind, created on first use."""
+    with _GROUPS_LOCK:
+        group = _GROUPS.get(name)
+        if group is None:
+            group = _GROUPS[name] = HedgeGroup(name)
+        return group
+
+
+def hedging_metrics() -> list[dict[str, Any]]:
+    with _GROUPS_LOCK:
+        groups = list(_GROUPS.values())
+    return [group.snapshot() for group in groups]
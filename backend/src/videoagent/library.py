@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import gzip
 import hashlib
+import json
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
@@ -10,7 +12,26 @@ from typing import Any, Optional
 
 from videoagent.config import Config, default_config
 from videoagent.models import SceneMatch, TranscriptSegment, VideoLibraryIndex, VideoMetadata
+from videoagent.mp4_metadata import probe_mp4_metadata
 from videoagent.storage import GCSStorageClient, get_storage_client
+from videoagent.transcript_search import TranscriptSearchIndex
+from videoagent.transcript_store import CompactTranscript
+
+_INDEX_FORMAT_VERSION = 3
+# Containers whose metadata can be read from the moov atom via ranged reads.
+_RANGE_PROBE_SUFFIXES = frozenset({".mp4", ".mov", ".m4v"})
+# ffprobe may read a signed URL; a stalled response must not hang a library scan.
+_FFPROBE_TIMEOUT_SECONDS = 30
+
+
+def _encode_index_blob(payload: dict[str, Any]) -> bytes:
+    """Serialize an index payload as gzip-compressed compact JSON."""
+    content = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    return gzip.compress(content.encode("utf-8"), mtime=0)
+
+
+def _decode_index_blob(content: bytes) -> dict[str, Any]:
+    return json.loads(gzip.decompress(content).decode("utf-8"))
 
 
 def get_video_id(path: str, generation: Optional[str] = None, size: Optional[int] = None) -> str:
@@ -19,8 +40,8 @@ def get_video_id(path: str, generation: Optional[str] = None, size: Optional[int
     return hashlib.md5(content.encode()).hexdigest()[:12]
 
 
-def get_video_metadata_ffprobe(path: Path) -> dict:
-    """Extract video metadata using ffprobe."""
+def get_video_metadata_ffprobe(path: Path | str) -> dict:
+    """Extract video metadata using ffprobe (local path or http(s) URL)."""
     import json as json_module
     import subprocess
 
@@ -33,7 +54,7 @@ def get_video_metadata_ffprobe(path: Path) -> dict:
         str(path),
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=_FFPROBE_TIMEOUT_SECONDS)
     data = json_module.loads(result.stdout)
 
     video_stream = None
@@ -115,18 +136,26 @@ class VideoLibrary:
         self.storage: GCSStorageClient = get_storage_client(self.config)
         self.index = VideoLibraryIndex()
         self._legacy_id_resolution_cache: dict[str, Optional[str]] = {}
+        # Videos whose transcript blob must be (re)written on the next save.
+        self._dirty_transcript_ids: set[str] = set()
+        self._transcript_segment_counts: dict[str, int] = {}
 
+        index_prefix = f"companies/{company_id}/indexes" if company_id else "indexes"
         if company_id:
             base_prefix = f"companies/{company_id}"
             self._video_prefix = f"{base_prefix}/videos/"
             self._transcript_prefix = f"{base_prefix}/transcripts/"
             self._metadata_prefix = f"{base_prefix}/metadata/"
-            self._index_key = f"{base_prefix}/indexes/video_index_2.json"
         else:
             self._video_prefix = "videos/"
             self._transcript_prefix = "transcripts/"
             self._metadata_prefix = "metadata/"
-            self._index_key = "indexes/video_index_2.json"
+        self._legacy_index_key = f"{index_prefix}/video_index_2.json"
+        self._index_header_key = f"{index_prefix}/video_index_3/header.json.gz"
+        self._index_transcript_prefix = f"{index_prefix}/video_index_3/transcripts/"
+        self._transcript_search_key = f"{index_prefix}/video_index_3/transcript_search.json.gz"
+        self._transcript_search_loaded = False
+        self._transcript_search_dirty = False
 
     def _transcript_key_for_video(self, video_blob_path: str) -> str:
         if video_blob_path.startswith(self._video_prefix):
@@ -138,70 +167,167 @@ class VideoLibrary:
     def _metadata_key_for_video(self, video_id: str) -> str:
         return f"{self._metadata_prefix}{video_id}.json"
 
-    def _load_index(self) -> None:
-        """Load index from GCS if available."""
-        if not self.storage.exists(self._index_key):
-            return
+    def _index_transcript_key(self, video_id: str) -> str:
+        return f"{self._index_transcript_prefix}{video_id}.json.gz"
+
+    @staticmethod
+    def _video_header_entry(metadata: VideoMetadata) -> dict[str, Any]:
+        return {
+            "id": metadata.id,
+            "path": metadata.path,
+            "filename": metadata.filename,
+            "duration": metadata.duration,
+            "resolution": list(metadata.resolution),
+            "fps": metadata.fps,
+            "file_size": metadata.file_size,
+        }
 
+    @staticmethod
+    def _video_from_header_entry(video_data: dict[str, Any]) -> VideoMetadata:
+        return VideoMetadata(
+            id=video_data["id"],
+            path=video_data["path"],
+            filename=video_data["filename"],
+            duration=video_data["duration"],
+            resolution=tuple(video_data["resolution"]),
+            fps=video_data["fps"],
+            file_size=video_data["file_size"],
+        )
+
+    def _load_index(self) -> None:
+        """Load index from GCS if available, preferring the v3 header."""
         try:
-            data = self.storage.read_json(self._index_key)
-            self.index.last_indexed = data.get("last_indexed")
-            loaded: dict[str, VideoMetadata] = {}
-
-            for video_id, video_data in data.get("videos", {}).items():
-                transcript_segments = [
-                    TranscriptSegment(
-                        text=seg_data["text"],
-                        start_time=seg_data["start_time"],
-                        end_time=seg_data["end_time"],
-                    )
-                    for seg_data in video_data.get("transcript_segments", [])
-                ]
-
-                loaded[video_id] = VideoMetadata(
-                    id=video_data["id"],
-                    path=video_data["path"],
-                    filename=video_data["filename"],
-                    duration=video_data["duration"],
-                    resolution=tuple(video_data["resolution"]),
-                    fps=video_data["fps"],
-                    file_size=video_data["file_size"],
-                    transcript_segments=transcript_segments,
+            if self.storage.exists(self._index_header_key):
+                self._load_index_v3()
+            elif self.storage.exists(self._legacy_index_key):
+                self._load_legacy_index()
+        except Exception as exc:
+            print(f"Warning: Failed to load video index from GCS, will re-index: {exc}")
+
+    def _load_index_v3(self) -> None:
+        """Load the compact header; transcripts are fetched per video on first access."""
+        data = _decode_index_blob(self.storage.read_bytes(self._index_header_key))
+        loaded: dict[str, VideoMetadata] = {}
+        segment_counts: dict[str, int] = {}
+        for video_id, video_data in data.get("videos", {}).items():
+            metadata = self._video_from_header_entry(video_data)
+            segment_counts[video_id] = int(video_data.get("transcript_segment_count") or 0)
+            if segment_counts[video_id]:
+                metadata.set_transcript_loader(
+                    lambda video_id=video_id: self._load_indexed_transcript(video_id)
                 )
+            loaded[video_id] = metadata
+
+        self.index.last_indexed = data.get("last_indexed")
+        self.index.legacy_video_ids = dict(data.get("legacy_video_ids") or {})
+        self.index.set_videos(loaded)
+        self._reset_transcript_search()
+        self._transcript_segment_counts = segment_counts
+        self._dirty_transcript_ids.clear()
+
+    def _load_legacy_index(self) -> None:
+        """Load the v2 index with inline transcripts; the next save migrates it to v3."""
+        data = self.storage.read_json(self._legacy_index_key)
+        loaded: dict[str, VideoMetadata] = {}
+        for video_id, video_data in data.get("videos", {}).items():
+            metadata = self._video_from_header_entry(video_data)
+            metadata.transcript_segments = CompactTranscript.from_rows(
+                (seg_data["start_time"], seg_data["end_time"], seg_data["text"])
+                for seg_data in video_data.get("transcript_segments", [])
+            )
+            loaded[video_id] = metadata
+
+        self.index.last_indexed = data.get("last_indexed")
+        self.index.set_videos(loaded)
+        self._reset_transcript_search()
+        self._dirty_transcript_ids = set(loaded)
 
-            self.index.videos = loaded
+    def _reset_transcript_search(self) -> None:
+        self.index.set_transcript_search(TranscriptSearchIndex())
+        self._transcript_search_loaded = False
+        self._transcript_search_dirty = False
+
+    def _load_transcript_search(self) -> None:
+        """Load the persisted transcript search index once, without indexing anything."""
+        if self._transcript_search_loaded:
+            return
+        self._transcript_search_loaded = True
+        try:
+            if self.storage.exists(self._transcript_search_key):
+                payload = _decode_index_blob(self.storage.read_bytes(self._transcript_search_key))
+                self.index.set_transcript_search(TranscriptSearchIndex.from_payload(payload))
         except Exception as exc:
-            print(f"Warning: Failed to load video index from GCS, will re-index: {exc}")
+            print(f"Warning: Failed to load transcript search index, rebuilding: {exc}")
+            self.index.set_transcript_search(TranscriptSearchIndex())
+
+    def _ensure_transcript_search(self) -> None:
+        """Load the persisted transcript search index, indexing any videos it lacks.
+
+        Only searches call this: indexing a video the stored index lacks reads its
+        transcript blob, which scanning the library must not do.
+        """
+        self._load_transcript_search()
+        if self.index.sync_transcript_search():
+            self._transcript_search_dirty = True
+
+    def _prepare_transcript_search(self) -> None:
+        self._ensure_transcript_search()
+        if self._transcript_search_dirty:
+            self._save_transcript_search()
+
+    def _save_transcript_search(self) -> None:
+        self.storage.write_bytes(
+            self._transcript_search_key,
+            _encode_index_blob(self.index.transcript_search.to_payload()),
+        )
+        self._transcript_search_dirty = False
+
+    def _load_indexed_transcript(self, video_id: str) -> CompactTranscript:
+        # Errors propagate: the video keeps its loader and stored segment count, so a
+        # transient read failure is retried rather than saved as an empty transcript.
+        data = _decode_index_blob(self.storage.read_bytes(self._index_transcript_key(video_id)))
+        return CompactTranscript(data.get("starts", []), data.get("ends", []), data.get("texts", []))
 
     def _save_index(self) -> None:
-        """Persist current index to GCS."""
-        data = {
+        """Persist dirty transcript blobs, then the compact header, to GCS."""
+        header_videos: dict[str, dict[str, Any]] = {}
+        for video_id, metadata in self.index.videos.items():
+            entry = self._video_header_entry(metadata)
+            if video_id in self._dirty_transcript_ids:
+                transcript = metadata.transcript
+                if transcript:
+                    self.storage.write_bytes(
+                        self._index_transcript_key(video_id),
+                        _encode_index_blob(
+                            {
+                                "video_id": video_id,
+                                "starts": transcript.starts.tolist(),
+                                "ends": transcript.ends.tolist(),
+                                "texts": transcript.texts,
+                            }
+                        ),
+                    )
+                entry["transcript_segment_count"] = len(transcript)
+                self._transcript_segment_counts[video_id] = len(transcript)
+            else:
+                entry["transcript_segment_count"] = self._indexed_segment_count(video_id, metadata)
+            header_videos[video_id] = entry
+
+        header = {
+            "format_version": _INDEX_FORMAT_VERSION,
             "last_indexed": self.index.last_indexed,
-            "videos": {},
+            "videos": header_videos,
+            "legacy_video_ids": self.index.legacy_video_ids,
         }
+        if self._transcript_search_dirty and self._transcript_search_loaded:
+            self._save_transcript_search()
+        self.storage.write_bytes(self._index_header_key, _encode_index_blob(header))
+        self._dirty_transcript_ids.clear()
 
-        for video_id, metadata in self.index.videos.items():
-            transcript_segments = [
-                {
-                    "text": seg.text,
-                    "start_time": seg.start_time,
-                    "end_time": seg.end_time,
-                }
-                for seg in metadata.transcript_segments
-            ]
-
-            data["videos"][video_id] = {
-                "id": metadata.id,
-                "path": metadata.path,
-                "filename": metadata.filename,
-                "duration": metadata.duration,
-                "resolution": list(metadata.resolution),
-                "fps": metadata.fps,
-                "file_size": metadata.file_size,
-                "transcript_segments": transcript_segments,
-            }
-
-        self.storage.write_json(self._index_key, data)
+    def _indexed_segment_count(self, video_id: str, metadata: VideoMetadata) -> int:
+        if metadata.transcript_loaded:
+            return len(metadata.transcript)
+        return self._transcript_segment_counts.get(video_id, 0)
 
     def _load_cached_video_metadata(
         self,
@@ -227,10 +353,7 @@ class VideoLibrary:
         video_id: str,
         blob_meta: dict[str, Any],
     ) -> dict[str, Any]:
-        with tempfile.TemporaryDirectory(prefix="videoagent_scan_") as temp_dir:
-            local_path = Path(temp_dir) / Path(video_blob_path).name
-            self.storage.download_to_filename(video_blob_path, local_path)
-            extracted = extract_video_metadata(local_path)
+        extracted = self._extract_remote_video_metadata(video_blob_path, blob_meta)
 
         payload = {
             "id": video_id,
@@ -247,6 +370,37 @@ class VideoLibrary:
         self.storage.write_json(self._metadata_key_for_video(video_id), payload)
         return payload
 
+    def _extract_remote_video_metadata(
+        self,
+        video_blob_path: str,
+        blob_meta: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Probe via ranged reads, then ffprobe on a signed URL, then a full download."""
+        file_size = int(blob_meta.get("size") or 0)
+        if file_size and Path(video_blob_path).suffix.lower() in _RANGE_PROBE_SUFFIXES:
+            try:
+                extracted = probe_mp4_metadata(
+                    lambda start, end: self.storage.read_bytes(video_blob_path, start=start, end=end - 1),
+                    file_size,
+                )
+                if extracted:
+                    return extracted
+            except Exception as exc:
+                print(f"Warning: Ranged metadata probe failed for {video_blob_path}: {exc}")
+
+        try:
+            extracted = get_video_metadata_ffprobe(self.storage.get_url(video_blob_path))
+            if not extracted.get("file_size"):
+                extracted["file_size"] = file_size
+            return extracted
+        except Exception as exc:
+            print(f"Warning: ffprobe on signed URL failed for {video_blob_path}: {exc}")
+
+        with tempfile.TemporaryDirectory(prefix="videoagent_scan_") as temp_dir:
+            local_path = Path(temp_dir) / Path(video_blob_path).name
+            self.storage.download_to_filename(video_blob_path, local_path)
+            return extract_video_metadata(local_path)
+
     def _load_transcript_segments(self, video_blob_path: str) -> list[TranscriptSegment]:
         transcript_key = self._transcript_key_for_video(video_blob_path)
         if not self.storage.exists(transcript_key):
@@ -265,6 +419,7 @@ class VideoLibrary:
 
         new_videos: list[VideoMetadata] = []
         found_ids: set[str] = set()
+        previous_ids_by_path = {video.path: video_id for video_id, video in self.index.videos.items()}
 
         for video_blob_path in self.storage.list_files(self._video_prefix, recursive=True):
             suffix = Path(video_blob_path).suffix.lower()
@@ -308,13 +463,25 @@ class VideoLibrary:
                 )
 
                 self.index.add_video(metadata)
+                previous_id = previous_ids_by_path.get(metadata.path)
+                if previous_id and previous_id != video_id:
+                    self.index.record_legacy_video_id(previous_id, video_id)
+                self._dirty_transcript_ids.add(video_id)
+                self._transcript_search_dirty = True
                 new_videos.append(metadata)
             except Exception as exc:
                 print(f"Warning: Failed to index {video_blob_path}: {exc}")
 
         removed_ids = set(self.index.videos.keys()) - found_ids
         for video_id in removed_ids:
-            del self.index.videos[video_id]
+            self.index.remove_video(video_id)
+            self._transcript_search_dirty = True
+            self._dirty_transcript_ids.discard(video_id)
+            if self._transcript_segment_counts.pop(video_id, 0):
+                try:
+                    self.storage.delete(self._index_transcript_key(video_id))
+                except Exception as exc:
+                    print(f"Warning: Failed to delete indexed transcript for {video_id}: {exc}")
 
         self.index.last_indexed = datetime.now(timezone.utc).isoformat()
         self._save_index()
@@ -338,9 +505,16 @@ class VideoLibrary:
         """Resolve a stale video_id to the current id for the same blob path.
 
         This is used after cross-bucket copies where object generation changes.
+        Ids superseded since the library was indexed resolve from the persisted
+        legacy-id table; GCS is only consulted for ids that predate it.
         """
         if not video_id:
             return None
+        if not self.index.videos:
+            self._load_index()
+        indexed = self.index.resolve_legacy_video_id(video_id)
+        if indexed:
+            return indexed
         if video_id in self._legacy_id_resolution_cache:
             return self._legacy_id_resolution_cache[video_id]
 
@@ -366,17 +540,16 @@ class VideoLibrary:
         except Exception:
             resolved = None
 
+        if resolved and resolved != video_id:
+            # Persisted with the next index save.
+            self.index.record_legacy_video_id(video_id, resolved)
         self._legacy_id_resolution_cache[video_id] = resolved
         return resolved
 
     def get_video_by_path(self, path: str | Path) -> Optional[VideoMetadata]:
         if not self.index.videos:
             self._load_index()
-        target = str(path).strip()
-        for video in self.index.videos.values():
-            if video.path == target:
-                return video
-        return None
+        return self.index.get_video_by_path(str(path).strip())
 
     def search_by_duration(
         self,
@@ -388,14 +561,7 @@ class VideoLibrary:
         if not self.index.videos:
             self.scan_library()
 
-        results = list(self.index.videos.values())
-
-        if min_duration is not None:
-            results = [v for v in results if v.duration >= min_duration]
-        if max_duration is not None:
-            results = [v for v in results if v.duration <= max_duration]
-
-        return results
+        return self.index.search_by_duration(min_duration, max_duration)
 
     def search_by_transcript_keyword(
         self,
@@ -405,8 +571,22 @@ class VideoLibrary:
             self._load_index()
         if not self.index.videos:
             self.scan_library()
+        self._prepare_transcript_search()
         return self.index.search_by_transcript_keyword(keyword)
 
+    def search_transcripts(
+        self,
+        query: str,
+        limit: int = 20,
+    ) -> list[tuple[VideoMetadata, TranscriptSegment, float]]:
+        """BM25-ranked transcript segments across the library."""
+        if not self.index.videos:
+            self._load_index()
+        if not self.index.videos:
+            self.scan_library()
+        self._prepare_transcript_search()
+        return self.index.search_transcripts(query, limit=limit)
+
     def search_scenes_by_llm(self, query: str) -> list[SceneMatch]:
         if not self.index.videos:
             self._load_index()
@@ -427,6 +607,10 @@ class VideoLibrary:
             return None
 
         video.transcript_segments = transcript_segments
+        self._dirty_transcript_ids.add(video_id)
+        self._load_transcript_search()
+        self.index.reindex_transcript(video_id)
+        self._transcript_search_dirty = True
         self._save_index()
         return video
 
@@ -4,11 +4,15 @@ Data models for the Video Agent.
 These models define the core structures used throughout the system.
 """
 import uuid
+from bisect import bisect_left, bisect_right
 from enum import Enum
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
 
-from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, computed_field, model_validator
+
+from videoagent.transcript_search import TranscriptSearchIndex
+from videoagent.transcript_store import CompactTranscript
 
 
 class VideoAgentModel(BaseModel):
@@ -55,28 +59,98 @@ class VideoMetadata(VideoAgentModel):
     file_size: int  # in bytes
     url: Optional[str] = None
 
-    transcript_segments: list[TranscriptSegment] = Field(default_factory=list)
+    # Transcripts are held in a compact array-backed store outside the validated
+    # fields; index loads can defer fetching them until first access
+    # (see `set_transcript_loader`). TranscriptSegment models are only
+    # materialized when callers ask for them.
+    _transcript: Optional[CompactTranscript] = PrivateAttr(default=None)
+    _transcript_loader: Optional[Callable[[], Any]] = PrivateAttr(default=None)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _accept_transcript_segments(cls, values: Any, handler):
+        segments = None
+        if isinstance(values, dict) and "transcript_segments" in values:
+            values = dict(values)
+            segments = values.pop("transcript_segments")
+        metadata = handler(values)
+        if segments is not None:
+            metadata.transcript_segments = segments
+        return metadata
+
+    @property
+    def transcript(self) -> CompactTranscript:
+        """Compact transcript store, loading it on first access."""
+        if self._transcript is None:
+            loader = self._transcript_loader
+            if loader is None:
+                self.transcript_segments = CompactTranscript()
+            else:
+                try:
+                    loaded = loader()
+                except Exception as exc:
+                    # Stay unloaded so the next access retries instead of caching an empty transcript.
+                    print(f"Warning: Failed to load transcript for {self.id}: {exc}")
+                    return CompactTranscript()
+                self.transcript_segments = loaded
+        return self._transcript
+
+    @computed_field
+    @property
+    def transcript_segments(self) -> list[TranscriptSegment]:
+        return self._materialize_segments(self.transcript.rows())
+
+    @transcript_segments.setter
+    def transcript_segments(self, segments: list[TranscriptSegment] | CompactTranscript) -> None:
+        self._transcript_loader = None
+        if isinstance(segments, CompactTranscript):
+            self._transcript = segments
+            return
+        rows = []
+        for seg in segments or []:
+            if not isinstance(seg, TranscriptSegment):
+                seg = TranscriptSegment.model_validate(seg)
+            rows.append((seg.start_time, seg.end_time, seg.text))
+        self._transcript = CompactTranscript.from_rows(rows)
+
+    @property
+    def transcript_loaded(self) -> bool:
+        """True once transcript segments are resident in memory."""
+        return self._transcript is not None
+
+    def set_transcript_loader(
+        self,
+        loader: Callable[[], CompactTranscript | list[TranscriptSegment]],
+    ) -> None:
+        """Defer loading the transcript until it is first accessed."""
+        self._transcript = None
+        self._transcript_loader = loader
+
+    @staticmethod
+    def _materialize_segments(rows) -> list[TranscriptSegment]:
+        return [
+            TranscriptSegment(text=text, start_time=start, end_time=end)
+            for start, end, text in rows
+        ]
 
     def get_full_transcript(self) -> str:
         """Concatenate transcript segments with timestamps into a single string."""
         return " ".join(
-            f"[{seg.start_time:.2f}-{seg.end_time:.2f}] {seg.text}"
-            for seg in self.transcript_segments
+            f"[{start:.2f}-{end:.2f}] {text}"
+            for start, end, text in self.transcript.rows()
         )
 
     def get_transcript_at_time(self, time: float) -> Optional[TranscriptSegment]:
         """Get the transcript segment at a specific time."""
-        for seg in self.transcript_segments:
-            if seg.start_time <= time <= seg.end_time:
-                return seg
-        return None
+        index = self.transcript.index_at(time)
+        if index is None:
+            return None
+        return self._materialize_segments([self.transcript.row(index)])[0]
 
     def get_transcript_in_range(self, start: float, end: float) -> list[TranscriptSegment]:
         """Get all transcript segments within a time range."""
-        return [
-            seg for seg in self.transcript_segments
-            if seg.end_time >= start and seg.start_time <= end
-        ]
+        transcript = self.transcript
+        return self._materialize_segments(transcript.rows(transcript.indices_in_range(start, end)))
 
 
 class VideoSegment(VideoAgentModel):
@@ -233,12 +307,153 @@ class VideoLibraryIndex(VideoAgentModel):
     """
     videos: dict[str, VideoMetadata] = Field(default_factory=dict)
     last_indexed: Optional[str] = None
+    # Superseded video_id -> current video_id for the same blob path.
+    legacy_video_ids: dict[str, str] = Field(default_factory=dict)
 
     _llm_search_fn: Optional[Callable] = PrivateAttr(default=None)
+    _transcript_search: TranscriptSearchIndex = PrivateAttr(default_factory=TranscriptSearchIndex)
+
+    # Secondary indexes, maintained by add_video/remove_video and rebuilt lazily when
+    # `videos` is replaced wholesale.
+    _ids_by_path: dict[str, str] = PrivateAttr(default_factory=dict)
+    _ids_by_filename: dict[str, list[str]] = PrivateAttr(default_factory=dict)
+    _duration_keys: list[float] = PrivateAttr(default_factory=list)
+    _duration_ids: list[str] = PrivateAttr(default_factory=list)
+    _secondary_indexes_valid: bool = PrivateAttr(default=False)
+    _transcript_search_synced: bool = PrivateAttr(default=False)
+
+    def set_videos(self, videos: dict[str, VideoMetadata]) -> None:
+        """Replace all videos, invalidating derived indexes."""
+        self.videos = videos
+        self._secondary_indexes_valid = False
+        self._transcript_search_synced = False
 
     def add_video(self, metadata: VideoMetadata) -> None:
         """Add a video to the index."""
+        if metadata.id in self.videos:
+            self.remove_video(metadata.id)
         self.videos[metadata.id] = metadata
+        if self._secondary_indexes_valid:
+            self._index_secondary(metadata)
+        self._transcript_search.add_video(metadata.id, metadata.transcript.texts)
+
+    def remove_video(self, video_id: str) -> None:
+        """Remove a video from the index."""
+        metadata = self.videos.pop(video_id, None)
+        if metadata is not None and self._secondary_indexes_valid:
+            self._unindex_secondary(metadata)
+        self._transcript_search.remove_video(video_id)
+
+    def _index_secondary(self, metadata: VideoMetadata) -> None:
+        self._ids_by_path[metadata.path] = metadata.id
+        self._ids_by_filename.setdefault(metadata.filename, []).append(metadata.id)
+        position = bisect_right(self._duration_keys, metadata.duration)
+        self._duration_keys.insert(position, metadata.duration)
+        self._duration_ids.insert(position, metadata.id)
+
+    def _unindex_secondary(self, metadata: VideoMetadata) -> None:
+        if self._ids_by_path.get(metadata.path) == metadata.id:
+            del self._ids_by_path[metadata.path]
+        filename_ids = self._ids_by_filename.get(metadata.filename, [])
+        if metadata.id in filename_ids:
+            filename_ids.remove(metadata.id)
+            if not filename_ids:
+                del self._ids_by_filename[metadata.filename]
+        position = bisect_left(self._duration_keys, metadata.duration)
+        while position < len(self._duration_keys) and self._duration_keys[position] == metadata.duration:
+            if self._duration_ids[position] == metadata.id:
+                del self._duration_keys[position]
+                del self._duration_ids[position]
+                break
+            position += 1
+
+    def _ensure_secondary_indexes(self) -> None:
+        # The length check also catches callers that mutate `videos` directly.
+        if self._secondary_indexes_valid and len(self._duration_ids) == len(self.videos):
+            return
+        self._ids_by_path = {}
+        self._ids_by_filename = {}
+        self._duration_keys = []
+        self._duration_ids = []
+        for metadata in sorted(self.videos.values(), key=lambda video: video.duration):
+            self._ids_by_path[metadata.path] = metadata.id
+            self._ids_by_filename.setdefault(metadata.filename, []).append(metadata.id)
+            self._duration_keys.append(metadata.duration)
+            self._duration_ids.append(metadata.id)
+        self._secondary_indexes_valid = True
+
+    def get_video_by_path(self, path: str) -> Optional[VideoMetadata]:
+        """Get a video by its storage path."""
+        self._ensure_secondary_indexes()
+        video_id = self._ids_by_path.get(path)
+        return self.videos.get(video_id) if video_id else None
+
+    def record_legacy_video_id(self, legacy_id: str, current_id: str) -> None:
+        """Map a superseded video_id (and anything already pointing at it) to current_id."""
+        if not legacy_id or not current_id or legacy_id == current_id:
+            return
+        for known_id, target_id in self.legacy_video_ids.items():
+            if target_id == legacy_id:
+                self.legacy_video_ids[known_id] = current_id
+        self.legacy_video_ids.pop(current_id, None)
+        self.legacy_video_ids[legacy_id] = current_id
+
+    def resolve_legacy_video_id(self, video_id: str) -> Optional[str]:
+        """Current video_id for a possibly superseded one, if known."""
+        if video_id in self.videos:
+            return video_id
+        return self.legacy_video_ids.get(video_id)
+
+    def get_videos_by_filename(self, filename: str) -> list[VideoMetadata]:
+        """Get all videos with the given filename."""
+        self._ensure_secondary_indexes()
+        return [self.videos[video_id] for video_id in self._ids_by_filename.get(filename, [])]
+
+    def search_by_duration(
+        self,
+        min_duration: Optional[float] = None,
+        max_duration: Optional[float] = None,
+    ) -> list[VideoMetadata]:
+        """Videos with min_duration <= duration <= max_duration, shortest first."""
+        self._ensure_secondary_indexes()
+        lower = 0 if min_duration is None else bisect_left(self._duration_keys, min_duration)
+        upper = len(self._duration_keys) if max_duration is None else bisect_right(self._duration_keys, max_duration)
+        return [self.videos[video_id] for video_id in self._duration_ids[lower:upper]]
+
+    def reindex_transcript(self, video_id: str) -> None:
+        """Refresh the transcript search postings for a video."""
+        video = self.videos.get(video_id)
+        if video is None:
+            self._transcript_search.remove_video(video_id)
+        else:
+            self._transcript_search.add_video(video_id, video.transcript.texts)
+
+    @property
+    def transcript_search(self) -> TranscriptSearchIndex:
+        return self._transcript_search
+
+    def set_transcript_search(self, search_index: TranscriptSearchIndex) -> None:
+        self._transcript_search = search_index
+        self._transcript_search_synced = False
+
+    def sync_transcript_search(self) -> bool:
+        """Index videos missing from the transcript search; returns True if it changed.
+
+        add_video/remove_video keep the search current, so this only does work after
+        set_videos or set_transcript_search (or a direct change to `videos`).
+        """
+        # The count check also catches callers that mutate `videos` directly.
+        if self._transcript_search_synced and self._transcript_search.video_count == len(self.videos):
+            return False
+        self._transcript_search_synced = True
+        indexed = self._transcript_search.video_ids
+        stale = indexed - self.videos.keys()
+        missing = self.videos.keys() - indexed
+        for video_id in stale:
+            self._transcript_search.remove_video(video_id)
+        for video_id in missing:
+            self._transcript_search.add_video(video_id, self.videos[video_id].transcript.texts)
+        return bool(stale or missing)
 
     def get_video(self, video_id: str) -> Optional[VideoMetadata]:
         """Get a video by ID."""
@@ -252,23 +467,49 @@ class VideoLibraryIndex(VideoAgentModel):
         Search for videos containing a keyword in their transcript.
 
         Args:
-            keyword: The keyword to search for (case-insensitive)
+            keyword: Word or phrase to search for (case-insensitive). The last word
+                also matches as a prefix, so "onboard" finds "onboarding". When no
+                segment matches word by word, segments containing the keyword as a
+                plain substring are returned instead (e.g. "ricing" in "pricing");
+                that fallback reads every transcript.
 
         Returns:
             List of tuples (video, matching_segments) where matching_segments
             are the transcript segments containing the keyword.
         """
-        keyword_lower = keyword.lower()
+        self.sync_transcript_search()
+        segment_indices: dict[str, list[int]] = {}
+        for video_id, segment_index in self._transcript_search.phrase_hits(keyword, prefix_last=True):
+            segment_indices.setdefault(video_id, []).append(segment_index)
+
         results = []
+        for video_id, video in self.videos.items():
+            matching_indices = segment_indices.get(video_id)
+            if matching_indices:
+                results.append((video, video._materialize_segments(video.transcript.rows(matching_indices))))
+        if results:
+            return results
 
+        keyword_lower = keyword.lower()
         for video in self.videos.values():
-            matching_segments = [
-                seg for seg in video.transcript_segments
-                if keyword_lower in seg.text.lower()
-            ]
-            if matching_segments:
-                results.append((video, matching_segments))
+            transcript = video.transcript
+            matching_indices = [index for index, text in enumerate(transcript.texts) if keyword_lower in text.lower()]
+            if matching_indices:
+                results.append((video, video._materialize_segments(transcript.rows(matching_indices))))
+        return results
 
+    def search_transcripts(
+        self,
+        query: str,
+        limit: int = 20,
+    ) -> list[tuple[VideoMetadata, TranscriptSegment, float]]:
+        """BM25-ranked transcript segments; supports "quoted phrases" and prefix* terms."""
+        self.sync_transcript_search()
+        results = []
+        for video_id, segment_index, score in self._transcript_search.search(query, limit=limit):
+            video = self.videos[video_id]
+            segment = video._materialize_segments([video.transcript.row(segment_index)])[0]
+            results.append((video, segment, score))
         return results
 
     def search_scenes_by_llm(
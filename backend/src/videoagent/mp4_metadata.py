@@ -0,0 +1,170 @@
+"""Read MP4/MOV metadata (duration, resolution, fps) from byte ranges.
+
+Only the `moov` atom is needed, so callers can fetch a small head of the file and,
+when the muxer put `moov` after `mdat`, one more range near the end, instead of
+downloading the whole video.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections import Counter
+from typing import Callable, Iterator, Optional
+
+# read_range(start, end) returns bytes [start, end) of the file.
+RangeReader = Callable[[int, int], bytes]
+
+_HEAD_READ_BYTES = 256 * 1024
+_MAX_TOP_LEVEL_BOXES = 64
+_MAX_MOOV_BYTES = 64 * 1024 * 1024
+_CONTAINER_BOXES = frozenset({b"trak", b"mdia", b"minf", b"stbl"})
+
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[tuple[bytes, int, int]]:
+    """Yield (type, payload_start, box_end) for boxes in data[start:end]."""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            return
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _find_moov(read_range: RangeReader, file_size: int, head_bytes: int) -> Optional[bytes]:
+    head = read_range(0, min(file_size, head_bytes))
+    offset = 0
+    for _ in range(_MAX_TOP_LEVEL_BOXES):
+        if offset + 8 > file_size:
+            return None
+        if offset + 16 <= len(head):
+            header = head[offset : offset + 16]
+        else:
+            header = read_range(offset, min(file_size, offset + 16))
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack_from(">I4s", header, 0)
+        if size == 1:
+            if len(header) < 16:
+                return None
+            size = struct.unpack_from(">Q", header, 8)[0]
+        elif size == 0:
+            size = file_size - offset
+        if size < 8:
+            return None
+        if box_type == b"moov":
+            if size > _MAX_MOOV_BYTES:
+                return None
+            if offset + size <= len(head):
+                return head[offset : offset + size]
+            return read_range(offset, offset + size)
+        offset += size
+    return None
+
+
+def _full_box_times(data: bytes, payload: int) -> tuple[int, int]:
+    """(timescale, duration) from an mvhd/mdhd payload."""
+    version = data[payload]
+    if version == 1:
+        return struct.unpack_from(">IQ", data, payload + 4 + 16)
+    return struct.unpack_from(">II", data, payload + 4 + 8)
+
+
+def _parse_track(data: bytes, start: int, end: int, track: dict) -> None:
+    for box_type, payload, box_end in _iter_boxes(data, start, end):
+        if box_type in _CONTAINER_BOXES:
+            _parse_track(data, payload, box_end, track)
+        elif box_type == b"tkhd":
+            # width/height are 16.16 fixed point at the end of tkhd.
+            width, height = struct.unpack_from(">II", data, box_end - 8)
+            track["display_size"] = (width >> 16, height >> 16)
+        elif box_type == b"hdlr":
+            # QuickTime also puts a data-handler hdlr inside minf; the mdia one comes first.
+            track.setdefault("handler", data[payload + 8 : payload + 12])
+        elif box_type == b"mdhd":
+            track["timescale"], track["duration"] = _full_box_times(data, payload)
+        elif box_type == b"stsd":
+            entries = list(_iter_boxes(data, payload + 8, box_end))
+            if entries:
+                _entry_type, entry_payload, entry_end = entries[0]
+                # VisualSampleEntry: 8 bytes SampleEntry + 16 bytes predefined/reserved.
+                if entry_payload + 28 <= entry_end:
+                    track["coded_size"] = struct.unpack_from(">HH", data, entry_payload + 24)
+        elif box_type == b"stts":
+            (entry_count,) = struct.unpack_from(">I", data, payload + 4)
+            entry_count = min(entry_count, (box_end - payload - 8) // 8)
+            deltas: Counter = Counter()
+            for index in range(entry_count):
+                count, delta = struct.unpack_from(">II", data, payload + 8 + index * 8)
+                deltas[delta] += count
+            track["sample_deltas"] = deltas
+
+
+def parse_moov(moov: bytes) -> Optional[dict]:
+    """Metadata dict (duration, resolution, fps) from a complete moov box."""
+    boxes = list(_iter_boxes(moov))
+    if not boxes or boxes[0][0] != b"moov":
+        return None
+    _moov_type, moov_payload, moov_end = boxes[0]
+
+    duration = 0.0
+    video_track: Optional[dict] = None
+    for box_type, payload, box_end in _iter_boxes(moov, moov_payload, moov_end):
+        if box_type == b"mvhd":
+            timescale, units = _full_box_times(moov, payload)
+            if timescale:
+                duration = units / timescale
+        elif box_type == b"trak" and video_track is None:
+            track: dict = {}
+            _parse_track(moov, payload, box_end, track)
+            if track.get("handler") == b"vide":
+                video_track = track
+
+    if video_track is None:
+        return None
+    if duration <= 0 and video_track.get("timescale"):
+        duration = video_track.get("duration", 0) / video_track["timescale"]
+    if duration <= 0:
+        # Fragmented MP4s keep durations in moof boxes; leave those to ffprobe.
+        return None
+
+    fps = 0.0
+    deltas: Counter = video_track.get("sample_deltas") or Counter()
+    if deltas and video_track.get("timescale"):
+        common_delta = deltas.most_common(1)[0][0]
+        if common_delta:
+            fps = video_track["timescale"] / common_delta
+
+    width, height = video_track.get("coded_size") or video_track.get("display_size") or (0, 0)
+    return {
+        "duration": float(duration),
+        "resolution": (int(width), int(height)),
+        "fps": float(fps),
+    }
+
+
+def probe_mp4_metadata(
+    read_range: RangeReader,
+    file_size: int,
+    head_bytes: int = _HEAD_READ_BYTES,
+) -> Optional[dict]:
+    """Probe an MP4/MOV via ranged reads; returns None when the moov atom is unusable."""
+    if file_size <= 0:
+        return None
+    moov = _find_moov(read_range, file_size, head_bytes)
+    if moov is None:
+        return None
+    metadata = parse_moov(moov)
+    if metadata is None:
+        return None
+    metadata["file_size"] = int(file_size)
+    return metadata
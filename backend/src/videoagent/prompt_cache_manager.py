@@ -0,0 +1,268 @@
+"""Background lifecycle manager for the explicit shortlist prompt caches.
+
+Explicit Gemini context caches expire after their TTL whether or not they are still
+being used, and the first request after expiry pays for re-creating them inline.
+`PromptCacheManager` tracks the live cache of every (company, model) pair. A daemon
+thread renews caches that were used recently and are close to expiry (via
+`caches.update`), lets idle ones lapse, and periodically re-runs the company warmer so
+a cache is rebuilt as soon as the company's scene index changes. Hits and cached-token
+totals are recorded per cache for `/metrics/prompt-cache`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+_TICK_SECONDS = 30.0
+# Renew a cache once it is this close to expiry...
+_RENEW_MARGIN_SECONDS = 180.0
+# ...but only if it served a request within this window.
+_IDLE_AFTER_SECONDS = 1800.0
+# How often each tracked company is re-warmed to pick up scene index changes.
+_REBUILD_CHECK_SECONDS = 300.0
+_DEFAULT_TTL_SECONDS = 600
+
+# Warmer contract: prepare the company's cache (tracking it here); True when it is ready.
+CompanyWarmer = Callable[[str], bool]
+# Extender contract: renew a cache for `ttl_seconds`; new expiry, or None when it is gone.
+CacheExtender = Callable[["ManagedPromptCache", int], Optional[float]]
+
+
+@dataclass
+class ManagedPromptCache:
+    company_id: str
+    model: str
+    cache_key: str
+    cached_content_name: str
+    expires_at: Optional[float]
+    ttl_seconds: int
+    last_used_at: float
+    hits: int = 0
+    cached_tokens: int = 0
+    extensions: int = 0
+    rebuilds: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "company_id": self.company_id,
+            "model": self.model,
+            "cached_content_name": self.cached_content_name,
+            "expires_at": self.expires_at,
+            "last_used_at": self.last_used_at,
+            "hits": self.hits,
+            "cached_tokens": self.cached_tokens,
+            "extensions": self.extensions,
+            "rebuilds": self.rebuilds,
+        }
+
+
+def _extend_with_gemini(cache: ManagedPromptCache, ttl_seconds: int) -> Optional[float]:
+    from videoagent.gemini import GeminiClient
+
+    return GeminiClient().extend_cached_content_ttl(
+        model=cache.model,
+        cache_key=cache.cache_key,
+        cached_content_name=cache.cached_content_name,
+        ttl_seconds=ttl_seconds,
+    )
+
+
+class PromptCacheManager:
+    """Keeps in-use prompt caches alive and rebuilds them when their content changes."""
+
+    def __init__(
+        self,
+        *,
+        tick_seconds: float = _TICK_SECONDS,
+        renew_margin_seconds: float = _RENEW_MARGIN_SECONDS,
+        idle_after_seconds: float = _IDLE_AFTER_SECONDS,
+        rebuild_check_seconds: float = _REBUILD_CHECK_SECONDS,
+        extender: CacheExtender = _extend_with_gemini,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.tick_seconds = tick_seconds
+        self.renew_margin_seconds = renew_margin_seconds
+        self.idle_after_seconds = idle_after_seconds
+        self.rebuild_check_seconds = rebuild_check_seconds
+        self._extender = extender
+        self._warmer: Optional[CompanyWarmer] = None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._caches: dict[tuple[str, str], ManagedPromptCache] = {}
+        self._warm_checked_at: dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def set_warmer(self, warmer: CompanyWarmer) -> None:
+        self._warmer = warmer
+
+    def track(
+        self,
+        company_id: str,
+        model: str,
+        cache_key: str,
+        cached_content_name: str,
+        *,
+        expires_at: Optional[float],
+        ttl_seconds: int = _DEFAULT_TTL_SECONDS,
+    ) -> None:
+        """Record the cache currently serving a company; a new cache key counts as a rebuild."""
+        with self._lock:
+            self._warm_checked_at.setdefault(company_id, self._clock())
+            current = self._caches.get((company_id, model))
+            if current is not None and current.cached_content_name == cached_content_name:
+                if expires_at is not None:
+                    current.expires_at = expires_at
+                return
+            cache = ManagedPromptCache(
+                company_id=company_id,
+                model=model,
+                cache_key=cache_key,
+                cached_content_name=cached_content_name,
+                expires_at=expires_at,
+                ttl_seconds=ttl_seconds,
+                last_used_at=self._clock(),
+            )
+            if current is not None:
+                cache.hits = current.hits
+                cache.cached_tokens = current.cached_tokens
+                cache.extensions = current.extensions
+                cache.rebuilds = current.rebuilds + (current.cache_key != cache_key)
+            self._caches[(company_id, model)] = cache
+
+    def record_use(
+        self,
+        company_id: Optional[str],
+        model: str,
+        cached_content_name: str,
+        cached_tokens: Optional[int],
+    ) -> None:
+        with self._lock:
+            cache = self._caches.get((str(company_id), model))
+            if cache is None or cache.cached_content_name != cached_content_name:
+                return
+            cache.hits += 1
+            cache.cached_tokens += int(cached_tokens or 0)
+            cache.last_used_at = self._clock()
+
+    def has_live_cache(self, company_id: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            return any(
+                cache.company_id == company_id and (cache.expires_at is None or cache.expires_at > now)
+                for cache in self._caches.values()
+            )
+
+    def warm_companies(self, company_ids: Iterable[str]) -> int:
+        """Run the warmer for each company; returns how many ended up with a ready cache."""
+        ready = 0
+        for company_id in company_ids:
+            if self._warm(company_id):
+                ready += 1
+        return ready
+
+    def _warm(self, company_id: str) -> bool:
+        warmer = self._warmer
+        if warmer is None:
+            return False
+        with self._lock:
+            self._warm_checked_at[company_id] = self._clock()
+        try:
+            return bool(warmer(company_id))
+        except Exception as exc:
+            print(f"[PromptCacheManager][warm] Failed for company {company_id}: {exc}")
+            return False
+
+    def tick(self) -> None:
+        """Renew in-use caches near expiry, drop lapsed ones and re-warm companies due a check."""
+        now = self._clock()
+        to_extend: list[ManagedPromptCache] = []
+        to_rewarm: set[str] = set()
+        with self._lock:
+            for key, cache in list(self._caches.items()):
+                idle = now - cache.last_used_at > self.idle_after_seconds
+                if cache.expires_at is not None and cache.expires_at <= now:
+                    del self._caches[key]
+                    self._warm_checked_at.pop(cache.company_id, None)
+                    continue
+                if idle:
+                    continue
+                if cache.expires_at is not None and cache.expires_at - now <= self.renew_margin_seconds:
+                    to_extend.append(cache)
+                if now - self._warm_checked_at.get(cache.company_id, now) >= self.rebuild_check_seconds:
+                    to_rewarm.add(cache.company_id)
+
+        for cache in to_extend:
+            self._extend(cache)
+        for company_id in sorted(to_rewarm):
+            self._warm(company_id)
+
+    def _extend(self, cache: ManagedPromptCache) -> None:
+        try:
+            expires_at = self._extender(cache, cache.ttl_seconds)
+        except Exception as exc:
+            print(f"[PromptCacheManager][extend] Failed to renew {cache.cached_content_name}: {exc}")
+            expires_at = None
+        with self._lock:
+            key = (cache.company_id, cache.model)
+            if self._caches.get(key) is not cache:
+                return
+            if expires_at is None:
+                # Gone remotely; the next warm or request recreates it.
+                del self._caches[key]
+                return
+            cache.expires_at = expires_at
+            cache.extensions += 1
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="prompt-cache-manager", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.tick_seconds):
+            try:
+                self.tick()
+            except Exception as exc:
+                print(f"[PromptCacheManager][tick] {exc}")
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            caches = [cache.snapshot() for cache in self._caches.values()]
+        return {
+            "running": self._thread is not None and not self._stopped.is_set(),
+            "caches": sorted(caches, key=lambda cache: (cache["company_id"], cache["model"])),
+            "hits": sum(cache["hits"] for cache in caches),
+            "cached_tokens": sum(cache["cached_tokens"] for cache in caches),
+        }
+
+
+_MANAGER: Optional[PromptCacheManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def prompt_cache_manager_enabled() -> bool:
+    raw = str(os.environ.get("PROMPT_CACHE_MANAGER_ENABLED") or "").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+def get_prompt_cache_manager() -> PromptCacheManager:
+    """Process-wide manager; its background thread starts with `start()`."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = PromptCacheManager()
+        return _MANAGER
+
+
+def prompt_cache_metrics() -> dict[str, Any]:
+    return get_prompt_cache_manager().snapshot()
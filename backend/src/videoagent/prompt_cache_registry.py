@@ -0,0 +1,132 @@
+"""Cluster-wide registry of explicit Gemini context caches in the shared app database.
+
+Each API node keeps its own local cache DB, but the cluster shares one
+`prompt_cache_registry` row per (cache_key, model). The first node to need a cache
+takes the row's create-lock, creates the cache and publishes its name. Every other
+node reuses the published cache instead of creating its own copy; a node that finds
+the lock held waits briefly for the holder to publish. A lock whose holder died
+lapses after `lock_ttl_seconds`. Registry failures never block a request: callers
+fall back to creating the cache locally.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+_LOCK_TTL_SECONDS = 120.0
+_WAIT_POLL_SECONDS = 0.5
+_WAIT_TIMEOUT_SECONDS = 20.0
+
+
+class PromptCacheRegistry:
+    """Create-lock and lookup operations over the shared `prompt_cache_registry` table."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        *,
+        node_id: Optional[str] = None,
+        lock_ttl_seconds: float = _LOCK_TTL_SECONDS,
+        wait_timeout_seconds: float = _WAIT_TIMEOUT_SECONDS,
+        poll_seconds: float = _WAIT_POLL_SECONDS,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._session_factory = session_factory
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.poll_seconds = poll_seconds
+        self._clock = clock
+        self._sleep = sleep
+
+    def _run(self, operation: Callable[[Any], Any]) -> Any:
+        db = self._session_factory()
+        try:
+            return operation(db)
+        finally:
+            db.close()
+
+    def lookup(self, cache_key: str, model: str) -> Optional[tuple[str, Optional[float]]]:
+        """(cached_content_name, expires_at) of a published, unexpired cache."""
+        from videoagent.db import crud
+
+        entry = self._run(lambda db: crud.get_prompt_cache_entry(db, cache_key, model))
+        if entry is None or not entry.cached_content_name:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= self._clock():
+            return None
+        return entry.cached_content_name, entry.expires_at
+
+    def try_acquire(self, cache_key: str, model: str) -> bool:
+        from videoagent.db import crud
+
+        return self._run(
+            lambda db: crud.try_lock_prompt_cache_entry(
+                db,
+                cache_key,
+                model,
+                self.node_id,
+                self._clock(),
+                self.lock_ttl_seconds,
+            )
+        )
+
+    def publish(self, cache_key: str, model: str, cached_content_name: str, expires_at: Optional[float]) -> None:
+        from videoagent.db import crud
+
+        self._run(
+            lambda db: crud.publish_prompt_cache_entry(db, cache_key, model, cached_content_name, expires_at)
+        )
+
+    def release(self, cache_key: str, model: str) -> None:
+        from videoagent.db import crud
+
+        self._run(lambda db: crud.release_prompt_cache_lock(db, cache_key, model, self.node_id))
+
+    def forget(self, cached_content_name: str) -> None:
+        from videoagent.db import crud
+
+        self._run(lambda db: crud.delete_prompt_cache_entries_by_name(db, cached_content_name))
+
+    def wait_for_published(self, cache_key: str, model: str) -> Optional[tuple[str, Optional[float]]]:
+        """Poll for another node's cache; None on timeout or once the create-lock is free to take."""
+        from videoagent.db import crud
+
+        deadline = self._clock() + self.wait_timeout_seconds
+        while self._clock() < deadline:
+            self._sleep(self.poll_seconds)
+            published = self.lookup(cache_key, model)
+            if published is not None:
+                return published
+            entry = self._run(lambda db: crud.get_prompt_cache_entry(db, cache_key, model))
+            if entry is None or entry.lock_owner is None or (entry.lock_expires_at or 0) <= self._clock():
+                return None
+        return None
+
+
+_REGISTRY: Optional[PromptCacheRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def prompt_cache_registry_enabled() -> bool:
+    raw = str(os.environ.get("PROMPT_CACHE_REGISTRY_ENABLED") or "").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+def get_prompt_cache_registry() -> Optional[PromptCacheRegistry]:
+    """Process-wide registry over the app database, or None when disabled."""
+    global _REGISTRY
+    if not prompt_cache_registry_enabled():
+        return None
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            from videoagent.db.connection import SessionLocal
+
+            _REGISTRY = PromptCacheRegistry(SessionLocal)
+        return _REGISTRY
@@ -0,0 +1,453 @@
+"""Shared retry policy, retry budgets and circuit breakers for provider calls.
+
+All retries of Gemini/Vertex, ElevenLabs and agent-turn calls go through
+`call_with_resilience` / `call_with_resilience_async`:
+
+- errors are classified, and only rate limits and transient failures are retried;
+- backoff uses full jitter (uniform in [0, min(cap, base * 2**n)]);
+- an optional per-request `RetryBudget` (see `retry_budget_scope`) caps the total
+  retries and wasted seconds across every nested call made for that request;
+- a per-provider `CircuitBreaker` fails fast after consecutive transient failures
+  and lets a single probe through once its cool-down has elapsed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+R = TypeVar("R")
+
+_TRANSIENT_STATUS_CODES = frozenset({408, 500, 502, 503, 504})
+_TRANSIENT_ERROR_NAMES = frozenset(
+    {
+        "APIConnectionError",
+        "ConnectError",
+        "ConnectionError",
+        "ConnectTimeout",
+        "ReadTimeout",
+        "RemoteProtocolError",
+        "ServiceUnavailableError",
+        "InternalServerError",
+        "Timeout",
+    }
+)
+_BREAKER_FAILURE_THRESHOLD = 5
+_BREAKER_RESET_SECONDS = 30.0
+
+
+class ErrorClass(str, Enum):
+    RATE_LIMITED = "rate_limited"
+    TRANSIENT = "transient"
+    FATAL = "fatal"
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def classify_error(error: BaseException) -> ErrorClass:
+    """Decide whether an exception from a provider call is worth retrying."""
+    if isinstance(error, CircuitOpenError):
+        return ErrorClass.FATAL
+    if isinstance(error, RetriesExhaustedError) and error.__cause__ is not None:
+        # Classify by what actually failed: exhausted 429s are still rate limiting.
+        return classify_error(error.__cause__)
+    status = _status_code(error)
+    if status == 429:
+        return ErrorClass.RATE_LIMITED
+    detail = getattr(error, "detail", None)
+    if isinstance(detail, str) and '"code": 429' in detail:
+        return ErrorClass.RATE_LIMITED
+    message = str(error).lower()
+    if ("ratelimiterror" in message and "429" in message) or "resource_exhausted" in message:
+        return ErrorClass.RATE_LIMITED
+    if status in _TRANSIENT_STATUS_CODES:
+        return ErrorClass.TRANSIENT
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return ErrorClass.TRANSIENT
+    if type(error).__name__ in _TRANSIENT_ERROR_NAMES:
+        return ErrorClass.TRANSIENT
+    return ErrorClass.FATAL
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    return classify_error(error) is ErrorClass.RATE_LIMITED
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay_seconds: float = 1.0
+    max_delay_seconds: float = 16.0
+    retry_on: frozenset[ErrorClass] = field(
+        default_factory=lambda: frozenset({ErrorClass.RATE_LIMITED, ErrorClass.TRANSIENT})
+    )
+
+    def backoff_seconds(self, attempt: int) -> float:
+        """Full-jitter delay before retrying after the given (1-based) failed attempt."""
+        cap = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** (attempt - 1)))
+        return random.uniform(0.0, cap)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+    def __init__(self, provider: str, retry_after_seconds: float):
+        self.provider = provider
+        self.retry_after_seconds = retry_after_seconds
+        super().__init__(
+            f"{provider} circuit breaker is open after repeated failures; "
+            f"retry in {retry_after_seconds:.1f}s."
+        )
+
+
+class RetryBudget:
+    """Caps retries and time spent on failed attempts across one logical request."""
+
+    def __init__(self, max_retries: int, max_wasted_seconds: Optional[float] = None) -> None:
+        self.max_retries = max_retries
+        self.max_wasted_seconds = max_wasted_seconds
+        self.retries_used = 0
+        self.wasted_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def try_consume(self, planned_delay_seconds: float) -> bool:
+        with self._lock:
+            if self.retries_used >= self.max_retries:
+                return False
+            if (
+                self.max_wasted_seconds is not None
+                and self.wasted_seconds + planned_delay_seconds > self.max_wasted_seconds
+            ):
+                return False
+            self.retries_used += 1
+            return True
+
+    def add_wasted(self, seconds: float) -> None:
+        with self._lock:
+            self.wasted_seconds += seconds
+
+
+_current_budget: ContextVar[Optional[RetryBudget]] = ContextVar("retry_budget", default=None)
+
+
+@contextmanager
+def retry_budget_scope(max_retries: int, max_wasted_seconds: Optional[float] = None) -> Iterator[RetryBudget]:
+    """Share one retry budget with every resilient call made in this context."""
+    budget = RetryBudget(max_retries, max_wasted_seconds)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive transient failures -> half-open probe -> closed."""
+
+    def __init__(
+        self,
+        provider: str,
+        *,
+        failure_threshold: int = _BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = _BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probe_in_flight or self._clock() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> bool:
+        """Admit a call or raise `CircuitOpenError`; returns True when the call is the half-open probe."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            elapsed = self._clock() - self._opened_at
+            if elapsed < self.reset_seconds or self._probe_in_flight:
+                raise CircuitOpenError(self.provider, max(0.0, self.reset_seconds - elapsed))
+            self._probe_in_flight = True
+            return True
+
+    def record_probe_aborted(self) -> None:
+        """A probe that ended without an outcome (e.g. cancelled) counts as a failed probe."""
+        with self._lock:
+            if self._probe_in_flight:
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, error_class: ErrorClass) -> None:
+        with self._lock:
+            if error_class is not ErrorClass.TRANSIENT:
+                # The provider answered (429, 4xx, ...), so it is reachable.
+                self._consecutive_failures = 0
+                self._opened_at = None
+                self._probe_in_flight = False
+                return
+            self._consecutive_failures += 1
+            if self._probe_in_flight or self._consecutive_failures >= self.failure_threshold:
+                if self._opened_at is None or self._probe_in_flight:
+                    print(
+                        f"[Resilience] {self.provider} circuit opened after "
+                        f"{self._consecutive_failures} consecutive transient failure(s)."
+                    )
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+
+class _ProviderStats:
+    __slots__ = (
+        "calls",
+        "attempts",
+        "retries",
+        "wasted_seconds",
+        "budget_exhausted",
+        "circuit_rejections",
+        "errors",
+    )
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.wasted_seconds = 0.0
+        self.budget_exhausted = 0
+        self.circuit_rejections = 0
+        self.errors: dict[str, int] = {}
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_STATS: dict[str, _ProviderStats] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    with _REGISTRY_LOCK:
+        breaker = _BREAKERS.get(provider)
+        if breaker is None:
+            breaker = _BREAKERS[provider] = CircuitBreaker(provider)
+        return breaker
+
+
+def _update_stats(provider: str, update: Callable[[_ProviderStats], None]) -> None:
+    with _REGISTRY_LOCK:
+        stats = _STATS.get(provider)
+        if stats is None:
+            stats = _STATS[provider] = _ProviderStats()
+        update(stats)
+
+
+def resilience_metrics() -> list[dict[str, Any]]:
+    with _REGISTRY_LOCK:
+        items = list(_STATS.items())
+        breakers = dict(_BREAKERS)
+    metrics = []
+    for provider, stats in items:
+        breaker = breakers.get(provider)
+        metrics.append(
+            {
+                "provider": provider,
+                "calls": stats.calls,
+                "attempts": stats.attempts,
+                "retries": stats.retries,
+                "wasted_seconds": round(stats.wasted_seconds, 3),
+                "budget_exhausted": stats.budget_exhausted,
+                "circuit_rejections": stats.circuit_rejections,
+                "errors": dict(stats.errors),
+                "circuit_state": breaker.state if breaker else "closed",
+            }
+        )
+    return metrics
+
+
+class RetriesExhaustedError(RuntimeError):
+    """Raised (from the last error) when a resilient call gives up."""
+
+
+class _Attempts:
+    """Bookkeeping shared by the sync and async retry loops."""
+
+    def __init__(self, provider: str, operation_name: str, policy: RetryPolicy, log_prefix: str) -> None:
+        self.provider = provider
+        self.operation_name = operation_name
+        self.policy = policy
+        self.log_prefix = log_prefix
+        self.breaker = get_circuit_breaker(provider)
+        self.budget = _current_budget.get()
+        self.probing = False
+        _update_stats(provider, lambda stats: setattr(stats, "calls", stats.calls + 1))
+
+    def before_attempt(self) -> None:
+        try:
+            self.probing = self.breaker.before_call()
+        except CircuitOpenError:
+            _update_stats(
+                self.provider,
+                lambda stats: setattr(stats, "circuit_rejections", stats.circuit_rejections + 1),
+            )
+            raise
+        _update_stats(self.provider, lambda stats: setattr(stats, "attempts", stats.attempts + 1))
+
+    def on_success(self) -> None:
+        self.breaker.record_success()
+
+    def on_abort(self) -> None:
+        """The attempt was interrupted (cancellation, KeyboardInterrupt) before it finished."""
+        if self.probing:
+            self.breaker.record_probe_aborted()
+
+    def on_failure(self, error: BaseException, attempt: int, elapsed: float) -> Optional[float]:
+        """Record a failed attempt; returns the backoff delay, or None to stop retrying."""
+        if isinstance(error, RetriesExhaustedError):
+            # A nested resilient call already retried (and told the breaker); don't multiply its retries.
+            return None
+        error_class = classify_error(error)
+        self.breaker.record_failure(error_class)
+
+        def _record(stats: _ProviderStats) -> None:
+            stats.errors[error_class.value] = stats.errors.get(error_class.value, 0) + 1
+            stats.wasted_seconds += elapsed
+
+        _update_stats(self.provider, _record)
+        if self.budget is not None:
+            self.budget.add_wasted(elapsed)
+        if error_class not in self.policy.retry_on or attempt >= self.policy.max_attempts:
+            return None
+        delay = self.policy.backoff_seconds(attempt)
+        if self.budget is not None and not self.budget.try_consume(delay):
+            _update_stats(
+                self.provider,
+                lambda stats: setattr(stats, "budget_exhausted", stats.budget_exhausted + 1),
+            )
+            print(f"{self.log_prefix} {self.operation_name}: retry budget exhausted; not retrying: {error}")
+            return None
+
+        def _record_retry(stats: _ProviderStats) -> None:
+            stats.retries += 1
+            stats.wasted_seconds += delay
+
+        _update_stats(self.provider, _record_retry)
+        if self.budget is not None:
+            self.budget.add_wasted(delay)
+        print(
+            f"{self.log_prefix} {self.operation_name} failed "
+            f"(attempt {attempt}/{self.policy.max_attempts}, {error_class.value}): {error}. "
+            f"Retrying in {delay:.1f}s."
+        )
+        return delay
+
+    def should_wrap(self, error: BaseException, reraise: bool) -> bool:
+        """Retryable errors that ran out of attempts or budget are wrapped unless `reraise`."""
+        if reraise or isinstance(error, RetriesExhaustedError):
+            return False
+        return classify_error(error) in self.policy.retry_on
+
+
+def call_with_resilience(
+    operation: Callable[[], R],
+    *,
+    provider: str,
+    operation_name: str,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    sleep: Optional[Callable[[float], None]] = None,
+    reraise: bool = False,
+    log_prefix: str = "[Resilience]",
+) -> R:
+    """Run a blocking provider call with classified retries, budget and circuit breaker.
+
+    Non-retryable errors propagate unchanged. When retries run out the last error is
+    re-raised if `reraise`, otherwise wrapped in `RetriesExhaustedError`.
+    """
+    attempts = _Attempts(provider, operation_name, policy, log_prefix)
+    attempt = 0
+    while True:
+        attempt += 1
+        attempts.before_attempt()
+        started = time.monotonic()
+        try:
+            result = operation()
+        except Exception as exc:
+            delay = attempts.on_failure(exc, attempt, time.monotonic() - started)
+            if delay is None:
+                if attempts.should_wrap(exc, reraise):
+                    raise RetriesExhaustedError(f"{operation_name} failed after {attempt} attempts.") from exc
+                raise
+            (sleep or time.sleep)(delay)
+            continue
+        except BaseException:
+            # Cancelled (e.g. a losing hedge or a deadline): free the half-open probe slot.
+            attempts.on_abort()
+            raise
+        attempts.on_success()
+        return result
+
+
+async def call_with_resilience_async(
+    operation: Callable[[], Awaitable[R]],
+    *,
+    provider: str,
+    operation_name: str,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    sleep: Optional[Callable[[float], Awaitable[None]]] = None,
+    reraise: bool = False,
+    log_prefix: str = "[Resilience]",
+) -> R:
+    """Async counterpart of `call_with_resilience`."""
+    attempts = _Attempts(provider, operation_name, policy, log_prefix)
+    attempt = 0
+    while True:
+        attempt += 1
+        attempts.before_attempt()
+        started = time.monotonic()
+        try:
+            result = await operation()
+        except Exception as exc:
+            delay = attempts.on_failure(exc, attempt, time.monotonic() - started)
+            if delay is None:
+                if attempts.should_wrap(exc, reraise):
+                    raise RetriesExhaustedError(f"{operation_name} failed after {attempt} attempts.") from exc
+                raise
+            await (sleep or asyncio.sleep)(delay)
+            continue
+        except BaseException:
+            # Cancelled (e.g. a losing hedge or a deadline): free the half-open probe slot.
+            attempts.on_abort()
+            raise
+        attempts.on_success()
+        return result
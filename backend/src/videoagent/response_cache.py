@@ -0,0 +1,320 @@
+"""Opt-in persistent cache of Gemini responses for deterministic calls.
+
+Call sites opt in by passing a `ResponseCachePolicy` to
+`GeminiClient.generate_content(_async)`. Entries are keyed by a canonical hash of
+the model, contents and config (file parts by URI plus GCS object generation),
+stored compressed in `.cache/gemini_responses.db`, and evicted by TTL and by a
+total-size bound (least recently used first). Hit/miss counters are kept per site.
+"""
+
+from __future__ import annotations
+
+import enum
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel
+
+_DEFAULT_TTL_SECONDS = 7 * 24 * 3600.0
+_DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Fraction of max_bytes to shrink to when the size bound is exceeded.
+_EVICTION_TARGET_RATIO = 0.9
+_KEY_VERSION = 1
+
+
+class UncacheableRequestError(ValueError):
+    """The request contains a value that cannot be hashed deterministically."""
+
+
+@dataclass(frozen=True)
+class ResponseCachePolicy:
+    """Per-call-site response cache settings.
+
+    `accept` decides whether a response may be stored or served; by default any
+    response with non-empty text is accepted. Pass a validator so that responses
+    the caller would reject (and retry) are never replayed from the cache.
+    """
+
+    site: str
+    ttl_seconds: float = _DEFAULT_TTL_SECONDS
+    accept: Optional[Callable[[Any], bool]] = None
+
+    def accepts(self, response: Any) -> bool:
+        if self.accept is not None:
+            return self.accept(response)
+        return bool(getattr(response, "text", None))
+
+
+def json_response_validator(validate: Callable[[str], object]) -> Callable[[Any], bool]:
+    """Build an `accept` predicate that requires `validate(response.text)` to succeed."""
+
+    def _accept(response: Any) -> bool:
+        text = getattr(response, "text", None)
+        if not text:
+            return False
+        try:
+            validate(text)
+        except ValueError:
+            return False
+        return True
+
+    return _accept
+
+
+def _canonicalize(value: Any, file_generation: Optional[Callable[[str], Optional[str]]]) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, enum.Enum):
+        return _canonicalize(value.value, file_generation)
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes_sha256__": hashlib.sha256(value).hexdigest()}
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return {"__schema__": value.model_json_schema()}
+    if isinstance(value, BaseModel):
+        # Walk fields rather than model_dump(): configs may hold schema classes.
+        fields = {name: getattr(value, name) for name in type(value).model_fields}
+        return _canonicalize(fields, file_generation)
+    if isinstance(value, dict):
+        canonical = {
+            str(key): _canonicalize(item, file_generation)
+            for key, item in value.items()
+            if item is not None
+        }
+        file_uri = canonical.get("file_uri")
+        if file_generation is not None and isinstance(file_uri, str) and file_uri.startswith("gs://"):
+            generation = file_generation(file_uri)
+            if generation is None:
+                raise UncacheableRequestError(f"No object generation for {file_uri}.")
+            canonical["__generation__"] = generation
+        return canonical
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(item, file_generation) for item in value]
+    raise UncacheableRequestError(f"Cannot canonicalize {type(value).__name__} for the response cache.")
+
+
+def canonical_request_key(
+    model: str,
+    contents: Any,
+    config: Any,
+    *,
+    file_generation: Optional[Callable[[str], Optional[str]]],
+) -> str:
+    """Stable hash of a generate_content request; raises `UncacheableRequestError`.
+
+    With `file_generation=None` gs:// parts are keyed by URI only, which is enough to
+    identify requests that are in flight at the same moment.
+    """
+    canonical = {
+        "v": _KEY_VERSION,
+        "model": model,
+        "contents": _canonicalize(contents, file_generation),
+        "config": _canonicalize(config, file_generation),
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _SiteStats:
+    __slots__ = ("hits", "misses", "stores", "rejected", "uncacheable")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.rejected = 0
+        self.uncacheable = 0
+
+
+class GeminiResponseCache:
+    """SQLite store of serialized responses with TTL and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats: dict[str, _SiteStats] = {}
+        self._evictions = 0
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS gemini_response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    site TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_gemini_response_cache_last_used_at "
+                "ON gemini_response_cache (last_used_at)"
+            )
+
+    def _site_stats(self, site: str) -> _SiteStats:
+        stats = self._stats.get(site)
+        if stats is None:
+            stats = self._stats[site] = _SiteStats()
+        return stats
+
+    def record(self, site: str, outcome: str) -> None:
+        """Count one hit/miss/store/rejected/uncacheable outcome for a call site."""
+        with self._lock:
+            stats = self._site_stats(site)
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+
+    def get(self, cache_key: str) -> Optional[str]:
+        now = self._clock()
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT payload, expires_at FROM gemini_response_cache WHERE cache_key = ?",
+                (cache_key,),
+            ).fetchone()
+            if not row:
+                return None
+            payload, expires_at = row
+            if expires_at <= now:
+                conn.execute("DELETE FROM gemini_response_cache WHERE cache_key = ?", (cache_key,))
+                return None
+            conn.execute(
+                "UPDATE gemini_response_cache SET last_used_at = ? WHERE cache_key = ?",
+                (now, cache_key),
+            )
+        return zlib.decompress(payload).decode("utf-8")
+
+    def put(self, cache_key: str, *, site: str, model: str, payload: str, ttl_seconds: float) -> None:
+        now = self._clock()
+        blob = zlib.compress(payload.encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO gemini_response_cache (
+                    cache_key, site, model, payload, size_bytes, expires_at, created_at, last_used_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    payload=excluded.payload,
+                    size_bytes=excluded.size_bytes,
+                    expires_at=excluded.expires_at,
+                    last_used_at=excluded.last_used_at
+                """,
+                (cache_key, site, model, blob, len(blob), now + ttl_seconds, now, now),
+            )
+            self._evict(conn, now)
+
+    def delete(self, cache_key: str) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM gemini_response_cache WHERE cache_key = ?", (cache_key,))
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        evicted = conn.execute("DELETE FROM gemini_response_cache WHERE expires_at <= ?", (now,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM gemini_response_cache").fetchone()[0]
+        if total > self.max_bytes:
+            target = int(self.max_bytes * _EVICTION_TARGET_RATIO)
+            rows = conn.execute(
+                "SELECT cache_key, size_bytes FROM gemini_response_cache ORDER BY last_used_at ASC"
+            ).fetchall()
+            stale_keys = []
+            for cache_key, size_bytes in rows:
+                if total <= target:
+                    break
+                stale_keys.append((cache_key,))
+                total -= size_bytes
+            conn.executemany("DELETE FROM gemini_response_cache WHERE cache_key = ?", stale_keys)
+            evicted += len(stale_keys)
+        if evicted > 0:
+            with self._lock:
+                self._evictions += evicted
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            sites = {
+                site: {
+                    "hits": stats.hits,
+                    "misses": stats.misses,
+                    "hit_rate": round(stats.hits / (stats.hits + stats.misses), 4)
+                    if stats.hits + stats.misses
+                    else 0.0,
+                    "stores": stats.stores,
+                    "rejected": stats.rejected,
+                    "uncacheable": stats.uncacheable,
+                }
+                for site, stats in self._stats.items()
+            }
+            evictions = self._evictions
+        with sqlite3.connect(self.db_path) as conn:
+            entries, size_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM gemini_response_cache"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": evictions,
+            "sites": sites,
+        }
+
+
+_RESPONSE_CACHE: Optional[GeminiResponseCache] = None
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def response_cache_enabled() -> bool:
+    raw = str(os.environ.get("GEMINI_RESPONSE_CACHE_ENABLED") or "").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _parse_max_bytes() -> int:
+    raw = str(os.environ.get("GEMINI_RESPONSE_CACHE_MAX_MB") or "").strip()
+    if not raw:
+        return _DEFAULT_MAX_BYTES
+    try:
+        parsed = float(raw)
+    except ValueError:
+        return _DEFAULT_MAX_BYTES
+    return int(parsed * 1024 * 1024) if parsed > 0 else _DEFAULT_MAX_BYTES
+
+
+def get_response_cache() -> GeminiResponseCache:
+    """Process-wide response cache stored next to the Gemini file cache."""
+    global _RESPONSE_CACHE
+    with _RESPONSE_CACHE_LOCK:
+        if _RESPONSE_CACHE is None:
+            cache_dir = Path(__file__).resolve().parents[3] / ".cache"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            _RESPONSE_CACHE = GeminiResponseCache(
+                cache_dir / "gemini_responses.db",
+                max_bytes=_parse_max_bytes(),
+            )
+        return _RESPONSE_CACHE
+
+
+def response_cache_metrics() -> dict[str, Any]:
+    with _RESPONSE_CACHE_LOCK:
+        cache = _RESPONSE_CACHE
+    if cache is None:
+        return {"entries": 0, "size_bytes": 0, "max_bytes": _parse_max_bytes(), "evictions": 0, "sites": {}}
+    return cache.metrics()
@@ -0,0 +1,165 @@
+"""In-process single-flight coalescing of identical in-flight provider requests.
+
+Concurrent callers that issue the same request key share one execution: the first
+caller (the leader) runs the request and every caller that arrives while it is in
+flight awaits the same result or exception. Nothing is persisted; a key is forgotten
+as soon as its request finishes. Sync and async callers share one registry, so a
+thread and an event loop asking for the same thing also coalesce.
+
+Code that deliberately issues a duplicate request (a hedge racing a slow original)
+runs inside `single_flight_bypass()` so it is not folded back into the original.
+Sync calls made on an event-loop thread are not coalesced either: blocking that thread
+on a leader running on the same loop would deadlock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Iterator, TypeVar
+
+R = TypeVar("R")
+
+_BYPASS: contextvars.ContextVar[bool] = contextvars.ContextVar("single_flight_bypass", default=False)
+
+
+@contextlib.contextmanager
+def single_flight_bypass() -> Iterator[None]:
+    """Run requests issued in this context (and tasks created in it) without coalescing."""
+    token = _BYPASS.set(True)
+    try:
+        yield
+    finally:
+        _BYPASS.reset(token)
+
+
+def _on_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _LeaderCancelled(Exception):
+    """The leading async caller was cancelled; followers must run the request themselves."""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key within one namespace."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future] = {}
+        self._executed = 0
+        self._coalesced = 0
+        self._max_waiters = 0
+        self._bypassed = 0
+        self._waiters: dict[Hashable, int] = {}
+
+    def _join_or_lead(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                self._waiters[key] = self._waiters.get(key, 0) + 1
+                self._max_waiters = max(self._max_waiters, self._waiters[key])
+                return future, False
+            future = self._in_flight[key] = Future()
+            self._executed += 1
+            self._waiters[key] = 0
+            return future, True
+
+    def _should_bypass(self, *, sync: bool = False) -> bool:
+        if not _BYPASS.get() and not (sync and _on_event_loop_thread()):
+            return False
+        with self._lock:
+            self._bypassed += 1
+        return True
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                self._waiters.pop(key, None)
+
+    def do(self, key: Hashable, operation: Callable[[], R]) -> R:
+        """Run `operation` once for all concurrent callers with the same key."""
+        if self._should_bypass(sync=True):
+            return operation()
+        while True:
+            future, leader = self._join_or_lead(key)
+            if leader:
+                try:
+                    result = operation()
+                except BaseException as exc:
+                    self._finish(key, future)
+                    future.set_exception(exc)
+                    raise
+                self._finish(key, future)
+                future.set_result(result)
+                return result
+            try:
+                return future.result()
+            except _LeaderCancelled:
+                continue
+
+    async def do_async(self, key: Hashable, operation: Callable[[], Awaitable[R]]) -> R:
+        """Async counterpart of `do`; followers may wait from any thread or event loop."""
+        if self._should_bypass():
+            return await operation()
+        while True:
+            future, leader = self._join_or_lead(key)
+            if leader:
+                try:
+                    result = await operation()
+                except asyncio.CancelledError:
+                    self._finish(key, future)
+                    future.set_exception(_LeaderCancelled())
+                    raise
+                except BaseException as exc:
+                    self._finish(key, future)
+                    future.set_exception(exc)
+                    raise
+                self._finish(key, future)
+                future.set_result(result)
+                return result
+            try:
+                # Shield so a cancelled follower does not cancel the shared future.
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderCancelled:
+                continue
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._in_flight),
+                "max_waiters": self._max_waiters,
+                "bypassed": self._bypassed,
+            }
+
+
+_FLIGHTS: dict[str, SingleFlight] = {}
+_FLIGHTS_LOCK = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Shared single-flight group for a request namespace, created on first use."""
+    with _FLIGHTS_LOCK:
+        flight = _FLIGHTS.get(name)
+        if flight is None:
+            flight = _FLIGHTS[name] = SingleFlight(name)
+        return flight
+
+
+def single_flight_metrics() -> list[dict[str, Any]]:
+    with _FLIGHTS_LOCK:
+        flights = list(_FLIGHTS.values())
+    return [flight.snapshot() for flight in flights]
@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Any, Generator, Optional, Union
 
 try:
+    from google.api_core.exceptions import NotFound, NotModified
     from google.cloud import storage
 except ImportError as exc:  # pragma: no cover
     raise RuntimeError(
@@ -154,10 +155,53 @@ class GCSStorageClient:
         blob = self.bucket.blob(self._normalize_blob_path(path))
         blob.upload_from_string(content, content_type=content_type)
 
+    def read_bytes(
+        self,
+        path: PathLike,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> bytes:
+        """Download a blob, or the inclusive byte range [start, end] of it."""
+        blob = self.bucket.blob(self._normalize_blob_path(path))
+        return blob.download_as_bytes(start=start, end=end)
+
+    def write_bytes(
+        self,
+        path: PathLike,
+        content: bytes,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        blob = self.bucket.blob(self._normalize_blob_path(path))
+        blob.upload_from_string(content, content_type=content_type)
+
+    def delete(self, path: PathLike) -> bool:
+        """Delete a blob; returns False when it did not exist."""
+        blob = self.bucket.blob(self._normalize_blob_path(path))
+        try:
+            blob.delete()
+        except NotFound:
+            return False
+        return True
+
     def read_json(self, path: PathLike) -> dict[str, Any]:
         text = self.read_text(path)
         return json.loads(text)
 
+    def read_json_if_changed(
+        self,
+        path: PathLike,
+        generation: Optional[str] = None,
+    ) -> Optional[tuple[dict[str, Any], Optional[str]]]:
+        """(payload, generation) in one GET, or None when the object is still at `generation`."""
+        blob = self.bucket.blob(self._normalize_blob_path(path))
+        try:
+            text = blob.download_as_text(if_generation_not_match=int(generation) if generation else None)
+        except NotModified:
+            return None
+        except NotFound as exc:
+            raise FileNotFoundError(f"File not found in GCS: {path}") from exc
+        return json.loads(text), str(blob.generation) if blob.generation is not None else None
+
     def write_json(
         self,
         path: PathLike,
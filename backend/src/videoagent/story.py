@@ -27,6 +27,7 @@ from videoagent.models import (
     VideoSegment,
     VoiceOver,
 )
+from videoagent.response_cache import ResponseCachePolicy, json_response_validator
 from videoagent.voice import VoiceOverGenerator
 
 
@@ -332,17 +333,21 @@ Do NOT pick specific clips or timestamps yet.
 Return a JSON array of storyboard scenes that matches the provided schema.
 """
 
-        schema = TypeAdapter(list[_StoryboardScene]).json_schema()
+        adapter = TypeAdapter(list[_StoryboardScene])
         response = self.client.generate_content(
             model=self.config.gemini_model,
             contents=prompt,
             config={
                 "response_mime_type": "application/json",
-                "response_json_schema": schema,
+                "response_json_schema": adapter.json_schema(),
             },
+            response_cache=ResponseCachePolicy(
+                site="plan_storyboard",
+                accept=json_response_validator(adapter.validate_json),
+            ),
         )
 
-        return TypeAdapter(list[_StoryboardScene]).validate_json(response.text)
+        return adapter.validate_json(response.text)
 
     async def _generate_voice_overs(self, scripts: list[str]) -> list[VoiceOver]:
         if not scripts:
@@ -350,10 +355,7 @@ Return a JSON array of storyboard scenes that matches the provided schema.
 
         pairs = [(script, self.config.tts_voice) for script in scripts]
 
-        return await self.voice_generator.generate_voice_overs_parallel(
-            pairs,
-            max_concurrency=min(4, len(pairs)),
-        )
+        return await self.voice_generator.generate_voice_overs_parallel(pairs)
 
     def _select_clips(
         self,
@@ -1,8 +1,17 @@
-"""Helpers for testimony-digest persistence and index building."""
+"""Helpers for testimony-digest persistence and index building.
+
+Besides the per-video digests and their index, the digest builders write one compact
+per-company bundle holding every valid, sanitized testimony card. The agent loads its
+testimony context from that bundle: a single conditional GET, skipped entirely while
+the in-memory copy is fresh.
+"""
 from __future__ import annotations
 
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from videoagent.storage import GCSStorageClient
 
@@ -17,6 +26,10 @@ def testimony_digest_index_key(company_id: str) -> str:
     return f"companies/{company_id}/testimony_digest/index_td_v1.json"
 
 
+def testimony_digest_bundle_key(company_id: str) -> str:
+    return f"companies/{company_id}/testimony_digest/bundle_td_v1.json"
+
+
 def testimony_digest_run_summary_key(company_id: str, run_id: str) -> str:
     return f"companies/{company_id}/testimony_digest/runs/{run_id}/summary.json"
 
@@ -136,3 +149,204 @@ def build_testimony_digest_index(
     if prompt_name:
         payload["prompt_name"] = prompt_name
     return payload
+
+
+def _normalize_text(value: object) -> str:
+    return str(value or "").strip()
+
+
+def is_valid_testimony_card(card: object) -> bool:
+    if not isinstance(card, dict):
+        return False
+    speaker = card.get("speaker")
+    speaker_has_data = False
+    if isinstance(speaker, dict):
+        speaker_has_data = any(
+            _normalize_text(speaker.get(field))
+            for field in ("name", "role", "company")
+        )
+
+    proof_claim = _normalize_text(card.get("proof_claim"))
+    intro_seed = _normalize_text(card.get("intro_seed"))
+    evidence_snippet = _normalize_text(card.get("evidence_snippet"))
+
+    metrics_raw = card.get("metrics")
+    metrics_has_data = False
+    if isinstance(metrics_raw, list):
+        for metric in metrics_raw:
+            if not isinstance(metric, dict):
+                continue
+            metric_name = _normalize_text(metric.get("metric"))
+            metric_value = _normalize_text(metric.get("value"))
+            if metric_name or metric_value:
+                metrics_has_data = True
+                break
+
+    red_flags_raw = card.get("red_flags")
+    red_flags_has_data = False
+    if isinstance(red_flags_raw, list):
+        red_flags_has_data = any(_normalize_text(flag) for flag in red_flags_raw)
+
+    return bool(
+        proof_claim
+        or intro_seed
+        or evidence_snippet
+        or speaker_has_data
+        or metrics_has_data
+        or red_flags_has_data
+    )
+
+
+def sanitize_testimony_card(card: dict) -> dict:
+    speaker = card.get("speaker")
+    speaker_dict = speaker if isinstance(speaker, dict) else {}
+    metrics_raw = card.get("metrics")
+    metrics_list = metrics_raw if isinstance(metrics_raw, list) else []
+    red_flags_raw = card.get("red_flags")
+    red_flags_list = red_flags_raw if isinstance(red_flags_raw, list) else []
+
+    sanitized_metrics: list[dict[str, str]] = []
+    for metric in metrics_list:
+        if not isinstance(metric, dict):
+            continue
+        metric_name = _normalize_text(metric.get("metric"))
+        metric_value = _normalize_text(metric.get("value"))
+        if not metric_name and not metric_value:
+            continue
+        sanitized_metrics.append({"metric": metric_name, "value": metric_value})
+
+    sanitized_red_flags = [
+        _normalize_text(flag)
+        for flag in red_flags_list
+        if _normalize_text(flag)
+    ]
+
+    return {
+        "speaker": {
+            "name": _normalize_text(speaker_dict.get("name")) or None,
+            "role": _normalize_text(speaker_dict.get("role")) or None,
+            "company": _normalize_text(speaker_dict.get("company")) or None,
+        },
+        "proof_claim": _normalize_text(card.get("proof_claim")),
+        "metrics": sanitized_metrics,
+        "intro_seed": _normalize_text(card.get("intro_seed")),
+        "evidence_snippet": _normalize_text(card.get("evidence_snippet")),
+        "red_flags": sanitized_red_flags,
+    }
+
+
+def build_testimony_digest_bundle(
+    *,
+    company_id: str,
+    digests: dict[str, Optional[dict[str, Any]]],
+    generated_at: Optional[str] = None,
+) -> dict[str, Any]:
+    """Compact bundle of the valid, sanitized cards of each video digest, keyed by video_id."""
+    videos: list[dict[str, Any]] = []
+    for video_id in sorted(digests):
+        digest_payload = digests[video_id]
+        cards_raw = digest_payload.get("testimony_cards") if isinstance(digest_payload, dict) else None
+        if not isinstance(cards_raw, list):
+            continue
+        valid_cards = [sanitize_testimony_card(card) for card in cards_raw if is_valid_testimony_card(card)]
+        if valid_cards:
+            videos.append({"video_id": video_id, "testimony_cards": valid_cards})
+    return {
+        "schema_version": TESTIMONY_DIGEST_SCHEMA_VERSION,
+        "generated_at": generated_at or datetime.now(timezone.utc).isoformat(),
+        "company_id": company_id,
+        "videos": videos,
+        "counts": {
+            "videos_with_valid_testimony_cards": len(videos),
+            "testimony_cards_total": sum(len(video["testimony_cards"]) for video in videos),
+        },
+    }
+
+
+def compile_testimony_digest_bundle(storage: GCSStorageClient, company_id: str) -> Optional[dict[str, Any]]:
+    """Build the bundle from the index and the per-video digests it lists with cards."""
+    index_payload = read_testimony_digest_index(storage, company_id)
+    if not isinstance(index_payload, dict) or not isinstance(index_payload.get("videos"), list):
+        return None
+    digests: dict[str, Optional[dict[str, Any]]] = {}
+    for entry in index_payload["videos"]:
+        if not isinstance(entry, dict):
+            continue
+        if not entry.get("has_testimony_cards") or int(entry.get("testimony_cards_count") or 0) <= 0:
+            continue
+        video_id = _normalize_text(entry.get("video_id"))
+        if video_id:
+            digests[video_id] = read_video_testimony_digest(storage, company_id, video_id)
+    return build_testimony_digest_bundle(company_id=company_id, digests=digests)
+
+
+def write_testimony_digest_bundle(
+    storage: GCSStorageClient,
+    company_id: str,
+    payload: dict[str, Any],
+) -> None:
+    storage.write_json(testimony_digest_bundle_key(company_id), payload, indent=None)
+
+
+@dataclass(frozen=True)
+class TestimonyDigestBundle:
+    # Object generation of the bundle; None when compiled from per-video digests.
+    generation: Optional[str]
+    videos: list[dict[str, Any]]
+
+
+@dataclass
+class _CachedBundle:
+    bundle: TestimonyDigestBundle
+    checked_at: float
+
+
+_BUNDLE_REVALIDATE_SECONDS = 60.0
+_BUNDLES: dict[str, _CachedBundle] = {}
+_BUNDLES_LOCK = threading.Lock()
+
+
+def load_testimony_digest_bundle(
+    storage: GCSStorageClient,
+    company_id: str,
+    *,
+    revalidate_after_seconds: float = _BUNDLE_REVALIDATE_SECONDS,
+    clock: Callable[[], float] = time.monotonic,
+) -> TestimonyDigestBundle:
+    """Company testimony context, served from memory and re-validated by generation."""
+    with _BUNDLES_LOCK:
+        cached = _BUNDLES.get(company_id)
+    if cached is not None and clock() - cached.checked_at < revalidate_after_seconds:
+        return cached.bundle
+
+    known_generation = cached.bundle.generation if cached is not None else None
+    try:
+        fetched = storage.read_json_if_changed(testimony_digest_bundle_key(company_id), known_generation)
+    except FileNotFoundError:
+        # Digests written before bundles existed: assemble the same payload from the per-video objects,
+        # and store it so later revalidations are a single conditional GET again.
+        compiled = compile_testimony_digest_bundle(storage, company_id)
+        if compiled is not None:
+            try:
+                write_testimony_digest_bundle(storage, company_id, compiled)
+            except Exception as exc:
+                print(
+                    "[TestimonyDigestIndex][load_testimony_digest_bundle] "
+                    f"Failed to write compiled bundle for company_id={company_id}: {exc}"
+                )
+        fetched = (compiled or {}, None)
+    except Exception as exc:
+        print(f"[TestimonyDigestIndex][load_testimony_digest_bundle] Failed for company_id={company_id}: {exc}")
+        if cached is not None:
+            return cached.bundle
+        return TestimonyDigestBundle(generation=None, videos=[])
+
+    if fetched is None:
+        bundle = cached.bundle
+    else:
+        payload, generation = fetched
+        videos = payload.get("videos") if isinstance(payload, dict) else None
+        bundle = TestimonyDigestBundle(generation=generation, videos=videos if isinstance(videos, list) else [])
+    with _BUNDLES_LOCK:
+        _BUNDLES[company_id] = _CachedBundle(bundle=bundle, checked_at=clock())
+    return bundle
@@ -0,0 +1,217 @@
+"""Inverted index over transcript segments with phrase, prefix and BM25 queries."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_INDEX_FORMAT_VERSION = 1
+
+# A hit is (video_id, segment_index); postings keep token positions per segment.
+SegmentHit = tuple[str, int]
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall((text or "").lower())
+
+
+class TranscriptSearchIndex:
+    """Term -> video_id -> segment_index -> token positions.
+
+    Each transcript segment is a BM25 document. Videos are (re)indexed one at a time,
+    so the index can be maintained incrementally as the library changes.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, dict[int, list[int]]]] = {}
+        self._segment_lengths: dict[str, list[int]] = {}
+        self._video_terms: dict[str, set[str]] = {}
+        self._total_tokens = 0
+        self._document_count = 0
+        self._sorted_terms: Optional[list[str]] = None
+
+    @property
+    def video_ids(self) -> set[str]:
+        return set(self._segment_lengths)
+
+    @property
+    def video_count(self) -> int:
+        return len(self._segment_lengths)
+
+    @property
+    def segment_count(self) -> int:
+        return self._document_count
+
+    def add_video(self, video_id: str, texts: Iterable[str]) -> None:
+        """Index (or re-index) all segments of a video."""
+        self.remove_video(video_id)
+        lengths: list[int] = []
+        video_terms: set[str] = set()
+        for segment_index, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            video_terms.update(tokens)
+            for position, term in enumerate(tokens):
+                by_video = self._postings.get(term)
+                if by_video is None:
+                    by_video = self._postings[term] = {}
+                    self._sorted_terms = None
+                by_video.setdefault(video_id, {}).setdefault(segment_index, []).append(position)
+        self._segment_lengths[video_id] = lengths
+        self._video_terms[video_id] = video_terms
+        self._total_tokens += sum(lengths)
+        self._document_count += len(lengths)
+
+    def remove_video(self, video_id: str) -> None:
+        lengths = self._segment_lengths.pop(video_id, None)
+        if lengths is None:
+            return
+        self._total_tokens -= sum(lengths)
+        self._document_count -= len(lengths)
+        for term in self._video_terms.pop(video_id, set()):
+            by_video = self._postings.get(term)
+            if by_video is None:
+                continue
+            by_video.pop(video_id, None)
+            if not by_video:
+                del self._postings[term]
+                self._sorted_terms = None
+
+    def expand_prefix(self, prefix: str) -> list[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        matches = []
+        for index in range(bisect_left(terms, prefix), len(terms)):
+            if not terms[index].startswith(prefix):
+                break
+            matches.append(terms[index])
+        return matches
+
+    def _positions_for(self, term: str, prefix: bool) -> dict[str, dict[int, list[int]]]:
+        if not prefix:
+            return self._postings.get(term, {})
+        merged: dict[str, dict[int, list[int]]] = defaultdict(lambda: defaultdict(list))
+        for expanded in self.expand_prefix(term):
+            for video_id, segments in self._postings[expanded].items():
+                for segment_index, positions in segments.items():
+                    merged[video_id][segment_index].extend(positions)
+        return merged
+
+    def phrase_hits(self, phrase: str, prefix_last: bool = False) -> list[SegmentHit]:
+        """Segments containing the tokens of `phrase` consecutively, in index order."""
+        terms = tokenize(phrase)
+        if not terms:
+            return []
+        postings = [
+            self._positions_for(term, prefix_last and index == len(terms) - 1)
+            for index, term in enumerate(terms)
+        ]
+        hits: list[SegmentHit] = []
+        for video_id, first_segments in postings[0].items():
+            for segment_index, positions in first_segments.items():
+                starts = set(positions)
+                for offset, term_postings in enumerate(postings[1:], start=1):
+                    following = term_postings.get(video_id, {}).get(segment_index)
+                    if not following:
+                        starts = set()
+                        break
+                    starts &= {position - offset for position in following}
+                    if not starts:
+                        break
+                if starts:
+                    hits.append((video_id, segment_index))
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        return hits
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[str, int, float]]:
+        """BM25-ranked segments for `query`.
+
+        Quoted parts are phrase filters, and a trailing `*` makes a term a prefix query.
+        """
+        phrases = re.findall(r'"([^"]+)"', query or "")
+        free_text = re.sub(r'"[^"]*"', " ", query or "")
+        query_terms: list[tuple[str, bool]] = []
+        for raw in free_text.split() + [term for phrase in phrases for term in phrase.split()]:
+            is_prefix = raw.endswith("*")
+            query_terms.extend((term, is_prefix) for term in tokenize(raw.rstrip("*")))
+        if not query_terms:
+            return []
+
+        required: Optional[set[SegmentHit]] = None
+        for phrase in phrases:
+            phrase_hits = set(self.phrase_hits(phrase))
+            required = phrase_hits if required is None else required & phrase_hits
+
+        document_count = self.segment_count
+        average_length = self._total_tokens / document_count if document_count else 0.0
+        scores: dict[SegmentHit, float] = defaultdict(float)
+        for term, is_prefix in query_terms:
+            term_postings = self._positions_for(term, is_prefix)
+            frequency = sum(len(segments) for segments in term_postings.values())
+            if not frequency:
+                continue
+            idf = math.log(1.0 + (document_count - frequency + 0.5) / (frequency + 0.5))
+            for video_id, segments in term_postings.items():
+                lengths = self._segment_lengths[video_id]
+                for segment_index, positions in segments.items():
+                    hit = (video_id, segment_index)
+                    if required is not None and hit not in required:
+                        continue
+                    tf = len(positions)
+                    relative_length = lengths[segment_index] / average_length if average_length else 0.0
+                    norm = 1.0 - _BM25_B + _BM25_B * relative_length
+                    scores[hit] += idf * tf * (_BM25_K1 + 1.0) / (tf + _BM25_K1 * norm)
+
+        ranked = heapq.nsmallest(max(0, limit), scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(video_id, segment_index, score) for (video_id, segment_index), score in ranked]
+
+    def to_payload(self) -> dict[str, Any]:
+        postings: dict[str, dict[str, list[int]]] = {}
+        for term, by_video in self._postings.items():
+            # Per video: flat [segment_index, count, *positions, ...] to keep the payload small.
+            postings[term] = {
+                video_id: [
+                    value
+                    for segment_index, positions in segments.items()
+                    for value in (segment_index, len(positions), *positions)
+                ]
+                for video_id, segments in by_video.items()
+            }
+        return {
+            "format_version": _INDEX_FORMAT_VERSION,
+            "segment_lengths": self._segment_lengths,
+            "postings": postings,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "TranscriptSearchIndex":
+        if payload.get("format_version") != _INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported transcript search index version: {payload.get('format_version')}")
+        index = cls()
+        index._segment_lengths = {
+            video_id: [int(length) for length in lengths]
+            for video_id, lengths in payload.get("segment_lengths", {}).items()
+        }
+        index._total_tokens = sum(sum(lengths) for lengths in index._segment_lengths.values())
+        index._document_count = sum(len(lengths) for lengths in index._segment_lengths.values())
+        for term, by_video in payload.get("postings", {}).items():
+            decoded: dict[str, dict[int, list[int]]] = {}
+            for video_id, flat in by_video.items():
+                segments: dict[int, list[int]] = {}
+                cursor = 0
+                while cursor < len(flat):
+                    segment_index, count = flat[cursor], flat[cursor + 1]
+                    segments[segment_index] = list(flat[cursor + 2 : cursor + 2 + count])
+                    cursor += 2 + count
+                decoded[video_id] = segments
+                index._video_terms.setdefault(video_id, set()).add(term)
+            index._postings[term] = decoded
+        return index
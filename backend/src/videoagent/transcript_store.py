@@ -0,0 +1,73 @@
+"""Compact, array-backed transcript storage with binary-search lookups."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, Optional, Sequence
+
+
+class CompactTranscript:
+    """Transcript held as parallel start/end arrays plus a text table.
+
+    Segments are kept sorted by start time. `_max_ends[i]` is the running maximum of
+    end times up to `i`, which keeps point/range lookups logarithmic even when
+    segments overlap.
+    """
+
+    __slots__ = ("starts", "ends", "texts", "_max_ends")
+
+    def __init__(
+        self,
+        starts: Iterable[float] = (),
+        ends: Iterable[float] = (),
+        texts: Iterable[str] = (),
+    ):
+        rows = list(zip(starts, ends, texts))
+        if any(rows[i][0] > rows[i + 1][0] for i in range(len(rows) - 1)):
+            rows.sort(key=lambda row: row[0])
+        self.starts = array("d", (float(row[0]) for row in rows))
+        self.ends = array("d", (float(row[1]) for row in rows))
+        self.texts: list[str] = [str(row[2]) for row in rows]
+        self._max_ends = array("d")
+        running = float("-inf")
+        for end in self.ends:
+            running = end if end > running else running
+            self._max_ends.append(running)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[float, float, str]]) -> "CompactTranscript":
+        rows = list(rows)
+        return cls(
+            (row[0] for row in rows),
+            (row[1] for row in rows),
+            (row[2] for row in rows),
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __bool__(self) -> bool:
+        return bool(self.texts)
+
+    def row(self, index: int) -> tuple[float, float, str]:
+        return self.starts[index], self.ends[index], self.texts[index]
+
+    def rows(self, indices: Optional[Sequence[int]] = None) -> Iterator[tuple[float, float, str]]:
+        for index in range(len(self)) if indices is None else indices:
+            yield self.row(index)
+
+    def index_at(self, time: float) -> Optional[int]:
+        """Index of the first segment (by start) with start <= time <= end."""
+        upper = bisect_right(self.starts, time)
+        lower = bisect_left(self._max_ends, time, 0, upper)
+        for index in range(lower, upper):
+            if self.ends[index] >= time:
+                return index
+        return None
+
+    def indices_in_range(self, start: float, end: float) -> list[int]:
+        """Indices of segments overlapping [start, end] (inclusive)."""
+        upper = bisect_right(self.starts, end)
+        lower = bisect_left(self._max_ends, start, 0, upper)
+        return [index for index in range(lower, upper) if self.ends[index] >= start]
@@ -229,17 +229,10 @@ class VoiceOverGenerator:
     async def generate_voice_overs_parallel(
         self,
         script_voice_pairs: list[tuple[str, str]],
-        max_concurrency: int = 4,
     ) -> list[VoiceOver]:
-        """Generate multiple voice overs concurrently (async)."""
-        semaphore = asyncio.Semaphore(max_concurrency)
-
-        async def _run(script: str, voice: str) -> VoiceOver:
-            async with semaphore:
-                return await self.generate_voice_over_async(script, voice=voice)
-
+        """Generate multiple voice overs concurrently (async); TTS calls share the process governor."""
         return await asyncio.gather(*[
-            _run(script, voice) for script, voice in script_voice_pairs
+            self.generate_voice_over_async(script, voice=voice) for script, voice in script_voice_pairs
         ])
 
     def generate_for_segment_duration(
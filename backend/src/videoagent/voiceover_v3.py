@@ -11,16 +11,12 @@ from pathlib import Path
 from typing import Callable, Optional
 
 import requests
-from tenacity import (
-    RetryCallState,
-    Retrying,
-    retry_if_exception,
-    stop_after_attempt,
-    wait_exponential,
-)
 
+from videoagent.concurrency import get_governor
 from videoagent.config import Config, default_config
 from videoagent.models import VoiceOver
+from videoagent.resilience import ErrorClass, RetryPolicy, call_with_resilience
+from videoagent.single_flight import get_single_flight
 from videoagent.voice import get_audio_duration, wave_file
 
 
@@ -29,6 +25,12 @@ DEFAULT_ELEVENLABS_VOICE_ID = "EXAVITQu4vr4xnSDxMaL"
 _ELEVENLABS_RETRY_MAX_ATTEMPTS = 5
 _ELEVENLABS_RETRY_MIN_DELAY_SECONDS = 1.0
 _ELEVENLABS_RETRY_MAX_DELAY_SECONDS = 16.0
+_ELEVENLABS_RETRY_POLICY = RetryPolicy(
+    max_attempts=_ELEVENLABS_RETRY_MAX_ATTEMPTS,
+    base_delay_seconds=_ELEVENLABS_RETRY_MIN_DELAY_SECONDS,
+    max_delay_seconds=_ELEVENLABS_RETRY_MAX_DELAY_SECONDS,
+    retry_on=frozenset({ErrorClass.RATE_LIMITED, ErrorClass.TRANSIENT}),
+)
 
 
 class ElevenLabsRateLimitError(RuntimeError):
@@ -185,45 +187,38 @@ class VoiceOverV3Generator:
                 )
             return response
 
-        response: Optional[requests.Response] = None
-        for attempt in Retrying(
-            retry=retry_if_exception(_is_retryable_elevenlabs_rate_limit_error),
-            stop=stop_after_attempt(_ELEVENLABS_RETRY_MAX_ATTEMPTS),
-            wait=wait_exponential(
-                multiplier=1,
-                min=_ELEVENLABS_RETRY_MIN_DELAY_SECONDS,
-                max=_ELEVENLABS_RETRY_MAX_DELAY_SECONDS,
-            ),
-            reraise=True,
-            before_sleep=self._log_retry_before_sleep,
-            sleep=self._retry_sleep,
-        ):
-            with attempt:
-                response = _post_tts_request()
-
-        if response is None:
-            raise RuntimeError("ElevenLabs TTS request did not return a response.")
-
-        pcm_audio = response.content
-        if not pcm_audio:
-            raise RuntimeError("ElevenLabs TTS returned an empty audio payload.")
+        def _fetch_pcm_audio() -> bytes:
+            governor = get_governor("elevenlabs", model_id)
+            response: Optional[requests.Response] = call_with_resilience(
+                lambda: governor.run(
+                    _post_tts_request,
+                    is_rate_limited=_is_retryable_elevenlabs_rate_limit_error,
+                ),
+                provider="elevenlabs",
+                operation_name=f"ElevenLabs TTS ({model_id})",
+                policy=_ELEVENLABS_RETRY_POLICY,
+                sleep=self._retry_sleep,
+                reraise=True,
+                log_prefix="[voiceover_v3]",
+            )
+
+            if response is None:
+                raise RuntimeError("ElevenLabs TTS request did not return a response.")
+
+            if not response.content:
+                raise RuntimeError("ElevenLabs TTS returned an empty audio payload.")
+            return response.content
+
+        # Concurrent requests for the same text, voice and model share one synthesis.
+        pcm_audio = get_single_flight("elevenlabs.tts").do(
+            (base_url, model_id, resolved_voice_id, text),
+            _fetch_pcm_audio,
+        )
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
         wave_file(output_path, pcm_audio, channels=1, rate=24000, sample_width=2)
         return output_path
 
-    @staticmethod
-    def _log_retry_before_sleep(retry_state: RetryCallState) -> None:
-        exc = retry_state.outcome.exception() if retry_state.outcome else None
-        if exc is None:
-            return
-        wait_seconds = retry_state.next_action.sleep if retry_state.next_action else 0.0
-        print(
-            "[voiceover_v3] ElevenLabs rate-limited "
-            f"(attempt {retry_state.attempt_number}/{_ELEVENLABS_RETRY_MAX_ATTEMPTS}): {exc}. "
-            f"Retrying in {wait_seconds:.1f}s."
-        )
-
     def _resolve_elevenlabs_model_id(self, elevenlabs_model_id: Optional[str]) -> str:
         resolved = (
             (elevenlabs_model_id or "").strip()
@@ -4,6 +4,8 @@ import sys
 import types
 from pathlib import Path
 
+import pytest
+
 
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 BACKEND_SRC = BACKEND_ROOT / "src"
@@ -19,3 +21,66 @@ if "videoagent" not in sys.modules:
     package.__package__ = "videoagent"
     sys.modules["videoagent"] = package
 
+
+class FakeClock:
+    """Manually advanced clock; `sleep` moves time forward instead of waiting."""
+
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def _scene_card(scene_id: str, start: float, end: float, summary: str, keywords: tuple[str, ...] = ()) -> dict:
+    return {
+        "scene_id": scene_id,
+        "start_time": start,
+        "end_time": end,
+        "duration": end - start,
+        "visual_summary": summary,
+        "semantic_meaning": {"feature_showcased": summary},
+        "searchable_keywords": list(keywords),
+    }
+
+
+@pytest.fixture
+def scene_card():
+    """Factory for scene-analysis cards as they appear in `eligible_scenes`."""
+    return _scene_card
+
+
+@pytest.fixture
+def scene_index_payload() -> dict:
+    """Small scene-analysis index: an expense video with three cards and a travel video with one."""
+    return {
+        "schema_version": "vo_v1",
+        "videos": [
+            {
+                "video_id": "vid_expense",
+                "filename": "expense.mp4",
+                "video_duration": 60.0,
+                "eligible_scenes": [
+                    _scene_card("sc_001", 0.0, 4.0, "Receipt scanned on phone", ("receipt", "mobile")),
+                    _scene_card("sc_002", 4.0, 9.0, "Expense report approved in dashboard", ("expense", "approval")),
+                    _scene_card("sc_003", 30.0, 32.0, "Expense policy popup", ("expense", "policy")),
+                ],
+                "excluded_scenes": [],
+            },
+            {
+                "video_id": "vid_travel",
+                "filename": "travel.mp4",
+                "video_duration": 40.0,
+                "eligible_scenes": [_scene_card("sc_001", 0.0, 12.0, "Booking a flight", ("travel", "flight"))],
+                "excluded_scenes": [],
+            },
+        ],
+    }
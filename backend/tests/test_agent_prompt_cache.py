@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agents import ModelSettings, function_tool
+from agents.extensions.models.litellm_model import LitellmModel
+
+from videoagent.agent.agent_prompt_cache import (
+    AgentPrefixCacheModel,
+    AgentStaticPrefix,
+    record_agent_turn_usage,
+)
+
+
+@function_tool
+def update_storyboard(scene_id: str) -> str:
+    """Update one storyboard scene."""
+    return scene_id
+
+
+class _FakeGeminiClient:
+    def __init__(self) -> None:
+        self.created: list[dict] = []
+        self.forgotten: list[str] = []
+
+    def get_or_create_cached_content(self, **kwargs):
+        self.created.append(kwargs)
+        return "projects/p/locations/us-central1/cachedContents/agent"
+
+    def forget_cached_content(self, name: str) -> None:
+        self.forgotten.append(name)
+
+
+def _fetch(model: AgentPrefixCacheModel, system_instructions: str) -> dict:
+    return asyncio.run(
+        model._fetch_response(
+            system_instructions,
+            [{"role": "user", "content": "hello"}],
+            ModelSettings(),
+            [update_storyboard],
+            None,
+            [],
+            None,
+            None,
+        )
+    )
+
+
+def test_static_prefix_is_served_from_cache_and_session_state_sent_fresh(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_fetch(self, system_instructions, input, model_settings, tools, *args, **kwargs):
+        return {"system": system_instructions, "input": input, "settings": model_settings, "tools": tools}
+
+    monkeypatch.setattr(LitellmModel, "_fetch_response", fake_fetch)
+    client = _FakeGeminiClient()
+    model = AgentPrefixCacheModel(
+        "vertex_ai/gemini-test",
+        provider_model="gemini-test",
+        ttl_seconds=600,
+        client_factory=lambda: client,
+    )
+    model.static_prefix = AgentStaticPrefix(
+        company_id="acme",
+        prompt_version="v1",
+        digest_generation="7",
+        text="SYSTEM PROMPT\n\nTESTIMONY DIGEST",
+    )
+
+    cached = _fetch(model, "SYSTEM PROMPT\n\nTESTIMONY DIGEST\n\nCURRENT STORYBOARD SCENES: []")
+    assert cached["system"] is None and cached["tools"] == []
+    assert cached["input"][0] == {"role": "user", "content": "CURRENT STORYBOARD SCENES: []"}
+    assert cached["settings"].extra_args == {
+        "cached_content": "projects/p/locations/us-central1/cachedContents/agent",
+        "vertex_location": "us-central1",
+    }
+    created = client.created[0]
+    assert created["system_instruction"] == "SYSTEM PROMPT\n\nTESTIMONY DIGEST"
+    assert created["tools"][0]["function_declarations"][0]["name"] == "update_storyboard"
+
+    # Instructions that no longer match the cached prefix go out uncached.
+    uncached = _fetch(model, "DIFFERENT PROMPT")
+    assert uncached["system"] == "DIFFERENT PROMPT" and len(uncached["tools"]) == 1
+
+
+def _model_failing_cached_requests(
+    monkeypatch: pytest.MonkeyPatch, error: Exception
+) -> tuple[AgentPrefixCacheModel, _FakeGeminiClient]:
+    async def fake_fetch(self, system_instructions, input, model_settings, tools, *args, **kwargs):
+        if model_settings.extra_args and "cached_content" in model_settings.extra_args:
+            raise error
+        return {"system": system_instructions}
+
+    monkeypatch.setattr(LitellmModel, "_fetch_response", fake_fetch)
+    client = _FakeGeminiClient()
+    model = AgentPrefixCacheModel(
+        "vertex_ai/gemini-test",
+        provider_model="gemini-test",
+        ttl_seconds=600,
+        client_factory=lambda: client,
+    )
+    model.static_prefix = AgentStaticPrefix(company_id="acme", prompt_version="v1", digest_generation=None, text="SYS")
+    return model, client
+
+
+def test_rejected_cache_is_forgotten_and_request_resent_uncached(monkeypatch: pytest.MonkeyPatch) -> None:
+    model, client = _model_failing_cached_requests(monkeypatch, RuntimeError("404 NOT_FOUND: CachedContent not found"))
+
+    assert _fetch(model, "SYS\n\nSTATE") == {"system": "SYS\n\nSTATE"}
+    assert client.forgotten == ["projects/p/locations/us-central1/cachedContents/agent"]
+
+
+def test_rate_limited_cached_request_propagates_and_keeps_the_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    model, client = _model_failing_cached_requests(monkeypatch, RuntimeError("429 RESOURCE_EXHAUSTED"))
+
+    with pytest.raises(RuntimeError, match="RESOURCE_EXHAUSTED"):
+        _fetch(model, "SYS\n\nSTATE")
+    assert client.forgotten == []
+
+
+def test_turn_usage_reports_cached_and_billed_input_tokens() -> None:
+    usage = SimpleNamespace(
+        requests=3,
+        input_tokens=12_000,
+        output_tokens=400,
+        input_tokens_details=SimpleNamespace(cached_tokens=9_000),
+    )
+
+    report = record_agent_turn_usage("company-usage-test", usage)
+
+    assert report == {
+        "requests": 3,
+        "input_tokens": 12_000,
+        "cached_input_tokens": 9_000,
+        "billed_input_tokens": 3_000,
+        "output_tokens": 400,
+    }
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from videoagent import concurrency
+from videoagent.concurrency import GovernorLimits, Priority, ProviderGovernor, priority_scope
+from videoagent.gemini import GeminiClient
+
+
+class _RateLimitError(Exception):
+    status_code = 429
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    return getattr(exc, "status_code", None) == 429
+
+
+def test_aimd_halves_once_per_overload_and_recovers_additively(clock) -> None:
+    governor = ProviderGovernor("vertex", "m", GovernorLimits(initial_concurrency=8, max_concurrency=10), clock=clock)
+
+    for _ in range(3):
+        governor.acquire()
+    for _ in range(3):
+        governor.release(rate_limited=True)
+    assert governor.concurrency_limit == 4
+
+    clock.now += 2.0
+    governor.acquire()
+    governor.release(rate_limited=True)
+    assert governor.concurrency_limit == 2
+
+    for _ in range(6):
+        governor.acquire()
+        governor.release(success=True)
+    assert governor.concurrency_limit == 4
+    assert governor.snapshot()["rate_limited"] == 4
+
+
+def test_token_bucket_delays_requests_beyond_burst(clock) -> None:
+    governor = ProviderGovernor(
+        "elevenlabs",
+        "m",
+        GovernorLimits(initial_concurrency=4, max_concurrency=4, rate_per_second=2.0, burst=2),
+        clock=clock,
+    )
+
+    assert governor._reserve_token() == 0.0
+    assert governor._reserve_token() == 0.0
+    assert governor._reserve_token() == pytest.approx(0.5)
+    clock.now += 1.5
+    assert governor._reserve_token() == 0.0
+
+
+def test_interactive_waiters_are_served_before_batch() -> None:
+    governor = ProviderGovernor("vertex", "m", GovernorLimits(initial_concurrency=1, max_concurrency=1))
+    order: list[str] = []
+
+    async def _call(name: str, priority: Priority) -> None:
+        async def _operation() -> None:
+            order.append(name)
+            await asyncio.sleep(0)
+
+        with priority_scope(priority):
+            await governor.run_async(_operation, is_rate_limited=_is_rate_limited)
+
+    async def _main() -> None:
+        await governor.acquire_async()
+        tasks = [
+            asyncio.create_task(_call("batch-1", Priority.BATCH)),
+            asyncio.create_task(_call("batch-2", Priority.BATCH)),
+        ]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(_call("chat", Priority.INTERACTIVE)))
+        await asyncio.sleep(0)
+        assert governor.snapshot()["queue_depth"] == 3
+        governor.release(success=True)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(_main())
+
+    assert order == ["chat", "batch-1", "batch-2"]
+    snapshot = governor.snapshot()
+    assert snapshot["max_queue_depth"] == 3
+    assert snapshot["in_flight"] == 0
+    assert snapshot["acquired"] == 4
+
+
+def test_cancelled_waiter_does_not_leak_a_slot() -> None:
+    governor = ProviderGovernor("vertex", "m", GovernorLimits(initial_concurrency=1, max_concurrency=1))
+
+    async def _main() -> None:
+        await governor.acquire_async()
+        waiter = asyncio.create_task(governor.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        governor.release(success=True)
+        await asyncio.wait_for(governor.acquire_async(), timeout=1.0)
+
+    asyncio.run(_main())
+    assert governor.snapshot()["queue_depth"] == 0
+
+
+def test_gemini_client_reports_429s_to_shared_governor(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(concurrency, "_GOVERNORS", {})
+
+    async def fake_sleep(_seconds: float) -> None:
+        return None
+
+    monkeypatch.setattr("videoagent.gemini.asyncio.sleep", fake_sleep)
+    client = GeminiClient()
+    attempts = {"count": 0}
+
+    async def flaky_operation() -> str:
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            raise _RateLimitError("429")
+        return "ok"
+
+    result = asyncio.run(
+        client._run_with_retry_async(flaky_operation, operation_name="test", model="gemini-test")
+    )
+
+    assert result == "ok"
+    [snapshot] = concurrency.governor_metrics()
+    assert (snapshot["provider"], snapshot["model"]) == ("vertex", "gemini-test")
+    assert snapshot["rate_limited"] == 1
+    assert snapshot["successes"] == 1
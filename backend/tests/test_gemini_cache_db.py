@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from videoagent.gemini import GeminiClient
+from videoagent.gemini_cache_db import GeminiCacheDB
+
+
+def _last_used_at(db: GeminiCacheDB, cache_key: str) -> float:
+    return db.fetchone("SELECT last_used_at FROM gemini_prompt_cache WHERE cache_key = ?", (cache_key,))[0]
+
+
+def test_connection_uses_wal_and_batches_touches(tmp_path: Path, clock) -> None:
+    db = GeminiCacheDB(tmp_path / "files.db", flush_interval_seconds=3600, clock=clock)
+    db.execute(
+        "INSERT INTO gemini_prompt_cache VALUES (?, ?, ?, ?, ?, ?)",
+        ("key", "model", "cachedContents/1", None, 1.0, 1.0),
+    )
+
+    for _ in range(3):
+        clock.now += 1
+        db.touch_prompt("key", "model")
+
+    assert db.fetchone("PRAGMA journal_mode")[0] == "wal"
+    assert (db.pending_touches(), _last_used_at(db, "key")) == (1, 1.0)
+    db.flush()
+    assert (db.pending_touches(), _last_used_at(db, "key")) == (0, 1_003.0)
+
+
+def _client_with_remote(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, expire_time: float) -> tuple:
+    client = GeminiClient()
+    client._cache_db = GeminiCacheDB(tmp_path / "files.db", flush_interval_seconds=3600)
+    remote_gets: list[str] = []
+
+    def fake_get(*, name):
+        remote_gets.append(name)
+        return SimpleNamespace(expire_time=expire_time)
+
+    caches = SimpleNamespace(get=fake_get)
+    monkeypatch.setattr(client, "_get_content_client", lambda: SimpleNamespace(caches=caches))
+    return client, remote_gets
+
+
+def test_prompt_cache_lookup_skips_remote_validation_while_expiry_is_far(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    client, remote_gets = _client_with_remote(monkeypatch, tmp_path, expire_time=time.time() + 3600)
+    client._store_cached_prompt_entry("far", "model", "cachedContents/far", time.time() + 3600)
+    client._store_cached_prompt_entry("near", "model", "cachedContents/near", time.time() + 30)
+    client._cache_db.forget_prompt_name("far", "model")
+
+    assert client._load_cached_prompt_name("far", "model") == "cachedContents/far"
+    assert client._load_cached_prompt_name("far", "model") == "cachedContents/far"
+    assert remote_gets == []
+
+    assert client._load_cached_prompt_name("near", "model") == "cachedContents/near"
+    assert client._load_cached_prompt_name("near", "model") == "cachedContents/near"
+    assert remote_gets == ["cachedContents/near"]
+
+    client.forget_cached_content("cachedContents/far")
+    assert client._load_cached_prompt_name("far", "model") is None
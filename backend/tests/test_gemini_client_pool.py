@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from google import genai
+
+from videoagent import gemini as gemini_module
+from videoagent.gemini import GeminiClient
+
+
+class _FakeGenaiClient:
+    created = 0
+
+    def __init__(self, **_kwargs) -> None:
+        _FakeGenaiClient.created += 1
+
+
+@pytest.fixture
+def fake_genai(monkeypatch: pytest.MonkeyPatch) -> type[_FakeGenaiClient]:
+    _FakeGenaiClient.created = 0
+    monkeypatch.setattr(gemini_module, "_GENAI_CLIENTS", {})
+    monkeypatch.setattr(gemini_module, "build_vertex_client_kwargs", lambda _config: {"vertexai": True})
+    monkeypatch.setattr(genai, "Client", _FakeGenaiClient)
+    return _FakeGenaiClient
+
+
+def test_gemini_clients_share_one_pooled_genai_client(fake_genai) -> None:
+    first = GeminiClient()._get_content_client()
+    second = GeminiClient()._get_tts_client()
+
+    assert first is second
+    assert fake_genai.created == 1
+
+
+def test_pooled_clients_are_scoped_per_event_loop(fake_genai) -> None:
+    client = GeminiClient()
+
+    async def _resolve():
+        return client._get_content_client(), client._get_content_client()
+
+    first_a, first_b = asyncio.run(_resolve())
+    second_a, _ = asyncio.run(_resolve())
+
+    assert first_a is first_b
+    assert second_a is not first_a
+    # The client pinned to the first (now closed) loop is dropped when the second is created.
+    assert gemini_module.genai_client_pool_size() == 1
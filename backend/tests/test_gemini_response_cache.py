@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from videoagent.gemini import GeminiClient
+from videoagent.response_cache import (
+    GeminiResponseCache,
+    ResponseCachePolicy,
+    UncacheableRequestError,
+    canonical_request_key,
+    json_response_validator,
+)
+
+
+def _video_part(uri: str = "gs://bucket/videos/a.mp4") -> types.Part:
+    return types.Part(
+        file_data=types.FileData(file_uri=uri, mime_type="video/mp4"),
+        video_metadata=types.VideoMetadata(start_offset="1.000s", end_offset="9.000s"),
+    )
+
+
+def _response(text: str) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part(text=text)]))]
+    )
+
+
+def test_canonical_key_is_order_independent_and_tracks_object_generation() -> None:
+    generations = {"gs://bucket/videos/a.mp4": "1"}
+    contents = types.Content(role="user", parts=[_video_part(), types.Part(text="script")])
+
+    first = canonical_request_key("m", contents, {"a": 1, "b": 2}, file_generation=generations.get)
+    reordered = canonical_request_key("m", contents, {"b": 2, "a": 1}, file_generation=generations.get)
+    generations["gs://bucket/videos/a.mp4"] = "2"
+    overwritten = canonical_request_key("m", contents, {"a": 1, "b": 2}, file_generation=generations.get)
+
+    assert first == reordered
+    assert first != overwritten
+    with pytest.raises(UncacheableRequestError):
+        canonical_request_key("m", contents, None, file_generation=lambda _uri: None)
+    with pytest.raises(UncacheableRequestError):
+        canonical_request_key("m", ["text"], {"callback": object()}, file_generation=generations.get)
+
+
+def test_cache_expires_entries_and_evicts_least_recently_used(tmp_path: Path, clock) -> None:
+    cache = GeminiResponseCache(tmp_path / "responses.db", max_bytes=10_000, clock=clock)
+
+    cache.put("short", site="s", model="m", payload="x", ttl_seconds=10)
+    clock.now += 11
+    assert cache.get("short") is None
+
+    payloads = {f"k{index}": base64.b64encode(random.Random(index).randbytes(3_000)).decode() for index in range(4)}
+    for key, payload in payloads.items():
+        cache.put(key, site="s", model="m", payload=payload, ttl_seconds=100)
+        clock.now += 1
+        cache.get("k0")
+
+    metrics = cache.metrics()
+    assert cache.get("k0") == payloads["k0"]
+    assert cache.get("k1") is None
+    assert metrics["size_bytes"] <= 10_000
+    assert metrics["evictions"] >= 1
+
+
+def test_generate_content_async_serves_repeat_calls_from_cache(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    cache = GeminiResponseCache(tmp_path / "responses.db")
+    monkeypatch.setattr("videoagent.gemini.get_response_cache", lambda: cache)
+    client = GeminiClient()
+    replies = ['{"ok": true}', "not json", '{"ok": false}']
+    calls = {"count": 0}
+
+    async def fake_generate_content(**_kwargs):
+        calls["count"] += 1
+        return _response(replies.pop(0))
+
+    fake_models = SimpleNamespace(generate_content=fake_generate_content)
+    monkeypatch.setattr(
+        client,
+        "_get_content_client",
+        lambda: SimpleNamespace(aio=SimpleNamespace(models=fake_models)),
+    )
+    policy = ResponseCachePolicy(site="deep_analysis", accept=json_response_validator(json.loads))
+
+    async def _call(prompt: str):
+        return await client.generate_content_async(
+            model="gemini-test",
+            contents=[prompt],
+            config={"response_mime_type": "application/json"},
+            response_cache=policy,
+        )
+
+    first = asyncio.run(_call("scene one"))
+    repeat = asyncio.run(_call("scene one"))
+    rejected = asyncio.run(_call("scene two"))
+    retried = asyncio.run(_call("scene two"))
+
+    assert first.text == repeat.text == '{"ok": true}'
+    assert rejected.text == "not json"
+    assert retried.text == '{"ok": false}'
+    assert calls["count"] == 3
+    site = cache.metrics()["sites"]["deep_analysis"]
+    assert (site["hits"], site["misses"], site["stores"], site["rejected"]) == (1, 3, 2, 1)
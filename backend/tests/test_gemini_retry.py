@@ -13,6 +13,12 @@ class _RateLimitError(Exception):
         self.status_code = 429
 
 
+@pytest.fixture(autouse=True)
+def _no_jitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Full-jitter backoff draws uniformly from [0, cap]; pin it to the cap.
+    monkeypatch.setattr("videoagent.resilience.random.uniform", lambda _low, high: high)
+
+
 def test_run_with_retry_sync_uses_exponential_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
     client = GeminiClient()
     attempts = {"count": 0}
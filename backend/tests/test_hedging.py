@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from videoagent import hedging
+from videoagent.agent import scene_matcher_v2 as matcher_module
+from videoagent.agent.scene_matcher_v2 import SceneMatcherV2, ShortlistClip
+from videoagent.hedging import HedgeDeadlineExceeded, HedgeGroup
+from videoagent.single_flight import SingleFlight
+from videoagent.story import _StoryboardScene
+
+
+def _warm_group(latency: float) -> HedgeGroup:
+    group = HedgeGroup("test", min_samples=5, min_hedge_delay_seconds=0.0)
+    for _ in range(5):
+        group.record_latency(latency)
+    return group
+
+
+def test_slow_call_is_hedged_and_loser_cancelled() -> None:
+    group = _warm_group(0.01)
+    flight = SingleFlight("test")
+    delays = [1.0, 0.0]
+    cancelled: list[int] = []
+
+    async def _request(attempt: int) -> str:
+        try:
+            await asyncio.sleep(delays[attempt])
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return f"attempt-{attempt}"
+
+    attempts = iter(range(2))
+
+    async def _operation() -> str:
+        attempt = next(attempts)
+        return await flight.do_async("same-request", lambda: _request(attempt))
+
+    result = asyncio.run(group.run(_operation, deadline_seconds=5.0))
+
+    assert result == "attempt-1"
+    assert cancelled == [0]
+    snapshot = group.snapshot()
+    assert (snapshot["hedges"], snapshot["hedge_wins"]) == (1, 1)
+    assert flight.snapshot()["bypassed"] == 1
+
+
+def test_deadline_cancels_every_attempt() -> None:
+    group = HedgeGroup("test")
+    cancelled: list[bool] = []
+
+    async def _operation() -> str:
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "late"
+
+    with pytest.raises(HedgeDeadlineExceeded):
+        asyncio.run(group.run(_operation, deadline_seconds=0.02))
+
+    assert cancelled == [True]
+    assert group.snapshot()["deadline_exceeded"] == 1
+
+
+class _FakeClient:
+    def __init__(self, _config) -> None:
+        self.use_vertexai = False
+
+    def get_or_upload_file(self, path):
+        return path
+
+
+def test_deep_analysis_returns_in_time_candidates_with_warning(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(hedging, "_GROUPS", {})
+    monkeypatch.setattr(matcher_module, "GeminiClient", _FakeClient)
+
+    async def fake_analyze(_client, job, _uploaded):
+        if job.video_id == "slow":
+            await asyncio.sleep(1.0)
+        return {"candidates": [{"video_id": job.video_id, "start_seconds": 0.0, "end_seconds": 5.0}]}
+
+    monkeypatch.setattr(matcher_module, "_analyze_voice_over_job", fake_analyze)
+    matcher = SceneMatcherV2.__new__(SceneMatcherV2)
+    matcher.config = None
+    matcher._deep_analysis_scene_budget_seconds = 0.05
+    clips = [
+        ShortlistClip(video_id="fast", start_time=0.0, end_time=10.0, reason="fits"),
+        ShortlistClip(video_id="slow", start_time=0.0, end_time=10.0, reason="fits"),
+    ]
+    video_map = {
+        video_id: SimpleNamespace(path=f"videos/{video_id}.mp4", duration=60.0) for video_id in ("fast", "slow")
+    }
+
+    results = asyncio.run(
+        matcher._run_deep_analysis(
+            scene=_StoryboardScene(scene_id="s1", title="Scene", purpose="Purpose", script="Script"),
+            notes="",
+            shortlist_clips=clips,
+            video_map=video_map,
+            storage=SimpleNamespace(exists=lambda _path: True),
+            target_duration=5.0,
+        )
+    )
+
+    fast, slow = results
+    assert [candidate["video_id"] for candidate in fast["candidates"]] == ["fast"]
+    assert slow["candidates"] == []
+    assert "missed the 0.05s scene budget" in slow["warning"]
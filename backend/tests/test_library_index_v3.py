@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import pytest
+
+from videoagent import library as library_module
+from videoagent.models import TranscriptSegment
+
+
+class FakeStorage:
+    def __init__(self):
+        self.blobs: dict[str, object] = {}
+        self.reads: list[str] = []
+
+    def exists(self, path: str) -> bool:
+        return path in self.blobs
+
+    def read_bytes(self, path: str) -> bytes:
+        self.reads.append(path)
+        return self.blobs[path]
+
+    def write_bytes(self, path: str, content: bytes, content_type: str = "application/octet-stream") -> None:
+        self.blobs[path] = content
+
+    def read_json(self, path: str):
+        self.reads.append(path)
+        return self.blobs[path]
+
+    def delete(self, path: str) -> bool:
+        return self.blobs.pop(path, None) is not None
+
+
+def _make_library(monkeypatch: pytest.MonkeyPatch, storage: FakeStorage) -> library_module.VideoLibrary:
+    monkeypatch.setattr(library_module, "get_storage_client", lambda _config=None: storage)
+    return library_module.VideoLibrary(company_id="acme")
+
+
+def _video(video_id: str, segments: list[TranscriptSegment]) -> library_module.VideoMetadata:
+    return library_module.VideoMetadata(
+        id=video_id,
+        path=f"gs://bucket/companies/acme/videos/{video_id}.mp4",
+        filename=f"{video_id}.mp4",
+        duration=12.0,
+        resolution=(1920, 1080),
+        fps=30.0,
+        file_size=1024,
+        transcript_segments=segments,
+    )
+
+
+def test_v3_index_round_trip_loads_transcripts_lazily(monkeypatch: pytest.MonkeyPatch):
+    storage = FakeStorage()
+    writer = _make_library(monkeypatch, storage)
+    writer.index.add_video(_video("vid_a", [TranscriptSegment(text="hello", start_time=0.0, end_time=1.5)]))
+    writer.index.add_video(_video("vid_b", []))
+    writer._dirty_transcript_ids.update({"vid_a", "vid_b"})
+    writer._save_index()
+
+    assert writer._index_header_key in storage.blobs
+    assert writer._index_transcript_key("vid_a") in storage.blobs
+    assert writer._index_transcript_key("vid_b") not in storage.blobs
+
+    reader = _make_library(monkeypatch, storage)
+    reader._load_index()
+    assert storage.reads == [reader._index_header_key]
+
+    video_a = reader.index.get_video("vid_a")
+    assert video_a is not None
+    assert video_a.resolution == (1920, 1080)
+    assert not video_a.transcript_loaded
+
+    assert [seg.text for seg in video_a.transcript_segments] == ["hello"]
+    assert storage.reads[-1] == reader._index_transcript_key("vid_a")
+    assert reader.index.get_video("vid_b").transcript_segments == []
+    assert len(storage.reads) == 2
+
+
+def test_save_does_not_fetch_or_rewrite_unloaded_transcripts(monkeypatch: pytest.MonkeyPatch):
+    storage = FakeStorage()
+    writer = _make_library(monkeypatch, storage)
+    writer.index.add_video(_video("vid_a", [TranscriptSegment(text="hello", start_time=0.0, end_time=1.5)]))
+    writer._dirty_transcript_ids.add("vid_a")
+    writer._save_index()
+
+    reader = _make_library(monkeypatch, storage)
+    reader._load_index()
+    reader._save_index()
+
+    assert storage.reads == [reader._index_header_key]
+    reloaded = _make_library(monkeypatch, storage)
+    reloaded._load_index()
+    assert [seg.text for seg in reloaded.index.get_video("vid_a").transcript_segments] == ["hello"]
+
+
+def test_legacy_v2_index_is_read_and_migrated(monkeypatch: pytest.MonkeyPatch):
+    storage = FakeStorage()
+    library = _make_library(monkeypatch, storage)
+    storage.blobs[library._legacy_index_key] = {
+        "last_indexed": "2025-01-01T00:00:00+00:00",
+        "videos": {
+            "vid_a": {
+                "id": "vid_a",
+                "path": "gs://bucket/companies/acme/videos/vid_a.mp4",
+                "filename": "vid_a.mp4",
+                "duration": 12.0,
+                "resolution": [1920, 1080],
+                "fps": 30.0,
+                "file_size": 1024,
+                "transcript_segments": [{"text": "legacy", "start_time": 0.0, "end_time": 2.0}],
+            }
+        },
+    }
+
+    library._load_index()
+    assert library.index.get_video("vid_a").transcript_segments[0].text == "legacy"
+
+    library._save_index()
+    migrated = _make_library(monkeypatch, storage)
+    migrated._load_index()
+    assert migrated.index.last_indexed == "2025-01-01T00:00:00+00:00"
+    assert migrated.index.get_video("vid_a").transcript_segments[0].text == "legacy"
+
+
+def test_video_metadata_dump_includes_lazy_transcript():
+    video = _video("vid_a", [])
+    video.set_transcript_loader(lambda: [TranscriptSegment(text="late", start_time=1.0, end_time=2.0)])
+
+    dumped = video.model_dump()
+    assert dumped["transcript_segments"] == [{"text": "late", "start_time": 1.0, "end_time": 2.0}]
+    assert library_module.VideoMetadata.model_validate(dumped).transcript_segments[0].text == "late"
+
+
+def test_failed_transcript_read_is_retried_and_not_saved_as_empty(monkeypatch: pytest.MonkeyPatch):
+    storage = FakeStorage()
+    writer = _make_library(monkeypatch, storage)
+    writer.index.add_video(_video("vid_a", [TranscriptSegment(text="hello", start_time=0.0, end_time=1.5)]))
+    writer._dirty_transcript_ids.add("vid_a")
+    writer._save_index()
+
+    reader = _make_library(monkeypatch, storage)
+    reader._load_index()
+    transcript_key = reader._index_transcript_key("vid_a")
+    blob = storage.blobs.pop(transcript_key)
+
+    video = reader.index.get_video("vid_a")
+    assert video.transcript_segments == []
+    assert not video.transcript_loaded
+    reader._save_index()
+
+    storage.blobs[transcript_key] = blob
+    reloaded = _make_library(monkeypatch, storage)
+    reloaded._load_index()
+    assert [seg.text for seg in reloaded.index.get_video("vid_a").transcript_segments] == ["hello"]
+    assert [seg.text for seg in video.transcript_segments] == ["hello"]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import pytest
+
+from videoagent import library as library_module
+from videoagent.models import VideoLibraryIndex, VideoMetadata
+
+
+def _video(video_id: str, path: str, duration: float) -> VideoMetadata:
+    return VideoMetadata(
+        id=video_id,
+        path=path,
+        filename=path.rsplit("/", 1)[-1],
+        duration=duration,
+        resolution=(1920, 1080),
+        fps=30.0,
+        file_size=100,
+    )
+
+
+def test_path_filename_and_duration_indexes_track_changes():
+    index = VideoLibraryIndex()
+    index.add_video(_video("a", "gs://bucket/x/intro.mp4", 30.0))
+    index.add_video(_video("b", "gs://bucket/y/intro.mp4", 90.0))
+    index.add_video(_video("c", "gs://bucket/y/demo.mp4", 60.0))
+
+    assert index.get_video_by_path("gs://bucket/y/demo.mp4").id == "c"
+    assert [video.id for video in index.get_videos_by_filename("intro.mp4")] == ["a", "b"]
+    assert [video.id for video in index.search_by_duration(min_duration=30.0, max_duration=60.0)] == ["a", "c"]
+
+    index.remove_video("a")
+    index.add_video(_video("c", "gs://bucket/y/demo.mp4", 120.0))
+
+    assert index.get_video_by_path("gs://bucket/x/intro.mp4") is None
+    assert [video.id for video in index.get_videos_by_filename("intro.mp4")] == ["b"]
+    assert [video.id for video in index.search_by_duration(min_duration=60.0)] == ["b", "c"]
+    assert [video.id for video in index.search_by_duration()] == ["b", "c"]
+
+
+def test_set_videos_rebuilds_indexes():
+    index = VideoLibraryIndex()
+    index.add_video(_video("a", "gs://bucket/a.mp4", 10.0))
+    index.search_by_duration()
+
+    index.set_videos({"b": _video("b", "gs://bucket/b.mp4", 20.0)})
+
+    assert index.get_video_by_path("gs://bucket/a.mp4") is None
+    assert index.get_video_by_path("gs://bucket/b.mp4").id == "b"
+    assert [video.id for video in index.search_by_duration(max_duration=25.0)] == ["b"]
+
+
+def test_legacy_ids_collapse_chains():
+    index = VideoLibraryIndex()
+    index.add_video(_video("v3", "gs://bucket/a.mp4", 10.0))
+    index.record_legacy_video_id("v1", "v2")
+    index.record_legacy_video_id("v2", "v3")
+
+    assert index.resolve_legacy_video_id("v1") == "v3"
+    assert index.resolve_legacy_video_id("v2") == "v3"
+    assert index.resolve_legacy_video_id("v3") == "v3"
+    assert index.resolve_legacy_video_id("unknown") is None
+
+
+class _ScanStorage:
+    def __init__(self, generation: str):
+        self.generation = generation
+        self.blobs: dict[str, bytes] = {}
+        self.metadata_calls = 0
+
+    def list_files(self, prefix: str, recursive: bool = True):
+        yield f"{prefix}intro.mp4"
+
+    def get_metadata(self, path: str):
+        self.metadata_calls += 1
+        return {"size": 100, "generation": self.generation, "blob_path": path}
+
+    def exists(self, path: str) -> bool:
+        return path in self.blobs
+
+    def read_bytes(self, path: str) -> bytes:
+        return self.blobs[path]
+
+    def write_bytes(self, path: str, content: bytes, content_type: str = "application/octet-stream") -> None:
+        self.blobs[path] = content
+
+    def to_gs_uri(self, path: str) -> str:
+        return f"gs://bucket/{path}"
+
+
+def test_scan_records_superseded_ids_and_resolves_without_gcs(monkeypatch: pytest.MonkeyPatch):
+    storage = _ScanStorage(generation="1")
+    monkeypatch.setattr(library_module, "get_storage_client", lambda _config=None: storage)
+
+    def fake_extract(self, video_blob_path, video_id, blob_meta):
+        return {
+            "path": self.storage.to_gs_uri(video_blob_path),
+            "filename": "intro.mp4",
+            "duration": 12.0,
+            "resolution": [1920, 1080],
+            "fps": 30.0,
+            "file_size": 100,
+        }
+
+    monkeypatch.setattr(library_module.VideoLibrary, "_extract_and_cache_video_metadata", fake_extract)
+    monkeypatch.setattr(library_module.VideoLibrary, "_load_cached_video_metadata", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(library_module.VideoLibrary, "_load_transcript_segments", lambda *_args: [])
+
+    library = library_module.VideoLibrary(company_id="acme")
+    [old_video] = library.scan_library()
+    storage.generation = "2"
+    [new_video] = library.scan_library()
+    assert old_video.id != new_video.id
+
+    reloaded = library_module.VideoLibrary(company_id="acme")
+    calls_before = storage.metadata_calls
+    assert reloaded.resolve_legacy_video_id(old_video.id) == new_video.id
+    assert storage.metadata_calls == calls_before
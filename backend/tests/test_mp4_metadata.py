@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import struct
+import subprocess
+
+import pytest
+
+from videoagent import library as library_module
+from videoagent.mp4_metadata import probe_mp4_metadata
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _full_box(box_type: bytes, payload: bytes) -> bytes:
+    return _box(box_type, b"\x00\x00\x00\x00" + payload)
+
+
+def _moov(width: int = 1280, height: int = 720, timescale: int = 30000, delta: int = 1001, samples: int = 300) -> bytes:
+    mvhd = _full_box(b"mvhd", struct.pack(">IIII", 0, 0, 1000, 10010) + b"\x00" * 80)
+    tkhd = _full_box(
+        b"tkhd",
+        struct.pack(">IIIII", 0, 0, 1, 0, 10010) + b"\x00" * 52 + struct.pack(">II", width << 16, height << 16),
+    )
+    mdhd = _full_box(b"mdhd", struct.pack(">IIII", 0, 0, timescale, samples * delta) + b"\x00" * 4)
+    hdlr = _full_box(b"hdlr", struct.pack(">I4s", 0, b"vide") + b"\x00" * 12)
+    avc1 = _box(b"avc1", b"\x00" * 6 + b"\x00\x01" + b"\x00" * 16 + struct.pack(">HH", width, height) + b"\x00" * 50)
+    stsd = _full_box(b"stsd", struct.pack(">I", 1) + avc1)
+    stts = _full_box(b"stts", struct.pack(">III", 1, samples, delta))
+    minf = _box(b"minf", _box(b"stbl", stsd + stts))
+    trak = _box(b"trak", tkhd + _box(b"mdia", mdhd + hdlr + minf))
+    return _box(b"moov", mvhd + trak)
+
+
+def _recording_reader(data: bytes):
+    calls: list[tuple[int, int]] = []
+
+    def read_range(start: int, end: int) -> bytes:
+        calls.append((start, end))
+        return data[start:end]
+
+    return read_range, calls
+
+
+def test_probe_reads_moov_from_head():
+    data = _box(b"ftyp", b"isom\x00\x00\x02\x00") + _moov() + _box(b"mdat", b"\x00" * 50_000)
+    read_range, calls = _recording_reader(data)
+
+    metadata = probe_mp4_metadata(read_range, len(data), head_bytes=4096)
+
+    assert metadata == {
+        "duration": pytest.approx(10.01),
+        "resolution": (1280, 720),
+        "fps": pytest.approx(29.97, rel=1e-3),
+        "file_size": len(data),
+    }
+    assert calls == [(0, 4096)]
+
+
+def test_probe_fetches_trailing_moov_without_reading_mdat():
+    mdat = _box(b"mdat", b"\x00" * 200_000)
+    data = _box(b"ftyp", b"isom\x00\x00\x02\x00") + mdat + _moov(width=1920, height=1080, timescale=25, delta=1)
+    read_range, calls = _recording_reader(data)
+
+    metadata = probe_mp4_metadata(read_range, len(data), head_bytes=4096)
+
+    assert metadata["resolution"] == (1920, 1080)
+    assert metadata["fps"] == pytest.approx(25.0)
+    assert sum(end - start for start, end in calls) < 10_000
+
+
+def test_probe_returns_none_without_video_track():
+    mvhd = _full_box(b"mvhd", struct.pack(">IIII", 0, 0, 1000, 5000) + b"\x00" * 80)
+    data = _box(b"ftyp", b"isom") + _box(b"moov", mvhd)
+    read_range, _calls = _recording_reader(data)
+
+    assert probe_mp4_metadata(read_range, len(data)) is None
+
+
+def test_library_metadata_extraction_skips_full_download(monkeypatch: pytest.MonkeyPatch):
+    data = _box(b"ftyp", b"isom\x00\x00\x02\x00") + _moov() + _box(b"mdat", b"\x00" * 1000)
+
+    class _Storage:
+        def read_bytes(self, path: str, start=None, end=None) -> bytes:
+            return data[start : end + 1]
+
+        def download_to_filename(self, *_args, **_kwargs):
+            raise AssertionError("full download should not be needed")
+
+    monkeypatch.setattr(library_module, "get_storage_client", lambda _config=None: _Storage())
+    library = library_module.VideoLibrary(company_id="acme")
+
+    extracted = library._extract_remote_video_metadata("companies/acme/videos/a.mp4", {"size": len(data)})
+
+    assert extracted["resolution"] == (1280, 720)
+    assert extracted["file_size"] == len(data)
+
+
+def test_library_metadata_extraction_downloads_when_ffprobe_times_out(monkeypatch: pytest.MonkeyPatch):
+    downloads: list[str] = []
+
+    class _Storage:
+        def get_url(self, path: str) -> str:
+            return f"https://storage.example/{path}?signature=x"
+
+        def download_to_filename(self, path: str, local_path) -> None:
+            downloads.append(path)
+
+    def _run(cmd, **kwargs):
+        raise subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+
+    monkeypatch.setattr(library_module, "get_storage_client", lambda _config=None: _Storage())
+    monkeypatch.setattr(subprocess, "run", _run)
+    monkeypatch.setattr(library_module, "extract_video_metadata", lambda path: {"duration": 3.0, "file_size": 10})
+    library = library_module.VideoLibrary(company_id="acme")
+
+    extracted = library._extract_remote_video_metadata("companies/acme/videos/a.webm", {"size": 10})
+
+    assert downloads == ["companies/acme/videos/a.webm"]
+    assert extracted["duration"] == 3.0
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from videoagent.db import crud
+from videoagent.db.models import Base, Company, Session, SessionChatMessage, User
+from videoagent.prompt_cache_manager import PromptCacheManager
+
+
+def test_manager_renews_in_use_caches_and_lets_idle_ones_lapse(clock) -> None:
+    extended: list[str] = []
+
+    def extender(cache, ttl_seconds):
+        extended.append(cache.company_id)
+        return clock.now + ttl_seconds
+
+    manager = PromptCacheManager(renew_margin_seconds=120, idle_after_seconds=900, extender=extender, clock=clock)
+    for company_id in ("busy", "idle"):
+        manager.track(company_id, "model", f"key-{company_id}", f"cachedContents/{company_id}", expires_at=2_000.0)
+
+    clock.now = 1_400.0
+    manager.record_use("busy", "model", "cachedContents/busy", cached_tokens=2_000)
+    manager.record_use("busy", "model", "cachedContents/stale", cached_tokens=99)
+    clock.now = 1_500.0
+    manager.tick()
+    assert extended == []
+
+    clock.now = 1_950.0
+    manager.tick()
+    assert extended == ["busy"]
+    clock.now = 2_200.0
+    manager.tick()
+
+    snapshot = manager.snapshot()
+    assert [cache["company_id"] for cache in snapshot["caches"]] == ["busy"]
+    busy = snapshot["caches"][0]
+    assert (busy["hits"], busy["cached_tokens"], busy["extensions"], busy["expires_at"]) == (1, 2_000, 1, 2_550.0)
+    assert manager.has_live_cache("busy") and not manager.has_live_cache("idle")
+
+
+def test_manager_rewarms_companies_and_counts_index_rebuilds(clock) -> None:
+    manager = PromptCacheManager(rebuild_check_seconds=300, extender=lambda cache, ttl: None, clock=clock)
+    index = SimpleNamespace(generation=1)
+    warmed: list[str] = []
+
+    def warmer(company_id: str) -> bool:
+        warmed.append(company_id)
+        key = f"key-{index.generation}"
+        manager.track(company_id, "model", key, f"cachedContents/{key}", expires_at=clock.now + 3_600)
+        return True
+
+    manager.set_warmer(warmer)
+    assert manager.warm_companies(["acme"]) == 1
+
+    clock.now += 100
+    manager.tick()
+    assert warmed == ["acme"]
+
+    index.generation = 2
+    clock.now += 300
+    manager.tick()
+
+    assert warmed == ["acme", "acme"]
+    cache = manager.snapshot()["caches"][0]
+    assert (cache["cached_content_name"], cache["rebuilds"]) == ("cachedContents/key-2", 1)
+
+
+def test_startup_warmup_lists_only_recently_active_production_companies() -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    last_message = {
+        "recent": now - timedelta(hours=1),
+        "older": now - timedelta(days=2),
+        "stale": now - timedelta(days=30),
+    }
+    for company_id, is_test in (("recent", False), ("older", False), ("stale", False), ("test", True)):
+        db.add(Company(id=company_id, name=company_id, is_test=is_test))
+        db.add(User(id=f"u_{company_id}", company_id=company_id, email=f"{company_id}@example.com", name=company_id))
+        db.add(Session(id=f"s_{company_id}", company_id=company_id, user_id=f"u_{company_id}"))
+        db.add(
+            SessionChatMessage(
+                session_id=f"s_{company_id}",
+                role="user",
+                content="hi",
+                timestamp=last_message.get(company_id, now),
+            )
+        )
+    db.commit()
+
+    since = now - timedelta(days=7)
+    assert crud.list_recently_active_company_ids(db, since) == ["recent", "older"]
+    assert crud.list_recently_active_company_ids(db, since, limit=1) == ["recent"]
+    assert crud.list_recently_active_company_ids(db, since, include_test=True)[0] == "test"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from videoagent.db.models import Base
+from videoagent.gemini import GeminiClient
+from videoagent.gemini_cache_db import GeminiCacheDB
+from videoagent.prompt_cache_registry import PromptCacheRegistry
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def test_create_lock_is_exclusive_until_released_or_lapsed(session_factory, clock) -> None:
+    node_a = PromptCacheRegistry(session_factory, node_id="a", lock_ttl_seconds=10, clock=clock, sleep=clock.sleep)
+    node_b = PromptCacheRegistry(session_factory, node_id="b", lock_ttl_seconds=10, clock=clock, sleep=clock.sleep)
+
+    assert node_a.try_acquire("key", "model") is True
+    assert node_b.try_acquire("key", "model") is False
+    # Holder died without publishing: the waiter gives up once the lock lapses and takes it.
+    assert node_b.wait_for_published("key", "model") is None
+    assert node_b.try_acquire("key", "model") is True
+
+    node_b.publish("key", "model", "cachedContents/shared", clock.now + 600)
+    assert node_a.lookup("key", "model") == ("cachedContents/shared", clock.now + 600)
+    node_a.forget("cachedContents/shared")
+    assert node_b.lookup("key", "model") is None
+
+
+def _node(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, name: str, created: list[str]) -> GeminiClient:
+    client = GeminiClient()
+    client._cache_db = GeminiCacheDB(tmp_path / f"{name}.db", flush_interval_seconds=3600)
+
+    def fake_create(*, model, config):
+        created.append(name)
+        return SimpleNamespace(name=f"cachedContents/{name}", expire_time=time.time() + 3600)
+
+    caches = SimpleNamespace(create=fake_create)
+    monkeypatch.setattr(client, "_get_content_client", lambda: SimpleNamespace(caches=caches))
+    return client
+
+
+def test_second_node_reuses_cache_published_by_first(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    session_factory,
+) -> None:
+    created: list[str] = []
+    registries = {name: PromptCacheRegistry(session_factory, node_id=name) for name in ("a", "b")}
+    clients = {name: _node(monkeypatch, tmp_path, name, created) for name in ("a", "b")}
+
+    names = []
+    for name in ("a", "b"):
+        monkeypatch.setattr("videoagent.gemini.get_prompt_cache_registry", lambda name=name: registries[name])
+        names.append(
+            clients[name].get_or_create_text_cached_content(
+                model="gemini-test",
+                cache_key="prefix-hash",
+                text="shared library context",
+                ttl_seconds=600,
+            )
+        )
+
+    assert names == ["cachedContents/a", "cachedContents/a"]
+    assert created == ["a"]
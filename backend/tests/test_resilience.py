@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from videoagent import resilience
+from videoagent.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ErrorClass,
+    RetriesExhaustedError,
+    RetryPolicy,
+    call_with_resilience,
+    call_with_resilience_async,
+    classify_error,
+    retry_budget_scope,
+)
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture(autouse=True)
+def _isolated_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(resilience, "_BREAKERS", {})
+    monkeypatch.setattr(resilience, "_STATS", {})
+
+
+def test_classify_error_separates_rate_limits_transient_and_fatal() -> None:
+    assert classify_error(_StatusError(429)) is ErrorClass.RATE_LIMITED
+    assert classify_error(RuntimeError("429 RESOURCE_EXHAUSTED: quota")) is ErrorClass.RATE_LIMITED
+    assert classify_error(_StatusError(503)) is ErrorClass.TRANSIENT
+    assert classify_error(TimeoutError()) is ErrorClass.TRANSIENT
+    assert classify_error(_StatusError(400)) is ErrorClass.FATAL
+    assert classify_error(ValueError("bad json")) is ErrorClass.FATAL
+
+    exhausted = RetriesExhaustedError("op failed after 3 attempts.")
+    exhausted.__cause__ = _StatusError(429)
+    assert classify_error(exhausted) is ErrorClass.RATE_LIMITED
+
+
+def test_backoff_uses_full_jitter_within_capped_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    bounds: list[tuple[float, float]] = []
+
+    def fake_uniform(low: float, high: float) -> float:
+        bounds.append((low, high))
+        return high / 2
+
+    monkeypatch.setattr("videoagent.resilience.random.uniform", fake_uniform)
+    policy = RetryPolicy(base_delay_seconds=1.0, max_delay_seconds=5.0)
+
+    delays = [policy.backoff_seconds(attempt) for attempt in range(1, 5)]
+
+    assert bounds == [(0.0, 1.0), (0.0, 2.0), (0.0, 4.0), (0.0, 5.0)]
+    assert delays == [0.5, 1.0, 2.0, 2.5]
+
+
+def test_retry_budget_is_shared_across_nested_calls() -> None:
+    delays: list[float] = []
+    attempts = {"count": 0}
+
+    def always_rate_limited() -> None:
+        attempts["count"] += 1
+        raise _StatusError(429)
+
+    policy = RetryPolicy(max_attempts=5, base_delay_seconds=0.01, max_delay_seconds=0.01)
+    with retry_budget_scope(3) as budget:
+        for _ in range(2):
+            with pytest.raises(RetriesExhaustedError):
+                call_with_resilience(
+                    always_rate_limited,
+                    provider="gemini",
+                    operation_name="op",
+                    policy=policy,
+                    sleep=delays.append,
+                )
+
+    # 3 retries in total: the first call uses all of them, the second gets none.
+    assert budget.retries_used == 3
+    assert attempts["count"] == 5
+    [metrics] = resilience.resilience_metrics()
+    assert metrics["retries"] == 3
+    assert metrics["budget_exhausted"] == 2
+    assert metrics["errors"] == {"rate_limited": 5}
+
+
+def test_non_retryable_errors_propagate_unchanged() -> None:
+    error = ValueError("bad request")
+
+    async def fail() -> None:
+        raise error
+
+    with pytest.raises(ValueError) as excinfo:
+        asyncio.run(call_with_resilience_async(fail, provider="vertex", operation_name="op"))
+
+    assert excinfo.value is error
+
+
+def test_circuit_breaker_opens_fails_fast_and_closes_after_probe(clock) -> None:
+    breaker = CircuitBreaker("vertex", failure_threshold=3, reset_seconds=30.0, clock=clock)
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure(ErrorClass.TRANSIENT)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 31.0
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_open_circuit_rejects_calls_without_invoking_provider(monkeypatch: pytest.MonkeyPatch, clock) -> None:
+    monkeypatch.setitem(
+        resilience._BREAKERS,
+        "elevenlabs",
+        CircuitBreaker("elevenlabs", failure_threshold=2, clock=clock),
+    )
+    calls = {"count": 0}
+
+    def unavailable() -> None:
+        calls["count"] += 1
+        raise _StatusError(503)
+
+    with pytest.raises(RetriesExhaustedError):
+        call_with_resilience(
+            unavailable,
+            provider="elevenlabs",
+            operation_name="tts",
+            policy=RetryPolicy(max_attempts=2),
+            sleep=lambda _seconds: None,
+        )
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(unavailable, provider="elevenlabs", operation_name="tts")
+
+    assert calls["count"] == 2
+    [metrics] = resilience.resilience_metrics()
+    assert metrics["circuit_state"] == "open"
+    assert metrics["circuit_rejections"] == 1
+
+
+def test_cancelled_half_open_probe_does_not_leave_circuit_stuck(monkeypatch: pytest.MonkeyPatch, clock) -> None:
+    breaker = CircuitBreaker("vertex", failure_threshold=1, reset_seconds=30.0, clock=clock)
+    monkeypatch.setitem(resilience._BREAKERS, "vertex", breaker)
+    breaker.before_call()
+    breaker.record_failure(ErrorClass.TRANSIENT)
+
+    async def cancelled() -> None:
+        raise asyncio.CancelledError()
+
+    async def ok() -> str:
+        return "ok"
+
+    clock.now += 31.0
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(call_with_resilience_async(cancelled, provider="vertex", operation_name="op"))
+    assert breaker.state == "open"
+
+    clock.now += 31.0
+    assert asyncio.run(call_with_resilience_async(ok, provider="vertex", operation_name="op")) == "ok"
+    assert breaker.state == "closed"
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from videoagent.agent.scene_card_retrieval import SceneCardRetriever, estimate_tokens
+from videoagent.agent.scene_matcher_v2 import SceneMatcherV2
+
+
+def test_retrieve_ranks_by_bm25_and_drops_infeasible_cards(scene_index_payload):
+    retriever = SceneCardRetriever(scene_index_payload)
+
+    narrowed, stats = retriever.retrieve("expense approval", target_duration=5.0, top_k=1)
+
+    # sc_003 mentions expense but its isolated 2s span cannot cover a 5s VO.
+    assert [video["video_id"] for video in narrowed["videos"]] == ["vid_expense"]
+    assert [card["scene_id"] for card in narrowed["videos"][0]["eligible_scenes"]] == ["sc_001", "sc_002"]
+    assert stats.cards_total == 4
+    assert stats.cards_feasible == 3
+    assert stats.cards_sent == 2
+
+
+def test_retrieve_pads_with_feasible_cards_when_query_has_no_overlap(scene_index_payload):
+    retriever = SceneCardRetriever(scene_index_payload)
+
+    narrowed, stats = retriever.retrieve("unrelated words", target_duration=3.0, top_k=3)
+
+    assert stats.cards_feasible == 3
+    assert stats.cards_sent == 3
+    assert sum(len(video["eligible_scenes"]) for video in narrowed["videos"]) == 3
+
+
+def test_matcher_only_narrows_when_library_exceeds_top_k(scene_index_payload):
+    matcher = SceneMatcherV2.__new__(SceneMatcherV2)
+    matcher._shortlist_retrieval_top_k = 1
+    payload = scene_index_payload
+    scene = SimpleNamespace(scene_id="s1", title="Approvals", purpose="", script="Expense approval in seconds")
+
+    narrowed = matcher._retrieve_shortlist_index_payload(
+        scene=scene,
+        notes="",
+        target_duration=5.0,
+        index_payload=payload,
+        retriever=SceneCardRetriever(payload),
+    )
+    assert narrowed is not payload
+    assert estimate_tokens(matcher._render_video_context_block(narrowed)) < estimate_tokens(
+        matcher._render_video_context_block(payload)
+    )
+
+    matcher._shortlist_retrieval_top_k = 10
+    assert (
+        matcher._retrieve_shortlist_index_payload(
+            scene=scene,
+            notes="",
+            target_duration=5.0,
+            index_payload=payload,
+            retriever=SceneCardRetriever(payload),
+        )
+        is payload
+    )
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from videoagent.agent.scene_clip_context import SceneClipLedger, plan_scene_clip_budget
+
+
+def test_budget_lowers_fps_before_deferring_clips() -> None:
+    within = plan_scene_clip_budget([("a", 10.0), ("b", 20.0)], max_frames=600, fps=5.0)
+    assert (within.fps, within.attach, within.deferred) == (5.0, ["a", "b"], [])
+
+    scaled = plan_scene_clip_budget([("a", 100.0), ("b", 100.0)], max_frames=600, fps=5.0)
+    assert (scaled.fps, scaled.attach, scaled.deferred) == (3.0, ["a", "b"], [])
+
+    deferred = plan_scene_clip_budget([("a", 500.0), ("b", 200.0), ("c", 10.0)], max_frames=600, fps=5.0)
+    assert (deferred.fps, deferred.attach, deferred.deferred) == (1.0, ["a"], ["b", "c"])
+
+
+def test_ledger_records_attachments_only_for_committed_turns() -> None:
+    ledger = SceneClipLedger()
+    ledger.stage("sess", {"scene_1": "fp1"}, {"scene_1"})
+    ledger.discard("sess")
+    ledger.commit("sess")
+    assert ledger.seen("sess") == {}
+
+    ledger.stage("sess", {"scene_1": "fp1", "scene_2": "fp2"}, {"scene_1", "scene_2"})
+    ledger.commit("sess")
+    ledger.stage("sess", {}, {"scene_2"})
+    ledger.commit("sess")
+    assert ledger.seen("sess") == {"scene_2": "fp2"}
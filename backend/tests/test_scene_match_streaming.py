@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from videoagent.agent import scene_matcher as matcher_module
+from videoagent.agent.scene_matcher import (
+    SceneMatchJob,
+    SceneMatchMode,
+    _execute_analysis_jobs,
+    _stream_scene_match_result,
+)
+from videoagent.story import SceneCandidate, _StoryboardScene
+
+
+class _MemoryStoryboardStore:
+    def __init__(self, scenes: list[_StoryboardScene]) -> None:
+        self.scenes = scenes
+        self.saves = 0
+
+    def load(self, session_id, user_id=None):
+        return [scene.model_copy(deep=True) for scene in self.scenes]
+
+    def save(self, session_id, scenes, user_id=None):
+        self.saves += 1
+        self.scenes = scenes
+
+
+class _MemoryEventStore:
+    def __init__(self) -> None:
+        self.events: list[dict] = []
+
+    def append(self, session_id, event, user_id=None):
+        self.events.append(event)
+
+
+def _scene(scene_id: str) -> _StoryboardScene:
+    return _StoryboardScene(scene_id=scene_id, title="Scene", purpose="Purpose", script="Script")
+
+
+def _job(scene_id: str, video_id: str) -> SceneMatchJob:
+    return SceneMatchJob(
+        scene_id=scene_id,
+        scene=_scene(scene_id),
+        video_id=video_id,
+        metadata=SimpleNamespace(duration=60.0),
+        notes="",
+        mode=SceneMatchMode.VOICE_OVER,
+        duration_section="",
+        target_duration=5.0,
+    )
+
+
+def _candidate(video_id: str, start: float) -> dict:
+    return {
+        "video_id": video_id,
+        "start_seconds": start,
+        "end_seconds": start + 5.0,
+        "description": f"{video_id} at {start}",
+        "rationale": "fits",
+    }
+
+
+def test_scene_results_are_published_before_slower_scenes_finish(monkeypatch: pytest.MonkeyPatch) -> None:
+    finished: list[str] = []
+    published: list[tuple[str, list[str]]] = []
+    delays = {("fast", "v1"): 0.0, ("fast", "v2"): 0.01, ("slow", "v1"): 0.05}
+
+    async def fake_analyze(_client, job, _uploaded):
+        await asyncio.sleep(delays[(job.scene_id, job.video_id)])
+        finished.append(f"{job.scene_id}:{job.video_id}")
+        return {"scene_id": job.scene_id, "video_id": job.video_id, "candidates": []}
+
+    monkeypatch.setattr(matcher_module, "_analyze_single_job", fake_analyze)
+
+    def on_scene_complete(scene_id: str, results: list[dict]) -> None:
+        published.append((scene_id, list(finished)))
+        assert {result["scene_id"] for result in results} == {scene_id}
+
+    jobs = [_job("slow", "v1"), _job("fast", "v1"), _job("fast", "v2")]
+    results = asyncio.run(_execute_analysis_jobs(None, jobs, {}, on_scene_complete=on_scene_complete))
+
+    assert [result["scene_id"] for result in results] == ["slow", "fast", "fast"]
+    assert published[0] == ("fast", ["fast:v1", "fast:v2"])
+    assert published[1][0] == "slow"
+
+
+def test_stream_persists_candidates_and_keeps_user_selection() -> None:
+    scene = _scene("s1")
+    chosen = SceneCandidate(source_video_id="picked", start_time=1.0, end_time=6.0)
+    scene.matched_scene_candidates = [chosen, SceneCandidate(source_video_id="stale", start_time=0.0, end_time=5.0)]
+    scene.selected_candidate_id = chosen.candidate_id
+    storyboard_store = _MemoryStoryboardStore([scene, _scene("s2")])
+    event_store = _MemoryEventStore()
+
+    _stream_scene_match_result(
+        storyboard_store=storyboard_store,
+        event_store=event_store,
+        session_id="session",
+        user_id="user",
+        scene_id="s1",
+        candidates=[_candidate("vid_a", 0.0), _candidate("vid_b", 10.0)],
+        keep_original_audio=False,
+        warnings=["one window skipped"],
+    )
+
+    saved = storyboard_store.scenes[0]
+    assert [candidate.source_video_id for candidate in saved.matched_scene_candidates] == ["vid_a", "vid_b", "picked"]
+    assert saved.selected_candidate_id == chosen.candidate_id
+    assert saved.matched_scene.source_video_id == "picked"
+    [event] = event_store.events
+    assert event["type"] == "scene_match_result"
+    assert (event["scene_id"], event["candidate_count"]) == ("s1", 2)
+    assert event["warnings"] == ["one window skipped"]
+
+
+def test_stream_does_not_auto_select_a_candidate() -> None:
+    storyboard_store = _MemoryStoryboardStore([_scene("s1")])
+
+    _stream_scene_match_result(
+        storyboard_store=storyboard_store,
+        event_store=_MemoryEventStore(),
+        session_id="session",
+        user_id=None,
+        scene_id="s1",
+        candidates=[_candidate("vid_a", 0.0)],
+        keep_original_audio=False,
+    )
+
+    saved = storyboard_store.scenes[0]
+    assert [candidate.source_video_id for candidate in saved.matched_scene_candidates] == ["vid_a"]
+    assert saved.selected_candidate_id is None and saved.matched_scene is None
+
+
+def test_stream_without_candidates_only_emits_event() -> None:
+    storyboard_store = _MemoryStoryboardStore([_scene("s1")])
+    event_store = _MemoryEventStore()
+
+    _stream_scene_match_result(
+        storyboard_store=storyboard_store,
+        event_store=event_store,
+        session_id="session",
+        user_id=None,
+        scene_id="s1",
+        candidates=[],
+        keep_original_audio=True,
+        errors=[{"scene_id": "s1", "error": "Model returned an empty response."}],
+    )
+
+    assert storyboard_store.saves == 0
+    assert event_store.events[0]["errors"] == ["Model returned an empty response."]
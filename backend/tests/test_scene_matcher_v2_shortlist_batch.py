@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from videoagent.agent import scene_matcher_v2 as matcher_module
+from videoagent.agent.scene_matcher_v2 import SceneMatcherV2
+
+
+def _payload() -> dict:
+    return {
+        "videos": [
+            {
+                "video_id": "vid_1",
+                "filename": "one.mp4",
+                "video_duration": 90.0,
+                "eligible_scenes": [
+                    {"scene_id": "sc_001", "start_time": 0.0, "end_time": 40.0, "visual_summary": "Dashboard"},
+                ],
+                "excluded_scenes": [],
+            }
+        ]
+    }
+
+
+def _matcher(max_scenes: int = 8) -> SceneMatcherV2:
+    matcher = SceneMatcherV2.__new__(SceneMatcherV2)
+    matcher.config = None
+    matcher.shortlist_model = "test-model"
+    matcher._thinking_budget = 100
+    matcher._shortlist_prompt_cache_ttl_seconds = 0
+    matcher._shortlist_retrieval_top_k = 0
+    matcher._shortlist_batch_max_scenes = max_scenes
+    return matcher
+
+
+def _pending_jobs(count: int) -> list[tuple]:
+    jobs = []
+    for index in range(count):
+        scene = SimpleNamespace(scene_id=f"s{index}", title=f"Scene {index}", purpose="", script="Script")
+        jobs.append((index, scene.scene_id, scene, "", 5.0))
+    return jobs
+
+
+class _FakeClient:
+    responses: list[str] = []
+    requests: list[str] = []
+
+    def __init__(self, _config) -> None:
+        self.use_vertexai = False
+
+    async def generate_content_async(self, *, model, contents, config, **_kwargs):
+        _FakeClient.requests.append(contents.parts[0].text)
+        return SimpleNamespace(text=_FakeClient.responses.pop(0), usage_metadata=None)
+
+
+@pytest.fixture
+def fake_client(monkeypatch: pytest.MonkeyPatch) -> type[_FakeClient]:
+    _FakeClient.responses = []
+    _FakeClient.requests = []
+    monkeypatch.setattr(matcher_module, "GeminiClient", _FakeClient)
+    return _FakeClient
+
+
+def _clip(video_id: str = "vid_1", end_time: float = 30.0) -> dict:
+    return {"video_id": video_id, "start_time": 0.0, "end_time": end_time, "reason": "fits"}
+
+
+def test_eight_scene_storyboard_uses_one_shortlist_call(fake_client):
+    fake_client.responses = [
+        json.dumps({"scenes": [{"scene_id": f"s{index}", "review_clips": [_clip()]} for index in range(8)]})
+    ]
+    video_map = {"vid_1": SimpleNamespace(duration=90.0)}
+
+    prepared = asyncio.run(
+        _matcher()._batch_shortlist_pending_jobs(
+            pending_jobs=_pending_jobs(8),
+            shortlist_index_payload=_payload(),
+            video_map=video_map,
+            shortlist_retriever=None,
+            scene_vector_index=None,
+        )
+    )
+
+    assert len(fake_client.requests) == 1
+    assert fake_client.requests[0].count("### TARGET SCENE") == 8
+    assert sorted(prepared) == list(range(8))
+    assert prepared[3][0]["review_clips"][0].video_id == "vid_1"
+
+
+def test_invalid_or_missing_scenes_fall_back_to_per_scene_calls(fake_client):
+    fake_client.responses = [
+        json.dumps(
+            {
+                "scenes": [
+                    {"scene_id": "s0", "review_clips": [_clip()]},
+                    {"scene_id": "s1", "review_clips": [_clip(video_id="unknown")]},
+                ]
+            }
+        )
+    ]
+    video_map = {"vid_1": SimpleNamespace(duration=90.0)}
+
+    prepared = asyncio.run(
+        _matcher()._batch_shortlist_pending_jobs(
+            pending_jobs=_pending_jobs(3),
+            shortlist_index_payload=_payload(),
+            video_map=video_map,
+            shortlist_retriever=None,
+            scene_vector_index=None,
+        )
+    )
+
+    assert list(prepared) == [0]
+
+
+def test_malformed_batch_response_returns_no_results(fake_client):
+    fake_client.responses = ["not json"]
+
+    prepared = asyncio.run(
+        _matcher()._batch_shortlist_pending_jobs(
+            pending_jobs=_pending_jobs(2),
+            shortlist_index_payload=_payload(),
+            video_map={"vid_1": SimpleNamespace(duration=90.0)},
+            shortlist_retriever=None,
+            scene_vector_index=None,
+        )
+    )
+
+    assert prepared == {}
+
+
+def test_plan_batches_respects_scene_cap_token_budget_and_duplicates(monkeypatch: pytest.MonkeyPatch):
+    matcher = _matcher(max_scenes=3)
+    items = [
+        matcher_module._ShortlistBatchItem(
+            index=index,
+            scene=scene,
+            notes="",
+            target_duration=5.0,
+            semantic_hits=[],
+            index_payload=_payload(),
+        )
+        for index, _scene_id, scene, _notes, _duration in _pending_jobs(7)
+    ]
+
+    assert [len(batch) for batch in matcher._plan_shortlist_batches(items, _payload())] == [3, 3, 1]
+
+    items[1].scene = items[0].scene
+    assert [len(batch) for batch in matcher._plan_shortlist_batches(items[:3], _payload())] == [1, 2]
+
+    matcher._shortlist_batch_max_scenes = 8
+    monkeypatch.setattr(matcher_module, "_SHORTLIST_BATCH_MAX_PROMPT_TOKENS", 1)
+    assert [len(batch) for batch in matcher._plan_shortlist_batches(items[2:], _payload())] == [1] * 5
+
+
+def test_union_index_payloads_keeps_base_order():
+    base = _payload()
+    base["videos"][0]["eligible_scenes"].append({"scene_id": "sc_002", "start_time": 40.0, "end_time": 50.0})
+    first = {"videos": [{**base["videos"][0], "eligible_scenes": [base["videos"][0]["eligible_scenes"][1]]}]}
+    second = {"videos": [{**base["videos"][0], "eligible_scenes": [base["videos"][0]["eligible_scenes"][0]]}]}
+
+    merged = SceneMatcherV2._union_index_payloads(base, [first, second])
+
+    assert [card["scene_id"] for card in merged["videos"][0]["eligible_scenes"]] == ["sc_001", "sc_002"]
+    assert SceneMatcherV2._union_index_payloads(base, [base, base]) is base
+
+
+def test_cached_prefix_keeps_full_library_and_sends_retrieval_as_hint():
+    full = _payload()
+    full["videos"][0]["eligible_scenes"].append(
+        {"scene_id": "sc_002", "start_time": 40.0, "end_time": 80.0, "visual_summary": "Invoice list"}
+    )
+    narrowed = {**full, "videos": [{**full["videos"][0], "eligible_scenes": full["videos"][0]["eligible_scenes"][1:]}]}
+    matcher = _matcher()
+
+    assert matcher._shortlist_context_payload(full, [narrowed]) == (narrowed, False)
+    matcher._shortlist_prompt_cache_ttl_seconds = 600
+    context, send_hints = matcher._shortlist_context_payload(full, [narrowed])
+    assert context is full and send_hints
+
+    scene = _pending_jobs(1)[0][2]
+    block = matcher._render_target_scene_block(scene=scene, notes="", target_duration=5.0, retrieval_hint=narrowed)
+    assert "- retrieval_hint:" in block and block.rstrip().endswith("vid_1: sc_002")
+
+
+def test_shortlist_cache_lookup_runs_off_the_event_loop(fake_client, monkeypatch: pytest.MonkeyPatch):
+    matcher = _matcher()
+    lookups: list[str] = []
+
+    def _lookup(**_kwargs):
+        # Waiting for another node's cache blocks; it must not hold up the other scene tasks on the loop.
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            lookups.append("worker thread")
+        else:
+            lookups.append("event loop")
+        return None
+
+    monkeypatch.setattr(matcher, "_get_shortlist_prompt_cached_content_name", _lookup)
+    fake_client.responses = ["{}"]
+
+    response, error = asyncio.run(
+        matcher._generate_shortlist_response(
+            client=fake_client(None),
+            shared_prompt_prefix="prefix",
+            request_block="block",
+            response_schema={},
+            scope="scene_id=s0",
+            use_prompt_cache=True,
+            thinking_budget=None,
+        )
+    )
+
+    assert lookups == ["worker thread"]
+    assert error is None and response.text == "{}"
+    assert fake_client.requests == ["prefix\n\nblock\n"]
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from videoagent.agent.scene_card_retrieval import SceneCardRetriever
+from videoagent.agent.scene_matcher_v2 import SceneMatcherV2
+from videoagent.agent.scene_vector_index import HashingEmbedder, SceneVectorIndex
+from videoagent.config import Config
+
+
+class _CountingEmbedder(HashingEmbedder):
+    def __init__(self) -> None:
+        super().__init__(dimension=256)
+        self.calls = 0
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        self.calls += 1
+        return super().embed(texts)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dimension=128)
+
+    first = embedder.embed(["expense approvals", ""])
+    second = embedder.embed(["expense approvals", ""])
+
+    assert np.array_equal(first, second)
+    assert abs(np.linalg.norm(first[0]) - 1.0) < 1e-5
+    assert not first[1].any()
+
+
+def test_search_ranks_semantically_closest_card_first(scene_index_payload):
+    index = SceneVectorIndex(HashingEmbedder())
+    assert index.sync_from_scene_index(scene_index_payload) == 2
+
+    hits = index.search("approving expenses", top_k=2)
+
+    assert hits[0][:2] == ("vid_expense", "sc_002")
+    assert len(hits) == 2
+    assert not index.uses_ivf
+
+
+def test_sync_only_reembeds_changed_videos(scene_index_payload, scene_card):
+    embedder = _CountingEmbedder()
+    index = SceneVectorIndex(embedder)
+    payload = scene_index_payload
+    index.sync_from_scene_index(payload)
+    embedder.calls = 0
+
+    assert index.sync_from_scene_index(payload) == 0
+    payload["videos"][1]["eligible_scenes"].append(scene_card("sc_002", 8.0, 14.0, "Airport check-in"))
+    payload["videos"].pop(0)
+    assert index.sync_from_scene_index(payload) == 1
+
+    assert embedder.calls == 1
+    assert index.video_ids == {"vid_travel"}
+    assert len(index) == 2
+
+
+def test_ivf_mode_finds_exact_match_with_quantized_codes(scene_card):
+    topics = ["expense", "travel", "invoice", "payroll", "budget", "vendor", "receipt", "audit"]
+    payload = {
+        "videos": [
+            {
+                "video_id": f"vid_{topic}",
+                "eligible_scenes": [
+                    scene_card(f"sc_{shot:03d}", shot * 5.0, shot * 5.0 + 5.0, f"{topic} workflow step {shot} screen")
+                    for shot in range(12)
+                ],
+            }
+            for topic in topics
+        ]
+    }
+    index = SceneVectorIndex(HashingEmbedder(), ivf_min_vectors=32, probes=4)
+    index.sync_from_scene_index(payload)
+
+    hits = index.search("payroll workflow step 7 screen", top_k=3)
+
+    assert index.uses_ivf
+    assert hits[0][:2] == ("vid_payroll", "sc_007")
+
+
+def test_concurrent_sync_and_search_never_see_a_partial_rebuild(scene_card):
+    def payload(step: int) -> dict:
+        return {
+            "videos": [
+                {
+                    "video_id": f"vid_{video}",
+                    "eligible_scenes": [
+                        scene_card(f"sc_{shot:03d}", shot * 5.0, shot * 5.0 + 5.0, f"topic {video} {shot} {step}")
+                        for shot in range(8 + (step + video) % 5)
+                    ],
+                }
+                for video in range(6 + step % 3)
+            ]
+        }
+
+    index = SceneVectorIndex(HashingEmbedder(dimension=64), ivf_min_vectors=40, probes=2)
+    index.sync_from_scene_index(payload(0))
+    errors: list[BaseException] = []
+    done = threading.Event()
+
+    def writer() -> None:
+        try:
+            for round_index in range(1, 60):
+                index.sync_from_scene_index(payload(round_index))
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            done.set()
+
+    def reader() -> None:
+        try:
+            while not done.is_set():
+                for video_id, scene_id, _score in index.search("topic 3 step 4", top_k=5):
+                    assert video_id.startswith("vid_") and scene_id.startswith("sc_")
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer), *(threading.Thread(target=reader) for _ in range(4))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert not errors
+
+
+def test_retriever_fuses_semantic_hits_by_rank(scene_index_payload):
+    retriever = SceneCardRetriever(scene_index_payload)
+
+    narrowed, _stats = retriever.retrieve(
+        "unrelated words",
+        target_duration=3.0,
+        top_k=1,
+        neighbor_radius=0,
+        semantic_hits=[("vid_travel", "sc_001", 0.9)],
+    )
+
+    assert [video["video_id"] for video in narrowed["videos"]] == ["vid_travel"]
+
+
+def test_prerank_orders_clips_by_overlapping_card_score(scene_index_payload):
+    clips = [
+        SimpleNamespace(video_id="vid_expense", start_time=0.0, end_time=3.0),
+        SimpleNamespace(video_id="vid_travel", start_time=1.0, end_time=6.0),
+        SimpleNamespace(video_id="vid_expense", start_time=7.0, end_time=11.0),
+    ]
+
+    ranked = SceneMatcherV2._prerank_shortlist_clips(
+        clips,
+        semantic_hits=[("vid_expense", "sc_002", 0.8), ("vid_travel", "sc_001", 0.3)],
+        index_payload=scene_index_payload,
+    )
+
+    assert ranked == [clips[2], clips[1], clips[0]]
+
+
+@pytest.mark.parametrize(("project", "expected"), [(None, "off"), ("proj-1", "gemini")])
+def test_default_embedder_is_gemini_only_with_a_vertex_project(
+    monkeypatch, tmp_path, scene_index_payload, project, expected
+):
+    for name in ("SCENE_VECTOR_EMBEDDER", "VERTEXAI_PROJECT", "GOOGLE_CLOUD_PROJECT", "CLOUDSDK_CORE_PROJECT"):
+        monkeypatch.delenv(name, raising=False)
+    config = Config(output_dir=tmp_path, gcp_project_id=project)
+
+    matcher = SceneMatcherV2(config, None, None, "sess_1", "company_1", "user_1")
+
+    assert matcher._scene_vector_embedder == expected
+    if expected == "off":
+        assert matcher._build_scene_embedder() is None
+        assert matcher._get_scene_vector_index(scene_index_payload) is None
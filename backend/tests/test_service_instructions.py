@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from videoagent.agent.service import VideoAgentService
+from videoagent.agent.storage import StoryboardStore
+from videoagent.story import _StoryboardScene
+
+
+class _FakeDB:
+    def query(self, _model):
+        return SimpleNamespace(filter=lambda *_args: SimpleNamespace(first=lambda: None))
+
+    def add(self, _row) -> None:
+        pass
+
+
+class _FakeDBContext:
+    def __enter__(self):
+        return _FakeDB()
+
+    def __exit__(self, *_exc) -> None:
+        return None
+
+
+class _FailingCommitDBContext(_FakeDBContext):
+    def __exit__(self, *_exc) -> None:
+        raise RuntimeError("commit failed")
+
+
+def test_dynamic_instructions_rerender_only_after_storyboard_save(monkeypatch, tmp_path: Path) -> None:
+    service = VideoAgentService(base_dir=tmp_path / "agent_sessions")
+    monkeypatch.setenv("AGENT_MODEL", "gemini/gemini-3-flash-preview")
+    monkeypatch.setattr(service, "_resolve_session_owner", lambda session_id: ("user_1", "company_1"))
+    monkeypatch.setattr(service, "_build_testimony_digest_videos", lambda company_id: [])
+    monkeypatch.setattr(service, "_build_company_brief_context", lambda company_id: "brief")
+    monkeypatch.setattr(service, "_testimony_digest_generation", lambda company_id: "1")
+    monkeypatch.setattr(service.brief_store, "load", lambda session_id, user_id=None: None)
+
+    scenes = [[_StoryboardScene(scene_id="scene_1", title="One", purpose="p", script="s")]]
+    loads: list[str] = []
+
+    def _load(session_id, user_id=None):
+        loads.append(session_id)
+        return scenes[-1]
+
+    monkeypatch.setattr(service.storyboard_store, "load", _load)
+    monkeypatch.setattr("videoagent.agent.storage.get_db_context", _FakeDBContext)
+
+    agent = service._get_agent("sess_1")
+    first = agent.instructions(None, agent)
+    assert agent.instructions(None, agent) is first
+    assert loads == ["sess_1"]
+
+    scenes.append([_StoryboardScene(scene_id="scene_2", title="Two", purpose="p", script="s")])
+    service.storyboard_store.save("sess_1", scenes[-1], user_id="user_1")
+    second = agent.instructions(None, agent)
+
+    assert loads == ["sess_1", "sess_1"]
+    assert "scene_2" in second and "scene_2" not in first
+
+
+def test_storyboard_version_is_bumped_only_after_commit(monkeypatch, tmp_path: Path) -> None:
+    store = StoryboardStore(tmp_path)
+    scenes = [_StoryboardScene(scene_id="scene_1", title="One", purpose="p", script="s")]
+
+    monkeypatch.setattr("videoagent.agent.storage.get_db_context", _FailingCommitDBContext)
+    with pytest.raises(RuntimeError, match="commit failed"):
+        store.save("sess_1", scenes)
+    assert store.version("sess_1") == 0
+
+    monkeypatch.setattr("videoagent.agent.storage.get_db_context", _FakeDBContext)
+    store.save("sess_1", scenes)
+    assert store.version("sess_1") == 1
@@ -176,3 +176,56 @@ def test_run_turn_schedules_shortlist_cache_warmup(monkeypatch, tmp_path: Path)
     assert result["response"] == "ok"
     assert calls["title"] == 1
     assert calls["cache"] == 1
+
+
+def test_scene_clip_context_attaches_only_changed_scenes(monkeypatch, tmp_path: Path) -> None:
+    service = VideoAgentService(base_dir=tmp_path / "agent_sessions")
+
+    def _scene(scene_id: str, video_id: str, start: float) -> _StoryboardScene:
+        return _StoryboardScene(
+            scene_id=scene_id,
+            title=scene_id,
+            purpose="p",
+            script="s",
+            use_voice_over=False,
+            matched_scene=_MatchedScene(
+                source_video_id=video_id,
+                start_time=start,
+                end_time=start + 4.0,
+                description=f"{scene_id} clip",
+                keep_original_audio=True,
+            ),
+        )
+
+    scenes = [_scene("scene_1", "vid_1", 0.0), _scene("scene_2", "vid_2", 10.0)]
+    scans: list[str] = []
+
+    class _FakeVideoLibrary:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def scan_library(self) -> None:
+            scans.append("scan")
+
+        def get_video(self, video_id: str):
+            return SimpleNamespace(path=f"gs://bucket/videos/{video_id}.mp4", filename=f"{video_id}.mp4")
+
+    monkeypatch.setattr(service_module, "VideoLibrary", _FakeVideoLibrary)
+    monkeypatch.setattr(service, "_resolve_session_owner", lambda session_id: ("user_1", "company_1"))
+    monkeypatch.setattr(service.storyboard_store, "load", lambda session_id, user_id=None: list(scenes))
+
+    first = service._build_scene_clip_context_message("sess_1")
+    assert [part["type"] for part in first["content"]] == ["input_file", "input_file"]
+    service._scene_clip_ledger.commit("sess_1")
+
+    unchanged = service._build_scene_clip_context_message("sess_1")
+    assert [part["type"] for part in unchanged["content"]] == ["input_text", "input_text"]
+    assert VideoAgentService._is_scene_clip_context_message(unchanged)
+    assert scans == ["scan"]
+    service._scene_clip_ledger.commit("sess_1")
+
+    scenes[1] = _scene("scene_2", "vid_3", 20.0)
+    changed = service._build_scene_clip_context_message("sess_1")
+    assert [part["type"] for part in changed["content"]] == ["input_text", "input_file"]
+    assert changed["content"][1]["file_data"] == "gs://bucket/videos/vid_3.mp4"
+    assert VideoAgentService._is_scene_clip_context_message(changed)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+
+from videoagent.agent.session_memory import (
+    SUMMARY_MARKER,
+    CompactingSQLiteSession,
+    MemoryPolicy,
+    bound_history,
+    split_turns,
+)
+
+
+def _turn(index: int, tool_output: str = "ok") -> list[dict]:
+    call_id = f"call_{index}"
+    return [
+        {"role": "user", "content": f"request {index}"},
+        {"type": "function_call", "name": "match_scene_to_video_v2", "arguments": "{}", "call_id": call_id},
+        {"type": "function_call_output", "call_id": call_id, "output": tool_output},
+        {
+            "type": "message",
+            "role": "assistant",
+            "content": [{"type": "output_text", "text": json.dumps({"response": f"reply {index}"})}],
+        },
+    ]
+
+
+def test_bound_history_summarizes_older_turns_and_drops_reflected_tool_outputs() -> None:
+    history = [item for index in range(5) for item in _turn(index, tool_output="x" * 500)]
+    policy = MemoryPolicy(recent_turns=2, max_history_tokens=0, max_tool_output_chars=100)
+
+    bounded = bound_history(history, policy)
+
+    assert bounded[0]["content"].startswith(SUMMARY_MARKER)
+    assert "- User: request 0\n  Tools: match_scene_to_video_v2\n  Assistant: reply 0" in bounded[0]["content"]
+    assert "request 3" not in bounded[0]["content"]
+    outputs = [item["output"] for item in bounded if item.get("type") == "function_call_output"]
+    assert outputs[0].startswith("[TOOL_OUTPUT_DROPPED: 500 chars")
+    assert outputs[1] == "x" * 500
+
+    # A second pass over the bounded history keeps a single, unchanged summary.
+    summary, turns = split_turns(bound_history(bounded, policy))
+    assert summary.count("request 0") == 1 and len(turns) == 2
+
+
+def test_bound_history_moves_turns_into_summary_to_fit_token_budget() -> None:
+    history = [item for index in range(3) for item in _turn(index, tool_output="y" * 4_000)]
+
+    policy = MemoryPolicy(recent_turns=3, max_history_tokens=1_500, max_tool_output_chars=10_000)
+
+    bounded = bound_history(history, policy)
+
+    _, turns = split_turns(bounded)
+    assert [turn[0]["content"] for turn in turns] == ["request 2"]
+
+
+def test_compact_rewrites_the_stored_history(tmp_path: Path) -> None:
+    session = CompactingSQLiteSession("sess_1", str(tmp_path / "agent_memory.db"))
+    asyncio.run(session.add_items([item for index in range(6) for item in _turn(index)]))
+    policy = MemoryPolicy(recent_turns=2, compact_after_turns=4)
+
+    stats = session.compact(policy)
+
+    stored = asyncio.run(session.get_items())
+    assert stats is not None and stats["items_after"] == len(stored) == 9
+    assert stored[0]["content"].startswith(SUMMARY_MARKER)
+    assert session.compact(policy) is None
+
+
+def test_items_added_during_compaction_are_not_lost(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "agent_memory.db")
+    session = CompactingSQLiteSession("sess_1", db_path)
+    asyncio.run(session.add_items([item for index in range(6) for item in _turn(index)]))
+    writer = CompactingSQLiteSession("sess_1", db_path)
+    late_item = {"role": "user", "content": "written mid-compaction"}
+    threads: list[threading.Thread] = []
+
+    def _prepare(items: list) -> list:
+        thread = threading.Thread(target=lambda: asyncio.run(writer.add_items([late_item])))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.1)
+        return items
+
+    assert session.compact(MemoryPolicy(recent_turns=2, compact_after_turns=4), _prepare) is not None
+    threads[0].join(timeout=10)
+
+    assert asyncio.run(session.get_items())[-1] == late_item
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from videoagent.agent import scene_matcher_v2 as matcher_module
+from videoagent.agent.scene_matcher_v2 import SceneMatcherV2
+from videoagent.agent.shortlist_index_cache import (
+    ShortlistIndexCache,
+    ShortlistIndexSnapshot,
+    shortlist_prompt_cache_key,
+)
+
+
+def _snapshot(generation: str) -> ShortlistIndexSnapshot:
+    return ShortlistIndexSnapshot(
+        company_id="acme",
+        index_generation=generation,
+        library_version="v",
+        video_map={},
+        index_payload={"videos": []},
+        index_warnings=[],
+        shared_prompt_prefix="prefix",
+        prompt_cache_key="key",
+    )
+
+
+def test_cache_serves_from_memory_and_revalidates_in_background(clock) -> None:
+    background: list = []
+    cache = ShortlistIndexCache(refresh_after_seconds=60, clock=clock, run_in_background=background.append)
+    generations = ["1"]
+    loads: list = []
+
+    def loader(previous):
+        loads.append(previous)
+        if previous is not None and previous.index_generation == generations[-1]:
+            return previous
+        return _snapshot(generations[-1])
+
+    first = cache.get("acme", loader)
+    assert cache.get("acme", loader) is first
+    assert loads == [None]
+
+    clock.now += 61
+    assert cache.get("acme", loader) is first
+    assert cache.get("acme", loader) is first
+    assert len(background) == 1
+    background.pop()()
+    assert loads[-1] is first
+    assert cache.get("acme", loader) is first
+
+    generations.append("2")
+    clock.now += 139
+    cache.get("acme", loader)
+    background.pop()()
+    assert cache.get("acme", loader).index_generation == "2"
+
+
+def test_zero_refresh_interval_never_revalidates(clock) -> None:
+    background: list = []
+    cache = ShortlistIndexCache(refresh_after_seconds=0, clock=clock, run_in_background=background.append)
+    loads: list = []
+
+    def loader(previous):
+        loads.append(previous)
+        return _snapshot("1")
+
+    first = cache.get("acme", loader)
+    clock.now += 10_000
+    assert cache.get("acme", loader) is first
+    assert (loads, background) == ([None], [])
+
+
+class _FakeStorage:
+    def __init__(self) -> None:
+        self.generation = "1"
+        self.reads = 0
+
+    def get_metadata(self, _path):
+        return {"generation": self.generation}
+
+    def exists(self, _path):
+        return True
+
+    def read_json(self, _path):
+        self.reads += 1
+        return {
+            "videos": [
+                {
+                    "video_id": "vid_1",
+                    "video_duration": 90.0,
+                    "eligible_scenes": [{"scene_id": "sc_001", "start_time": 0.0, "end_time": 40.0}],
+                    "excluded_scenes": [],
+                }
+            ]
+        }
+
+
+class _FakeLibrary:
+    def __init__(self, _config, company_id=None) -> None:
+        self.company_id = company_id
+
+    def scan_library(self):
+        return []
+
+    def list_videos(self):
+        return [SimpleNamespace(id="vid_1", duration=90.0, filename="one.mp4")]
+
+
+def test_matcher_loader_rebuilds_only_when_index_generation_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    storage = _FakeStorage()
+    monkeypatch.setattr(matcher_module, "get_storage_client", lambda _config: storage)
+    monkeypatch.setattr(matcher_module, "VideoLibrary", _FakeLibrary)
+    matcher = SceneMatcherV2.__new__(SceneMatcherV2)
+    matcher.config = None
+    matcher.company_id = "acme"
+    matcher.shortlist_model = "test-model"
+    matcher._shortlist_retrieval_top_k = 40
+
+    first = matcher._load_shortlist_snapshot(None)
+    unchanged = matcher._load_shortlist_snapshot(first)
+    storage.generation = "2"
+    rebuilt = matcher._load_shortlist_snapshot(first)
+
+    assert unchanged is first
+    assert rebuilt is not first and rebuilt.index_generation == "2"
+    assert storage.reads == 2
+    assert first.prompt_cache_key == shortlist_prompt_cache_key("test-model", first.shared_prompt_prefix)
+    assert first.scene_card_retriever is not None and rebuilt.scene_card_retriever is not first.scene_card_retriever
+    matcher._shortlist_snapshot = first
+    assert matcher._shortlist_prompt_prefix(first.index_payload) is first.shared_prompt_prefix
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from videoagent import single_flight
+from videoagent.single_flight import SingleFlight, get_single_flight
+from videoagent.voiceover_v3 import VoiceOverV3Generator
+
+
+def _wait_for_coalesced(flight: SingleFlight, count: int) -> None:
+    deadline = time.monotonic() + 5.0
+    while flight.snapshot()["coalesced"] < count:
+        if time.monotonic() > deadline:
+            raise AssertionError("followers never joined the flight")
+        time.sleep(0.001)
+
+
+def test_concurrent_async_callers_share_one_execution() -> None:
+    flight = SingleFlight("test")
+    calls = {"count": 0}
+
+    async def _operation() -> str:
+        calls["count"] += 1
+        await asyncio.sleep(0.01)
+        return "shared"
+
+    async def _main() -> list[str]:
+        return await asyncio.gather(*[flight.do_async("key", _operation) for _ in range(5)])
+
+    assert asyncio.run(_main()) == ["shared"] * 5
+    assert calls["count"] == 1
+    snapshot = flight.snapshot()
+    assert (snapshot["executed"], snapshot["coalesced"], snapshot["in_flight"]) == (1, 4, 0)
+
+
+def test_followers_receive_the_leaders_exception() -> None:
+    flight = SingleFlight("test")
+
+    async def _operation() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("provider failed")
+
+    async def _main() -> list[object]:
+        return await asyncio.gather(*[flight.do_async("key", _operation) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(_main())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.snapshot()["executed"] == 1
+
+
+def test_follower_runs_request_itself_when_leader_is_cancelled() -> None:
+    flight = SingleFlight("test")
+    calls = {"count": 0}
+
+    async def _operation() -> str:
+        calls["count"] += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def _main() -> str:
+        leader = asyncio.create_task(flight.do_async("key", _operation))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do_async("key", _operation))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(_main()) == "done"
+    assert calls["count"] == 2
+
+
+def test_sync_and_threaded_callers_coalesce() -> None:
+    flight = SingleFlight("test")
+    release = threading.Event()
+    results: list[int] = []
+
+    def _operation() -> int:
+        _wait_for_coalesced(flight, 2)
+        release.wait(timeout=5.0)
+        return 42
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", _operation))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5.0)
+
+    assert results == [42, 42, 42]
+    assert flight.snapshot()["executed"] == 1
+
+
+def test_sync_call_on_event_loop_thread_does_not_wait_for_async_leader() -> None:
+    flight = SingleFlight("test")
+
+    async def _main() -> list[str]:
+        async def _leader_operation() -> str:
+            await asyncio.sleep(0.05)
+            return "async"
+
+        leader = asyncio.create_task(flight.do_async("key", _leader_operation))
+        await asyncio.sleep(0)
+        # Joining the async leader here would block the loop it needs to finish.
+        sync_result = flight.do("key", lambda: "sync")
+        return [sync_result, await leader]
+
+    assert asyncio.run(_main()) == ["sync", "async"]
+    assert flight.snapshot()["bypassed"] == 1
+
+
+class _DummyResponse:
+    status_code = 200
+    content = b"\x00\x01"
+    text = ""
+
+
+def test_identical_voiceovers_share_one_elevenlabs_request(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(single_flight, "_FLIGHTS", {})
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    generator = VoiceOverV3Generator()
+    posts = {"count": 0}
+
+    def fake_post(*_args, **_kwargs) -> _DummyResponse:
+        posts["count"] += 1
+        _wait_for_coalesced(get_single_flight("elevenlabs.tts"), 1)
+        return _DummyResponse()
+
+    monkeypatch.setattr("videoagent.voiceover_v3.requests.post", fake_post)
+    monkeypatch.setattr(
+        "videoagent.voiceover_v3.wave_file",
+        lambda filename, pcm, **_kwargs: Path(filename).write_bytes(pcm),
+    )
+    outputs = [tmp_path / "a.wav", tmp_path / "b.wav"]
+    threads = [
+        threading.Thread(target=generator._synthesize_text_to_wav, args=("hello", output, "eleven_v3"))
+        for output in outputs
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5.0)
+
+    assert posts["count"] == 1
+    assert [output.read_bytes() for output in outputs] == [b"\x00\x01", b"\x00\x01"]
+    [snapshot] = single_flight.single_flight_metrics()
+    assert (snapshot["executed"], snapshot["coalesced"]) == (1, 1)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import pytest
+
+from videoagent import testimony_digest_index as digest_module
+from videoagent.testimony_digest_index import build_testimony_digest_bundle, load_testimony_digest_bundle
+
+# Imported via the module: pytest would collect `testimony_*` names as tests.
+bundle_key = digest_module.testimony_digest_bundle_key
+index_key = digest_module.testimony_digest_index_key
+video_key = digest_module.testimony_digest_video_key
+
+
+class _FakeStorage:
+    def __init__(self, objects: dict[str, dict]) -> None:
+        self.objects = objects
+        self.generations = {key: "1" for key in objects}
+        self.requests: list[str] = []
+
+    def exists(self, path: str) -> bool:
+        return path in self.objects
+
+    def read_json(self, path: str) -> dict:
+        self.requests.append(f"read {path}")
+        return self.objects[path]
+
+    def read_json_if_changed(self, path: str, generation):
+        self.requests.append(f"conditional {path}")
+        if path not in self.objects:
+            raise FileNotFoundError(path)
+        if generation == self.generations[path]:
+            return None
+        return self.objects[path], self.generations[path]
+
+    def write_json(self, path: str, payload: dict, indent=2) -> None:
+        self.requests.append(f"write {path}")
+        self.objects[path] = payload
+        self.generations[path] = str(int(self.generations.get(path, "0")) + 1)
+
+
+_CARDS = [
+    {"proof_claim": "  Cut onboarding time in half ", "speaker": {"name": "Ana"}, "metrics": [{"metric": ""}]},
+    {"proof_claim": "", "speaker": {}, "metrics": []},
+]
+
+
+@pytest.fixture(autouse=True)
+def _empty_bundle_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(digest_module, "_BUNDLES", {})
+
+
+def test_bundle_keeps_only_valid_sanitized_cards() -> None:
+    bundle = build_testimony_digest_bundle(
+        company_id="acme",
+        digests={"vid_b": {"testimony_cards": _CARDS}, "vid_a": {"testimony_cards": [_CARDS[1]]}, "vid_c": None},
+        generated_at="2026-01-01T00:00:00+00:00",
+    )
+
+    assert [video["video_id"] for video in bundle["videos"]] == ["vid_b"]
+    card = bundle["videos"][0]["testimony_cards"][0]
+    assert card["proof_claim"] == "Cut onboarding time in half"
+    assert card["metrics"] == []
+    assert bundle["counts"] == {"videos_with_valid_testimony_cards": 1, "testimony_cards_total": 1}
+
+
+def test_loader_serves_bundle_from_memory_and_revalidates_by_generation(clock) -> None:
+    key = bundle_key("acme")
+    storage = _FakeStorage({key: {"videos": [{"video_id": "vid_1", "testimony_cards": [{"proof_claim": "x"}]}]}})
+
+    first = load_testimony_digest_bundle(storage, "acme", clock=clock)
+    assert load_testimony_digest_bundle(storage, "acme", clock=clock) is first
+    assert storage.requests == [f"conditional {key}"]
+
+    clock.now += 61
+    assert load_testimony_digest_bundle(storage, "acme", clock=clock) is first
+    storage.objects[key] = {"videos": []}
+    storage.generations[key] = "2"
+    clock.now += 61
+    refreshed = load_testimony_digest_bundle(storage, "acme", clock=clock)
+
+    assert (first.generation, refreshed.generation, refreshed.videos) == ("1", "2", [])
+    assert len(storage.requests) == 3
+
+
+def test_loader_compiles_from_per_video_digests_when_bundle_is_missing(clock) -> None:
+    storage = _FakeStorage(
+        {
+            index_key("acme"): {
+                "videos": [
+                    {"video_id": "vid_1", "has_testimony_cards": True, "testimony_cards_count": 2},
+                    {"video_id": "vid_2", "has_testimony_cards": False, "testimony_cards_count": 0},
+                ]
+            },
+            video_key("acme", "vid_1"): {"testimony_cards": _CARDS},
+        }
+    )
+
+    bundle = load_testimony_digest_bundle(storage, "acme", clock=clock)
+
+    assert bundle.generation is None
+    assert [video["video_id"] for video in bundle.videos] == ["vid_1"]
+    assert storage.requests[-1] == f"write {bundle_key('acme')}"
+
+    # The compiled bundle was written back, so revalidation no longer reads every digest.
+    storage.requests.clear()
+    clock.now += 61
+    revalidated = load_testimony_digest_bundle(storage, "acme", clock=clock)
+
+    assert storage.requests == [f"conditional {bundle_key('acme')}"]
+    assert revalidated.generation == "1"
+    assert revalidated.videos == bundle.videos
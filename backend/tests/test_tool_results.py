@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from videoagent.agent import tool_results
+from videoagent.agent.tool_results import ToolResultStore, encode_tool_result, read_tool_result
+
+
+def _scene_match_output() -> str:
+    payload = {
+        "results": [
+            {
+                "scene_id": "scene_1",
+                "candidates": [
+                    {
+                        "video_id": "abc123",
+                        "start_timestamp": "00:12.000",
+                        "start_seconds": 12.0,
+                        "end_seconds": 18.5,
+                        "description": "Wide shot of the team at work. " * 20,
+                        "rationale": "Matches the voice over. " * 20,
+                    }
+                ],
+            }
+        ],
+        "warnings": {"scene_1": [f"warning {index}" for index in range(10)]},
+        "shortlist_review_clips": {"scene_1": [{"video_id": "abc123", "reason": "x" * 300}] * 5},
+    }
+    return f"{json.dumps(payload)}\nMessage: Review the candidates above."
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tool_results, "_TOOL_TOKENS", {})
+
+
+def test_large_scene_match_result_is_stored_behind_a_handle() -> None:
+    store = ToolResultStore()
+    output = _scene_match_output()
+
+    encoded = encode_tool_result("sess_1", "match_scene_to_video_v2", output, store=store)
+
+    header, compact_json, message = encoded.split("\n")
+    handle = header.split()[1].rstrip(":")
+    compact = json.loads(compact_json)
+    candidate = compact["results"][0]["candidates"][0]
+    assert (candidate["video_id"], candidate["start_seconds"], candidate["end_seconds"]) == ("abc123", 12.0, 18.5)
+    assert len(candidate["description"]) <= 160 and "start_timestamp" not in candidate
+    assert compact["warnings"]["scene_1"]["count"] == 10
+    assert compact["shortlist_review_clips"] == {"scene_1": "5 clip(s)"}
+    assert message == "Message: Review the candidates above."
+
+    drilled = read_tool_result("sess_1", handle, path="shortlist_review_clips.scene_1.0", store=store)
+    assert json.loads(drilled.split("\n", 1)[1])["video_id"] == "abc123"
+    assert read_tool_result("other_session", handle, store=store).startswith("Unknown or expired")
+
+    totals = tool_results.tool_result_metrics()["match_scene_to_video_v2"]
+    assert totals["calls"] == totals["compacted"] == 1
+    assert totals["saved_tokens"] == totals["raw_tokens"] - totals["returned_tokens"] > 0
+
+
+def test_short_results_pass_through_and_long_pages_are_chunked(monkeypatch: pytest.MonkeyPatch) -> None:
+    store = ToolResultStore()
+    assert encode_tool_result("sess_1", "update_storyboard", "UI updated successfully", store=store) == (
+        "UI updated successfully"
+    )
+
+    long_error = "generate_scene failed: RuntimeError: " + "trace line\n" * 1_000
+    encoded = encode_tool_result("sess_1", "generate_scene", long_error, store=store)
+    handle = encoded.split()[1].rstrip(":")
+    assert len(encoded) < 1_000
+
+    first_page = read_tool_result("sess_1", handle, store=store)
+    assert first_page.endswith("[More: call get_tool_result with offset=6000]")
+    assert tool_results.tool_result_metrics()["update_storyboard"]["compacted"] == 0
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import pytest
+
+from videoagent import library as library_module
+from videoagent.models import TranscriptSegment, VideoLibraryIndex, VideoMetadata
+from videoagent.transcript_search import TranscriptSearchIndex
+
+
+class FakeStorage:
+    def __init__(self):
+        self.blobs: dict[str, bytes] = {}
+        self.reads: list[str] = []
+
+    def exists(self, path: str) -> bool:
+        return path in self.blobs
+
+    def read_bytes(self, path: str) -> bytes:
+        self.reads.append(path)
+        return self.blobs[path]
+
+    def write_bytes(self, path: str, content: bytes, content_type: str = "application/octet-stream") -> None:
+        self.blobs[path] = content
+
+
+def _make_library(monkeypatch: pytest.MonkeyPatch, storage: FakeStorage) -> library_module.VideoLibrary:
+    monkeypatch.setattr(library_module, "get_storage_client", lambda _config=None: storage)
+    return library_module.VideoLibrary(company_id="acme")
+
+
+def _video(video_id: str, texts: list[str]) -> VideoMetadata:
+    return VideoMetadata(
+        id=video_id,
+        path=f"gs://bucket/videos/{video_id}.mp4",
+        filename=f"{video_id}.mp4",
+        duration=30.0,
+        resolution=(1920, 1080),
+        fps=30.0,
+        file_size=100,
+        transcript_segments=[
+            TranscriptSegment(text=text, start_time=float(index), end_time=float(index) + 1.0)
+            for index, text in enumerate(texts)
+        ],
+    )
+
+
+def _search_index() -> TranscriptSearchIndex:
+    index = TranscriptSearchIndex()
+    index.add_video("vid_a", ["Onboarding was painless", "The team loved the dashboard"])
+    index.add_video("vid_b", ["We saved hours every week", "dashboard dashboard dashboard", "team onboarding"])
+    return index
+
+
+def test_phrase_and_prefix_queries():
+    index = _search_index()
+
+    assert index.phrase_hits("the dashboard") == [("vid_a", 1)]
+    assert index.phrase_hits("dashboard the") == []
+    assert index.phrase_hits("onboard", prefix_last=True) == [("vid_a", 0), ("vid_b", 2)]
+    assert index.expand_prefix("da") == ["dashboard"]
+
+
+def test_bm25_ranks_higher_term_frequency_first_and_phrases_filter():
+    index = _search_index()
+
+    ranked = index.search("dashboard")
+    assert [(video_id, segment) for video_id, segment, _score in ranked] == [("vid_b", 1), ("vid_a", 1)]
+    assert [(video_id, segment) for video_id, segment, _score in index.search('"team onboarding"')] == [("vid_b", 2)]
+    assert index.search("missing") == []
+
+
+def test_payload_round_trip_and_incremental_removal():
+    index = _search_index()
+    restored = TranscriptSearchIndex.from_payload(index.to_payload())
+
+    assert restored.search("team") == index.search("team")
+    restored.remove_video("vid_b")
+    assert restored.video_ids == {"vid_a"}
+    assert restored.phrase_hits("dashboard") == [("vid_a", 1)]
+    assert restored.expand_prefix("sav") == []
+
+
+def test_library_index_keyword_search_matches_words_and_prefixes():
+    library_index = VideoLibraryIndex()
+    library_index.add_video(_video("vid_a", ["Onboarding was painless", "Support replied fast"]))
+
+    results = library_index.search_by_transcript_keyword("onboard")
+    assert [(video.id, [seg.text for seg in segments]) for video, segments in results] == [
+        ("vid_a", ["Onboarding was painless"])
+    ]
+    library_index.remove_video("vid_a")
+    assert library_index.search_by_transcript_keyword("onboard") == []
+
+
+def test_keyword_search_falls_back_to_substring_matches():
+    library_index = VideoLibraryIndex()
+    library_index.add_video(_video("vid_a", ["Our pricing starts at $100", "Support replied fast"]))
+
+    for keyword in ("ricing", "$100", "s at $1"):
+        results = library_index.search_by_transcript_keyword(keyword)
+        assert [(video.id, [seg.text for seg in segments]) for video, segments in results] == [
+            ("vid_a", ["Our pricing starts at $100"])
+        ], keyword
+    assert library_index.search_by_transcript_keyword("refund") == []
+
+
+def test_search_syncs_only_after_the_library_changes():
+    loads: list[str] = []
+    video = _video("vid_a", [])
+    video.set_transcript_loader(lambda: loads.append("vid_a") or _video("x", ["Onboarding was painless"]).transcript)
+    library_index = VideoLibraryIndex()
+    library_index.set_videos({"vid_a": video})
+
+    assert library_index.sync_transcript_search()
+    assert not library_index.sync_transcript_search()
+    assert [hit[:2] for hit in library_index.transcript_search.search("painless")] == [("vid_a", 0)]
+    library_index.add_video(_video("vid_b", ["painless setup"]))
+    assert not library_index.sync_transcript_search()
+    library_index.videos.pop("vid_b")
+    assert library_index.sync_transcript_search()
+    assert loads == ["vid_a"]
+
+
+def test_library_persists_search_index_and_reuses_it_without_loading_transcripts(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    storage = FakeStorage()
+    writer = _make_library(monkeypatch, storage)
+    writer.index.add_video(_video("vid_a", ["Onboarding was painless"]))
+    writer._dirty_transcript_ids.add("vid_a")
+    writer._transcript_search_loaded = True
+    writer._transcript_search_dirty = True
+    writer._save_index()
+    assert writer._transcript_search_key in storage.blobs
+
+    reader = _make_library(monkeypatch, storage)
+    reader._load_index()
+    reader._ensure_transcript_search()
+    assert [hit[:2] for hit in reader.index.transcript_search.search("painless")] == [("vid_a", 0)]
+    assert storage.reads == [reader._index_header_key, reader._transcript_search_key]
+    assert not reader._transcript_search_dirty
+
+    results = reader.search_transcripts("painless")
+    assert [(video.id, segment.text) for video, segment, _score in results] == [("vid_a", "Onboarding was painless")]
+
+
+def test_scan_library_does_not_read_transcripts_for_the_search_index(monkeypatch: pytest.MonkeyPatch):
+    storage = FakeStorage()
+    blob_path = "companies/acme/videos/vid_a.mp4"
+    video_id = library_module.get_video_id(blob_path, generation="1", size=100)
+    storage.list_files = lambda prefix, recursive=False: [blob_path]
+    storage.get_metadata = lambda path: {"generation": "1", "size": 100}
+    writer = _make_library(monkeypatch, storage)
+    writer.index.add_video(_video(video_id, ["Onboarding was painless"]))
+    writer._dirty_transcript_ids.add(video_id)
+    writer._save_index()
+
+    reader = _make_library(monkeypatch, storage)
+    reader.scan_library()
+    assert storage.reads == [reader._index_header_key]
+
+    results = reader.search_transcripts("painless")
+    assert [(video.id, segment.text) for video, segment, _score in results] == [(video_id, "Onboarding was painless")]
+    assert storage.reads[-1] == reader._index_transcript_key(video_id)
+    assert reader._transcript_search_key in storage.blobs
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import random
+
+from videoagent.models import TranscriptSegment, VideoMetadata
+from videoagent.transcript_store import CompactTranscript
+
+
+def _linear_at(rows, time):
+    for index, (start, end, _text) in enumerate(rows):
+        if start <= time <= end:
+            return index
+    return None
+
+
+def _linear_range(rows, start, end):
+    return [index for index, (seg_start, seg_end, _text) in enumerate(rows) if seg_end >= start and seg_start <= end]
+
+
+def test_lookups_match_linear_scan_with_overlapping_segments():
+    rng = random.Random(7)
+    rows = []
+    cursor = 0.0
+    for index in range(400):
+        start = cursor + rng.uniform(-1.0, 2.0)
+        rows.append((start, start + rng.uniform(0.1, 6.0), f"line {index}"))
+        cursor = max(cursor, start)
+    rows.sort(key=lambda row: row[0])
+    transcript = CompactTranscript.from_rows(rows)
+
+    for _ in range(500):
+        time = rng.uniform(-2.0, cursor + 8.0)
+        assert transcript.index_at(time) == _linear_at(rows, time)
+        span_start = rng.uniform(-2.0, cursor + 8.0)
+        span_end = span_start + rng.uniform(0.0, 10.0)
+        assert transcript.indices_in_range(span_start, span_end) == _linear_range(rows, span_start, span_end)
+
+
+def test_unsorted_input_is_ordered_by_start_time():
+    transcript = CompactTranscript([5.0, 1.0], [6.0, 2.0], ["late", "early"])
+
+    assert transcript.texts == ["early", "late"]
+    assert transcript.index_at(5.5) == 1
+    assert transcript.index_at(3.0) is None
+    assert CompactTranscript().indices_in_range(0.0, 10.0) == []
+
+
+def test_video_metadata_materializes_segments_at_boundary():
+    video = VideoMetadata(
+        id="vid_a",
+        path="gs://bucket/videos/a.mp4",
+        filename="a.mp4",
+        duration=10.0,
+        resolution=(1920, 1080),
+        fps=30.0,
+        file_size=100,
+        transcript_segments=[
+            TranscriptSegment(text="one", start_time=0.0, end_time=2.0),
+            {"text": "two", "start_time": 2.0, "end_time": 4.0},
+        ],
+    )
+
+    assert isinstance(video.transcript, CompactTranscript)
+    assert video.get_transcript_at_time(3.0) == TranscriptSegment(text="two", start_time=2.0, end_time=4.0)
+    assert [seg.text for seg in video.get_transcript_in_range(1.0, 2.5)] == ["one", "two"]
+    assert video.get_full_transcript() == "[0.00-2.00] one [2.00-4.00] two"
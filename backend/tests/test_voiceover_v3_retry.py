@@ -25,6 +25,12 @@ def _write_fake_wave(
     filename.write_bytes(pcm)
 
 
+@pytest.fixture(autouse=True)
+def _no_jitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Full-jitter backoff draws uniformly from [0, cap]; pin it to the cap.
+    monkeypatch.setattr("videoagent.resilience.random.uniform", lambda _low, high: high)
+
+
 def test_synthesize_retries_429_then_succeeds(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ) -> None:
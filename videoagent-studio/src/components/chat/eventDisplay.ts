@@ -87,6 +87,16 @@ export function getEventDisplay(event: AgentEvent): EventDisplay {
             }
 
 
+        case 'scene_match_result':
+            return {
+                icon: '🎞️',
+                label: event.candidate_count
+                    ? `Found ${event.candidate_count} candidate${event.candidate_count === 1 ? '' : 's'} for scene ${event.scene_id}`
+                    : `No candidates found for scene ${event.scene_id}`,
+                color: event.candidate_count ? 'text-green-600' : 'text-amber-600',
+                isAnimated: false,
+            };
+
         case 'video_render_complete':
             return {
                 icon: '✅',
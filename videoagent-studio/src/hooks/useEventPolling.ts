@@ -50,7 +50,7 @@ export function useEventPolling() {
                     addEvent(event);
 
                     // Handle special event types for real-time updates
-                    if (event.type === 'storyboard_update') {
+                    if (event.type === 'storyboard_update' || event.type === 'scene_match_result') {
                         // Fetch latest storyboard when updated
                         try {
                             const storyboard = await api.getStoryboard(sessionId);
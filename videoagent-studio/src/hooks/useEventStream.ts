@@ -69,7 +69,7 @@ export function useEventStream() {
             addEvent(data);
 
             // Handle special event types for real-time updates
-            if (data.type === 'storyboard_update' && sessionId) {
+            if ((data.type === 'storyboard_update' || data.type === 'scene_match_result') && sessionId) {
                 try {
                     const storyboard = await api.getStoryboard(sessionId);
                     if (storyboard.scenes?.length > 0) {
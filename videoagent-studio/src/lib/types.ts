@@ -13,7 +13,8 @@ export type EventType =
     | 'video_render_start'
     | 'video_render_complete'
     | 'video_brief_update'
-    | 'session_title_updated';
+    | 'session_title_updated'
+    | 'scene_match_result';
 
 export interface AgentEvent {
     ts: string;
@@ -26,6 +27,8 @@ export interface AgentEvent {
     source?: string;
     output?: string;
     input?: unknown;
+    scene_id?: string;
+    candidate_count?: number;
 }
 
 export interface Message {